@@ -0,0 +1,276 @@
+"""
+Podium Pal Backend - Acoustic Analysis
+=======================================
+Measures how a recording was delivered from the audio itself: frame energy,
+voice-activity segmentation, pauses, speaking time vs. silence and pitch
+variability. PCM WAV files are read in fixed-size blocks of frames, so memory
+stays bounded however long the recording is, and analyses run in a process
+pool so the NumPy work never holds the server's GIL.
+"""
+
+import asyncio
+import logging
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAME_SECONDS = 0.03
+BLOCK_SECONDS = 10.0
+
+# Silences shorter than this are treated as part of the speech around them
+MIN_PAUSE_SECONDS = 0.3
+LONG_PAUSE_SECONDS = 1.5
+# Bursts of energy shorter than this (clicks, breaths) are not speech
+MIN_SPEECH_SECONDS = 0.1
+
+# Frames must be at least this many dB above the noise floor to count as voiced
+VAD_MARGIN_DB = 10.0
+VAD_MIN_DB = -55.0
+
+PITCH_MIN_HZ = 70.0
+PITCH_MAX_HZ = 400.0
+# Normalized autocorrelation peak needed to trust a pitch estimate
+PITCH_MIN_PERIODICITY = 0.3
+
+
+def _decode_pcm(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Decode interleaved little-endian PCM into mono float32 samples in [-1, 1]"""
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        samples = values.astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def iter_frame_blocks(wav_file: wave.Wave_read, frame_length: int,
+                      block_seconds: float = BLOCK_SECONDS) -> Iterator[np.ndarray]:
+    """
+    Yield (n_frames, frame_length) arrays of consecutive, non-overlapping frames
+
+    Reads about `block_seconds` of audio at a time; a trailing partial frame
+    is dropped.
+    """
+    sample_rate = wav_file.getframerate()
+    frames_per_block = max(1, int(block_seconds * sample_rate) // frame_length)
+    carry = np.zeros(0, dtype=np.float32)
+    while True:
+        raw = wav_file.readframes(frames_per_block * frame_length)
+        if not raw:
+            break
+        samples = _decode_pcm(raw, wav_file.getsampwidth(), wav_file.getnchannels())
+        if carry.size:
+            samples = np.concatenate([carry, samples])
+        usable = samples.size - samples.size % frame_length
+        carry = samples[usable:]
+        if usable:
+            yield samples[:usable].reshape(-1, frame_length)
+
+
+def frame_energy_db(frames: np.ndarray) -> np.ndarray:
+    """RMS energy of each frame in dBFS"""
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(rms + 1e-10)
+
+
+def frame_pitch_hz(frames: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Autocorrelation pitch estimate for each frame (NaN where not periodic)
+
+    The autocorrelation of every frame is computed at once through the FFT.
+    """
+    frame_length = frames.shape[1]
+    min_lag = max(1, int(sample_rate / PITCH_MAX_HZ))
+    max_lag = min(frame_length - 1, int(sample_rate / PITCH_MIN_HZ))
+    if max_lag <= min_lag:
+        return np.full(frames.shape[0], np.nan)
+
+    centered = (frames - frames.mean(axis=1, keepdims=True)) * np.hanning(frame_length)
+    n_fft = 1 << (2 * frame_length - 1).bit_length()
+    spectrum = np.fft.rfft(centered, n=n_fft, axis=1)
+    autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft, axis=1)[:, :max_lag + 1]
+
+    lags = min_lag + np.argmax(autocorr[:, min_lag:], axis=1)
+    zero_lag = autocorr[:, 0]
+    peak = autocorr[np.arange(autocorr.shape[0]), lags]
+    periodicity = np.divide(peak, zero_lag, out=np.zeros_like(peak), where=zero_lag > 0)
+    return np.where(periodicity >= PITCH_MIN_PERIODICITY, sample_rate / lags, np.nan)
+
+
+def _runs(mask: np.ndarray):
+    """Start and end indices (end exclusive) of each run of True values"""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def segment_speech(energy_db: np.ndarray, frame_seconds: float) -> np.ndarray:
+    """
+    Voice-activity mask over frames
+
+    The threshold sits VAD_MARGIN_DB above the noise floor (the 10th
+    percentile of frame energy). Short gaps are bridged and short bursts
+    dropped so that only real pauses separate speech segments.
+    """
+    if energy_db.size == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = float(np.percentile(energy_db, 10))
+    threshold = max(noise_floor + VAD_MARGIN_DB, VAD_MIN_DB)
+    # Speech throughout (no quiet frames to estimate noise from): stay below the loud frames
+    threshold = min(threshold, float(np.percentile(energy_db, 90)) - 3.0)
+    speech = energy_db > threshold
+
+    min_gap = int(round(MIN_PAUSE_SECONDS / frame_seconds))
+    starts, ends = _runs(~speech)
+    for start, end in zip(starts, ends):
+        if 0 < start and end < speech.size and end - start < min_gap:
+            speech[start:end] = True
+
+    min_burst = int(round(MIN_SPEECH_SECONDS / frame_seconds))
+    starts, ends = _runs(speech)
+    for start, end in zip(starts, ends):
+        if end - start < min_burst:
+            speech[start:end] = False
+    return speech
+
+
+def analyze_wav(path: str, frame_seconds: float = FRAME_SECONDS,
+                block_seconds: float = BLOCK_SECONDS) -> Optional[Dict]:
+    """
+    Acoustic delivery metrics for a PCM WAV file
+
+    Only per-frame energy and pitch are kept while reading, so memory grows
+    with the number of 30 ms frames, not with the number of samples.
+
+    Args:
+        path: WAV file path
+        frame_seconds: Analysis frame length
+        block_seconds: Amount of audio decoded per read
+
+    Returns:
+        Dictionary of audio metrics, or None if the file is not PCM WAV
+    """
+    try:
+        wav_file = wave.open(str(path), "rb")
+    except (wave.Error, EOFError):
+        return None
+
+    with wav_file:
+        sample_rate = wav_file.getframerate()
+        frame_length = max(1, int(round(sample_rate * frame_seconds)))
+        frame_seconds = frame_length / sample_rate
+        duration = wav_file.getnframes() / sample_rate if sample_rate else 0.0
+        energy_blocks = []
+        pitch_blocks = []
+        for frames in iter_frame_blocks(wav_file, frame_length, block_seconds):
+            energy_blocks.append(frame_energy_db(frames).astype(np.float32))
+            pitch_blocks.append(frame_pitch_hz(frames, sample_rate).astype(np.float32))
+
+    energy_db = np.concatenate(energy_blocks) if energy_blocks else np.zeros(0, dtype=np.float32)
+    pitch_hz = np.concatenate(pitch_blocks) if pitch_blocks else np.zeros(0, dtype=np.float32)
+    speech = segment_speech(energy_db, frame_seconds)
+
+    speech_starts, speech_ends = _runs(speech)
+    speaking_seconds = float(speech.sum()) * frame_seconds
+    pauses = np.zeros(0)
+    if speech_starts.size > 1:
+        # Pauses are the silences between speech segments, not leading or trailing silence
+        pauses = (speech_starts[1:] - speech_ends[:-1]) * frame_seconds
+
+    voiced_pitch = pitch_hz[speech & ~np.isnan(pitch_hz)]
+    mean_pitch = None
+    pitch_variability = None
+    if voiced_pitch.size >= 10:
+        mean_pitch = round(float(np.mean(voiced_pitch)), 1)
+        semitones = 12.0 * np.log2(voiced_pitch / np.median(voiced_pitch))
+        pitch_variability = round(float(np.std(semitones)), 2)
+
+    return {
+        "durationSeconds": round(duration, 2),
+        "speakingSeconds": round(speaking_seconds, 2),
+        "silenceSeconds": round(max(0.0, duration - speaking_seconds), 2),
+        "speakingRatio": round(speaking_seconds / duration, 3) if duration else 0.0,
+        "speechSegments": int(speech_starts.size),
+        "pauseCount": int(pauses.size),
+        "longPauseCount": int(np.sum(pauses >= LONG_PAUSE_SECONDS)),
+        "meanPauseSeconds": round(float(pauses.mean()), 2) if pauses.size else 0.0,
+        "longestPauseSeconds": round(float(pauses.max()), 2) if pauses.size else 0.0,
+        "meanPitchHz": mean_pitch,
+        "pitchVariabilitySemitones": pitch_variability,
+        "sampleRate": sample_rate
+    }
+
+
+def articulation_rate(word_count: int, audio_metrics: Dict) -> Optional[int]:
+    """Words per minute of actual speaking time (pauses excluded)"""
+    speaking_seconds = audio_metrics.get("speakingSeconds") or 0
+    if speaking_seconds <= 0:
+        return None
+    return int(word_count / (speaking_seconds / 60.0))
+
+
+class AcousticAnalyzer:
+    """
+    Runs analyze_wav in a process pool with a per-file deadline
+
+    The pool is created on first use, so importing the backend (for example
+    from benchmarks) does not start worker processes. A pool broken by a
+    worker that died (killed, out of memory) is replaced, and the file is
+    tried once more in the new pool.
+    """
+
+    def __init__(self, workers: int = 2, timeout: Optional[float] = 60.0):
+        self.workers = workers
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def analyze(self, path: Path) -> Optional[Dict]:
+        """
+        Analyze an audio file, returning None for unsupported formats or on failure
+
+        Args:
+            path: Path to the stored recording
+        """
+        if Path(path).suffix.lower() not in (".wav", ".wave"):
+            return None
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            pool = self._pool
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(pool, analyze_wav, str(path)), self.timeout)
+            except BrokenProcessPool as e:
+                # Other analyses may have replaced the broken pool already
+                if self._pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+                if attempt == 0:
+                    logger.warning("Audio analysis pool broken, retrying in a new pool", extra={"path": str(path)})
+                    continue
+                logger.error("Audio analysis failed", extra={"path": str(path), "error": str(e)})
+            except asyncio.TimeoutError:
+                logger.warning("Audio analysis timed out", extra={"path": str(path)})
+            except Exception as e:
+                logger.error("Audio analysis failed", extra={"path": str(path), "error": str(e)})
+            return None
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
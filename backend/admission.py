@@ -0,0 +1,239 @@
+"""
+Podium Pal Backend - Admission Control
+=======================================
+Decides which analysis work runs and when: per-client token buckets reject
+clients that submit faster than their rate, and a priority queue in front of
+the LLM stage caps concurrent Gemini calls, serves interactive requests ahead
+of batch and background work, and sheds load when the queue is full.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+# Priority classes, most urgent first. Background work (queued jobs) is never
+# shed: the job queue already bounds it, and it has nobody waiting to retry.
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITY_BACKGROUND = "background"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BATCH, PRIORITY_BACKGROUND)
+_SHEDDABLE = {PRIORITY_INTERACTIVE, PRIORITY_BATCH}
+
+
+class AdmissionRejectedError(Exception):
+    """
+    Work refused now; the client should retry after `retry_after` seconds
+
+    Reasons: "rate_limited" (the client's bucket is empty), "queue_full" (no
+    room to wait) and "shed" (evicted from the queue for more urgent work).
+    """
+
+    def __init__(self, message: str, retry_after: float, reason: str):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+    @property
+    def retry_after_header(self) -> str:
+        """Whole seconds for a Retry-After header, at least 1"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `burst` tokens, refilled at `rate` tokens per second
+
+    A request costing more than the burst is admitted once the bucket is
+    full and leaves it in debt, so large batches are slowed, not refused forever.
+    """
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """
+        Take `cost` tokens if available
+
+        Returns:
+            0 if admitted, otherwise seconds until enough tokens will be available
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        needed = min(cost, self.burst)
+        if self.tokens >= needed:
+            self.tokens -= cost
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """
+    Token bucket per client id, kept for the `max_clients` most recent clients
+
+    Args:
+        rate_per_minute: Sustained requests per minute per client (0 disables limiting)
+        burst: Requests a client may make at once after being idle
+        max_clients: Buckets kept; the least recently seen client is forgotten
+            first (and starts over with a full bucket)
+    """
+
+    def __init__(self, rate_per_minute: float, burst: float, max_clients: int = 10000,
+                 clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self._clock = clock
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._limited = 0
+
+    def check(self, client_id: str, cost: float = 1.0):
+        """
+        Charge a client for a request
+
+        Raises:
+            AdmissionRejectedError: If the client has no tokens left (reason "rate_limited")
+        """
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = self._buckets[client_id] = TokenBucket(self.rate, self.burst, now)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_id)
+            wait = bucket.take(cost, now)
+            if wait:
+                self._limited += 1
+        if wait:
+            raise AdmissionRejectedError("Too many requests from this client", wait, "rate_limited")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"clients": len(self._buckets), "limited": self._limited}
+
+
+class AdmissionController:
+    """
+    Concurrency cap with a bounded priority wait queue
+
+    At most `max_concurrent` slots are held at once. Callers beyond that wait
+    in priority order (FIFO within a class). When `max_queue` interactive and
+    batch callers are already waiting, a new caller evicts the newest waiter of
+    a less urgent class if there is one, and is rejected otherwise. The
+    Retry-After estimate is the queue ahead divided by the slot count, times
+    the recent average time a slot is held.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, initial_hold_seconds: float = 5.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self._running = 0
+        # Heap entries are [rank, sequence, future]
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._hold_seconds = initial_hold_seconds
+        self._admitted = dict.fromkeys(PRIORITIES, 0)
+        self._rejected = {"queue_full": 0, "shed": 0}
+
+    def retry_after(self) -> float:
+        return (len(self._waiters) + 1) * self._hold_seconds / self.max_concurrent
+
+    @asynccontextmanager
+    async def slot(self, priority: str = PRIORITY_INTERACTIVE) -> AsyncIterator[float]:
+        """
+        Hold one slot for the duration of the block
+
+        Yields:
+            Seconds spent waiting for the slot
+
+        Raises:
+            AdmissionRejectedError: If the queue is full (reason "queue_full") or
+                this caller was evicted while waiting (reason "shed")
+        """
+        waited = await self._acquire(priority)
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self._release(time.monotonic() - started)
+
+    async def _acquire(self, priority: str) -> float:
+        rank = PRIORITIES.index(priority)
+        if self._running < self.max_concurrent and not self._waiters:
+            self._running += 1
+            self._admitted[priority] += 1
+            return 0.0
+
+        if priority in _SHEDDABLE:
+            queued = [entry for entry in self._waiters if PRIORITIES[entry[0]] in _SHEDDABLE]
+            if len(queued) >= self.max_queue:
+                victims = [entry for entry in queued if entry[0] > rank]
+                if not victims:
+                    self._rejected["queue_full"] += 1
+                    raise AdmissionRejectedError("Server is busy, please retry", self.retry_after(), "queue_full")
+                victim = max(victims, key=lambda entry: (entry[0], entry[1]))
+                self._waiters.remove(victim)
+                heapq.heapify(self._waiters)
+                self._rejected["shed"] += 1
+                victim[2].set_exception(
+                    AdmissionRejectedError("Server is busy, please retry", self.retry_after(), "shed")
+                )
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = [rank, next(self._sequence), future]
+        heapq.heappush(self._waiters, entry)
+        started = loop.time()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over as the caller was cancelled; pass it on
+                self._release(0.0, record=False)
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+        self._admitted[priority] += 1
+        return loop.time() - started
+
+    def _release(self, held_seconds: float, record: bool = True):
+        if record:
+            self._hold_seconds = 0.9 * self._hold_seconds + 0.1 * held_seconds
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter; the running count is unchanged
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    def stats(self) -> Dict:
+        """Slots in use, waiters per class, admissions and rejections since start"""
+        waiting = dict.fromkeys(PRIORITIES, 0)
+        for rank, _, _ in self._waiters:
+            waiting[PRIORITIES[rank]] += 1
+        return {
+            "running": self._running,
+            "maxConcurrent": self.max_concurrent,
+            "queued": waiting,
+            "maxQueue": self.max_queue,
+            "admitted": dict(self._admitted),
+            "rejected": dict(self._rejected),
+            "avgHoldSeconds": round(self._hold_seconds, 3),
+        }
@@ -0,0 +1,285 @@
+"""
+Podium Pal Backend - Audio Ingestion
+=====================================
+Streaming multipart reader for /analyze uploads. Audio is written to disk
+chunk by chunk as it arrives (off the event loop), hashed during the write and
+stored by content hash, so memory per upload stays constant and identical
+re-uploads share one file.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import struct
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+DEFAULT_AUDIO_EXTENSION = "webm"
+
+# Text fields (transcript, userGoal, ...) are small; cap them so a form
+# cannot smuggle an unbounded body past the audio limits
+MAX_FIELD_BYTES = 1024 * 1024
+
+_EXTENSION_PATTERN = re.compile(r"^[a-z0-9]{1,8}$")
+
+
+class UploadTooLargeError(Exception):
+    """The upload exceeds the configured size or duration limit"""
+
+
+class InvalidUploadError(Exception):
+    """The request body is not a usable multipart/form-data upload"""
+
+
+class StoredAudio(NamedTuple):
+    path: Path
+    sha256: str
+    size: int
+    deduplicated: bool
+    write_seconds: float
+
+
+def audio_extension(filename: str) -> str:
+    """Pick a safe file extension from the client-supplied filename"""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return extension if _EXTENSION_PATTERN.match(extension) else DEFAULT_AUDIO_EXTENSION
+
+
+def wav_byte_rate(header: bytes) -> Optional[int]:
+    """Return the byte rate from a canonical RIFF/WAVE header, or None for other formats"""
+    if len(header) < 32 or header[:4] != b"RIFF" or header[8:12] != b"WAVE" or header[12:16] != b"fmt ":
+        return None
+    byte_rate = struct.unpack_from("<I", header, 28)[0]
+    return byte_rate or None
+
+
+class HashingAudioWriter:
+    """
+    Write an audio stream to a temporary file while hashing it, then move it
+    to its content-addressed location
+
+    File I/O and hashing run in a worker thread; callers await each write so
+    at most one network chunk is held in memory at a time.
+
+    Args:
+        storage_dir: Root directory for stored audio
+        extension: File extension for the stored file
+        max_bytes: Maximum accepted size in bytes
+        max_duration: Maximum accepted duration in seconds (enforced from the
+            header byte rate for WAV uploads)
+    """
+
+    def __init__(self, storage_dir: Path, extension: str, max_bytes: int, max_duration: Optional[float] = None):
+        self.storage_dir = Path(storage_dir)
+        self.extension = extension
+        self.max_bytes = max_bytes
+        self.max_duration = max_duration
+        self.size = 0
+        self.temp_path = self.storage_dir / f".upload-{uuid.uuid4().hex}.part"
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._header = b""
+        self._wav_limit = False
+        self.write_seconds = 0.0
+
+    async def write(self, data: bytes):
+        if not data:
+            return
+        self.size += len(data)
+        self._check_duration(data)
+        if self.size > self.max_bytes:
+            if self._wav_limit:
+                raise UploadTooLargeError(f"Recording is longer than {self.max_duration:g} seconds")
+            raise UploadTooLargeError(f"Audio upload exceeds {self.max_bytes} bytes")
+        await asyncio.to_thread(self._write_sync, data)
+
+    def _check_duration(self, data: bytes):
+        if self.max_duration is None or len(self._header) >= 44:
+            return
+        self._header += data[:44 - len(self._header)]
+        byte_rate = wav_byte_rate(self._header)
+        if byte_rate:
+            # 44-byte canonical header plus max_duration seconds of samples
+            duration_bytes = 44 + int(byte_rate * self.max_duration)
+            if duration_bytes < self.max_bytes:
+                self.max_bytes = duration_bytes
+                self._wav_limit = True
+
+    def _write_sync(self, data: bytes):
+        started = time.perf_counter()
+        if self._file is None:
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.temp_path, "wb")
+        self._file.write(data)
+        self._hash.update(data)
+        self.write_seconds += time.perf_counter() - started
+
+    async def finish(self) -> StoredAudio:
+        """Close the temporary file and store it by hash, reusing an existing copy"""
+        return await asyncio.to_thread(self._finish_sync)
+
+    def _finish_sync(self) -> StoredAudio:
+        if self._file is None:
+            self._write_sync(b"")
+        started = time.perf_counter()
+        self._file.close()
+        digest = self._hash.hexdigest()
+        final_path = self.storage_dir / digest[:2] / f"{digest}.{self.extension}"
+        if final_path.exists():
+            self.temp_path.unlink()
+            self.write_seconds += time.perf_counter() - started
+            return StoredAudio(final_path, digest, self.size, True, self.write_seconds)
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic; two identical uploads racing here write the same bytes
+        os.replace(self.temp_path, final_path)
+        self.write_seconds += time.perf_counter() - started
+        return StoredAudio(final_path, digest, self.size, False, self.write_seconds)
+
+    async def abort(self):
+        await asyncio.to_thread(self._abort_sync)
+
+    def _abort_sync(self):
+        if self._file is not None:
+            self._file.close()
+        try:
+            self.temp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _check_reported_duration(value: Optional[str], max_duration: Optional[float]):
+    if max_duration is None or not value:
+        return
+    try:
+        duration = float(value)
+    except ValueError:
+        return
+    if duration > max_duration:
+        raise UploadTooLargeError(f"Recording is longer than {max_duration:g} seconds")
+
+
+async def read_multipart_upload(request, storage_dir: Path, max_bytes: int,
+                                max_duration: Optional[float] = None,
+                                file_field: str = "audio",
+                                duration_field: str = "duration") -> Tuple[Dict[str, str], Optional[StoredAudio]]:
+    """
+    Parse a multipart/form-data request body as it streams in
+
+    Text fields are collected in memory (each capped at MAX_FIELD_BYTES);
+    the file in `file_field` goes straight to disk through HashingAudioWriter.
+    Other file parts are discarded. If the client-reported duration arrives
+    before the file and is over `max_duration`, the upload is rejected before
+    any audio is written.
+
+    Args:
+        request: The incoming Starlette request
+        storage_dir: Root directory for stored audio
+        max_bytes: Maximum audio size in bytes
+        max_duration: Maximum audio duration in seconds
+        file_field: Name of the form field carrying the audio
+        duration_field: Name of the form field with the reported duration
+
+    Returns:
+        (fields, stored_audio) where stored_audio is None if no audio was sent
+
+    Raises:
+        UploadTooLargeError: If the audio or a text field is over its limit
+        InvalidUploadError: If the body is not valid multipart/form-data
+    """
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise InvalidUploadError("Missing multipart boundary")
+
+    fields: Dict[str, str] = {}
+    # Parser callbacks are synchronous, so they only record what happened;
+    # the awaited disk writes are replayed after each network chunk
+    pending: List[Tuple[str, bytes]] = []
+    part = {"headers": {}, "field": b"", "value": b"", "name": None, "filename": None, "text": bytearray()}
+
+    def on_part_begin():
+        part.update(headers={}, field=b"", value=b"", name=None, filename=None, text=bytearray())
+
+    def on_header_field(data: bytes, start: int, end: int):
+        part["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"] = b""
+        part["value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        part["name"] = disposition.get(b"name", b"").decode("utf-8", "replace")
+        filename = disposition.get(b"filename")
+        part["filename"] = filename.decode("utf-8", "replace") if filename is not None else None
+        if part["name"] == file_field and part["filename"]:
+            pending.append(("begin", part["filename"].encode("utf-8")))
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if part["filename"] is not None:
+            if part["name"] == file_field:
+                pending.append(("data", bytes(data[start:end])))
+            return
+        part["text"] += data[start:end]
+        if len(part["text"]) > MAX_FIELD_BYTES:
+            raise UploadTooLargeError(f"Form field '{part['name']}' exceeds {MAX_FIELD_BYTES} bytes")
+
+    def on_part_end():
+        if part["filename"] is None:
+            fields[part["name"]] = part["text"].decode("utf-8", "replace")
+        elif part["name"] == file_field:
+            pending.append(("end", b""))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+    })
+
+    writer: Optional[HashingAudioWriter] = None
+    stored: Optional[StoredAudio] = None
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except UploadTooLargeError:
+                raise
+            except Exception as e:
+                raise InvalidUploadError(f"Malformed multipart body: {e}") from e
+
+            for event, data in pending:
+                if event == "begin" and writer is None and stored is None:
+                    _check_reported_duration(fields.get(duration_field), max_duration)
+                    writer = HashingAudioWriter(storage_dir, audio_extension(data.decode("utf-8")),
+                                                max_bytes, max_duration)
+                elif event == "data" and writer is not None:
+                    await writer.write(data)
+                elif event == "end" and writer is not None:
+                    stored = await writer.finish()
+                    writer = None
+            pending.clear()
+        parser.finalize()
+    except BaseException:
+        if writer is not None:
+            await writer.abort()
+        raise
+
+    if writer is not None:
+        # Body ended before the audio part was closed
+        await writer.abort()
+        raise InvalidUploadError("Truncated multipart body")
+
+    return fields, stored
@@ -0,0 +1,8 @@
+"""
+Podium Pal Backend - Benchmarks
+================================
+Offline load tests and micro-benchmarks. Run from the backend directory:
+
+    python -m benchmarks.load_test --rps 20 --duration 10
+    python -m benchmarks.microbench --sessions 10,100,1000
+"""
@@ -0,0 +1,140 @@
+"""
+Shared helpers for the benchmark scripts: isolated working directories,
+importing the app, synthetic data and JSON reports.
+"""
+
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+WORDS = (
+    "today I want to talk about our quarterly results and what they mean for the team "
+    "we grew revenue in every region while keeping costs flat which is a great outcome "
+    "the next step is to invest in customer success and hire two more engineers"
+).split()
+FILLERS = ["um", "uh", "like", "you know", "basically", "so", "kind of", "actually"]
+PERSONALITIES = ["supportive", "direct", "critical", "humorous", "mentor", "professional"]
+
+
+def use_temp_workdir(prefix: str = "podium-bench-") -> Path:
+    """
+    Switch into a fresh temporary directory so the app's storage directories
+    and databases never touch real data; call before importing main
+    """
+    workdir = Path(tempfile.mkdtemp(prefix=prefix))
+    os.chdir(workdir)
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    return workdir
+
+
+def import_app():
+    """Import the backend module (after use_temp_workdir)"""
+    import main
+    return main
+
+
+def make_transcript(word_count: int, filler_rate: float = 0.05, rng: Optional[random.Random] = None) -> str:
+    """Synthetic transcript with roughly `filler_rate` fillers per word"""
+    rng = rng or random.Random(0)
+    words = []
+    for _ in range(word_count):
+        words.append(rng.choice(FILLERS) if rng.random() < filler_rate else rng.choice(WORDS))
+    return " ".join(words)
+
+
+def make_session(rng: random.Random, timestamp: datetime, word_count: int = 150) -> Dict:
+    """Synthetic session record in the format written by save_session"""
+    session_id = str(uuid.uuid4())
+    return {
+        "sessionId": session_id,
+        "timestamp": timestamp.isoformat(),
+        "transcript": make_transcript(word_count, rng=rng),
+        "userGoal": "Explain the quarterly results",
+        "aiPersonality": rng.choice(PERSONALITIES),
+        "duration": 60,
+        "audioPath": None,
+        "feedback": {
+            "sessionId": session_id,
+            "pace": rng.randint(90, 190),
+            "fillerWords": {"um": rng.randint(0, 5)},
+            "aiSummary": "The speaker summarized the quarterly results.",
+            "clarityScore": rng.randint(40, 95),
+            "confidenceScore": rng.randint(40, 95),
+            "engagementScore": rng.randint(40, 95),
+            "structureScore": rng.randint(40, 95),
+            "overall_score": round(rng.uniform(4, 9.5), 1),
+            "constructiveTip": "Open with the headline number.",
+            "strengths": ["Clear message"],
+            "improvements": ["Fewer fillers"]
+        }
+    }
+
+
+def make_sessions(count: int, seed: int = 0) -> List[Dict]:
+    """`count` synthetic session records, 17 minutes apart"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    return [make_session(rng, start + timedelta(minutes=17 * i)) for i in range(count)]
+
+
+def write_sessions(storage_dir: Path, count: int, seed: int = 0) -> List[Dict]:
+    """Write `count` synthetic session files in the flat pre-store layout, returning the records"""
+    sessions = make_sessions(count, seed)
+    for session in sessions:
+        with open(storage_dir / f"{session['sessionId']}.json", "w") as f:
+            json.dump(session, f, indent=2)
+    return sessions
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict:
+    values = sorted(latencies_ms)
+    return {
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "mean_ms": sum(values) / len(values) if values else None,
+        "max_ms": values[-1] if values else None
+    }
+
+
+def environment_info() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count()
+    }
+
+
+def write_report(report: Dict, output: Optional[str]):
+    """Print the report as JSON, and also save it when an output path is given"""
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text)
+    print(text)
@@ -0,0 +1,102 @@
+"""
+Local stand-in for the Gemini model with configurable latency, jitter,
+error rate and malformed-JSON rate, so benchmarks never touch the real API.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Iterator
+
+
+class FakeGeminiError(Exception):
+    """Simulated transient Gemini failure"""
+
+    # HTTP status, like google.api_core's ServiceUnavailable
+    code = 503
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Mimics the parts of genai.GenerativeModel the backend uses
+
+    Args:
+        latency: Mean response time in seconds
+        jitter: Uniform +/- spread around the mean, in seconds
+        error_rate: Fraction of calls that raise FakeGeminiError
+        malformed_rate: Fraction of calls that return invalid JSON
+        seed: Random seed for reproducible runs
+    """
+
+    def __init__(self, latency: float = 0.8, jitter: float = 0.2, error_rate: float = 0.0,
+                 malformed_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors_injected = 0
+        self.malformed_injected = 0
+
+    def _roll(self):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            outcome = self._rng.random()
+        return delay, outcome
+
+    def _body(self, prompt: str) -> str:
+        # Scores vary with the prompt so identical inputs get identical answers
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        scores = [50 + b % 46 for b in digest[:4]]
+        return "```json\n" + json.dumps({
+            "summary": "The speaker walked through their main points with a clear goal.",
+            "clarityScore": scores[0],
+            "confidenceScore": scores[1],
+            "engagementScore": scores[2],
+            "structureScore": scores[3],
+            "overall_score": round(sum(scores) / 40.0, 1),
+            "tip": "Lead with your key message and cut the filler words before it.",
+            "strengths": ["Clear goal", "Steady pace", "Good closing"],
+            "improvements": ["Fewer fillers", "More concrete examples", "Stronger opening"]
+        }, indent=2) + "\n```"
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        delay, outcome = self._roll()
+        if outcome < self.error_rate:
+            with self._lock:
+                self.errors_injected += 1
+            time.sleep(delay)
+            raise FakeGeminiError("503 Service Unavailable (simulated)")
+        body = self._body(prompt)
+        if outcome < self.error_rate + self.malformed_rate:
+            with self._lock:
+                self.malformed_injected += 1
+            body = body[: len(body) // 2]
+        if stream:
+            return self._stream(body, delay)
+        time.sleep(delay)
+        return _FakeResponse(body)
+
+    def _stream(self, body: str, delay: float) -> Iterator[_FakeResponse]:
+        chunk_size = 64
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            yield _FakeResponse(chunk)
+
+
+def install_fake_gemini(main_module, model: FakeGenerativeModel) -> FakeGenerativeModel:
+    """Point the backend's Gemini calls at `model`"""
+    main_module.GEMINI_API_KEY = "fake-benchmark-key-0000000000"
+    main_module.get_gemini_model = lambda system_instruction=None: model
+    return model
@@ -0,0 +1,160 @@
+"""
+Open-loop load test for /analyze, /feedback/{session_id} and /recordings.
+
+Requests are issued at a fixed target rate (independent of how fast
+responses come back) against the app in-process, with Gemini replaced by
+FakeGenerativeModel. Per-endpoint latency percentiles, throughput and error
+rates are printed as JSON.
+
+    python -m benchmarks.load_test --rps 50 --duration 20 --latency 1.0 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import contextlib
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import (
+    environment_info, import_app, latency_summary, make_sessions, make_transcript, use_temp_workdir,
+    write_report, PERSONALITIES
+)
+from benchmarks.fake_gemini import FakeGenerativeModel, install_fake_gemini
+
+
+def parse_mix(text: str, endpoints=("analyze", "feedback", "recordings")) -> Dict[str, float]:
+    """Parse 'analyze=1,feedback=4,recordings=2' into endpoint weights"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(endpoints)
+    if unknown:
+        raise ValueError(f"Unknown endpoints in mix: {sorted(unknown)}")
+    return mix
+
+
+async def run_load(app, mix: Dict[str, float], rps: float, duration: float, session_ids: List[str],
+                   seed: int = 0) -> Dict:
+    """
+    Drive the app at `rps` requests per second for `duration` seconds
+
+    Returns:
+        Per-endpoint results plus overall totals
+    """
+    import httpx
+
+    rng = random.Random(seed)
+    endpoints = list(mix)
+    weights = [mix[name] for name in endpoints]
+    samples: Dict[str, List] = {name: [] for name in endpoints}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def one_request(endpoint: str):
+            started = time.perf_counter()
+            try:
+                if endpoint == "analyze":
+                    response = await client.post("/analyze", json={
+                        "transcript": make_transcript(rng.randint(80, 400), rng=rng),
+                        "userGoal": "Explain the quarterly results",
+                        "aiPersonality": rng.choice(PERSONALITIES),
+                        "duration": rng.randint(30, 180)
+                    })
+                elif endpoint == "feedback":
+                    response = await client.get(f"/feedback/{rng.choice(session_ids)}")
+                else:
+                    response = await client.get("/recordings", params={"limit": 50})
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            samples[endpoint].append(((time.perf_counter() - started) * 1000, ok))
+
+        total_requests = int(rps * duration)
+        tasks = []
+        started = time.perf_counter()
+        for i in range(total_requests):
+            delay = started + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            endpoint = rng.choices(endpoints, weights)[0]
+            tasks.append(asyncio.create_task(one_request(endpoint)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    results = {}
+    for endpoint, endpoint_samples in samples.items():
+        latencies = [latency for latency, _ in endpoint_samples]
+        errors = sum(1 for _, ok in endpoint_samples if not ok)
+        results[endpoint] = {
+            "requests": len(endpoint_samples),
+            "errors": errors,
+            "error_rate": errors / len(endpoint_samples) if endpoint_samples else 0.0,
+            "throughput_rps": len(endpoint_samples) / elapsed if elapsed else 0.0,
+            **latency_summary(latencies)
+        }
+    return {
+        "elapsed_s": elapsed,
+        "requests": total_requests,
+        "achieved_rps": total_requests / elapsed if elapsed else 0.0,
+        "endpoints": results
+    }
+
+
+async def _main(args) -> Dict:
+    main = import_app()
+    fake = install_fake_gemini(main, FakeGenerativeModel(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate, seed=args.seed
+    ))
+    sessions = make_sessions(args.sessions, seed=args.seed)
+    main.session_store.save_many(sessions)
+
+    await main.app.router.startup()
+    try:
+        results = await run_load(main.app, parse_mix(args.mix), args.rps, args.duration,
+                                 [s["sessionId"] for s in sessions], seed=args.seed)
+    finally:
+        await main.app.router.shutdown()
+
+    return {
+        "benchmark": "load_test",
+        "environment": environment_info(),
+        "config": {
+            "rps": args.rps, "duration_s": args.duration, "mix": args.mix, "sessions": args.sessions,
+            "fake_latency_s": args.latency, "fake_jitter_s": args.jitter,
+            "fake_error_rate": args.error_rate, "fake_malformed_rate": args.malformed_rate
+        },
+        "fake_model": {
+            "calls": fake.calls,
+            "errors_injected": fake.errors_injected,
+            "malformed_injected": fake.malformed_injected
+        },
+        "results": results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the Podium Pal API against a local Gemini stand-in")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test length in seconds")
+    parser.add_argument("--mix", default="analyze=1,feedback=4,recordings=2", help="Endpoint weights")
+    parser.add_argument("--sessions", type=int, default=500, help="Pre-existing sessions to seed")
+    parser.add_argument("--latency", type=float, default=0.8, help="Fake Gemini mean latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Fake Gemini latency jitter (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of Gemini calls that fail")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of malformed JSON replies")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    output = str(Path(args.output).resolve()) if args.output else None
+    use_temp_workdir()
+    # Keep the app's log output off stdout so the report stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        report = asyncio.run(_main(args))
+    write_report(report, output)
@@ -0,0 +1,344 @@
+"""
+Micro-benchmarks for calculate_metrics, local scoring, session listing, search,
+session storage and prompt building.
+
+Local scoring is reported as transcripts per second on one core, scoring
+distinct punctuated transcripts with their metrics already computed (as the
+analysis paths do) and from the transcript alone (as the fallback may). The
+target is 10,000 transcripts per second at 150 words with metrics; the entry
+for that size says whether the run met it, and `--check` exits non-zero if not.
+
+Session listing is measured as the number of session files grows, comparing
+a full scan of the session files (the pre-index /recordings behaviour) with
+queries answered by the session index. Search queries run against the
+full-text index: rare terms and phrases, a word found in every synthetic
+transcript (the worst case for ranking), prefixes and filters.
+
+Session storage compares every store backend and codec with the flat
+pretty-printed files written before the session store: sessions saved,
+loaded by id and scanned per second, and bytes on disk.
+
+Prompt building compares compiling a personality's prompt template per
+request with the templates compiled at import, and a new Gemini model object
+per request with the pooled one.
+
+    python -m benchmarks.microbench --sessions 10,100,1000,10000,100000 --output micro.json
+"""
+
+import argparse
+import contextlib
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.common import (
+    environment_info, import_app, make_session, make_sessions, make_transcript, use_temp_workdir, write_report,
+    write_sessions, PERSONALITIES
+)
+
+
+# Local scoring throughput target: transcripts per second on one core, at this many words, with metrics
+LOCAL_SCORING_TARGET_PER_SEC = 10000
+LOCAL_SCORING_TARGET_WORDS = 150
+
+
+def time_call(fn: Callable, repeat: int) -> Dict:
+    """Run fn `repeat` times and summarize wall time in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings)
+    }
+
+
+def bench_calculate_metrics(main, word_counts: List[int], repeat: int) -> List[Dict]:
+    results = []
+    for word_count in word_counts:
+        transcript = make_transcript(word_count)
+        timing = time_call(lambda: main.calculate_metrics(transcript, 600), repeat)
+        timing["words"] = word_count
+        timing["words_per_sec"] = word_count / (timing["median_ms"] / 1000) if timing["median_ms"] else None
+        results.append(timing)
+    return results
+
+
+def punctuate(transcript: str, rng: random.Random) -> str:
+    """End a sentence every 6-20 words, a few of them as questions"""
+    words = transcript.split()
+    position = 0
+    while position < len(words):
+        position += rng.randint(6, 20)
+        end = min(position, len(words)) - 1
+        words[end] += "?" if rng.random() < 0.1 else "."
+    return " ".join(words)
+
+
+def bench_local_scoring(main, word_counts: List[int], transcripts: int, repeat: int) -> List[Dict]:
+    results = []
+    for word_count in word_counts:
+        rng = random.Random(word_count)
+        corpus = [punctuate(make_transcript(word_count, rng=rng), rng) for _ in range(transcripts)]
+        metrics = [main.calculate_metrics(transcript, 60) for transcript in corpus]
+        scorer = main.local_scorer
+
+        def score_with_metrics():
+            for transcript, transcript_metrics in zip(corpus, metrics):
+                scorer.score(transcript, 60, transcript_metrics)
+
+        def score_alone():
+            for transcript in corpus:
+                scorer.feedback(scorer.score(transcript, 60))
+
+        entry = {"words": word_count, "transcripts": transcripts}
+        for name, fn in (("with_metrics", score_with_metrics), ("with_feedback_no_metrics", score_alone)):
+            timing = time_call(fn, repeat)
+            timing["transcripts_per_sec"] = transcripts / (timing["median_ms"] / 1000) if timing["median_ms"] else None
+            entry[name] = timing
+        if word_count == LOCAL_SCORING_TARGET_WORDS:
+            rate = entry["with_metrics"]["transcripts_per_sec"]
+            entry["target_transcripts_per_sec"] = LOCAL_SCORING_TARGET_PER_SEC
+            entry["meets_target"] = rate is not None and rate >= LOCAL_SCORING_TARGET_PER_SEC
+        results.append(entry)
+    return results
+
+
+def legacy_scan(storage_dir: Path) -> int:
+    """What /recordings did before the index: open and parse every session file"""
+    count = 0
+    for session_file in storage_dir.glob("*.json"):
+        with open(session_file, "r", encoding="utf-8") as f:
+            json.load(f)
+        count += 1
+    return count
+
+
+def bench_session_listing(main, session_counts: List[int], repeat: int, workdir: Path) -> List[Dict]:
+    from session_index import SessionIndex
+    from session_store import iter_flat_sessions
+
+    results = []
+    for count in session_counts:
+        storage_dir = workdir / f"sessions_{count}"
+        storage_dir.mkdir()
+        started = time.perf_counter()
+        write_sessions(storage_dir, count)
+        write_ms = (time.perf_counter() - started) * 1000
+
+        index = SessionIndex(workdir / f"index_{count}.db")
+        started = time.perf_counter()
+        index.rebuild(iter_flat_sessions(storage_dir))
+        rebuild_ms = (time.perf_counter() - started) * 1000
+
+        _, cursor = index.query(limit=50)
+        results.append({
+            "sessions": count,
+            "write_files_ms": write_ms,
+            "index_rebuild_ms": rebuild_ms,
+            "legacy_full_scan": time_call(lambda: legacy_scan(storage_dir), max(1, min(repeat, 3))),
+            "index_first_page": time_call(lambda: index.query(limit=50), repeat),
+            "index_second_page": time_call(lambda: index.query(limit=50, cursor=cursor), repeat),
+            "index_top_by_score": time_call(lambda: index.query(limit=50, sort="score"), repeat),
+            "index_filtered_page": time_call(lambda: index.query(limit=50, personality="direct"), repeat),
+            "index_all_rows": time_call(lambda: index.query(), max(1, min(repeat, 3)))
+        })
+        index.close()
+    return results
+
+
+def _disk_bytes(path: Path) -> int:
+    if path.is_file():
+        return sum(p.stat().st_size for p in path.parent.glob(path.name + "*"))
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def bench_session_store(session_count: int, workdir: Path) -> List[Dict]:
+    """Write, read-by-id and full-scan throughput (sessions/s) per store backend and codec"""
+    from session_store import CODECS, open_session_store
+
+    sessions = make_sessions(session_count, seed=1)
+    ids = [s["sessionId"] for s in sessions]
+    rng = random.Random(1)
+    lookups = [rng.choice(ids) for _ in range(session_count)]
+
+    def rate(fn) -> float:
+        started = time.perf_counter()
+        fn()
+        return round(session_count / (time.perf_counter() - started), 1)
+
+    # The flat layout written before the store: one indent=2 file per session
+    legacy_dir = workdir / "store_legacy"
+    legacy_dir.mkdir()
+
+    def legacy_write():
+        for session in sessions:
+            with open(legacy_dir / f"{session['sessionId']}.json", "w") as f:
+                json.dump(session, f, indent=2)
+
+    def legacy_read():
+        for session_id in lookups:
+            with open(legacy_dir / f"{session_id}.json", "r", encoding="utf-8") as f:
+                json.load(f)
+
+    results = [{
+        "store": "legacy_flat", "codec": "json (indent=2)",
+        "write_per_s": rate(legacy_write), "read_per_s": rate(legacy_read),
+        "scan_per_s": rate(lambda: legacy_scan(legacy_dir)), "bytes": _disk_bytes(legacy_dir)
+    }]
+
+    configurations = [(backend, codec) for backend in ("fs", "sqlite") for codec in CODECS]
+    configurations.append(("memory", "json"))
+    for backend, codec in configurations:
+        path = workdir / (f"store_{backend}_{codec}" + (".db" if backend == "sqlite" else ""))
+        store = open_session_store(backend, path, codec)
+        entry = {
+            "store": backend, "codec": codec,
+            # The analysis paths save one session per call
+            "write_per_s": rate(lambda: [store.save(session) for session in sessions]),
+            "read_per_s": rate(lambda: [store.load(session_id) for session_id in lookups]),
+            "scan_per_s": rate(lambda: sum(1 for _ in store.iter_sessions())),
+            "bytes": _disk_bytes(path) if backend != "memory" else None,
+        }
+        store.close()
+        results.append(entry)
+    return results
+
+
+# The synthetic transcripts share one small vocabulary; each session also gets
+# a few of these topic words so that rare terms and phrases exist to be found
+TOPIC_WORDS = [f"topic{i}" for i in range(2000)]
+
+SEARCH_QUERIES = {
+    "rare_term": {"query": "topic17"},
+    "rare_phrase": {"query": '"topic17 topic18"'},
+    "rare_prefix": {"query": "topic17*"},
+    "common_term": {"query": "engineers"},
+    "common_phrase": {"query": '"quarterly results"'},
+    "rare_term_filtered": {"query": "topic17", "personality": "direct", "min_score": 6},
+    "common_term_filtered": {"query": "engineers", "personality": "direct", "min_score": 9},
+}
+
+
+def bench_search(session_counts: List[int], repeat: int, workdir: Path) -> List[Dict]:
+    from search_index import SearchIndex
+
+    results = []
+    for count in session_counts:
+        rng = random.Random(count)
+        index = SearchIndex(workdir / f"search_{count}.db")
+        started = time.perf_counter()
+        batch = []
+        for i in range(count):
+            session = make_session(rng, datetime(2025, 1, 1) + timedelta(minutes=17 * i))
+            session["transcript"] += " " + " ".join(rng.choice(TOPIC_WORDS) for _ in range(5))
+            batch.append(session)
+            if len(batch) == 500:
+                index.upsert_many(batch)
+                batch = []
+        if batch:
+            index.upsert_many(batch)
+        index_ms = (time.perf_counter() - started) * 1000
+
+        entry = {"sessions": count, "index_build_ms": index_ms}
+        for name, params in SEARCH_QUERIES.items():
+            entry[name] = time_call(lambda: index.search(limit=20, **params), repeat)
+        results.append(entry)
+        index.close()
+    return results
+
+
+def bench_prompt_build(main, prompts: int, repeat: int) -> Dict:
+    """
+    Feedback prompts built per second: compiling the personality's template for
+    every request (what building the prompt from scratch costs) against the
+    templates compiled at import, plus creating a Gemini model per request
+    against reusing the pooled one
+    """
+    from prompts import PromptTemplate
+
+    rng = random.Random(prompts)
+    requests = [
+        (make_transcript(150, rng=rng), "Explain the quarterly results", rng.choice(PERSONALITIES))
+        for _ in range(prompts)
+    ]
+
+    def compile_per_request():
+        for transcript, goal, personality in requests:
+            PromptTemplate(personality).feedback_prompt(goal, transcript, "", "")
+
+    def compiled_once():
+        for transcript, goal, personality in requests:
+            main.prompt_templates.get(personality).feedback_prompt(goal, transcript, "", "")
+
+    result = {"prompts": prompts}
+    for name, fn in (("compile_per_request", compile_per_request), ("compiled_templates", compiled_once)):
+        timing = time_call(fn, repeat)
+        timing["prompts_per_sec"] = prompts / (timing["median_ms"] / 1000) if timing["median_ms"] else None
+        result[name] = timing
+
+    # Touching the pool imports the SDK, which the import time above excluded
+    pool = main.gemini_models
+    started = time.perf_counter()
+    pool.get()
+    result["sdk_first_use_ms"] = (time.perf_counter() - started) * 1000
+    genai = pool._sdk()
+    result["model_per_request"] = time_call(lambda: genai.GenerativeModel(pool.model_name), repeat)
+    result["pooled_model"] = time_call(lambda: pool.get(), repeat)
+    return result
+
+
+def _main(args, workdir: Path) -> Dict:
+    main = import_app()
+    return {
+        "benchmark": "microbench",
+        "environment": environment_info(),
+        "calculate_metrics": bench_calculate_metrics(
+            main, [int(n) for n in args.words.split(",")], args.repeat
+        ),
+        "local_scoring": bench_local_scoring(
+            main, [int(n) for n in args.scoring_words.split(",")], args.scoring_transcripts, args.repeat
+        ),
+        "session_listing": bench_session_listing(
+            main, [int(n) for n in args.sessions.split(",")], args.repeat, workdir
+        ),
+        "search": bench_search([int(n) for n in args.sessions.split(",")], args.repeat, workdir),
+        "session_store": bench_session_store(args.store_sessions, workdir),
+        "prompt_build": bench_prompt_build(main, args.prompts, args.repeat)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for metrics, scoring, listing, search, session storage and prompt building")
+    parser.add_argument("--words", default="100,1000,10000,100000", help="Transcript sizes for calculate_metrics")
+    parser.add_argument("--scoring-words", default="50,150,1000", help="Transcript sizes for local scoring")
+    parser.add_argument("--scoring-transcripts", type=int, default=2000, help="Distinct transcripts per scoring run")
+    parser.add_argument("--sessions", default="10,100,1000,10000,100000", help="Session counts for listing and search benchmarks")
+    parser.add_argument("--store-sessions", type=int, default=5000, help="Sessions written and read per storage backend")
+    parser.add_argument("--prompts", type=int, default=2000, help="Feedback prompts built per prompt-build run")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit non-zero if local scoring misses its throughput target")
+    args = parser.parse_args()
+
+    output = str(Path(args.output).resolve()) if args.output else None
+    workdir = use_temp_workdir()
+    with contextlib.redirect_stdout(sys.stderr):
+        report = _main(args, workdir)
+    write_report(report, output)
+    if args.check:
+        missed = [entry for entry in report["local_scoring"] if entry.get("meets_target") is False]
+        if missed:
+            sys.exit(f"local scoring below {LOCAL_SCORING_TARGET_PER_SEC} transcripts/s at "
+                     f"{LOCAL_SCORING_TARGET_WORDS} words: "
+                     f"{missed[0]['with_metrics']['transcripts_per_sec']:.0f}")
@@ -0,0 +1,126 @@
+"""
+Bulk session export and import throughput, in sessions per second.
+
+A synthetic history is generated lazily and written as a gzip NDJSON file,
+imported through main.import_sessions (session store plus session, progress
+and search indexes, as /import does), then exported back from the store as
+/export does: plain, gzip, with transcripts left out, and for a date range
+covering a tenth of the history. Peak RSS is recorded after each step; it
+should stay flat as --sessions grows.
+
+    python -m benchmarks.session_transfer --sessions 100000 --backend fs
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+from benchmarks.common import environment_info, import_app, make_session, use_temp_workdir, write_report
+
+
+def generate_sessions(count: int, seed: int = 0) -> Iterator[Dict]:
+    """Like common.make_sessions, without holding the list"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        yield make_session(rng, start + timedelta(minutes=17 * i))
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def drain(chunks, out=None) -> int:
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        if out is not None:
+            out.write(chunk)
+    return size
+
+
+def timed(sessions: int, fn: Callable[[], Dict]) -> Dict:
+    started = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - started
+    return {
+        **result,
+        "seconds": round(seconds, 2),
+        "sessions_per_sec": round(sessions / seconds, 1) if seconds else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _main(args, workdir: Path) -> Dict:
+    main = import_app()
+    from session_transfer import export_stream, import_stream, iter_sessions_in_range, read_file_chunks
+
+    count = args.sessions
+    source = workdir / "source.ndjson.gz"
+    report = {
+        "benchmark": "session_transfer",
+        "environment": environment_info(),
+        "sessions": count,
+        "store": main.session_store.stats(),
+        "batch_size": args.batch_size,
+        "baseline_rss_mb": peak_rss_mb(),
+    }
+
+    def write_source():
+        with open(source, "wb") as f:
+            return {"bytes": drain(export_stream(generate_sessions(count, args.seed), compress=True), f)}
+
+    report["encode_gzip"] = timed(count, write_source)
+    print(f"source written: {report['encode_gzip']['sessions_per_sec']} sessions/s", file=sys.stderr)
+    report["import"] = timed(count, lambda: import_stream(read_file_chunks(source), main.import_sessions,
+                                                          args.batch_size))
+    print(f"imported: {report['import']['sessions_per_sec']} sessions/s", file=sys.stderr)
+
+    exports = {
+        "export_ndjson": {},
+        "export_gzip": {"compress": True},
+        "export_without_transcripts": {"exclude": ["transcript"]},
+    }
+    for name, options in exports.items():
+        report[name] = timed(count, lambda: {"bytes": drain(export_stream(main.session_store.iter_sessions(),
+                                                                            **options))})
+        print(f"{name}: {report[name]['sessions_per_sec']} sessions/s", file=sys.stderr)
+
+    # The middle tenth of the history, found through the session index
+    start = datetime(2025, 1, 1)
+    date_from = (start + timedelta(minutes=17 * (count * 45 // 100))).isoformat()
+    date_to = (start + timedelta(minutes=17 * (count * 55 // 100))).isoformat()
+    in_range = count * 55 // 100 - count * 45 // 100 + 1
+    report["export_date_range"] = timed(in_range, lambda: {
+        "bytes": drain(export_stream(iter_sessions_in_range(main.session_store, main.session_index,
+                                                            date_from, date_to), date_from, date_to)),
+        "sessions_in_range": in_range,
+    })
+    print(f"export_date_range: {report['export_date_range']['sessions_per_sec']} sessions/s", file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk session export and import throughput")
+    parser.add_argument("--sessions", type=int, default=100000, help="Sessions in the synthetic history")
+    parser.add_argument("--backend", choices=["fs", "sqlite", "memory"], default="fs", help="Session store backend")
+    parser.add_argument("--codec", default="json", help="Session store codec: json, gzip or zstd")
+    parser.add_argument("--batch-size", type=int, default=500, help="Sessions saved per import batch")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    output = str(Path(args.output).resolve()) if args.output else None
+    workdir = use_temp_workdir()
+    os.environ.update(SESSION_STORE=args.backend, SESSION_CODEC=args.codec, LOG_LEVEL="WARNING")
+    with contextlib.redirect_stdout(sys.stderr):
+        report = _main(args, workdir)
+    write_report(report, output)
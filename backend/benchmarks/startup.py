@@ -0,0 +1,118 @@
+"""
+Cold start: how long a fresh process takes to import the app, to answer
+/health and to report /ready.
+
+Each run starts a new interpreter in an empty directory. The import is timed
+inside the child (python -X importtime style totals, without the noise of
+the parent), and the server runs are timed from process start to the first
+200 from /health (accepting traffic) and from /ready (Gemini SDK and models
+loaded). A syntactically valid placeholder API key makes the server warm up
+the SDK exactly as in production; no Gemini request is sent.
+
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, environment_info, write_report
+from benchmarks.worker_scaling import free_port
+
+PLACEHOLDER_API_KEY = "AIzaSy" + "0" * 33
+
+IMPORT_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import main
+print(time.perf_counter() - started, "google.generativeai" in sys.modules)
+"""
+
+
+def child_env(**overrides) -> Dict[str, str]:
+    env = dict(os.environ, LOG_LEVEL="WARNING", GEMINI_API_KEY=PLACEHOLDER_API_KEY, PYTHONPATH=str(BACKEND_DIR))
+    env.update(overrides)
+    return env
+
+
+def time_import() -> Dict:
+    """Seconds to import main in a fresh interpreter, and whether the Gemini SDK came with it"""
+    with tempfile.TemporaryDirectory(prefix="podium-startup-") as workdir:
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT], cwd=workdir, env=child_env(),
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+    return {"import_s": float(output[0]), "sdk_imported": output[1] == "True"}
+
+
+def wait_for(client: httpx.Client, path: str, started: float, timeout: float) -> Optional[float]:
+    while time.perf_counter() - started < timeout:
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def time_server(timeout: float) -> Dict:
+    """Seconds from spawning the server until /health and then /ready answer 200"""
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="podium-startup-") as workdir:
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, str(BACKEND_DIR / "main.py")], cwd=workdir,
+            env=child_env(HOST="127.0.0.1", PORT=str(port), WEB_CONCURRENCY="1"),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+                health = wait_for(client, "/health", started, timeout)
+                ready = wait_for(client, "/ready", started, timeout)
+                gemini = client.get("/ready").json()["gemini"] if ready is not None else None
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+    return {"health_s": health, "ready_s": ready, "gemini": gemini}
+
+
+def summarize(values: List[Optional[float]]) -> Dict:
+    values = [value for value in values if value is not None]
+    if not values:
+        return {"runs": 0}
+    return {"runs": len(values), "median_s": statistics.median(values), "min_s": min(values), "max_s": max(values)}
+
+
+def _main(args) -> Dict:
+    imports = [time_import() for _ in range(args.runs)]
+    servers = [time_server(args.timeout) for _ in range(args.runs)]
+    return {
+        "benchmark": "startup",
+        "environment": environment_info(),
+        "import": {**summarize([run["import_s"] for run in imports]),
+                   "sdk_imported": any(run["sdk_imported"] for run in imports)},
+        "health": summarize([run["health_s"] for run in servers]),
+        "ready": summarize([run["ready_s"] for run in servers]),
+        "gemini": servers[-1]["gemini"] if servers else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start: app import, time to /health and time to /ready")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the server to come up")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    write_report(_main(args), args.output)
@@ -0,0 +1,162 @@
+"""
+Throughput of the CPU-bound request path as the number of worker processes grows.
+
+For each worker count the real server is started (python main.py with
+WEB_CONCURRENCY set) in a fresh directory and driven closed-loop over HTTP:
+/analyze without a Gemini key (request parsing, metrics, local scoring,
+session persistence and indexing, JSON encoding), /feedback for stored
+sessions, /recordings pages and /metrics. Speedup and per-worker efficiency
+are reported relative to one worker. The load generator runs on the same
+host, so leave it cores to run on: scaling is only meaningful up to about
+half the host's cores.
+
+    python -m benchmarks.worker_scaling --workers 1,2,4 --duration 15 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import (
+    BACKEND_DIR, environment_info, latency_summary, make_transcript, write_report, PERSONALITIES
+)
+from benchmarks.load_test import parse_mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, workdir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ, WEB_CONCURRENCY=str(workers), HOST="127.0.0.1", PORT=str(port),
+        GEMINI_API_KEY="", CLIENT_RATE_PER_MINUTE="0", LOG_LEVEL="WARNING"
+    )
+    return subprocess.Popen(
+        [sys.executable, str(BACKEND_DIR / "main.py")], cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def drive(client: httpx.AsyncClient, mix: Dict[str, float], duration: float, concurrency: int,
+                seed: int) -> Dict:
+    rng = random.Random(seed)
+    transcripts = [make_transcript(150, rng=rng) for _ in range(200)]
+    session_ids: List[str] = []
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    stop_at = time.monotonic() + duration
+
+    async def request(name: str) -> httpx.Response:
+        if name == "analyze" or (name == "feedback" and not session_ids):
+            response = await client.post("/analyze", json={
+                "transcript": rng.choice(transcripts), "userGoal": "Explain the quarterly results",
+                "duration": 60, "aiPersonality": rng.choice(PERSONALITIES)
+            })
+            if response.status_code == 200:
+                session_ids.append(response.json()["sessionId"])
+            return response
+        if name == "feedback":
+            return await client.get(f"/feedback/{rng.choice(session_ids)}")
+        if name == "recordings":
+            return await client.get("/recordings", params={"limit": 50})
+        return await client.get("/metrics")
+
+    async def user():
+        while time.monotonic() < stop_at:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                ok = (await request(name)).status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies[name].append((time.perf_counter() - started) * 1000)
+            if not ok:
+                errors[name] += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "requests": total,
+        "requests_per_s": round(total / elapsed, 1),
+        "errors": sum(errors.values()),
+        "endpoints": {
+            name: {"requests": len(latencies[name]), "errors": errors[name], **latency_summary(latencies[name])}
+            for name in names
+        }
+    }
+
+
+async def run_one(workers: int, args) -> Dict:
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="podium-scaling-") as workdir:
+        server = start_server(workers, port, workdir)
+        try:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+                await wait_until_up(client)
+                # Warm up: seed sessions for /feedback and let every worker settle
+                await drive(client, {"analyze": 1}, min(3.0, args.duration), args.concurrency, args.seed)
+                mix = parse_mix(args.mix, endpoints=("analyze", "feedback", "recordings", "metrics"))
+                result = await drive(client, mix, args.duration, args.concurrency, args.seed)
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+    return {"workers": workers, **result}
+
+
+async def _main(args) -> Dict:
+    results = []
+    for workers in [int(n) for n in args.workers.split(",")]:
+        results.append(await run_one(workers, args))
+        print(f"{workers} workers: {results[-1]['requests_per_s']} req/s", file=sys.stderr)
+    first = results[0] if results else None
+    if first and first["requests_per_s"]:
+        per_worker = first["requests_per_s"] / first["workers"]
+        for entry in results:
+            entry["speedup"] = round(entry["requests_per_s"] / first["requests_per_s"], 2)
+            entry["efficiency"] = round(entry["requests_per_s"] / (per_worker * entry["workers"]), 2)
+    return {"benchmark": "worker_scaling", "environment": environment_info(), "mix": args.mix, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the CPU-bound request path per worker count")
+    parser.add_argument("--workers", default="1,2,4", help="Worker counts to compare")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of measured load per worker count")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent client connections")
+    parser.add_argument("--mix", default="analyze=1,feedback=4,recordings=2,metrics=1",
+                        help="Relative weights of analyze, feedback, recordings and metrics requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(_main(args)), args.output)
@@ -0,0 +1,213 @@
+"""
+Podium Pal Backend - Caching
+=============================
+Content-addressed cache for LLM feedback: an in-memory LRU tier with size and
+TTL limits, backed by an optional SQLite tier that survives restarts.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from worker_coordination import connect_sqlite
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with optional per-entry TTL
+
+    Eviction keeps at most `max_entries` entries and, when `max_bytes` is set,
+    at most that many bytes as reported by the `size` passed to `set()`.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: int = 0):
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never let one oversized entry flush the whole cache
+            self.pop(key)
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry[2]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheTier:
+    """Persistent key/value tier storing JSON values in a single SQLite table"""
+
+    def __init__(self, db_path: Path, ttl_seconds: Optional[float] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds and created_at + self.ttl_seconds <= time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FeedbackCache:
+    """
+    Two-tier cache for LLM feedback keyed by a hash of the prompt inputs
+
+    Lookups check the memory tier first, then the persistent tier (if
+    configured); persistent hits are promoted back into memory.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None, db_path: Optional[Path] = None):
+        self.memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.persistent = SQLiteCacheTier(db_path, ttl_seconds=ttl_seconds) if db_path else None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(transcript: str, user_goal: str, ai_personality: str, duration: int,
+                 has_audio: bool, model_name: str, scope: str = "speech",
+                 audio_metrics: Optional[Dict] = None) -> str:
+        """
+        Build a content-addressed key from normalized prompt inputs
+
+        Whitespace is collapsed so retries that differ only in spacing share
+        an entry; the model name keeps entries from different models apart,
+        and the scope separates whole-speech results from segment results.
+        Acoustic metrics are part of the prompt, so they are part of the key.
+        """
+        normalized = {
+            "scope": scope,
+            "transcript": " ".join((transcript or "").split()),
+            "userGoal": " ".join((user_goal or "").split()),
+            "aiPersonality": (ai_personality or "supportive").strip().lower(),
+            "duration": int(duration or 0),
+            "hasAudio": bool(has_audio),
+            "model": model_name,
+        }
+        if audio_metrics:
+            normalized["audio"] = audio_metrics
+        payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self.memory.get(key)
+        if value is not None:
+            with self._lock:
+                self._hits += 1
+            return value
+
+        if self.persistent is not None:
+            value = self.persistent.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                with self._lock:
+                    self._hits += 1
+                    self._persistent_hits += 1
+                return value
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, key: str, value: Dict):
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            self.persistent.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "persistentHits": self._persistent_hits,
+                "misses": self._misses,
+                "memoryEntries": len(self.memory),
+                "persistent": self.persistent is not None,
+            }
+
+    def close(self):
+        if self.persistent is not None:
+            self.persistent.close()
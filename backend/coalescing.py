@@ -0,0 +1,69 @@
+"""
+Podium Pal Backend - Request Coalescing
+========================================
+Single-flight execution: concurrent callers asking for the same key share one
+in-flight computation instead of each starting their own, so a double-clicked
+"Analyze" or a client retrying a slow request costs one Gemini call.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async calls by key
+
+    The first caller for a key starts the computation as its own task; callers
+    arriving while it runs await that task and get the same result or
+    exception. Nothing is remembered once the task finishes, so this is not a
+    cache: a later call with the same key starts afresh.
+
+    The task is shielded from its callers: a caller that is cancelled (client
+    disconnected) stops waiting, but the computation carries on for the others
+    and still persists its result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._started = 0
+        self._joined = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run `fn()` unless a call for `key` is already in flight, then wait for it
+
+        Args:
+            key: Identity of the computation
+            fn: Coroutine function to start if no call for `key` is running
+
+        Returns:
+            (result, shared) where shared is True if this caller joined a call
+            started by someone else
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        with self._lock:
+            if shared:
+                self._joined += 1
+            else:
+                self._started += 1
+        return await asyncio.shield(task), shared
+
+    def _finished(self, key: str, task: asyncio.Future):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller stopped waiting
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Calls started and calls that joined one already in flight, since start"""
+        with self._lock:
+            return {"started": self._started, "joined": self._joined, "inFlight": len(self._calls)}
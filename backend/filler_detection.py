@@ -0,0 +1,105 @@
+"""
+Podium Pal Backend - Filler Word Detection
+===========================================
+Compiled matcher that finds single- and multi-word fillers ("um",
+"you know", "kind of", ...) in one linear pass over a transcript.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple
+
+# Words with internal apostrophes ("don't") or hyphens ("uh-huh", "so-so")
+# stay one token; surrounding punctuation ("um," or "so.") is not part of a token
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:['-][^\W_]+)*")
+
+# Characters before a match that the matcher's lookbehinds inspect; a scan
+# resumed mid-text needs this much of the preceding text as context
+BOUNDARY_CONTEXT_CHARS = 2
+
+# Anything that is not a word character separates the words of a phrase,
+# so "you, know" still counts as "you know"
+_PHRASE_SEPARATOR = r"[^\w']+"
+
+DEFAULT_FILLER_LEXICON = (
+    "um", "uh", "like", "you know", "basically", "actually",
+    "literally", "so", "well", "right", "okay", "hmm",
+    "kind of", "sort of"
+)
+
+
+class FillerOccurrence(NamedTuple):
+    """A single filler match with character offsets into the original text"""
+    filler: str
+    start: int
+    end: int
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercased word tokens"""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class FillerMatcher:
+    """
+    Lexicon compiled into a single case-insensitive regular expression
+
+    Each filler becomes a named alternative anchored on word boundaries, and
+    alternatives are ordered longest phrase first so a scan takes the longest
+    match at each position ("you know" rather than any shorter entry inside
+    it). Matches never overlap, and the whole transcript is scanned once by
+    the regex engine, so cost stays O(n) however long the speech is.
+    """
+
+    def __init__(self, lexicon: Iterable[str] = DEFAULT_FILLER_LEXICON):
+        self.lexicon: List[str] = []
+        phrases = []
+        for phrase in lexicon:
+            tokens = tokenize(phrase)
+            filler = " ".join(tokens)
+            if not tokens or filler in self.lexicon:
+                continue
+            self.lexicon.append(filler)
+            phrases.append(tokens)
+
+        self.max_phrase_tokens = max((len(tokens) for tokens in phrases), default=0)
+
+        # Group names map back to lexicon entries without re-normalizing the match.
+        # The lookarounds treat contractions ("so's") and hyphenated words
+        # ("uh-huh", "well-known") as one word but still match a filler inside
+        # quotes ('so') or before a dash ("um-- so")
+        alternatives = []
+        for index, tokens in sorted(enumerate(phrases), key=lambda item: (-len(item[1]), -len(" ".join(item[1])))):
+            body = _PHRASE_SEPARATOR.join(re.escape(token) for token in tokens)
+            alternatives.append(f"(?P<f{index}>{body})")
+        self._pattern = re.compile(
+            r"(?<!\w)(?<!\w['-])(?:" + "|".join(alternatives) + r")(?!\w)(?!['-]\w)",
+            re.IGNORECASE
+        ) if alternatives else None
+
+    def find(self, text: str, pos: int = 0) -> List[FillerOccurrence]:
+        """
+        Return every filler occurrence in text, in order
+
+        Args:
+            text: Text to scan
+            pos: Offset to start matching at; the text before it is only
+                context for the word-boundary checks
+        """
+        if self._pattern is None:
+            return []
+        lexicon = self.lexicon
+        return [
+            FillerOccurrence(lexicon[int(match.lastgroup[1:])], match.start(), match.end())
+            for match in self._pattern.finditer(text, pos)
+        ]
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Count filler occurrences, keyed in lexicon order and omitting zeros"""
+        return self.summarize(self.find(text))
+
+    def summarize(self, occurrences: Iterable[FillerOccurrence]) -> Dict[str, int]:
+        """Turn a list of occurrences into per-filler counts"""
+        counts = dict.fromkeys(self.lexicon, 0)
+        for occurrence in occurrences:
+            counts[occurrence.filler] += 1
+        return {filler: count for filler, count in counts.items() if count > 0}
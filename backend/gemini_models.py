@@ -0,0 +1,99 @@
+"""
+Podium Pal Backend - Gemini Model Pool
+=======================================
+Lazy access to the Gemini SDK. Importing google.generativeai takes about half
+a second, so it happens on first use or during warm-up after startup, never
+at import. GenerativeModel objects are created once and reused by every
+request: one plain model, plus one per system instruction when the installed
+SDK accepts system instructions.
+"""
+
+import inspect
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+class GeminiModelPool:
+    """
+    Long-lived GenerativeModel objects for one model name
+
+    Args:
+        model_name: Gemini model, e.g. "gemini-2.0-flash"
+        api_key: API key passed to genai.configure (None leaves the SDK unconfigured)
+    """
+
+    def __init__(self, model_name: str, api_key: Optional[str] = None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._genai = None
+        self._supports_system_instruction = False
+        self._models: Dict[Optional[str], object] = {}
+        self._lock = threading.Lock()
+        self.import_seconds: Optional[float] = None
+
+    def _sdk(self):
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    started = time.perf_counter()
+                    import google.generativeai as genai
+                    if self.api_key:
+                        genai.configure(api_key=self.api_key)
+                    parameters = inspect.signature(genai.GenerativeModel).parameters
+                    self._supports_system_instruction = "system_instruction" in parameters
+                    self.import_seconds = time.perf_counter() - started
+                    self._genai = genai
+        return self._genai
+
+    @property
+    def supports_system_instruction(self) -> bool:
+        """Whether models can carry a system instruction (imports the SDK)"""
+        self._sdk()
+        return self._supports_system_instruction
+
+    def get(self, system_instruction: Optional[str] = None):
+        """
+        The shared model for a system instruction (None for a plain model)
+
+        Raises:
+            ValueError: If a system instruction is given but the SDK does not support them
+        """
+        model = self._models.get(system_instruction)
+        if model is not None:
+            return model
+        genai = self._sdk()
+        if system_instruction is not None and not self._supports_system_instruction:
+            raise ValueError("The installed google-generativeai does not support system instructions")
+        with self._lock:
+            model = self._models.get(system_instruction)
+            if model is None:
+                if system_instruction is None:
+                    model = genai.GenerativeModel(self.model_name)
+                else:
+                    model = genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
+                self._models[system_instruction] = model
+        return model
+
+    def warm_up(self, system_instructions: Iterable[str] = ()) -> float:
+        """
+        Import the SDK and create the plain model and, if supported, a model
+        per system instruction
+
+        Returns:
+            Seconds taken
+        """
+        started = time.perf_counter()
+        self.get()
+        if self.supports_system_instruction:
+            for system_instruction in system_instructions:
+                self.get(system_instruction)
+        return time.perf_counter() - started
+
+    def stats(self) -> Dict:
+        return {
+            "sdkLoaded": self._genai is not None,
+            "importSeconds": round(self.import_seconds, 3) if self.import_seconds is not None else None,
+            "systemInstructions": self._supports_system_instruction,
+            "models": len(self._models),
+        }
@@ -0,0 +1,350 @@
+"""
+Podium Pal Backend - Analysis Jobs
+===================================
+Background job mode for /analyze: inputs are persisted to disk, a bounded
+pool of worker tasks runs the analysis, and clients poll or subscribe to
+status changes. Jobs left queued or running by a restart are picked up again
+on startup. With several server processes sharing the job directory, each
+job belongs to the process that queued it; jobs whose process has died are
+taken over by the next one to start. Finished jobs are deleted once they are
+older than the retention period.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from worker_coordination import FileLock
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+TERMINAL_STATUSES = (JOB_DONE, JOB_FAILED)
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+class JobManager:
+    """
+    Persistent job queue drained by a fixed number of worker tasks
+
+    Workers are owned by the manager rather than by any request, so a client
+    disconnecting never cancels an analysis that is already queued.
+
+    Each manager holds a lock file named after its owner id while running,
+    and stamps the jobs it queues with that id; a job whose owner's lock is
+    free was left behind by a process that is gone.
+
+    Every unfinished job also has an empty marker file under .pending, so
+    recovery reads only those jobs and pruning can tell finished jobs apart by
+    their file times alone, without parsing every job file.
+    """
+
+    def __init__(self, storage_dir: Path, handler: Callable[[str, Dict], Awaitable[Dict]],
+                 workers: int = 4, max_queue: int = 1000, poll_interval: float = 0.5,
+                 retention_seconds: float = 0, prune_interval: float = 3600):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(exist_ok=True)
+        self.handler = handler
+        self.worker_count = workers
+        self.max_queue = max_queue
+        # How often events() re-reads a job that another process is running
+        self.poll_interval = poll_interval
+        # Finished jobs last updated longer ago than this are deleted (0 = kept forever)
+        self.retention_seconds = retention_seconds
+        self.prune_interval = prune_interval
+        self.owner_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._owner_lock = FileLock(self._owner_path(self.owner_id))
+        self._pending_dir = self.storage_dir / ".pending"
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pruner: Optional[asyncio.Task] = None
+        self._pruned = 0
+        self._active: Dict[str, Dict] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    async def start(self) -> int:
+        """
+        Recover unfinished jobs from disk, start the workers and, with a
+        retention period, delete expired finished jobs now and every
+        prune_interval seconds
+
+        Returns:
+            Number of recovered jobs
+        """
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._owner_lock.acquire()
+        recovered = []
+        # One process at a time, so two starting workers never claim the same job
+        with FileLock(self.storage_dir / ".recovery.lock"):
+            if not self._pending_dir.exists():
+                self._mark_legacy_pending()
+            for marker in self._pending_dir.iterdir():
+                job_file = self._path(marker.name)
+                try:
+                    job = self._read(job_file)
+                except FileNotFoundError:
+                    marker.unlink(missing_ok=True)
+                    continue
+                except Exception as e:
+                    logger.warning("Error reading job", extra={"file": job_file.name, "error": str(e)})
+                    continue
+                if job.get("status") in TERMINAL_STATUSES:
+                    # Finished just before a crash removed its marker
+                    marker.unlink(missing_ok=True)
+                elif not self._owned_elsewhere(job):
+                    recovered.append(job)
+
+            for job in sorted(recovered, key=lambda j: j.get("createdAt", "")):
+                job["status"] = JOB_QUEUED
+                job["owner"] = self.owner_id
+                self._write(job)
+                self._active[job["jobId"]] = job
+                self._queue.put_nowait(job["jobId"])
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        if self.retention_seconds > 0:
+            self._pruner = asyncio.create_task(self._prune_periodically())
+        return len(recovered)
+
+    async def stop(self):
+        """
+        Stop the workers
+
+        Jobs that were still running keep their on-disk status and are rerun
+        on the next start.
+        """
+        tasks = self._workers + ([self._pruner] if self._pruner else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._pruner = None
+        if self._owner_lock.held:
+            self._owner_lock.path.unlink(missing_ok=True)
+            self._owner_lock.release()
+
+    def submit(self, job_id: str, payload: Dict) -> Dict:
+        """
+        Persist a new job and queue it
+
+        Args:
+            job_id: Unique job id (also used as the session id)
+            payload: Analysis inputs passed to the handler
+
+        Returns:
+            Public job record
+
+        Raises:
+            JobQueueFullError: If the queue is at capacity
+        """
+        if self._queue is None or self._queue.full():
+            raise JobQueueFullError("Analysis queue is full, please retry later")
+        now = datetime.now().isoformat()
+        job = {
+            "jobId": job_id,
+            "status": JOB_QUEUED,
+            "createdAt": now,
+            "updatedAt": now,
+            "input": payload,
+            "result": None,
+            "error": None,
+            "owner": self.owner_id
+        }
+        # Marker first: a job file without one would never be recovered
+        self._mark_pending(job_id)
+        self._write(job)
+        self._active[job_id] = job
+        self._queue.put_nowait(job_id)
+        return self._public(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Current public job record, from memory or disk"""
+        job = self._active.get(job_id)
+        if job is None:
+            job_file = self._path(job_id)
+            if not job_file.exists():
+                return None
+            job = self._read(job_file)
+        return self._public(job)
+
+    async def events(self, job_id: str) -> AsyncIterator[Dict]:
+        """
+        Yield the job record now and after every status change, ending once
+        the job is done or failed
+        """
+        updates: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(updates)
+        try:
+            job = self.get(job_id)
+            if job is None:
+                return
+            yield job
+            while job["status"] not in TERMINAL_STATUSES:
+                if job_id in self._active:
+                    job = await updates.get()
+                else:
+                    # Running in another server process: follow its job file
+                    await asyncio.sleep(self.poll_interval)
+                    latest = self.get(job_id)
+                    if latest is None or latest == job:
+                        continue
+                    job = latest
+                yield job
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if updates in subscribers:
+                subscribers.remove(updates)
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {JOB_QUEUED: 0, JOB_RUNNING: 0}
+        for job in self._active.values():
+            if job["status"] in counts:
+                counts[job["status"]] += 1
+        return {"workers": self.worker_count, **counts, "pruned": self._pruned}
+
+    def prune(self) -> int:
+        """
+        Delete finished jobs whose file was last written more than
+        retention_seconds ago
+
+        Only file names and times are read: a job without a pending marker is
+        finished, and its file is not written again once it is.
+
+        Returns:
+            Number of deleted jobs
+        """
+        if self.retention_seconds <= 0:
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        deleted = 0
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.endswith(".json"):
+                    continue
+                try:
+                    if entry.stat().st_mtime >= cutoff:
+                        continue
+                    if (self._pending_dir / entry.name[:-len(".json")]).exists():
+                        continue
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    # Pruned by another server process sharing the directory
+                    continue
+                deleted += 1
+        self._pruned += deleted
+        return deleted
+
+    async def _prune_periodically(self):
+        while True:
+            try:
+                deleted = await asyncio.to_thread(self.prune)
+                if deleted:
+                    logger.info("Deleted expired analysis jobs", extra={"jobs": deleted})
+            except Exception as e:
+                logger.warning("Error deleting expired jobs", extra={"error": str(e)})
+            await asyncio.sleep(self.prune_interval)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._active.get(job_id)
+            if job is None:
+                self._queue.task_done()
+                continue
+            try:
+                self._update(job, status=JOB_RUNNING)
+                result = await self.handler(job_id, job["input"])
+                self._update(job, status=JOB_DONE, result=result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Job failed", extra={"job_id": job_id, "error": str(e)})
+                self._update(job, status=JOB_FAILED, error=str(e))
+            finally:
+                if job["status"] in TERMINAL_STATUSES:
+                    self._active.pop(job_id, None)
+                    (self._pending_dir / job_id).unlink(missing_ok=True)
+                self._queue.task_done()
+
+    def _update(self, job: Dict, **changes):
+        job.update(changes)
+        job["updatedAt"] = datetime.now().isoformat()
+        self._write(job)
+        snapshot = self._public(job)
+        for updates in self._subscribers.get(job["jobId"], []):
+            updates.put_nowait(snapshot)
+
+    def _path(self, job_id: str) -> Path:
+        return self.storage_dir / f"{job_id}.json"
+
+    def _owner_path(self, owner_id: str) -> Path:
+        return self.storage_dir / ".owners" / f"{owner_id}.lock"
+
+    def _mark_pending(self, job_id: str):
+        self._pending_dir.mkdir(exist_ok=True)
+        (self._pending_dir / job_id).touch()
+
+    def _mark_legacy_pending(self):
+        """Job directories from before pending markers: find unfinished jobs by reading every file, once"""
+        unfinished = []
+        for job_file in self.storage_dir.glob("*.json"):
+            try:
+                job = self._read(job_file)
+            except Exception as e:
+                logger.warning("Error reading job", extra={"file": job_file.name, "error": str(e)})
+                continue
+            if job.get("status") not in TERMINAL_STATUSES:
+                unfinished.append(job["jobId"])
+        for job_id in unfinished:
+            self._mark_pending(job_id)
+        self._pending_dir.mkdir(exist_ok=True)
+
+    def _owned_elsewhere(self, job: Dict) -> bool:
+        """Whether another live process owns this job"""
+        owner = job.get("owner")
+        if not owner or owner == self.owner_id:
+            return False
+        lock = FileLock(self._owner_path(owner))
+        if not lock.acquire(blocking=False):
+            return True
+        lock.release()
+        lock.path.unlink(missing_ok=True)
+        return False
+
+    def _read(self, job_file: Path) -> Dict:
+        with open(job_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, job: Dict):
+        # Write-then-rename so a crash never leaves a truncated job file behind
+        job_file = self._path(job["jobId"])
+        tmp_file = job_file.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp_file, job_file)
+
+    @staticmethod
+    def _public(job: Dict) -> Dict:
+        return {
+            "jobId": job["jobId"],
+            "sessionId": job["jobId"],
+            "status": job["status"],
+            "createdAt": job.get("createdAt"),
+            "updatedAt": job.get("updatedAt"),
+            "result": job.get("result"),
+            "error": job.get("error")
+        }
@@ -0,0 +1,228 @@
+"""
+Podium Pal Backend - Live Coaching State
+=========================================
+Rolling transcript state for /ws/live. Each transcript delta updates the
+word count, windowed pace and filler counts in time proportional to the
+delta, and the accumulated state becomes the session's metrics at the end
+without scanning the full transcript again.
+"""
+
+import re
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from filler_detection import BOUNDARY_CONTEXT_CHARS, TOKEN_PATTERN, FillerMatcher, FillerOccurrence
+
+_WORD_PATTERN = re.compile(r"\S+")
+
+# Longest uncommitted tail: a run without token boundaries (one huge "word",
+# or punctuation only) is committed beyond this instead of being rescanned
+# with every delta. Far longer than any filler phrase.
+MAX_PENDING_CHARS = 256
+
+
+class TranscriptTooLargeError(Exception):
+    """A transcript delta, or the transcript so far, exceeds the configured size limit"""
+
+
+class LiveAlertPolicy:
+    """
+    Thresholds for live pace and filler alerts
+
+    Args:
+        window_seconds: Sliding window for pace and filler rate
+        min_wpm: Alert when the windowed pace drops below this
+        max_wpm: Alert when the windowed pace rises above this
+        filler_alert_count: Alert when this many fillers fall inside the window
+        warmup_seconds: No pace alerts until the speaker has talked this long
+        cooldown_seconds: Minimum time between two alerts of the same kind
+    """
+
+    def __init__(self, window_seconds: float = 15.0, min_wpm: int = 110, max_wpm: int = 180,
+                 filler_alert_count: int = 3, warmup_seconds: float = 10.0, cooldown_seconds: float = 10.0):
+        self.window_seconds = window_seconds
+        self.min_wpm = min_wpm
+        self.max_wpm = max_wpm
+        self.filler_alert_count = filler_alert_count
+        self.warmup_seconds = warmup_seconds
+        self.cooldown_seconds = cooldown_seconds
+
+
+class LiveTranscript:
+    """
+    Incrementally maintained transcript metrics
+
+    Filler matching runs on the new text plus a short uncommitted tail: the
+    last `max_phrase_tokens` tokens stay pending, because the next delta may
+    finish a partial word or a multi-word filler. The tail never grows past
+    MAX_PENDING_CHARS, and the few committed characters before it are kept as
+    context for the word-boundary checks. Matches and words before the tail
+    are committed once and never looked at again, so each delta costs time
+    proportional to its length and the counts equal a full FillerMatcher scan
+    of the final text.
+
+    Args:
+        matcher: Filler lexicon to match against
+        policy: Alert thresholds
+        clock: Time source in seconds
+        max_delta_chars: Longest accepted delta (0 = no limit)
+        max_chars: Longest accepted transcript (0 = no limit)
+    """
+
+    def __init__(self, matcher: FillerMatcher, policy: Optional[LiveAlertPolicy] = None,
+                 clock=time.monotonic, max_delta_chars: int = 0, max_chars: int = 0):
+        self.matcher = matcher
+        self.policy = policy or LiveAlertPolicy()
+        self.max_delta_chars = max_delta_chars
+        self.max_chars = max_chars
+        self._length = 0
+        self._clock = clock
+        self._started = clock()
+        self._chunks: List[str] = []
+        # Uncommitted tail, its offset in the full transcript and the committed text just before it
+        self._pending = ""
+        self._pending_offset = 0
+        self._context = ""
+        self._in_word = False
+        self.word_count = 0
+        self.occurrences: List[FillerOccurrence] = []
+        self.filler_counts: Dict[str, int] = {}
+        # (seconds since start, count) events inside the sliding window
+        self._window_words: Deque[Tuple[float, int]] = deque()
+        self._window_word_total = 0
+        self._window_fillers: Deque[float] = deque()
+        self._last_alert: Dict[str, float] = {}
+        self._now = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return self._clock() - self._started
+
+    @property
+    def text(self) -> str:
+        """Full transcript received so far"""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def append(self, delta: str, at: Optional[float] = None) -> List[Dict]:
+        """
+        Add a transcript delta and return any alerts it triggers
+
+        Args:
+            delta: Newly recognized text, exactly as it continues the transcript
+            at: Seconds since the start of the speech (defaults to server time)
+
+        Returns:
+            List of alert dictionaries ({"kind", "message", ...}), usually empty
+
+        Raises:
+            TranscriptTooLargeError: If the delta or the resulting transcript is
+                over its limit; the transcript is left unchanged
+        """
+        if self.max_delta_chars and len(delta) > self.max_delta_chars:
+            raise TranscriptTooLargeError(
+                f"Transcript message exceeds the {self.max_delta_chars} character limit"
+            )
+        if self.max_chars and self._length + len(delta) > self.max_chars:
+            raise TranscriptTooLargeError(f"Transcript exceeds the {self.max_chars} character limit")
+        at = self.elapsed if at is None else at
+        # Client clocks can step backwards; the sliding windows need ordered times
+        at = self._now = max(self._now, at)
+        if not delta:
+            return []
+        self._chunks.append(delta)
+        self._length += len(delta)
+
+        # Whitespace-separated words, matching calculate_metrics' count
+        words = len(_WORD_PATTERN.findall(delta))
+        if words and self._in_word and not delta[0].isspace():
+            words -= 1
+        self._in_word = not delta[-1].isspace()
+        self.word_count += words
+        if words:
+            self._window_words.append((at, words))
+            self._window_word_total += words
+
+        self._pending += delta
+        self._commit(at, final=False)
+        return self._alerts(at)
+
+    def finish(self) -> List[FillerOccurrence]:
+        """Commit the pending tail; call once when the speech is over"""
+        self._commit(self._now, final=True)
+        return self.occurrences
+
+    def _commit(self, at: float, final: bool):
+        start = len(self._context)
+        text = self._context + self._pending
+        matches = self.matcher.find(text, start)
+        cutoff = len(text)
+        if not final:
+            tokens = [match.start() for match in TOKEN_PATTERN.finditer(text, start)]
+            keep = self.matcher.max_phrase_tokens or 1
+            cutoff = tokens[-keep] if len(tokens) >= keep else start
+            cutoff = max(cutoff, len(text) - MAX_PENDING_CHARS)
+            for match in matches:
+                # A filler spanning the cutoff is re-examined with the next delta
+                if match.start < cutoff < match.end:
+                    cutoff = match.start
+        offset = self._pending_offset - start
+        for match in matches:
+            if match.end > cutoff:
+                break
+            self.occurrences.append(FillerOccurrence(match.filler, match.start + offset, match.end + offset))
+            self.filler_counts[match.filler] = self.filler_counts.get(match.filler, 0) + 1
+            self._window_fillers.append(at)
+        self._context = text[max(0, cutoff - BOUNDARY_CONTEXT_CHARS):cutoff]
+        self._pending = text[cutoff:]
+        self._pending_offset += cutoff - start
+
+    def windowed_wpm(self, at: Optional[float] = None) -> int:
+        """Words per minute over the sliding window (or since the start, if shorter)"""
+        at = self.elapsed if at is None else at
+        self._expire(at)
+        span = min(self.policy.window_seconds, max(at, 1.0))
+        return int(self._window_word_total / (span / 60.0))
+
+    def _expire(self, at: float):
+        horizon = at - self.policy.window_seconds
+        while self._window_words and self._window_words[0][0] < horizon:
+            self._window_word_total -= self._window_words.popleft()[1]
+        while self._window_fillers and self._window_fillers[0] < horizon:
+            self._window_fillers.popleft()
+
+    def _alerts(self, at: float) -> List[Dict]:
+        policy = self.policy
+        wpm = self.windowed_wpm(at)
+        alerts = []
+        if at >= policy.warmup_seconds:
+            if wpm > policy.max_wpm:
+                alerts.append({"kind": "pace_fast", "wpm": wpm,
+                               "message": f"Slow down a little - {wpm} WPM (aim for {policy.max_wpm} or less)"})
+            elif wpm < policy.min_wpm:
+                alerts.append({"kind": "pace_slow", "wpm": wpm,
+                               "message": f"Pick up the pace - {wpm} WPM (aim for {policy.min_wpm} or more)"})
+        if len(self._window_fillers) >= policy.filler_alert_count:
+            alerts.append({"kind": "fillers", "count": len(self._window_fillers),
+                           "message": f"{len(self._window_fillers)} filler words in the last "
+                                      f"{policy.window_seconds:g}s - try pausing instead"})
+        return [alert for alert in alerts if self._may_alert(alert["kind"], at)]
+
+    def _may_alert(self, kind: str, at: float) -> bool:
+        last = self._last_alert.get(kind)
+        if last is not None and at - last < self.policy.cooldown_seconds:
+            return False
+        self._last_alert[kind] = at
+        return True
+
+    def snapshot(self) -> Dict:
+        """Current rolling metrics as sent to the client after each delta"""
+        counts = self.filler_counts
+        return {
+            "elapsed": round(self._now, 2),
+            "words": self.word_count,
+            "wpm": self.windowed_wpm(self._now),
+            "fillerWords": {filler: counts[filler] for filler in self.matcher.lexicon if filler in counts}
+        }
@@ -0,0 +1,104 @@
+"""
+Podium Pal Backend - LLM Execution Layer
+=========================================
+Runs blocking Gemini SDK calls off the event loop in a dedicated thread pool,
+with a cap on concurrent calls, per-call deadlines and queue-depth reporting.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class LLMTimeoutError(Exception):
+    """Raised when an LLM call does not finish before its deadline"""
+
+
+class LLMExecutor:
+    """
+    Dedicated executor for blocking LLM calls
+
+    At most `max_concurrency` calls run at once; the rest wait in the pool's
+    queue. A call that misses its deadline is abandoned by the caller (and
+    cancelled outright if it never started), so a slow Gemini response can
+    never stall the event loop or the requests waiting behind it.
+    """
+
+    def __init__(self, max_concurrency: int = 8, timeout: Optional[float] = 30.0):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="gemini")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` in the LLM pool and await its result
+
+        Args:
+            fn: Blocking callable to execute
+            timeout: Deadline in seconds covering queue wait and execution
+                     (defaults to the executor-wide timeout, None disables it)
+
+        Returns:
+            Whatever `fn` returns
+
+        Raises:
+            LLMTimeoutError: If the deadline expires first
+        """
+        deadline = self.timeout if timeout is None else timeout
+
+        def _call():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        def _on_done(fut):
+            with self._lock:
+                if fut.cancelled():
+                    # Never started, so it is still counted as queued
+                    self._queued -= 1
+                elif fut.exception() is not None:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+        with self._lock:
+            self._queued += 1
+        future = self._pool.submit(_call)
+        future.add_done_callback(_on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise LLMTimeoutError(f"LLM call exceeded {deadline}s deadline")
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of queue depth and call outcomes"""
+        with self._lock:
+            return {
+                "maxConcurrency": self.max_concurrency,
+                "running": self._running,
+                "queued": self._queued,
+                "completed": self._completed,
+                "failed": self._failed,
+                "timedOut": self._timed_out,
+            }
+
+    def shutdown(self):
+        """Stop accepting work and cancel anything that has not started"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
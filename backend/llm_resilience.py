@@ -0,0 +1,306 @@
+"""
+Podium Pal Backend - Resilient LLM Calls
+=========================================
+Client layer over the LLM executor: a deadline per request, bounded retries
+with jittered backoff for transient errors and malformed responses, optional
+hedged second requests when the first is slower than recent calls usually
+are, and a circuit breaker that fails fast while Gemini is unhealthy.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from llm_executor import LLMExecutor, LLMTimeoutError
+
+# HTTP status codes (as carried by google.api_core exceptions) worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the LLM while the circuit breaker is open"""
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    try:
+        return int(getattr(error, "code", None))
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_failure(error: BaseException) -> Optional[str]:
+    """
+    Decide whether a failed LLM call is worth retrying
+
+    Returns:
+        "timeout", "unavailable" or "malformed" for retryable failures,
+        None for errors a retry would not fix (bad request, auth, bugs)
+    """
+    if isinstance(error, LLMTimeoutError):
+        return "timeout"
+    if isinstance(error, ValueError):
+        # parse_feedback_response raises ValueError for invalid or incomplete JSON
+        return "malformed"
+    if isinstance(error, (ConnectionError, TimeoutError)) or _status_code(error) in RETRYABLE_STATUS_CODES:
+        return "unavailable"
+    return None
+
+
+def _is_client_error(error: BaseException) -> bool:
+    """A 4xx answer: the service is up, the request was wrong"""
+    code = _status_code(error)
+    return code is not None and 400 <= code < 500 and code not in RETRYABLE_STATUS_CODES
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    are rejected for `reset_seconds`. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == CIRCUIT_OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+                return CIRCUIT_HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (claims the trial slot when half-open)"""
+        with self._lock:
+            if self._state == CIRCUIT_OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+                self._state = CIRCUIT_HALF_OPEN
+            if self._state == CIRCUIT_CLOSED:
+                return True
+            if self._state == CIRCUIT_HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CIRCUIT_CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def release_trial(self):
+        """
+        Give back the half-open trial slot of a call that never finished
+        (cancelled or abandoned), without counting it either way
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == CIRCUIT_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != CIRCUIT_OPEN:
+                    self.opened += 1
+                self._state = CIRCUIT_OPEN
+                self._opened_at = self._clock()
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for the hedging threshold"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 20) -> Optional[float]:
+        """Nearest-rank percentile, or None until `min_samples` calls have been seen"""
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            values = sorted(self._samples)
+        rank = max(0, min(len(values) - 1, int(round(pct / 100.0 * len(values) + 0.5)) - 1))
+        return values[rank]
+
+
+class ResilientLLMClient:
+    """
+    Calls a blocking LLM function through the executor with retries, hedging
+    and a circuit breaker
+
+    Args:
+        executor: LLMExecutor the calls run in
+        breaker: Circuit breaker shared by every call to the same backend
+        deadline: Overall seconds per request, across attempts and backoff
+        attempt_timeout: Seconds per attempt (capped by what is left of the deadline)
+        max_attempts: Attempts per request, including the first
+        backoff_base: First retry waits up to this many seconds; the cap doubles per retry
+        backoff_max: Upper bound on one backoff wait
+        hedge_percentile: Start a second, parallel attempt when the first has
+            run longer than this percentile of recent latencies (0 disables hedging)
+    """
+
+    def __init__(self, executor: LLMExecutor, breaker: Optional[CircuitBreaker] = None,
+                 deadline: Optional[float] = 45.0, attempt_timeout: Optional[float] = 30.0,
+                 max_attempts: int = 3, backoff_base: float = 0.5, backoff_max: float = 4.0,
+                 hedge_percentile: float = 0.0, rng: Optional[random.Random] = None):
+        self.executor = executor
+        self.breaker = breaker or CircuitBreaker()
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.latencies = LatencyTracker()
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._counts = {"retries": 0, "retriesMalformed": 0, "hedges": 0, "hedgeWins": 0, "deadlineExceeded": 0}
+
+    async def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` in the executor, retrying transient failures
+
+        Returns:
+            Whatever `fn` returns
+
+        Raises:
+            CircuitOpenError: If the breaker rejects the call
+            LLMTimeoutError: If the deadline runs out
+            Exception: The last error once retries are exhausted, or the first
+                error that is not worth retrying
+        """
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + self.deadline if self.deadline is not None else None
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.breaker.allow():
+                raise CircuitOpenError("Gemini circuit breaker is open")
+            timeout = self.attempt_timeout
+            if expires is not None:
+                remaining = expires - loop.time()
+                if remaining <= 0:
+                    self._count("deadlineExceeded")
+                    raise LLMTimeoutError(f"LLM request exceeded {self.deadline:g}s deadline")
+                timeout = remaining if timeout is None else min(timeout, remaining)
+
+            try:
+                result = await self._attempt(fn, args, kwargs, timeout)
+            except Exception as e:
+                self.record_outcome(e)
+                reason = classify_failure(e)
+                if expires is not None and reason == "timeout" and loop.time() >= expires:
+                    self._count("deadlineExceeded")
+                    raise LLMTimeoutError(f"LLM request exceeded {self.deadline:g}s deadline") from e
+                if reason is None or attempt >= self.max_attempts:
+                    raise
+                delay = self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+                if expires is not None and loop.time() + delay >= expires:
+                    raise
+                self._count("retriesMalformed" if reason == "malformed" else "retries")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (client gone, hedge loser, shutdown): no verdict on the service
+                self.breaker.release_trial()
+                raise
+
+            self.record_outcome(None)
+            return result
+
+    def record_outcome(self, error: Optional[BaseException]):
+        """
+        Report how a call went to the circuit breaker
+
+        Also used by callers that talk to the LLM without going through
+        call() (streaming, where a retry would repeat already-sent output).
+        """
+        if error is None or classify_failure(error) == "malformed" or _is_client_error(error):
+            # The service answered, so this says nothing against its health
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    async def _timed(self, fn: Callable[..., Any], args, kwargs, timeout: Optional[float]) -> Any:
+        started = time.perf_counter()
+        result = await self.executor.run(fn, *args, timeout=timeout, **kwargs)
+        self.latencies.observe(time.perf_counter() - started)
+        return result
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile <= 0:
+            return None
+        return self.latencies.percentile(self.hedge_percentile)
+
+    async def _attempt(self, fn: Callable[..., Any], args, kwargs, timeout: Optional[float]) -> Any:
+        hedge_after = self._hedge_delay()
+        if hedge_after is None or (timeout is not None and hedge_after >= timeout):
+            return await self._timed(fn, args, kwargs, timeout)
+
+        primary = asyncio.ensure_future(self._timed(fn, args, kwargs, timeout))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        # Only hedge into idle capacity; a queued hedge would just add load
+        if done or self.executor.stats()["queued"] > 0:
+            return await primary
+
+        self._count("hedges")
+        hedge = asyncio.ensure_future(
+            self._timed(fn, args, kwargs, None if timeout is None else timeout - hedge_after)
+        )
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedgeWins")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            # The losing call keeps its executor thread until Gemini answers; its result is dropped
+            for task in pending:
+                task.cancel()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Circuit state and retry, hedge and rejection counts since start"""
+        with self._lock:
+            counts = dict(self._counts)
+        hedge_after = self._hedge_delay()
+        return {
+            "circuit": self.breaker.state,
+            "circuitOpened": self.breaker.opened,
+            "rejected": self.breaker.rejected,
+            **counts,
+            "hedgeAfterSeconds": round(hedge_after, 3) if hedge_after is not None else None,
+        }
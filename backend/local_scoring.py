@@ -0,0 +1,365 @@
+"""
+Podium Pal Backend - Local Scoring
+===================================
+Deterministic heuristic scores for clarity, confidence, engagement and
+structure, computed from the transcript in well under a millisecond and
+without any model. Used as the instant provisional result, as the scores of
+the fallback feedback when Gemini is unavailable, and as a sanity check on
+the scores Gemini returns.
+"""
+
+import math
+from itertools import chain
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+from filler_detection import FillerMatcher
+
+SCORE_KEYS = ("clarityScore", "confidenceScore", "engagementScore", "structureScore")
+
+# Words that soften a claim; a few are fine, a habit of them sounds unsure
+HEDGE_PHRASES = (
+    "i think", "i guess", "i feel like", "i believe", "i'm not sure", "i am not sure",
+    "maybe", "perhaps", "probably", "possibly", "hopefully", "somewhat", "might",
+    "kind of", "sort of", "a little bit", "more or less",
+)
+
+EXAMPLE_PHRASES = (
+    "for example", "for instance", "such as", "imagine", "let me give you",
+    "let me tell you", "a story", "case study", "to illustrate", "like when",
+)
+
+TRANSITION_PHRASES = (
+    "first", "firstly", "second", "secondly", "third", "next", "then", "finally",
+    "however", "on the other hand", "as a result", "therefore", "because",
+    "in addition", "moreover", "that's why", "which means",
+)
+
+# Rhetorical questions often come out of speech-to-text without a question mark
+QUESTION_PHRASES = (
+    "have you ever", "did you know", "what if", "how many of you", "why does",
+    "why do", "what would", "how would", "ask yourself", "raise your hand",
+)
+
+AUDIENCE_WORDS = ("you", "your", "we", "us", "our")
+
+OPENING_PHRASES = (
+    "good morning", "good afternoon", "good evening", "hello", "hi everyone",
+    "thank you for having", "thanks for having", "my name is", "today i", "today we",
+    "i want to talk", "i'd like to talk", "i would like to talk", "i'm going to",
+    "i am going to", "let me start", "in this talk", "let's talk about",
+)
+
+CLOSING_PHRASES = (
+    "in conclusion", "to conclude", "to sum up", "in summary", "to summarize",
+    "to wrap up", "thank you", "thanks for listening", "thanks everyone",
+    "so remember", "the key takeaway", "any questions", "finally",
+)
+
+# Words at either end of the transcript searched for an opening or closing
+EDGE_WORDS = 40
+
+# Speaking pace (WPM) that costs nothing; outside it clarity and confidence drop
+PACE_RANGE = (120, 170)
+
+# Below this many words, sentence statistics and diversity are too noisy to score
+MIN_WORDS_FOR_STATS = 30
+
+# ASCII punctuation (apostrophes aside) and common typographic marks become spaces
+# before splitting into words, which is much cheaper than a word regex. Sentence
+# endings become newlines, so the same translated text also splits into sentences
+# (a decimal point splits one too, which the statistics can live with).
+_SEPARATORS = str.maketrans({
+    **{chr(code): " " for code in range(33, 127) if not chr(code).isalnum() and chr(code) != "'"},
+    ".": "\n", "!": "\n", "?": "\n", "\u2026": "\n",
+    "\u2018": "'", "\u2019": "'", "\u201c": " ", "\u201d": " ", "\u2013": " ", "\u2014": " ",
+})
+
+
+class PhraseIndex:
+    """
+    Phrases of several kinds, counted in the space-joined words
+
+    A phrase is only searched for, as a substring of the joined words, when
+    its least common-looking word (the longest) is in the transcript's
+    vocabulary, which rules out most phrases with one set lookup and without
+    touching the text. Phrases are counted independently, so a listed phrase
+    inside a longer listed phrase counts for both.
+    """
+
+    def __init__(self, phrases_by_kind: Dict[str, Iterable[str]]):
+        # Per kind: phrases as (gate word, space-padded text)
+        self._kinds: Dict[str, List[Tuple[str, str]]] = {}
+        for kind, phrases in phrases_by_kind.items():
+            gated = self._kinds.setdefault(kind, [])
+            for phrase in phrases:
+                tokens = phrase.lower().translate(_SEPARATORS).split()
+                if tokens:
+                    gated.append(_gated_phrase(tokens))
+
+    def count(self, joined: str, vocabulary: Container[str]) -> Dict[str, int]:
+        """
+        Number of matches of each kind
+
+        Args:
+            joined: Lowercased words of the transcript joined by single spaces,
+                with a space at each end
+            vocabulary: The distinct words of the transcript
+        """
+        counts = {}
+        for kind, gated in self._kinds.items():
+            total = 0
+            for gate, padded in gated:
+                if gate in vocabulary:
+                    total += joined.count(padded)
+            counts[kind] = total
+        return counts
+
+
+def _gated_phrase(tokens: List[str]) -> Tuple[str, str]:
+    """(gate word, space-padded text) for a phrase: the text can only occur where its longest word does"""
+    return max(tokens, key=len), f" {' '.join(tokens)} "
+
+
+def _mentions(words: List[str], vocabulary: Container[str], phrases: Iterable[Tuple[str, str]]) -> bool:
+    """Whether any of the gated phrases occurs in a short run of words from a transcript with this vocabulary"""
+    text = None
+    for gate, padded in phrases:
+        if gate in vocabulary:
+            if text is None:
+                text = f" {' '.join(words)} "
+            if padded in text:
+                return True
+    return False
+
+
+_MARKERS = PhraseIndex({
+    "hedge": HEDGE_PHRASES,
+    "example": EXAMPLE_PHRASES,
+    "question": QUESTION_PHRASES,
+    "transition": TRANSITION_PHRASES,
+    "audience": AUDIENCE_WORDS,
+})
+# Signal names, for the all-zero signals of an empty transcript
+_COUNT_SIGNALS = ("words", "fillersPer100Words", "hedgesPer100Words", "questions", "examples",
+                  "transitions", "audiencePer100Words", "lexicalDiversity", "sentences")
+_OPTIONAL_SIGNALS = ("meanSentenceWords", "sentenceLengthVariation", "pace")
+_OPENINGS = tuple(_gated_phrase(phrase.split()) for phrase in OPENING_PHRASES)
+_CLOSINGS = tuple(_gated_phrase(phrase.split()) for phrase in CLOSING_PHRASES)
+
+
+def _clamp(value: float) -> int:
+    return int(round(min(100.0, max(0.0, value))))
+
+
+class LocalScorer:
+    """
+    Heuristic scorer built on the same counts as calculate_metrics
+
+    Signals, per 100 words where that makes sense: filler and hedging density,
+    mean sentence length and its variation, lexical diversity (Guiraud's
+    index, types / sqrt(tokens), which depends less on length than a plain
+    type-token ratio), question, example, transition and audience-address
+    markers, and whether the speech has a recognizable opening and closing.
+    The same transcript always gets the same scores.
+    """
+
+    def __init__(self, filler_matcher: FillerMatcher):
+        # Fillers are counted from the word list when no metrics are passed in
+        self._fillers = PhraseIndex({"filler": filler_matcher.lexicon})
+
+    def score(self, transcript: str, duration: int = 0, metrics: Optional[Dict] = None) -> Dict:
+        """
+        Score a transcript
+
+        Args:
+            transcript: The speech text
+            duration: Recording duration in seconds (0 if unknown: pace is then not judged)
+            metrics: Output of calculate_metrics for this transcript, to reuse its
+                filler counts and pace instead of scanning again
+
+        Returns:
+            Dictionary with clarityScore, confidenceScore, engagementScore,
+            structureScore (0-100), overall_score (0-10) and the raw signals
+        """
+        # One split per sentence gives both the sentence lengths and the words
+        sentences = [line.split() for line in transcript.lower().translate(_SEPARATORS).split("\n")]
+        words = list(chain.from_iterable(sentences))
+        word_count = len(words)
+        if word_count == 0:
+            signals = {**dict.fromkeys(_COUNT_SIGNALS, 0), **dict.fromkeys(_OPTIONAL_SIGNALS),
+                       "opening": False, "closing": False}
+            return {**dict.fromkeys(SCORE_KEYS, 0), "overall_score": 0.0, "signals": signals}
+
+        vocabulary = set(words)
+        joined = f" {' '.join(words)} "
+        if metrics is not None:
+            fillers = sum(metrics.get("fillerWords", {}).values())
+            pace_known = duration > 0 or bool((metrics.get("audioMetrics") or {}).get("durationSeconds"))
+            pace = metrics.get("pace", 0) if pace_known else None
+        else:
+            fillers = self._fillers.count(joined, vocabulary)["filler"]
+            pace = int(word_count * 60 / duration) if duration > 0 else None
+
+        counts = _MARKERS.count(joined, vocabulary)
+        questions = counts["question"] + transcript.count("?")
+
+        sentence_lengths = list(filter(None, map(len, sentences)))
+
+        per_100 = 100.0 / word_count
+        signals = {
+            "words": word_count,
+            "fillersPer100Words": round(fillers * per_100, 2),
+            "hedgesPer100Words": round(counts["hedge"] * per_100, 2),
+            "questions": questions,
+            "examples": counts["example"],
+            "transitions": counts["transition"],
+            "audiencePer100Words": round(counts["audience"] * per_100, 2),
+            "lexicalDiversity": round(len(vocabulary) / math.sqrt(word_count), 2),
+            "sentences": len(sentence_lengths),
+            "meanSentenceWords": None,
+            "sentenceLengthVariation": None,
+            "pace": pace,
+            "opening": _mentions(words[:EDGE_WORDS], vocabulary, _OPENINGS),
+            "closing": _mentions(words[-EDGE_WORDS:], vocabulary, _CLOSINGS),
+        }
+        # Unpunctuated speech-to-text output is one long "sentence"; say nothing about it
+        if len(sentence_lengths) >= 2:
+            mean = sum(sentence_lengths) / len(sentence_lengths)
+            variance = sum((length - mean) ** 2 for length in sentence_lengths) / len(sentence_lengths)
+            signals["meanSentenceWords"] = round(mean, 1)
+            signals["sentenceLengthVariation"] = round(math.sqrt(variance) / mean, 2)
+
+        scores = self._scores(signals)
+        scores["overall_score"] = round(sum(scores.values()) / (10.0 * len(SCORE_KEYS)), 1)
+        scores["signals"] = signals
+        return scores
+
+    @staticmethod
+    def _scores(signals: Dict) -> Dict[str, int]:
+        filler_rate = signals["fillersPer100Words"]
+        hedge_rate = signals["hedgesPer100Words"]
+        enough_words = signals["words"] >= MIN_WORDS_FOR_STATS
+        mean_sentence = signals["meanSentenceWords"]
+        variation = signals["sentenceLengthVariation"]
+        pace = signals["pace"]
+        pace_off = max(0, PACE_RANGE[0] - pace, pace - PACE_RANGE[1]) if pace is not None else 0
+
+        clarity = 90.0 - min(30.0, filler_rate * 3) - min(20.0, pace_off * 0.4)
+        if mean_sentence is not None:
+            clarity -= min(20.0, max(0.0, mean_sentence - 22) * 1.5)
+
+        confidence = 88.0 - min(35.0, hedge_rate * 6) - min(20.0, filler_rate * 2) - min(10.0, pace_off * 0.2)
+
+        engagement = 50.0 + min(15.0, signals["questions"] * 5) + min(15.0, signals["examples"] * 5)
+        engagement += min(10.0, signals["audiencePer100Words"] * 2)
+        if enough_words:
+            engagement += min(12.0, max(0.0, signals["lexicalDiversity"] - 4) * 4)
+        if variation is not None:
+            # Some variety in sentence length keeps listeners with you; none is monotone
+            engagement += 8.0 if 0.35 <= variation <= 1.0 else 3.0
+
+        structure = 45.0 + (15.0 if signals["opening"] else 0.0) + (15.0 if signals["closing"] else 0.0)
+        structure += min(15.0, signals["transitions"] * 4)
+        if signals["sentences"] >= 3:
+            structure += 5.0
+        if enough_words:
+            structure += 5.0
+
+        return {
+            "clarityScore": _clamp(clarity),
+            "confidenceScore": _clamp(confidence),
+            "engagementScore": _clamp(engagement),
+            "structureScore": _clamp(structure),
+        }
+
+    def feedback(self, scores: Dict) -> Dict:
+        """
+        Feedback dictionary (same fields as parsed LLM feedback) for local scores
+
+        Args:
+            scores: Output of score()
+
+        Returns:
+            Dictionary with the scores, a summary, a tip, strengths and improvements
+        """
+        signals = scores["signals"]
+        strengths, improvements = _observations(signals)
+        return {
+            "summary": (f"Local estimate from {signals['words']} words: "
+                        f"{signals['fillersPer100Words']:g} fillers and {signals['hedgesPer100Words']:g} "
+                        f"hedges per 100 words, questions: {signals['questions']}, "
+                        f"examples: {signals['examples']}."),
+            **{key: scores[key] for key in SCORE_KEYS},
+            "overall_score": scores["overall_score"],
+            "tip": improvements[0][1] if improvements else "Keep practicing: your delivery markers look solid.",
+            "strengths": [text for _, text in strengths[:3]] or ["Speech recorded successfully"],
+            "improvements": [text for _, text in improvements[:3]] or ["Keep practicing to stay consistent"],
+        }
+
+
+def _observations(signals: Dict) -> Tuple[List[Tuple[float, str]], List[Tuple[float, str]]]:
+    """(strengths, improvements), each most notable first, as (weight, text) pairs"""
+    strengths: List[Tuple[float, str]] = []
+    improvements: List[Tuple[float, str]] = []
+
+    filler_rate = signals["fillersPer100Words"]
+    if filler_rate >= 3:
+        improvements.append((filler_rate, "Cut filler words: pause silently instead of saying 'um' or 'like'"))
+    elif filler_rate <= 1:
+        strengths.append((3 - filler_rate, "Few filler words"))
+
+    hedge_rate = signals["hedgesPer100Words"]
+    if hedge_rate >= 2:
+        improvements.append((hedge_rate, "State your points directly instead of hedging with 'I think' or 'maybe'"))
+    elif hedge_rate <= 0.5:
+        strengths.append((2 - hedge_rate, "Confident, direct wording"))
+
+    pace = signals["pace"]
+    if pace is not None:
+        if pace > PACE_RANGE[1]:
+            improvements.append(((pace - PACE_RANGE[1]) / 10, "Slow down so your audience can keep up"))
+        elif pace < PACE_RANGE[0]:
+            improvements.append(((PACE_RANGE[0] - pace) / 10, "Pick up the pace a little to hold attention"))
+        else:
+            strengths.append((2, "Comfortable speaking pace"))
+
+    mean_sentence = signals["meanSentenceWords"]
+    if mean_sentence is not None and mean_sentence > 25:
+        improvements.append(((mean_sentence - 25) / 3, "Break long sentences into shorter ones"))
+
+    if signals["examples"]:
+        strengths.append((signals["examples"], "Uses concrete examples"))
+    elif signals["words"] >= MIN_WORDS_FOR_STATS:
+        improvements.append((1.5, "Add a concrete example or story to illustrate your point"))
+
+    if signals["questions"]:
+        strengths.append((signals["questions"], "Engages the audience with questions"))
+
+    if signals["opening"] and signals["closing"]:
+        strengths.append((2.5, "Clear opening and closing"))
+    elif not signals["opening"]:
+        improvements.append((2, "Open by telling the audience what you will talk about"))
+    else:
+        improvements.append((2, "End with a clear conclusion or takeaway"))
+
+    if signals["transitions"] >= 3:
+        strengths.append((signals["transitions"] / 2, "Signposts ideas with transitions"))
+
+    strengths.sort(key=lambda item: -item[0])
+    improvements.sort(key=lambda item: -item[0])
+    return strengths, improvements
+
+
+def score_deviation(llm_feedback: Dict, local_scores: Dict) -> Tuple[str, int]:
+    """
+    Largest gap between LLM and local scores
+
+    Returns:
+        (score key, absolute difference in points) for the dimension that differs most
+    """
+    worst_key, worst_gap = SCORE_KEYS[0], 0
+    for key in SCORE_KEYS:
+        gap = abs(int(llm_feedback.get(key, 0)) - local_scores[key])
+        if gap > worst_gap:
+            worst_key, worst_gap = key, gap
+    return worst_key, worst_gap
@@ -0,0 +1,191 @@
+"""
+Podium Pal Backend - Long Transcript Planning
+==============================================
+Token budgeting for LLM prompts. Transcripts over the budget are split at
+sentence boundaries into segments that are analyzed in parallel, and the
+per-segment feedback is reduced back into a single feedback object.
+
+A segment's prompt (and so its cached result) depends only on its own text.
+Measurements of the whole speech (pace, pauses, pitch) are applied once, to
+the reduced feedback.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from local_scoring import PACE_RANGE
+
+# Rough average for English text; good enough for budgeting, not billing
+CHARS_PER_TOKEN = 4
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+SCORE_FIELDS = ("clarityScore", "confidenceScore", "engagementScore", "structureScore")
+
+# Pitch variability (semitones) below which delivery sounds monotone
+MONOTONE_SEMITONES = 2.0
+
+# Long pauses in a speech before they count against its delivery; a few are rhetoric
+LONG_PAUSES_NOTED = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences
+
+    Speech-to-text output often has no punctuation at all, so any "sentence"
+    longer than a segment is later cut at word boundaries instead.
+    """
+    return [sentence for sentence in SENTENCE_END.split(text.strip()) if sentence]
+
+
+def plan_segments(transcript: str, max_tokens: int) -> List[str]:
+    """
+    Pack sentences greedily into segments of at most `max_tokens`
+
+    Packing runs front to back, so each segment depends only on the text
+    before its end: editing the tail of a transcript leaves every earlier
+    segment byte-identical, which lets cached segment results be reused.
+
+    Args:
+        transcript: The full speech text
+        max_tokens: Token budget per segment
+
+    Returns:
+        List of segment texts in order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    segments = []
+    current = ""
+    for sentence in split_sentences(transcript):
+        for piece in _cut_long_sentence(sentence, max_chars):
+            if current and len(current) + 1 + len(piece) > max_chars:
+                segments.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _cut_long_sentence(sentence: str, max_chars: int) -> List[str]:
+    if len(sentence) <= max_chars:
+        return [sentence]
+    pieces = []
+    current = ""
+    for word in sentence.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def reduce_segment_feedback(segment_feedback: List[Dict], segment_word_counts: List[int]) -> Dict:
+    """
+    Combine per-segment feedback into one feedback object
+
+    Scores are averaged weighted by segment length, strengths and
+    improvements are interleaved across segments (deduplicated, at most 4),
+    summaries are joined in order and the tip comes from the weakest segment.
+
+    Args:
+        segment_feedback: Parsed feedback for each segment, in order
+        segment_word_counts: Word count of each segment, aligned with feedback
+
+    Returns:
+        Feedback dictionary with the same fields as a single-prompt analysis
+    """
+    weights = [max(1, count) for count in segment_word_counts]
+    total_weight = sum(weights)
+
+    reduced = {}
+    for field in SCORE_FIELDS:
+        reduced[field] = int(round(
+            sum(feedback[field] * weight for feedback, weight in zip(segment_feedback, weights)) / total_weight
+        ))
+    reduced["overall_score"] = round(
+        sum(feedback["overall_score"] * weight for feedback, weight in zip(segment_feedback, weights)) / total_weight,
+        1
+    )
+
+    reduced["summary"] = " ".join(feedback["summary"].strip() for feedback in segment_feedback)
+    weakest = min(segment_feedback, key=lambda feedback: feedback["overall_score"])
+    reduced["tip"] = weakest["tip"]
+    reduced["strengths"] = _interleave_unique([feedback["strengths"] for feedback in segment_feedback], limit=4)
+    reduced["improvements"] = _interleave_unique([feedback["improvements"] for feedback in segment_feedback], limit=4)
+    return reduced
+
+
+def apply_delivery_metrics(feedback: Dict, pace: Optional[int], audio_metrics: Optional[Dict] = None) -> Dict:
+    """
+    Judge the whole speech's delivery on reduced segment feedback
+
+    Segment prompts only see their own text, so pace and acoustic measurements
+    are applied here: a pace outside PACE_RANGE costs clarity and confidence,
+    frequent long pauses cost confidence and monotone pitch costs engagement,
+    each with an improvement saying so (listed first).
+
+    Args:
+        feedback: Output of reduce_segment_feedback
+        pace: Words per minute over the whole speech (None if the duration is unknown)
+        audio_metrics: Acoustic metrics of the recording, if it was analyzed
+
+    Returns:
+        New feedback dictionary with adjusted scores and improvements
+    """
+    penalties = dict.fromkeys(SCORE_FIELDS, 0.0)
+    notes = []
+    if pace is not None:
+        pace_off = max(0, PACE_RANGE[0] - pace, pace - PACE_RANGE[1])
+        if pace_off:
+            penalties["clarityScore"] += min(20.0, pace_off * 0.4)
+            penalties["confidenceScore"] += min(10.0, pace_off * 0.2)
+            notes.append(f"Slow down: at {pace} WPM your audience may struggle to keep up" if pace > PACE_RANGE[1]
+                         else f"Pick up the pace: at {pace} WPM attention may drift")
+    if audio_metrics:
+        long_pauses = audio_metrics.get("longPauseCount") or 0
+        if long_pauses >= LONG_PAUSES_NOTED:
+            penalties["confidenceScore"] += min(10.0, long_pauses * 2.0)
+            notes.append(f"Shorten your pauses: {long_pauses} were long, the longest "
+                         f"{audio_metrics.get('longestPauseSeconds')}s")
+        variability = audio_metrics.get("pitchVariabilitySemitones")
+        if variability is not None and variability < MONOTONE_SEMITONES:
+            penalties["engagementScore"] += 8.0
+            notes.append("Vary your pitch to sound less monotone")
+    if not notes:
+        return feedback
+
+    adjusted = dict(feedback)
+    for field, penalty in penalties.items():
+        adjusted[field] = max(0, int(round(feedback[field] - penalty)))
+    adjusted["overall_score"] = round(
+        max(0.0, feedback["overall_score"] - sum(penalties.values()) / (10.0 * len(SCORE_FIELDS))), 1
+    )
+    adjusted["improvements"] = _interleave_unique([notes + feedback["improvements"]], limit=4)
+    return adjusted
+
+
+def _interleave_unique(lists: List[List[str]], limit: int) -> List[str]:
+    """Take items round-robin from each list, skipping case-insensitive duplicates"""
+    result = []
+    seen = set()
+    for position in range(max((len(items) for items in lists), default=0)):
+        for items in lists:
+            if position < len(items):
+                key = items[position].strip().lower()
+                if key not in seen:
+                    seen.add(key)
+                    result.append(items[position])
+                    if len(result) == limit:
+                        return result
+    return result
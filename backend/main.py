@@ -4,30 +4,132 @@ Podium Pal Backend - FastAPI Application
 A stateless API that analyzes speech transcripts and audio for comprehensive feedback.
 """
 
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Body, Request
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Body, Request, Query, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 import os
 from dotenv import load_dotenv
-import shutil
 from pathlib import Path
 from datetime import datetime
 import json
 import re
-import google.generativeai as genai
 import uuid
+import sys
+import asyncio
+import threading
+import logging
+from llm_executor import LLMExecutor, LLMTimeoutError
+from llm_resilience import (
+    CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, CircuitOpenError, ResilientLLMClient
+)
+from caching import FeedbackCache, LRUCache
+from coalescing import SingleFlight
+from admission import (
+    PRIORITIES, PRIORITY_BACKGROUND, PRIORITY_BATCH, PRIORITY_INTERACTIVE, AdmissionController,
+    AdmissionRejectedError, ClientRateLimiter
+)
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import hashlib
+from filler_detection import DEFAULT_FILLER_LEXICON, FillerMatcher, FillerOccurrence
+from live_session import LiveAlertPolicy, LiveTranscript, TranscriptTooLargeError
+from local_scoring import SCORE_KEYS, LocalScorer, score_deviation
+from gemini_models import GeminiModelPool
+from prompts import PERSONALITY_STYLES, PromptTemplates, split_for_system_instruction
+from session_index import SessionIndex
+from session_store import session_store_from_env
+from session_transfer import (
+    NDJSON_MEDIA_TYPE, ImportSummary, export_stream, import_stream, iter_sessions_in_range, parse_field_list,
+    save_imported
+)
+from worker_coordination import CrossProcessSemaphore, FileLock, SharedGeneration
+from progress import MAX_DAYS, MAX_WEEKS, ProgressRollups
+from search_index import SearchIndex
+from jobs import JOB_QUEUED, JOB_RUNNING, JobManager, JobQueueFullError
+from streaming_json import IncrementalJSONObjectParser
+from long_transcripts import apply_delivery_metrics, estimate_tokens, plan_segments, reduce_segment_feedback
+from acoustics import LONG_PAUSE_SECONDS, AcousticAnalyzer, articulation_rate
+from audio_ingest import (
+    HashingAudioWriter, InvalidUploadError, UploadTooLargeError, audio_extension, read_multipart_upload
+)
+from observability import MetricsRegistry, RequestLatencyMiddleware, configure_logging
 
 # Load environment variables
 load_dotenv()
 
+# Logging goes through a queue drained by a background thread, so request
+# handlers never block on log output (LOG_FORMAT=json for JSON lines)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+configure_logging(LOG_LEVEL, json_lines=LOG_FORMAT.lower() == "json")
+logger = logging.getLogger(__name__)
+
 # Create directory for storing audio files
 AUDIO_STORAGE_DIR = Path("audio_recordings")
 AUDIO_STORAGE_DIR.mkdir(exist_ok=True)
 
-# Create directory for storing feedback sessions
-FEEDBACK_STORAGE_DIR = Path("feedback_sessions")
-FEEDBACK_STORAGE_DIR.mkdir(exist_ok=True)
+# Uploads are stored by content hash under AUDIO_STORAGE_DIR/<2 hex>/<sha256>.<ext>;
+# larger or longer recordings are rejected with 413
+AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", str(50 * 1024 * 1024)))
+AUDIO_MAX_DURATION_SECONDS = float(os.getenv("AUDIO_MAX_DURATION_SECONDS", "1800"))
+
+# WAV uploads get acoustic analysis (pauses, speaking time, pitch) in a process pool
+AUDIO_ANALYSIS_WORKERS = int(os.getenv("AUDIO_ANALYSIS_WORKERS", "2"))
+AUDIO_ANALYSIS_TIMEOUT_SECONDS = float(os.getenv("AUDIO_ANALYSIS_TIMEOUT_SECONDS", "60"))
+acoustic_analyzer = AcousticAnalyzer(workers=AUDIO_ANALYSIS_WORKERS, timeout=AUDIO_ANALYSIS_TIMEOUT_SECONDS)
+
+# Full session records (see session_store.py). SESSION_STORE picks the backend:
+# "fs" (sharded files under SESSION_STORE_PATH, default feedback_sessions),
+# "sqlite" (one database file) or "memory"; SESSION_CODEC the encoding: "json",
+# "gzip" or "zstd". Flat files from older versions are still read; migrate them
+# with: python session_store.py migrate
+session_store = session_store_from_env()
+
+# Index of session metadata used by /recordings (rebuild: python session_index.py rebuild)
+SESSION_INDEX_DB = Path(os.getenv("SESSION_INDEX_DB", "sessions.db"))
+session_index = SessionIndex(SESSION_INDEX_DB)
+# Per-user progress aggregates for /progress, kept in the same database (rebuild: python progress.py rebuild)
+progress_rollups = ProgressRollups(SESSION_INDEX_DB)
+# Full-text index for /search, also in the same database (rebuild: python search_index.py rebuild)
+# SEARCH_MAX_RANKED_MATCHES caps the matches one query ranks, newest first (0 = no cap)
+SEARCH_MAX_RANKED_MATCHES = int(os.getenv("SEARCH_MAX_RANKED_MATCHES", "1000"))
+search_index = SearchIndex(SESSION_INDEX_DB, max_ranked_matches=SEARCH_MAX_RANKED_MATCHES)
+
+# Transcripts estimated above LLM_TRANSCRIPT_TOKEN_BUDGET tokens are split into
+# segments of about LLM_SEGMENT_TOKENS, analyzed in parallel and reduced
+LLM_TRANSCRIPT_TOKEN_BUDGET = int(os.getenv("LLM_TRANSCRIPT_TOKEN_BUDGET", "6000"))
+LLM_SEGMENT_TOKENS = int(os.getenv("LLM_SEGMENT_TOKENS", "3000"))
+
+# Batch analysis: items per request, concurrent LLM calls per batch and deadline per item
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+BATCH_ITEM_TIMEOUT_SECONDS = float(os.getenv("BATCH_ITEM_TIMEOUT_SECONDS", "60"))
+
+# Sessions /import writes per batch (one store write and index transaction each)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+# Identical /analyze requests arriving while one is in flight share its result,
+# including its sessionId, so a double submit writes one session. Identical LLM
+# requests are always coalesced; this only controls sharing whole sessions.
+COALESCE_SESSIONS = os.getenv("COALESCE_SESSIONS", "true").strip().lower() in ("1", "true", "yes")
+analysis_flights = SingleFlight()
+llm_flights = SingleFlight()
+
+# Background job mode for /analyze (?mode=async): inputs persist here until analyzed
+JOB_STORAGE_DIR = Path(os.getenv("JOB_STORAGE_DIR", "analysis_jobs"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "1000"))
+# Finished jobs are deleted this long after they completed (0 = kept forever)
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "604800"))
+
+# Multi-worker serving: WEB_CONCURRENCY server processes (uvicorn and gunicorn
+# both read it) share the storage, the session indexes, the LLM cache database
+# and GEMINI_GLOBAL_MAX_CONCURRENCY Gemini slots, coordinated through lock files
+# in WORKER_LOCK_DIR. Everything else (memory caches, metrics) is per process.
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+WORKER_LOCK_DIR = Path(os.getenv("WORKER_LOCK_DIR", "worker_locks"))
 
 # Configure Gemini AI
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -44,11 +146,177 @@ def _is_valid_api_key(key: str) -> bool:
     return True
 
 if GEMINI_API_KEY and _is_valid_api_key(GEMINI_API_KEY):
-    genai.configure(api_key=GEMINI_API_KEY)
-    print("✓ Gemini AI configured successfully")
+    logger.info("Gemini AI configured successfully")
 else:
-    print("⚠ Warning: GEMINI_API_KEY not found or looks invalid in environment variables")
-    print("  LLM feedback will use placeholder responses")
+    logger.warning("GEMINI_API_KEY not found or looks invalid in environment variables; "
+                   "LLM feedback will use placeholder responses")
+
+# Gemini calls are blocking, so they run in a dedicated executor with a cap on
+# concurrent calls and a deadline per call
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+llm_executor = LLMExecutor(max_concurrency=GEMINI_MAX_CONCURRENCY, timeout=GEMINI_TIMEOUT_SECONDS)
+
+# Each feedback request gets GEMINI_DEADLINE_SECONDS overall, split over up to
+# GEMINI_MAX_ATTEMPTS attempts (transient errors and malformed JSON are retried
+# with jittered backoff). GEMINI_HEDGE_PERCENTILE > 0 starts a second attempt
+# when the first is slower than that percentile of recent calls. After
+# GEMINI_BREAKER_FAILURES failures in a row, calls fail fast to the fallback
+# feedback for GEMINI_BREAKER_RESET_SECONDS.
+GEMINI_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", "45"))
+GEMINI_MAX_ATTEMPTS = int(os.getenv("GEMINI_MAX_ATTEMPTS", "3"))
+GEMINI_HEDGE_PERCENTILE = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "0"))
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+llm_client = ResilientLLMClient(
+    llm_executor,
+    CircuitBreaker(failure_threshold=GEMINI_BREAKER_FAILURES, reset_seconds=GEMINI_BREAKER_RESET_SECONDS),
+    deadline=GEMINI_DEADLINE_SECONDS,
+    attempt_timeout=GEMINI_TIMEOUT_SECONDS,
+    max_attempts=GEMINI_MAX_ATTEMPTS,
+    hedge_percentile=GEMINI_HEDGE_PERCENTILE
+)
+
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+
+# The Gemini SDK is imported on first use or by the warm-up started at startup
+# (see /ready), and its model objects are reused by every request. Prompts are
+# compiled once per personality.
+gemini_models = GeminiModelPool(
+    GEMINI_MODEL_NAME, api_key=GEMINI_API_KEY if GEMINI_API_KEY and _is_valid_api_key(GEMINI_API_KEY) else None
+)
+prompt_templates = PromptTemplates()
+# Set once the Gemini SDK and models are loaded (immediately without an API key)
+gemini_ready = asyncio.Event()
+gemini_warm_up: Dict[str, Any] = {"seconds": None, "error": None}
+
+# Cap on concurrent Gemini calls across all worker processes (0 = only the
+# per-process GEMINI_MAX_CONCURRENCY); defaults to that cap when there are several workers
+GEMINI_GLOBAL_MAX_CONCURRENCY = int(os.getenv(
+    "GEMINI_GLOBAL_MAX_CONCURRENCY", str(GEMINI_MAX_CONCURRENCY if WEB_CONCURRENCY > 1 else 0)
+))
+global_llm_slots = CrossProcessSemaphore(WORKER_LOCK_DIR, GEMINI_GLOBAL_MAX_CONCURRENCY, name="gemini")
+
+# Admission control. Each client (X-Client-Id header, else its address) may
+# submit CLIENT_RATE_PER_MINUTE analyses per minute with bursts of CLIENT_BURST
+# (0 = no limit). Gemini work then takes one of ADMISSION_MAX_CONCURRENT slots,
+# interactive requests first, then batch items, then queued jobs; with
+# ADMISSION_MAX_QUEUE requests already waiting, new ones get a 429.
+CLIENT_RATE_PER_MINUTE = float(os.getenv("CLIENT_RATE_PER_MINUTE", "30"))
+CLIENT_BURST = float(os.getenv("CLIENT_BURST", "10"))
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", str(GEMINI_MAX_CONCURRENCY)))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "100"))
+# Connections are spread evenly over the workers, so each one enforces its
+# share of the sustained rate (bursts are still allowed per worker)
+client_rate_limiter = ClientRateLimiter(CLIENT_RATE_PER_MINUTE / WEB_CONCURRENCY, CLIENT_BURST)
+llm_admission = AdmissionController(ADMISSION_MAX_CONCURRENT, ADMISSION_MAX_QUEUE)
+# /export and /import have their own budget, so bulk transfers and analyses
+# never use up each other's tokens
+TRANSFER_RATE_PER_MINUTE = float(os.getenv("TRANSFER_RATE_PER_MINUTE", "6"))
+TRANSFER_BURST = float(os.getenv("TRANSFER_BURST", "2"))
+transfer_rate_limiter = ClientRateLimiter(TRANSFER_RATE_PER_MINUTE / WEB_CONCURRENCY, TRANSFER_BURST)
+# Priority class of the LLM work started from the current task
+llm_priority: ContextVar[str] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+# Cache LLM feedback by a hash of the prompt inputs so repeat analyses skip Gemini.
+# Set LLM_CACHE_DB to a file path to keep cached feedback across restarts; with
+# several workers it defaults to llm_cache.db so every worker shares the results.
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "llm_cache.db" if WEB_CONCURRENCY > 1 else "")
+feedback_cache = FeedbackCache(
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=LLM_CACHE_TTL_SECONDS or None,
+    db_path=Path(LLM_CACHE_DB) if LLM_CACHE_DB else None
+)
+
+# /feedback serves sessions from an in-process cache of pre-serialized JSON
+# bodies, bounded by total size. Sessions only change when /import replaces
+# them; it bumps a generation shared by every worker, which then drop their
+# cached bodies.
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "5000"))
+SESSION_CACHE_MAX_BYTES = int(os.getenv("SESSION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+session_cache = LRUCache(max_entries=SESSION_CACHE_MAX_ENTRIES, max_bytes=SESSION_CACHE_MAX_BYTES)
+session_cache_generation = SharedGeneration(WORKER_LOCK_DIR / "session_cache.generation")
+
+# Filler lexicon (comma-separated, multi-word phrases allowed), compiled once at startup
+FILLER_LEXICON = os.getenv("FILLER_LEXICON", "")
+filler_matcher = FillerMatcher(
+    [phrase.strip() for phrase in FILLER_LEXICON.split(",")] if FILLER_LEXICON.strip() else DEFAULT_FILLER_LEXICON
+)
+
+# Heuristic scores: provisional results, fallback scores and a sanity check on
+# Gemini's scores, which are logged when any dimension differs by more than this
+local_scorer = LocalScorer(filler_matcher)
+LOCAL_SCORE_MAX_DEVIATION = int(os.getenv("LOCAL_SCORE_MAX_DEVIATION", "35"))
+
+# Live coaching (/ws/live): pace and filler alerts over a sliding window
+live_alert_policy = LiveAlertPolicy(
+    window_seconds=float(os.getenv("LIVE_WINDOW_SECONDS", "15")),
+    min_wpm=int(os.getenv("LIVE_MIN_WPM", "110")),
+    max_wpm=int(os.getenv("LIVE_MAX_WPM", "180")),
+    filler_alert_count=int(os.getenv("LIVE_FILLER_ALERT_COUNT", "3"))
+)
+# Longest transcript delta per message and longest transcript per live session,
+# in characters (0 = no limit); larger ones close the socket with code 1009
+LIVE_MAX_DELTA_CHARS = int(os.getenv("LIVE_MAX_DELTA_CHARS", "10000"))
+LIVE_MAX_TRANSCRIPT_CHARS = int(os.getenv("LIVE_MAX_TRANSCRIPT_CHARS", "200000"))
+
+# Metrics exposed at /metrics. Stages: request_parse, audio_write, audio_analysis,
+# metrics, prompt_build, gemini_call, json_parse, session_persist
+metrics_registry = MetricsRegistry()
+STAGE_SECONDS = metrics_registry.histogram(
+    "podium_stage_duration_seconds", "Time spent in each analysis stage", ["stage"]
+)
+HTTP_REQUEST_SECONDS = metrics_registry.histogram(
+    "podium_http_request_duration_seconds", "HTTP request duration by route", ["method", "route", "status"]
+)
+LLM_CALLS = metrics_registry.counter(
+    "podium_llm_calls_total", "Gemini calls by kind (full, segment, stream) and outcome", ["kind", "outcome"]
+)
+LLM_FALLBACKS = metrics_registry.counter(
+    "podium_llm_fallback_total", "Analyses answered with fallback feedback, by reason", ["reason"]
+)
+LLM_SCORE_CHECKS = metrics_registry.counter(
+    "podium_llm_score_checks_total", "Gemini scores compared with local heuristic scores, by outcome", ["outcome"]
+)
+COALESCED_REQUESTS = metrics_registry.counter(
+    "podium_coalesced_requests_total",
+    "Requests that joined an identical in-flight computation instead of starting their own", ["scope"]
+)
+ADMISSION_WAIT_SECONDS = metrics_registry.histogram(
+    "podium_admission_wait_seconds", "Time LLM work waited in the admission queue", ["priority"]
+)
+ADMISSION_REJECTED = metrics_registry.counter(
+    "podium_admission_rejected_total", "Requests refused with 429, by reason and priority", ["reason", "priority"]
+)
+ADMISSION_SLOTS = metrics_registry.gauge(
+    "podium_admission_slots", "LLM admission slots in use and callers waiting, by priority", ["state", "priority"]
+)
+LLM_PARSE_FAILURES = metrics_registry.counter(
+    "podium_llm_parse_failures_total", "Gemini responses that were not valid feedback JSON"
+)
+LLM_EXECUTOR_CALLS = metrics_registry.gauge(
+    "podium_llm_executor_calls", "Gemini calls currently in the executor", ["state"]
+)
+LLM_CLIENT_EVENTS = metrics_registry.gauge(
+    "podium_llm_client_events", "Gemini retries, hedges and circuit breaker rejections since start", ["event"]
+)
+LLM_CIRCUIT_STATE = metrics_registry.gauge(
+    "podium_llm_circuit_state", "1 for the current Gemini circuit breaker state", ["state"]
+)
+LLM_CACHE_LOOKUPS = metrics_registry.gauge(
+    "podium_llm_cache_lookups", "LLM feedback cache lookups since start", ["result"]
+)
+SESSION_CACHE_BYTES = metrics_registry.gauge(
+    "podium_session_cache_bytes", "Bytes held by the /feedback session cache"
+)
+SESSIONS_TRANSFERRED = metrics_registry.counter(
+    "podium_sessions_transferred_total", "Sessions written by /import, and read by /export", ["direction"]
+)
+ANALYSIS_JOBS = metrics_registry.gauge(
+    "podium_analysis_jobs", "Background analysis jobs by status", ["status"]
+)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -68,6 +336,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestLatencyMiddleware, histogram=HTTP_REQUEST_SECONDS)
 
 # ========================================
 # Pydantic Models (API Contract)
@@ -87,6 +356,21 @@ class AnalyzeRequest(BaseModel):
         }
 
 
+class BatchAnalyzeItem(BaseModel):
+    """One speech in a /analyze/batch request"""
+    id: Optional[str] = Field(None, description="Client reference echoed back in the result line")
+    transcript: str = Field(..., min_length=1, description="The speech transcript to analyze")
+    userGoal: str = Field(..., min_length=1, description="The user's intended message or goal")
+    duration: int = Field(0, ge=0, description="Recording duration in seconds")
+    aiPersonality: str = Field("supportive", description="The feedback style")
+    userId: Optional[str] = Field(None, description="User the session belongs to, for /progress")
+
+
+class BatchAnalyzeRequest(BaseModel):
+    """Request model for the /analyze/batch endpoint"""
+    items: List[BatchAnalyzeItem] = Field(..., min_length=1, description="Speeches to analyze")
+
+
 class AnalyzeResponse(BaseModel):
     """Response model for the /analyze endpoint"""
     sessionId: str = Field(..., description="Unique session identifier")
@@ -101,6 +385,12 @@ class AnalyzeResponse(BaseModel):
     constructiveTip: str = Field(..., description="Constructive feedback for improvement")
     strengths: list[str] = Field(..., description="List of key strengths in the speech")
     improvements: list[str] = Field(..., description="List of specific areas to improve")
+    audioMetrics: Optional[Dict[str, Any]] = Field(
+        None, description="Acoustic delivery metrics (pauses, speaking time, pitch), present for WAV recordings"
+    )
+    localScores: Optional[Dict[str, Any]] = Field(
+        None, description="Heuristic scores computed locally from the transcript, for comparison with the AI scores"
+    )
 
     class Config:
         json_schema_extra = {
@@ -135,11 +425,202 @@ async def root():
         "message": "Welcome to Podium Pal API",
         "status": "operational",
         "endpoints": {
-            "analyze": "/analyze (POST)"
+            "analyze": "/analyze (POST)",
+            "analyzeStream": "/analyze/stream (POST, SSE)",
+            "analyzeBatch": "/analyze/batch (POST, NDJSON)",
+            "live": "/ws/live (WebSocket)",
+            "health": "/health (GET)",
+            "ready": "/ready (GET, 503 until warmed up)",
+            "metrics": "/metrics (GET, Prometheus text format)",
+            "progress": "/progress (GET)",
+            "search": "/search?q=... (GET)",
+            "export": "/export (GET, NDJSON)",
+            "import": "/import (POST, NDJSON)",
+            "jobs": "/jobs/{job_id} (GET), /jobs/{job_id}/events (GET, SSE)"
         }
     }
 
 
+@app.get("/health")
+async def health():
+    """Health check with LLM executor queue depth"""
+    return {
+        "status": "operational",
+        "llm": llm_executor.stats(),
+        "llmClient": llm_client.stats(),
+        "llmCache": feedback_cache.stats(),
+        "geminiModels": gemini_models.stats(),
+        "sessionCache": {"entries": len(session_cache), "bytes": session_cache.size_bytes},
+        "sessionStore": session_store.stats(),
+        "coalescing": {"analysis": analysis_flights.stats(), "llm": llm_flights.stats()},
+        "admission": {**llm_admission.stats(), "clients": client_rate_limiter.stats(),
+                      "transferClients": transfer_rate_limiter.stats()},
+        "jobs": job_manager.stats(),
+        "worker": {"pid": os.getpid(), "workers": WEB_CONCURRENCY, "globalLlmSlots": global_llm_slots.stats()}
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until startup work, including the Gemini warm-up, has finished"""
+    body = {
+        "ready": gemini_ready.is_set(),
+        "gemini": {**gemini_models.stats(), "warmUpSeconds": gemini_warm_up["seconds"],
+                   "warmUpError": gemini_warm_up["error"]},
+        "promptTemplates": len(prompt_templates),
+    }
+    return JSONResponse(content=body, status_code=200 if body["ready"] else 503)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics: stage and request latency histograms, LLM outcome counters and queue gauges"""
+    llm_stats = llm_executor.stats()
+    LLM_EXECUTOR_CALLS.set(llm_stats["running"], state="running")
+    LLM_EXECUTOR_CALLS.set(llm_stats["queued"], state="queued")
+    client_stats = llm_client.stats()
+    for event in ("retries", "retriesMalformed", "hedges", "hedgeWins", "deadlineExceeded", "rejected"):
+        LLM_CLIENT_EVENTS.set(client_stats[event], event=event)
+    for state in (CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN):
+        LLM_CIRCUIT_STATE.set(1 if client_stats["circuit"] == state else 0, state=state)
+    admission_stats = llm_admission.stats()
+    ADMISSION_SLOTS.set(admission_stats["running"], state="running", priority="all")
+    for priority in PRIORITIES:
+        ADMISSION_SLOTS.set(admission_stats["queued"][priority], state="queued", priority=priority)
+    cache_stats = feedback_cache.stats()
+    LLM_CACHE_LOOKUPS.set(cache_stats["hits"], result="hit")
+    LLM_CACHE_LOOKUPS.set(cache_stats["misses"], result="miss")
+    SESSION_CACHE_BYTES.set(session_cache.size_bytes)
+    job_stats = job_manager.stats()
+    ANALYSIS_JOBS.set(job_stats[JOB_QUEUED], status=JOB_QUEUED)
+    ANALYSIS_JOBS.set(job_stats[JOB_RUNNING], status=JOB_RUNNING)
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.on_event("startup")
+async def sync_session_index():
+    """Rebuild the session index, progress rollups or search index if out of step with the session store"""
+    # Workers start together; the first rebuilds while the rest wait, then find nothing to do
+    with FileLock(WORKER_LOCK_DIR / "startup.lock"):
+        _sync_session_index()
+
+
+def _sync_session_index():
+    stored = session_store.count()
+    if session_index.count() != stored:
+        logger.info("Rebuilding session index", extra={"stored_sessions": stored})
+        indexed = session_index.rebuild(session_store.iter_sessions())
+        logger.info("Session index rebuilt", extra={"sessions": indexed})
+    if progress_rollups.count() != stored:
+        logger.info("Rebuilding progress rollups", extra={"stored_sessions": stored})
+        counted = progress_rollups.rebuild(session_store.iter_sessions())
+        logger.info("Progress rollups rebuilt", extra={"sessions": counted})
+    if search_index.count() != stored:
+        logger.info("Rebuilding search index", extra={"stored_sessions": stored})
+        indexed = search_index.rebuild(session_store.iter_sessions())
+        logger.info("Search index rebuilt", extra={"sessions": indexed})
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    """Start analysis job workers, re-queuing jobs interrupted by a restart"""
+    recovered = await job_manager.start()
+    if recovered:
+        logger.info("Recovered unfinished analysis jobs", extra={"jobs": recovered})
+
+
+@app.on_event("startup")
+async def start_gemini_warm_up():
+    """Import the Gemini SDK and create the shared models in the background so startup does not wait on them"""
+    if gemini_models.api_key is None:
+        gemini_ready.set()
+        return
+    asyncio.ensure_future(_warm_up_gemini())
+
+
+async def _warm_up_gemini():
+    system_instructions = [prompt_templates.get(name).feedback_system_instruction for name in PERSONALITY_STYLES]
+    try:
+        gemini_warm_up["seconds"] = round(
+            await asyncio.to_thread(gemini_models.warm_up, system_instructions), 3
+        )
+        logger.info("Gemini models ready", extra={"seconds": gemini_warm_up["seconds"]})
+    except Exception as e:
+        # Requests will load the SDK themselves and surface the error
+        gemini_warm_up["error"] = str(e)
+        logger.warning("Gemini warm-up failed", extra={"error": str(e)})
+    finally:
+        gemini_ready.set()
+
+
+@app.on_event("shutdown")
+async def shutdown_llm_executor():
+    """Stop job workers and cancel queued Gemini calls when the server stops"""
+    await job_manager.stop()
+    llm_executor.shutdown()
+    acoustic_analyzer.shutdown()
+    feedback_cache.close()
+    session_store.close()
+    session_index.close()
+    progress_rollups.close()
+    search_index.close()
+
+
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected(request: Request, exc: AdmissionRejectedError):
+    """Work refused by admission control is a 429 telling the client when to retry"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "reason": exc.reason, "retryAfter": int(exc.retry_after_header)},
+        headers={"Retry-After": exc.retry_after_header}
+    )
+
+
+def client_key(headers, client) -> str:
+    """Identity used for per-client rate limits: X-Client-Id header, else the client address"""
+    return headers.get("x-client-id") or (client.host if client else "unknown")
+
+
+def admit_client(key: str, cost: float = 1, priority: str = PRIORITY_INTERACTIVE,
+                 limiter: Optional[ClientRateLimiter] = None):
+    """
+    Charge a client's token bucket for new analysis (or, with `limiter`, bulk transfer) work
+
+    Args:
+        limiter: Bucket to charge instead of the analysis one (e.g. transfer_rate_limiter)
+
+    Raises:
+        AdmissionRejectedError: If the client is over its rate
+    """
+    try:
+        (limiter or client_rate_limiter).check(key, cost)
+    except AdmissionRejectedError as e:
+        ADMISSION_REJECTED.inc(reason=e.reason, priority=priority)
+        logger.warning("Client rate limited", extra={"client": key, "retry_after": round(e.retry_after, 1)})
+        raise
+
+
+@asynccontextmanager
+async def llm_slot():
+    """
+    Hold an LLM admission slot, at the current task's priority, around Gemini work
+
+    Raises:
+        AdmissionRejectedError: If the wait queue is full or the wait was shed
+    """
+    priority = llm_priority.get()
+    try:
+        async with llm_admission.slot(priority) as waited:
+            # Then one of the slots shared by all worker processes, if configured
+            async with global_llm_slots.slot() as global_waited:
+                ADMISSION_WAIT_SECONDS.observe(waited + global_waited, priority=priority)
+                yield
+    except AdmissionRejectedError as e:
+        ADMISSION_REJECTED.inc(reason=e.reason, priority=priority)
+        logger.warning("LLM work refused by admission control", extra={"reason": e.reason, "priority": priority})
+        raise
+
+
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_speech(request: Request):
     """
@@ -149,458 +630,1520 @@ async def analyze_speech(request: Request):
         transcript: The speech text (form field)
         userGoal: The user's intended message (form field)
         duration: Recording duration in seconds (form field)
+        userId: Optional user the session belongs to, for /progress (form field)
         audio: Optional audio file of the speech (multipart/form-data)
         
     Returns:
-        AnalyzeResponse with sessionId, pace, filler words, AI summary, clarity score, and tip
+        AnalyzeResponse with sessionId, pace, filler words, AI summary, clarity score, and tip.
+        A request identical to one still in flight (same normalized transcript,
+        goal, personality, duration, user and audio) gets that request's response,
+        sessionId included, unless COALESCE_SESSIONS is off.
+        In job mode (?mode=async or 'Prefer: respond-async') the analysis is queued
+        instead and a 202 with the sessionId, job status URLs and provisional
+        locally computed feedback is returned at once.
+        A 429 with Retry-After if the client is over its rate or the server is
+        too busy to queue the Gemini call.
     """
+    admit_client(client_key(request.headers, request.client))
     try:
         # Generate unique session ID
         session_id = str(uuid.uuid4())
 
-        # Detect request content-type and parse accordingly
-        content_type = request.headers.get('content-type', '')
-        transcript = None
-        userGoal = None
-        duration = 0
-        audio_path = None
+        transcript, userGoal, duration, aiPersonality, audio_path, user_id = await read_analyze_request(request)
 
-        if 'application/json' in content_type:
-            print('-> Received JSON analyze request')
-            body = await request.json()
-            transcript = body.get('transcript')
-            userGoal = body.get('userGoal') or body.get('user_goal')
-            aiPersonality = body.get('aiPersonality', 'supportive')
-            duration = int(body.get('duration', 0) or 0)
-        else:
-            # Assume multipart/form-data (form + optional file)
-            print('-> Received multipart/form-data analyze request')
-            form = await request.form()
-            transcript = form.get('transcript')
-            userGoal = form.get('userGoal') or form.get('user_goal')
-            aiPersonality = form.get('aiPersonality', 'supportive')
-            duration = int(form.get('duration', 0) or 0)
-            audio = form.get('audio') if 'audio' in form else None
-            if audio and hasattr(audio, 'filename') and audio.filename:
-                # Save uploaded audio file
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                file_extension = audio.filename.split('.')[-1] if '.' in audio.filename else 'webm'
-                audio_filename = f"recording_{timestamp}.{file_extension}"
-                audio_path = AUDIO_STORAGE_DIR / audio_filename
-                with open(audio_path, 'wb') as buffer:
-                    shutil.copyfileobj(audio.file, buffer)
-                print(f"Audio saved to: {audio_path}")
-
-        print(f"=== Analyze Request Received ===")
-        print(f"Session ID: {session_id}")
-        print(f"Transcript length: {len(transcript) if transcript else 0} chars")
-        print(f"Transcript preview: {(transcript or '')[:100]}...")
-        print(f"UserGoal: {userGoal}")
-        print(f"AI Personality: {aiPersonality}")
-        print(f"Duration: {duration} seconds")
-        # Calculate metrics and request LLM feedback
-        print("-> Calculating metrics...")
-        metrics = calculate_metrics(transcript or '', duration)
-
-        print("-> Requesting LLM feedback...")
-        llm_feedback = get_llm_feedback(transcript or '', userGoal or '', audio_path, duration, aiPersonality)
-        
-        # Combine results into response
-        response = AnalyzeResponse(
-            sessionId=session_id,
-            pace=metrics["pace"],
-            fillerWords=metrics["fillerWords"],
-            aiSummary=llm_feedback["summary"],
-            clarityScore=llm_feedback["clarityScore"],
-            confidenceScore=llm_feedback["confidenceScore"],
-            engagementScore=llm_feedback["engagementScore"],
-            structureScore=llm_feedback["structureScore"],
-            overall_score=llm_feedback["overall_score"],
-            constructiveTip=llm_feedback["tip"],
-            strengths=llm_feedback["strengths"],
-            improvements=llm_feedback["improvements"]
-        )
-        
-        # Save feedback session to file
-        session_data = {
-            "sessionId": session_id,
-            "timestamp": datetime.now().isoformat(),
-            "transcript": transcript,
-            "userGoal": userGoal,
-            "duration": duration,
-            "audioPath": str(audio_path) if audio_path else None,
-            "feedback": response.dict()
-        }
-        
-        session_file = FEEDBACK_STORAGE_DIR / f"{session_id}.json"
-        with open(session_file, "w") as f:
-            json.dump(session_data, f, indent=2)
-        
-        print(f"✓ Session saved: {session_file}")
-        
+        logger.info("Analyze request received", extra={
+            "session_id": session_id,
+            "transcript_chars": len(transcript) if transcript else 0,
+            "user_goal": userGoal,
+            "ai_personality": aiPersonality,
+            "duration": duration
+        })
+        logger.debug("Transcript preview", extra={"session_id": session_id, "preview": (transcript or '')[:100]})
+
+        if _wants_job_mode(request):
+            try:
+                job = job_manager.submit(session_id, {
+                    "transcript": transcript or '',
+                    "userGoal": userGoal or '',
+                    "duration": duration,
+                    "aiPersonality": aiPersonality,
+                    "audioPath": str(audio_path) if audio_path else None,
+                    "userId": user_id
+                })
+            except JobQueueFullError as e:
+                raise HTTPException(status_code=503, detail=str(e))
+            logger.info("Queued analysis job", extra={"session_id": session_id})
+            return JSONResponse(status_code=202, content={
+                **job,
+                "statusUrl": f"/jobs/{session_id}",
+                "eventsUrl": f"/jobs/{session_id}/events",
+                "provisional": local_scorer.feedback(local_scorer.score(transcript or '', duration))
+            })
+
+        if not COALESCE_SESSIONS:
+            return await run_analysis(session_id, transcript or '', userGoal or '', duration, aiPersonality,
+                                      audio_path, user_id=user_id)
+
+        key = FeedbackCache.make_key(transcript or '', userGoal or '', aiPersonality, duration, audio_path is not None,
+                                     GEMINI_MODEL_NAME, scope=f"session:{user_id or ''}:{audio_path or ''}")
+        response, shared = await analysis_flights.do(key, lambda: run_analysis(
+            session_id, transcript or '', userGoal or '', duration, aiPersonality, audio_path, user_id=user_id
+        ))
+        if shared:
+            COALESCED_REQUESTS.inc(scope="analysis")
+            logger.info("Joined in-flight analysis", extra={
+                "session_id": session_id, "shared_session_id": response.sessionId
+            })
         return response
         
+    except (HTTPException, AdmissionRejectedError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+async def read_analyze_request(request: Request) -> Tuple[Optional[str], Optional[str], int, str, Optional[Path], Optional[str]]:
+    """
+    Read analyze inputs from a JSON or multipart/form-data request, saving any audio upload
+    
+    Returns:
+        (transcript, userGoal, duration, aiPersonality, audio_path, userId)
+    """
+    with STAGE_SECONDS.time(stage="request_parse"):
+        return await _read_analyze_request(request)
+
+
+async def _read_analyze_request(request: Request) -> Tuple[Optional[str], Optional[str], int, str, Optional[Path], Optional[str]]:
+    # Detect request content-type and parse accordingly
+    content_type = request.headers.get('content-type', '')
+    transcript = None
+    userGoal = None
+    duration = 0
+    audio_path = None
+    user_id = None
+
+    if 'application/json' in content_type:
+        logger.debug("Received JSON analyze request")
+        body = await request.json()
+        transcript = body.get('transcript')
+        userGoal = body.get('userGoal') or body.get('user_goal')
+        aiPersonality = body.get('aiPersonality', 'supportive')
+        duration = int(body.get('duration', 0) or 0)
+        user_id = body.get('userId')
+    elif 'multipart/form-data' in content_type:
+        # Form + optional audio file; the audio streams straight to disk
+        logger.debug("Received multipart/form-data analyze request")
+        try:
+            form, stored_audio = await read_multipart_upload(
+                request, AUDIO_STORAGE_DIR, AUDIO_MAX_BYTES, AUDIO_MAX_DURATION_SECONDS
+            )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except InvalidUploadError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        transcript = form.get('transcript')
+        userGoal = form.get('userGoal') or form.get('user_goal')
+        aiPersonality = form.get('aiPersonality', 'supportive')
+        duration = int(form.get('duration', 0) or 0)
+        user_id = form.get('userId')
+        if stored_audio is not None:
+            if duration > AUDIO_MAX_DURATION_SECONDS:
+                # Duration was sent after the file, so it could not be checked up front
+                if not stored_audio.deduplicated:
+                    stored_audio.path.unlink(missing_ok=True)
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Recording is longer than {AUDIO_MAX_DURATION_SECONDS:g} seconds"
+                )
+            audio_path = stored_audio.path
+            STAGE_SECONDS.observe(stored_audio.write_seconds, stage="audio_write")
+            logger.info("Audio stored", extra={
+                "path": str(audio_path), "bytes": stored_audio.size, "deduplicated": stored_audio.deduplicated
+            })
+    else:
+        # URL-encoded form without audio
+        logger.debug("Received form analyze request")
+        form = await request.form()
+        transcript = form.get('transcript')
+        userGoal = form.get('userGoal') or form.get('user_goal')
+        aiPersonality = form.get('aiPersonality', 'supportive')
+        duration = int(form.get('duration', 0) or 0)
+        user_id = form.get('userId')
+
+    return transcript, userGoal, duration, aiPersonality, audio_path, user_id or None
+
+
+def _wants_job_mode(request: Request) -> bool:
+    """Job mode is requested with ?mode=async or a 'Prefer: respond-async' header"""
+    if request.query_params.get("mode") == "async":
+        return True
+    return "respond-async" in request.headers.get("prefer", "").lower()
+
+
+async def run_analysis(session_id: str, transcript: str, user_goal: str, duration: int,
+                       ai_personality: str, audio_path: Optional[Path] = None,
+                       live_state: Optional[LiveTranscript] = None,
+                       user_id: Optional[str] = None) -> AnalyzeResponse:
+    """
+    Run the full analysis pipeline for one speech and persist the session
+
+    Args:
+        session_id: Unique session identifier
+        transcript: The speech text
+        user_goal: The user's intended message
+        duration: Recording duration in seconds
+        ai_personality: The feedback style
+        audio_path: Optional path to the saved audio file
+        live_state: Rolling state from a live session; its word and filler
+            counts are used as-is instead of re-scanning the transcript
+        user_id: Optional user the session belongs to
+
+    Returns:
+        AnalyzeResponse for the session
+    """
+    # Analyze the recording, calculate metrics and request LLM feedback
+    audio_metrics = await analyze_audio(audio_path)
+    if live_state is not None:
+        metrics = build_metrics(live_state.word_count, duration, live_state.finish(), audio_metrics)
+    else:
+        metrics = calculate_metrics(transcript, duration, audio_metrics)
+    local_scores = local_scorer.score(transcript, duration, metrics)
+    llm_feedback = await request_llm_feedback(transcript, user_goal, audio_path, duration, ai_personality,
+                                              audio_metrics=metrics.get("audioMetrics"), local_scores=local_scores)
+    
+    return await finalize_analysis(session_id, transcript, user_goal, duration, ai_personality, audio_path,
+                                   metrics, llm_feedback, user_id=user_id, local_scores=local_scores)
+
+
+async def analyze_audio(audio_path: Optional[Path]) -> Optional[Dict]:
+    """
+    Acoustic metrics for a saved recording, computed in the process pool
+
+    Returns:
+        Audio metrics dictionary, or None without audio, for non-WAV formats or on failure
+    """
+    if audio_path is None:
+        return None
+    with STAGE_SECONDS.time(stage="audio_analysis"):
+        return await acoustic_analyzer.analyze(audio_path)
+
+
+async def finalize_analysis(session_id: str, transcript: str, user_goal: str, duration: int, ai_personality: str,
+                            audio_path: Optional[Path], metrics: Dict, llm_feedback: Dict,
+                            user_id: Optional[str] = None, local_scores: Optional[Dict] = None) -> AnalyzeResponse:
+    """
+    Combine metrics and LLM feedback into the response and persist the session
+
+    The save runs in a worker thread: with several workers it may wait for
+    another process's database lock, and must not stall the event loop.
+
+    Returns:
+        AnalyzeResponse for the session
+    """
+    response, session_data = build_session(session_id, transcript, user_goal, duration, ai_personality,
+                                           audio_path, metrics, llm_feedback, user_id=user_id,
+                                           local_scores=local_scores)
+    await asyncio.to_thread(save_session, session_data)
+    return response
+
+
+def build_session(session_id: str, transcript: str, user_goal: str, duration: int, ai_personality: str,
+                  audio_path: Optional[Path], metrics: Dict, llm_feedback: Dict,
+                  user_id: Optional[str] = None, local_scores: Optional[Dict] = None) -> Tuple[AnalyzeResponse, Dict]:
+    """
+    Combine metrics and LLM feedback into the response and the session record to persist
+
+    Args:
+        local_scores: local_scorer.score() result if already computed for this transcript
+
+    Returns:
+        (AnalyzeResponse, session_data)
+    """
+    if local_scores is None:
+        local_scores = local_scorer.score(transcript, duration, metrics)
+    if not llm_feedback.get("fallback"):
+        check_llm_scores(session_id, llm_feedback, local_scores)
+
+    # Combine results into response
+    response = AnalyzeResponse(
+        sessionId=session_id,
+        pace=metrics["pace"],
+        fillerWords=metrics["fillerWords"],
+        aiSummary=llm_feedback["summary"],
+        clarityScore=llm_feedback["clarityScore"],
+        confidenceScore=llm_feedback["confidenceScore"],
+        engagementScore=llm_feedback["engagementScore"],
+        structureScore=llm_feedback["structureScore"],
+        overall_score=llm_feedback["overall_score"],
+        constructiveTip=llm_feedback["tip"],
+        strengths=llm_feedback["strengths"],
+        improvements=llm_feedback["improvements"],
+        audioMetrics=metrics.get("audioMetrics"),
+        localScores={key: local_scores[key] for key in (*SCORE_KEYS, "overall_score")}
+    )
+    
+    # Save feedback session to file
+    session_data = {
+        "sessionId": session_id,
+        "userId": user_id,
+        "timestamp": datetime.now().isoformat(),
+        "transcript": transcript,
+        "userGoal": user_goal,
+        "aiPersonality": ai_personality,
+        "duration": duration,
+        "audioPath": str(audio_path) if audio_path else None,
+        "feedback": response.dict()
+    }
+    
+    return response, session_data
+
+
+def check_llm_scores(session_id: str, llm_feedback: Dict, local_scores: Dict):
+    """
+    Sanity-check Gemini's scores against the local heuristic scores
+
+    The heuristics are rough, so a gap is only logged (and counted) when one
+    dimension differs by more than LOCAL_SCORE_MAX_DEVIATION points; a run of
+    these usually means a prompt or model regression rather than a bad speech.
+    """
+    key, gap = score_deviation(llm_feedback, local_scores)
+    if gap <= LOCAL_SCORE_MAX_DEVIATION:
+        LLM_SCORE_CHECKS.inc(outcome="agree")
+        return
+    LLM_SCORE_CHECKS.inc(outcome="diverge")
+    logger.warning("Gemini score far from local estimate", extra={
+        "session_id": session_id, "score": key, "llm": llm_feedback.get(key), "local": local_scores[key], "gap": gap
+    })
+
+
+async def _run_analysis_job(job_id: str, payload: Dict) -> Dict:
+    """Job handler: run a queued analysis, using the job id as the session id"""
+    llm_priority.set(PRIORITY_BACKGROUND)
+    audio_path = Path(payload["audioPath"]) if payload.get("audioPath") else None
+    response = await run_analysis(job_id, payload["transcript"], payload["userGoal"], payload["duration"],
+                                  payload["aiPersonality"], audio_path, user_id=payload.get("userId"))
+    return response.dict()
+
+
+job_manager = JobManager(JOB_STORAGE_DIR, _run_analysis_job, workers=JOB_WORKERS, max_queue=JOB_MAX_QUEUE,
+                         retention_seconds=JOB_RETENTION_SECONDS)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll the status of a queued analysis (queued, running, done or failed)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """Server-Sent Events stream of job status changes, closed once the job finishes"""
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        async for job in job_manager.events(job_id):
+            yield _sse_event("status", job)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.post("/analyze/stream")
+async def analyze_speech_stream(request: Request):
+    """
+    Analyze a speech and stream the results as Server-Sent Events
+
+    Accepts the same JSON or multipart inputs as /analyze. Events, in order:
+        session - {"sessionId": ...}
+        metrics - local pace, filler counts and audio metrics, sent before any LLM work
+        provisional - locally computed scores, tip, strengths and improvements
+        field   - {"name": ..., "value": ...} for each LLM field as soon as it is complete
+        result  - the final validated AnalyzeResponse, persisted like /analyze
+        error   - {"detail": ...} if the analysis fails ("retryAfter" too if the server was too busy)
+    Provisional and field events are provisional; the result event is authoritative.
+    """
+    admit_client(client_key(request.headers, request.client))
+    try:
+        transcript, userGoal, duration, aiPersonality, audio_path, user_id = await read_analyze_request(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid analyze request: {e}")
+
+    session_id = str(uuid.uuid4())
+    transcript = transcript or ''
+    userGoal = userGoal or ''
+    logger.info("Streaming analyze request received", extra={"session_id": session_id})
+
+    async def event_stream():
+        try:
+            yield _sse_event("session", {"sessionId": session_id})
+
+            metrics = calculate_metrics(transcript, duration, await analyze_audio(audio_path))
+            yield _sse_event("metrics", {"pace": metrics["pace"], "fillerWords": metrics["fillerWords"],
+                                         "audioMetrics": metrics.get("audioMetrics")})
+            local_scores = local_scorer.score(transcript, duration, metrics)
+            yield _sse_event("provisional", local_scorer.feedback(local_scores))
+
+            llm_feedback = None
+            async for kind, payload in stream_llm_feedback(transcript, userGoal, audio_path, duration, aiPersonality,
+                                                           audio_metrics=metrics.get("audioMetrics"),
+                                                           local_scores=local_scores):
+                if kind == "field":
+                    name, value = payload
+                    yield _sse_event("field", {"name": name, "value": value})
+                else:
+                    llm_feedback = payload
+
+            response = await finalize_analysis(session_id, transcript, userGoal, duration, aiPersonality,
+                                               audio_path, metrics, llm_feedback, user_id=user_id,
+                                               local_scores=local_scores)
+            yield _sse_event("result", response.dict())
+        except AdmissionRejectedError as e:
+            yield _sse_event("error", {"detail": str(e), "retryAfter": int(e.retry_after_header)})
+        except Exception as e:
+            logger.error("Streaming analysis failed", extra={"session_id": session_id, "error": str(e)})
+            yield _sse_event("error", {"detail": f"Analysis failed: {e}"})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.websocket("/ws/live")
+async def live_coaching(websocket: WebSocket):
+    """
+    Live coaching while the user speaks, then the normal analysis at the end
+
+    Client messages (JSON text frames unless noted):
+        {"type": "start", "userGoal": ..., "aiPersonality": ..., "audioFormat": "wav", "userId": ...}
+            (optional, first)
+        {"type": "transcript", "text": "...", "t": seconds_since_start}  ("t" optional)
+        binary frames - consecutive bytes of the recording, stored like an upload
+        {"type": "end", "duration": seconds}  ("duration" optional)
+    Server messages:
+        {"type": "metrics", "elapsed", "words", "wpm", "fillerWords"} after every transcript delta
+        {"type": "alert", "kind": "pace_fast" | "pace_slow" | "fillers", "message", ...}
+        {"type": "result", ...AnalyzeResponse} once the session is analyzed and saved
+        {"type": "error", "detail": ...}  (with "retryAfter" when rate limited or the server is busy)
+
+    Audio over AUDIO_MAX_BYTES, a transcript delta over LIVE_MAX_DELTA_CHARS or a
+    transcript over LIVE_MAX_TRANSCRIPT_CHARS ends the session with an error and
+    close code 1009.
+    """
+    await websocket.accept()
+    try:
+        admit_client(client_key(websocket.headers, websocket.client))
+    except AdmissionRejectedError as e:
+        await websocket.send_json({"type": "error", "detail": str(e), "retryAfter": int(e.retry_after_header)})
+        await websocket.close(code=1013)
+        return
+    live = LiveTranscript(filler_matcher, live_alert_policy, max_delta_chars=LIVE_MAX_DELTA_CHARS,
+                          max_chars=LIVE_MAX_TRANSCRIPT_CHARS)
+    user_goal = ''
+    ai_personality = 'supportive'
+    audio_format = None
+    user_id = None
+    audio_writer: Optional[HashingAudioWriter] = None
+    end_message: Dict = {}
+    logger.info("Live session started")
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes") is not None:
+                if audio_writer is None:
+                    audio_writer = HashingAudioWriter(AUDIO_STORAGE_DIR, audio_extension(f".{audio_format or ''}"),
+                                                      AUDIO_MAX_BYTES, AUDIO_MAX_DURATION_SECONDS)
+                await audio_writer.write(message["bytes"])
+                continue
+
+            try:
+                data = json.loads(message.get("text") or "")
+            except json.JSONDecodeError:
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            kind = data.get("type") if isinstance(data, dict) else None
+
+            if kind == "transcript":
+                with STAGE_SECONDS.time(stage="live_update"):
+                    at = data.get("t")
+                    alerts = live.append(str(data.get("text") or ""), float(at) if isinstance(at, (int, float)) else None)
+                    snapshot = live.snapshot()
+                await websocket.send_json({"type": "metrics", **snapshot})
+                for alert in alerts:
+                    await websocket.send_json({"type": "alert", **alert})
+            elif kind == "start":
+                user_goal = data.get("userGoal") or ''
+                ai_personality = data.get("aiPersonality") or 'supportive'
+                audio_format = data.get("audioFormat")
+                user_id = data.get("userId") or None
+            elif kind == "end":
+                end_message = data
+                break
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+
+        audio_path = None
+        if audio_writer is not None:
+            stored_audio = await audio_writer.finish()
+            audio_writer = None
+            audio_path = stored_audio.path
+            STAGE_SECONDS.observe(stored_audio.write_seconds, stage="audio_write")
+
+        duration = int(end_message.get("duration") or round(live.elapsed))
+        session_id = str(uuid.uuid4())
+        logger.info("Live session ended", extra={"session_id": session_id, "words": live.word_count,
+                                                 "duration": duration})
+        response = await run_analysis(session_id, live.text, user_goal, duration, ai_personality, audio_path,
+                                      live_state=live, user_id=user_id)
+        await websocket.send_json({"type": "result", **response.dict()})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Live session disconnected")
+    except (UploadTooLargeError, TranscriptTooLargeError) as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1009)
+    except AdmissionRejectedError as e:
+        await websocket.send_json({"type": "error", "detail": str(e), "retryAfter": int(e.retry_after_header)})
+        await websocket.close(code=1013)
+    except Exception as e:
+        logger.error("Live session failed", extra={"error": str(e)})
+        await websocket.send_json({"type": "error", "detail": f"Analysis failed: {e}"})
+        await websocket.close(code=1011)
+    finally:
+        if audio_writer is not None:
+            await audio_writer.abort()
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/analyze/batch")
+async def analyze_speech_batch(batch: BatchAnalyzeRequest, request: Request):
+    """
+    Analyze many speeches in one request, streaming results as NDJSON
+
+    Metrics for the whole batch are computed up front, then LLM feedback is
+    fanned out with at most BATCH_MAX_CONCURRENCY calls in flight and a
+    deadline per item. One line is written per item in completion order:
+        {"type": "item", "index": i, "id": ..., "status": "done", "llmFallback": false, "result": {...}}
+        {"type": "item", "index": i, "id": ..., "status": "error", "error": "..."}
+    A done line is written only once its session has been persisted; items
+    that finish together are saved in one write. An item whose session could
+    not be saved reports an error instead. A final {"type": "summary", ...}
+    line reports the totals.
+
+    Each item costs one token of the client's rate limit, and its Gemini call
+    waits behind interactive requests; items shed by admission control report
+    an error with "retryAfter".
+    """
+    items = batch.items
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: at most {BATCH_MAX_ITEMS} items")
+    admit_client(client_key(request.headers, request.client), cost=len(items), priority=PRIORITY_BATCH)
+
+    logger.info("Batch analyze request received", extra={"items": len(items)})
+    metrics_list = calculate_metrics_batch([item.transcript for item in items], [item.duration for item in items])
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def analyze_item(index: int) -> Tuple[Dict, Optional[Dict]]:
+        item = items[index]
+        line = {"type": "item", "index": index, "id": item.id}
+        llm_priority.set(PRIORITY_BATCH)
+        try:
+            local_scores = local_scorer.score(item.transcript, item.duration, metrics_list[index])
+            async with semaphore:
+                llm_feedback = await asyncio.wait_for(
+                    request_llm_feedback(item.transcript, item.userGoal, None, item.duration, item.aiPersonality,
+                                         local_scores=local_scores),
+                    timeout=BATCH_ITEM_TIMEOUT_SECONDS
+                )
+            response, session_data = build_session(str(uuid.uuid4()), item.transcript, item.userGoal, item.duration,
+                                                   item.aiPersonality, None, metrics_list[index], llm_feedback,
+                                                   user_id=item.userId, local_scores=local_scores)
+        except asyncio.TimeoutError:
+            return {**line, "status": "error", "error": f"Timed out after {BATCH_ITEM_TIMEOUT_SECONDS}s"}, None
+        except AdmissionRejectedError as e:
+            return {**line, "status": "error", "error": str(e), "retryAfter": int(e.retry_after_header)}, None
+        except Exception as e:
+            logger.error("Batch item failed", extra={"index": index, "error": str(e)})
+            return {**line, "status": "error", "error": str(e)}, None
+        return {**line, "status": "done", "llmFallback": bool(llm_feedback.get("fallback")),
+                "result": response.dict()}, session_data
+
+    async def result_lines():
+        tasks = [asyncio.ensure_future(analyze_item(index)) for index in range(len(items))]
+        pending = set(tasks)
+        succeeded = 0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                results = sorted((task.result() for task in done), key=lambda result: result[0]["index"])
+                sessions = [session_data for _, session_data in results if session_data is not None]
+                if sessions:
+                    # Items that finished together share one write (and one index transaction)
+                    try:
+                        await asyncio.to_thread(save_sessions, sessions)
+                    except Exception as e:
+                        logger.error("Saving batch sessions failed", extra={"sessions": len(sessions), "error": str(e)})
+                        results = [
+                            ({"type": "item", "index": line["index"], "id": line["id"], "status": "error",
+                              "error": f"Could not save session: {e}"}, None)
+                            if session_data is not None else (line, None)
+                            for line, session_data in results
+                        ]
+                for line, session_data in results:
+                    if session_data is not None:
+                        succeeded += 1
+                    yield json.dumps(line) + "\n"
+
+            yield json.dumps({"type": "summary", "total": len(items), "succeeded": succeeded,
+                              "failed": len(items) - succeeded}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+
 @app.get("/feedback/{session_id}")
-async def get_feedback(session_id: str):
-    """Retrieve stored feedback by session id - returns FULL session data"""
+async def get_feedback(session_id: str, request: Request):
+    """
+    Retrieve stored feedback by session id - returns FULL session data
+
+    Responses carry a strong ETag derived from the body; a matching
+    If-None-Match gets a 304. Clients must revalidate, since /import can
+    replace a session.
+    """
     try:
-        print(f"GET /feedback/{session_id} requested")
-        session_file = FEEDBACK_STORAGE_DIR / f"{session_id}.json"
-        if not session_file.exists():
-            print(f"-> Feedback file not found: {session_file}")
-            raise HTTPException(status_code=404, detail="Feedback not found")
+        if session_cache_generation.changed():
+            session_cache.clear()
+        cached = session_cache.get(session_id)
+        if cached is None:
+            session_data = session_store.load(session_id)
+            if session_data is None:
+                logger.info("Session not found", extra={"session_id": session_id})
+                raise HTTPException(status_code=404, detail="Feedback not found")
+            cached = cache_session_body(session_id, session_data)
 
-        with open(session_file, "r", encoding="utf-8") as f:
-            session_data = json.load(f)
+        body, etag = cached
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
 
         # Return FULL session data (not just feedback object)
         # This includes: transcript, userGoal, duration, feedback, etc.
-        print(f"-> Returning full session data for: {session_id}")
-        return session_data
+        return Response(content=body, media_type="application/json", headers=headers)
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error retrieving feedback: {e}")
+        logger.error("Error retrieving feedback", extra={"session_id": session_id, "error": str(e)})
         raise HTTPException(status_code=500, detail=f"Failed to retrieve feedback: {e}")
 
 
+def cache_session_body(session_id: str, session_data: Dict) -> Tuple[bytes, str]:
+    """
+    Serialize a session once and keep the bytes and ETag in the session cache
+
+    Returns:
+        (body, etag)
+    """
+    body = json.dumps(session_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    session_cache.set(session_id, (body, etag), size=len(body))
+    return body, etag
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
 @app.get("/recordings")
-async def get_all_recordings():
-    """Get list of all recordings with their metadata"""
+async def get_all_recordings(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (omit for all recordings)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+    sort: str = Query("timestamp", pattern="^(timestamp|score)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    personality: Optional[str] = Query(None, description="Only sessions with this AI personality"),
+    date_from: Optional[str] = Query(None, description="ISO date/time lower bound (inclusive)"),
+    date_to: Optional[str] = Query(None, description="ISO date/time upper bound (inclusive)")
+):
+    """
+    Get list of recordings with their metadata, served from the session index
+
+    When more results remain, the cursor for the next page is returned in the
+    X-Next-Cursor response header.
+    """
     try:
-        print("GET /recordings requested")
-        recordings = []
-        
-        # Iterate through all feedback session files
-        for session_file in FEEDBACK_STORAGE_DIR.glob("*.json"):
-            try:
-                with open(session_file, "r", encoding="utf-8") as f:
-                    session_data = json.load(f)
-                
-                feedback = session_data.get("feedback", {})
-                
-                # Extract key info for the recordings list
-                recording_info = {
-                    "session_id": session_file.stem,
-                    "timestamp": session_data.get("timestamp", ""),
-                    "goal": feedback.get("goal", "General Speech"),
-                    "overall_score": feedback.get("overall_score", "N/A"),
-                    "ai_personality": feedback.get("ai_personality", "N/A"),
-                    "transcript_preview": feedback.get("transcript", "")[:100] + "..." if feedback.get("transcript") else ""
-                }
-                recordings.append(recording_info)
-            except Exception as e:
-                print(f"Error reading session {session_file.name}: {e}")
-                continue
+        try:
+            date_from = _normalize_date_bound(date_from, end_of_day=False)
+            date_to = _normalize_date_bound(date_to, end_of_day=True)
+            recordings, next_cursor = session_index.query(
+                limit=limit, cursor=cursor, sort=sort, order=order,
+                personality=personality, date_from=date_from, date_to=date_to
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
-        print(f"-> Returning {len(recordings)} recordings")
+        logger.debug("Returning recordings", extra={"count": len(recordings)})
         return recordings
     
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error retrieving recordings: {e}")
+        logger.error("Error retrieving recordings", extra={"error": str(e)})
         raise HTTPException(status_code=500, detail=f"Failed to retrieve recordings: {e}")
 
 
+def _normalize_date_bound(value: Optional[str], end_of_day: bool) -> Optional[str]:
+    """Validate an ISO date/time filter; a bare date covers the whole day"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+    if len(value) == 10 and end_of_day:
+        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed.isoformat()
+
+
+@app.get("/progress")
+async def get_progress(
+    userId: Optional[str] = Query(None, description="User whose progress to return (omit for sessions without a user)"),
+    days: int = Query(30, ge=1, le=MAX_DAYS, description="Days of daily trend, ending today"),
+    weeks: int = Query(12, ge=1, le=MAX_WEEKS, description="Weeks of weekly trend, ending this week")
+):
+    """
+    Progress summary served from rollups maintained as sessions are saved
+
+    Returns all-time score averages, daily and weekly trends (score averages,
+    pace and fillers per 100 words), the WPM distribution and the best and
+    worst sessions by overall score. The cost does not depend on how many
+    sessions the user has.
+    """
+    try:
+        return progress_rollups.progress(userId or "", days=days, weeks=weeks)
+    except Exception as e:
+        logger.error("Error retrieving progress", extra={"user_id": userId, "error": str(e)})
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve progress: {e}")
+
+
+@app.get("/search")
+async def search_sessions(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500, description='Words and "quoted phrases" to find'),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    offset: int = Query(0, ge=0, le=10000, description="Results to skip (from the X-Next-Offset header)"),
+    min_score: Optional[float] = Query(None, ge=0, le=10, description="Minimum overall score"),
+    max_score: Optional[float] = Query(None, ge=0, le=10, description="Maximum overall score"),
+    personality: Optional[str] = Query(None, description="Only sessions with this AI personality")
+):
+    """
+    Full-text search over transcripts, goals, summaries, strengths and improvements
+
+    Results are ranked by BM25 relevance and carry an HTML snippet (escaped
+    text, matched words in <mark> tags). When more results remain, the offset
+    of the next page is returned in the X-Next-Offset response header. A
+    query matching more than SEARCH_MAX_RANKED_MATCHES sessions is ranked over
+    the most recent ones only, and the response has X-Search-Truncated: true.
+    """
+    try:
+        try:
+            results, has_more, truncated = search_index.search(
+                q, limit=limit, offset=offset, min_score=min_score, max_score=max_score, personality=personality
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if has_more:
+            response.headers["X-Next-Offset"] = str(offset + limit)
+        if truncated:
+            response.headers["X-Search-Truncated"] = "true"
+        logger.debug("Returning search results", extra={"count": len(results)})
+        return results
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error searching sessions", extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail=f"Failed to search sessions: {e}")
+
+
+@app.get("/export")
+async def export_sessions(
+    request: Request,
+    date_from: Optional[str] = Query(None, description="ISO date/time lower bound (inclusive)"),
+    date_to: Optional[str] = Query(None, description="ISO date/time upper bound (inclusive)"),
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields to keep"),
+    exclude: Optional[str] = Query(None, description="Comma-separated top-level fields to drop, e.g. transcript"),
+    gzip: bool = Query(False, description="gzip-compress the stream")
+):
+    """
+    Stream stored sessions as NDJSON, one full session record per line
+
+    With a date range, sessions are found through the session index and sent
+    oldest first; without one, every stored session is sent in storage order.
+    The stream is produced as the client reads it, so memory use does not
+    depend on how many sessions are exported. Records keep their audioPath,
+    but audio files are not included.
+    """
+    admit_client(client_key(request.headers, request.client), priority="transfer", limiter=transfer_rate_limiter)
+    try:
+        date_from = _normalize_date_bound(date_from, end_of_day=False)
+        date_to = _normalize_date_bound(date_to, end_of_day=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if date_from or date_to:
+        sessions = iter_sessions_in_range(session_store, session_index, date_from, date_to)
+    else:
+        sessions = session_store.iter_sessions()
+    stream = export_stream(_count_exported(sessions), date_from, date_to, parse_field_list(fields),
+                           parse_field_list(exclude) or (), compress=gzip)
+    filename = "sessions.ndjson.gz" if gzip else "sessions.ndjson"
+    logger.info("Session export started", extra={"date_from": date_from, "date_to": date_to, "gzip": gzip})
+    # A plain iterator: Starlette pulls each chunk in a worker thread only once the previous one was sent
+    return StreamingResponse(
+        stream, media_type="application/gzip" if gzip else NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _count_exported(sessions: Iterable[Dict]) -> Iterator[Dict]:
+    for session_data in sessions:
+        SESSIONS_TRANSFERRED.inc(direction="export")
+        yield session_data
+
+
+@app.post("/import")
+async def import_sessions_endpoint(request: Request):
+    """
+    Load sessions from an NDJSON body (gzip-compressed or not), as written by /export
+
+    Sessions are saved with the session, progress and search indexes in
+    batches of IMPORT_BATCH_SIZE. The body is read only as fast as batches
+    are written. Sessions already stored under the same id are replaced.
+    Lines that are not complete, well-typed session records (for example from
+    an export with fields left out) are skipped and reported:
+        {"imported": n, "failed": n, "errors": [{"line": n, "error": "..."}]}
+
+    The import runs session_transfer.import_stream in a worker thread, the
+    same code as the command line import, pulling the body from the event loop.
+    """
+    admit_client(client_key(request.headers, request.client), priority="transfer", limiter=transfer_rate_limiter)
+    summary = ImportSummary()
+    chunks = _blocking_chunks(request.stream(), asyncio.get_running_loop())
+    try:
+        await asyncio.to_thread(import_stream, chunks, import_sessions, IMPORT_BATCH_SIZE, summary)
+    except ValueError as e:
+        # Batches before the bad data are kept
+        raise HTTPException(status_code=400, detail={"error": str(e), **summary.to_dict()})
+
+    logger.info("Sessions imported", extra={"imported": summary.imported, "failed": summary.failed})
+    return summary.to_dict()
+
+
+def _blocking_chunks(stream: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop) -> Iterator[bytes]:
+    """Iterate an async byte stream from a worker thread, one chunk at a time"""
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(stream.__anext__(), loop).result()
+        except StopAsyncIteration:
+            return
+
+
+# ========================================
+# Session Storage
+# ========================================
+
+def save_session(session_data: Dict):
+    """
+    Persist a session and add it to the session, progress and search indexes
+
+    Args:
+        session_data: Full session record including sessionId
+    """
+    save_sessions([session_data])
+
+
+def save_sessions(sessions: List[Dict]):
+    """
+    Persist several sessions, then add them to the session index,
+    progress rollups and search index (one transaction each)
+
+    Args:
+        sessions: Full session records including sessionId
+    """
+    with STAGE_SECONDS.time(stage="session_persist"):
+        session_store.save_many(sessions)
+        for session_data in sessions:
+            # Fresh sessions are usually opened right away by the feedback page
+            cache_session_body(session_data["sessionId"], session_data)
+        session_index.upsert_many(sessions)
+        progress_rollups.add_many(sessions)
+        search_index.upsert_many(sessions)
+    logger.info("Sessions saved", extra={"sessions": len(sessions)})
+
+
+def import_sessions(sessions: List[Dict]):
+    """
+    Persist imported sessions and add them to the session, progress and
+    search indexes, replacing earlier versions of the same sessions, then make
+    every worker drop its cached session bodies
+
+    Args:
+        sessions: Session records accepted by session_transfer.validate_record
+    """
+    with STAGE_SECONDS.time(stage="session_import"):
+        save_imported(sessions, session_store, session_index, progress_rollups, search_index)
+        session_cache_generation.bump()
+    SESSIONS_TRANSFERRED.inc(len(sessions), direction="import")
+
+
 # ========================================
 # Analysis Functions
 # ========================================
 
-def calculate_metrics(transcript: str, duration: int = 0) -> Dict:
+def calculate_metrics(transcript: str, duration: int = 0, audio_metrics: Optional[Dict] = None) -> Dict:
     """
     Calculate basic speech metrics from transcript
     
     Args:
         transcript: The speech text
         duration: Recording duration in seconds (0 if not provided)
+        audio_metrics: Acoustic metrics of the recording, if it was analyzed
         
     Returns:
-        Dictionary with pace and filler words
+        Dictionary with pace, filler word counts, filler occurrence offsets and,
+        when audio_metrics is given, audioMetrics including the articulation rate
     """
-    # Count words for pace calculation
-    words = transcript.split()
-    word_count = len(words)
-    
-    # Calculate actual WPM if duration is provided
-    if duration > 0:
-        minutes = duration / 60.0
-        pace = int(word_count / minutes) if minutes > 0 else 0
-        print(f"✓ Calculating WPM: {word_count} words / {minutes:.2f} minutes = {pace} WPM")
-    else:
-        # Fallback: estimate based on average speaking pace
-        estimated_minutes = word_count / 150  # Rough estimate
-        pace = int(word_count / max(estimated_minutes, 0.5))  # Avoid division by zero
-        print(f"⚠ Duration not provided, using estimated pace: {pace} WPM")
-    
-    # Common filler words to detect
-    filler_word_list = [
-        "um", "uh", "like", "you know", "basically", "actually",
-        "literally", "so", "well", "right", "okay", "hmm"
-    ]
-    
-    # Count filler words in transcript
-    transcript_lower = transcript.lower()
-    filler_words = {}
+    with STAGE_SECONDS.time(stage="metrics"):
+        # Count words for pace calculation
+        words = transcript.split()
+        word_count = len(words)
+        
+        # Find all fillers (including multi-word phrases) in a single pass
+        filler_occurrences = filler_matcher.find(transcript)
+        return build_metrics(word_count, duration, filler_occurrences, audio_metrics)
+
+
+def build_metrics(word_count: int, duration: int, filler_occurrences: List[FillerOccurrence],
+                  audio_metrics: Optional[Dict] = None) -> Dict:
+    """
+    Assemble the metrics dictionary from counts already taken
     
-    for filler in filler_word_list:
-        count = transcript_lower.split().count(filler)
-        if count > 0:
-            filler_words[filler] = count
+    Args:
+        word_count: Whitespace-separated words in the transcript
+        duration: Recording duration in seconds (0 if not provided)
+        filler_occurrences: Filler matches in transcript order
+        audio_metrics: Acoustic metrics of the recording, if it was analyzed
+        
+    Returns:
+        Same dictionary as calculate_metrics
+    """
+    # The measured recording length beats the client-reported duration
+    if audio_metrics and audio_metrics.get("durationSeconds"):
+        duration = audio_metrics["durationSeconds"]
+
+    # Calculate actual WPM if duration is provided (estimated otherwise)
+    pace = _pace_from_word_count(word_count, duration)
+    filler_words = filler_matcher.summarize(filler_occurrences)
     
-    print(f"✓ Metrics calculated: {word_count} words, {pace} WPM, {len(filler_words)} filler types")
+    logger.debug("Metrics calculated", extra={
+        "words": word_count, "pace": pace, "pace_estimated": duration <= 0, "filler_types": len(filler_words)
+    })
     
-    return {
+    metrics = {
         "pace": pace,
-        "fillerWords": filler_words
+        "fillerWords": filler_words,
+        "fillerOccurrences": [occurrence._asdict() for occurrence in filler_occurrences]
     }
+    if audio_metrics:
+        metrics["audioMetrics"] = {**audio_metrics, "articulationRate": articulation_rate(word_count, audio_metrics)}
+    return metrics
 
 
-def get_llm_feedback(transcript: str, user_goal: str, audio_path: Optional[Path] = None, duration: int = 0, ai_personality: str = "supportive") -> Dict:
+async def request_llm_feedback(transcript: str, user_goal: str, audio_path: Optional[Path] = None, duration: int = 0, ai_personality: str = "supportive",
+                               audio_metrics: Optional[Dict] = None, local_scores: Optional[Dict] = None) -> Dict:
     """
-    Get AI-powered feedback using Gemini LLM API
-    
+    Return cached feedback for these inputs, or call Gemini through the
+    resilient LLM client (executor thread, deadline, retries, circuit breaker)
+
+    Concurrent requests with the same cache key share a single Gemini call.
+
     Args:
         transcript: The speech text
         user_goal: The user's intended message
-        audio_path: Optional path to the audio file for tone/pace analysis
+        audio_path: Optional path to the audio file
         duration: Recording duration in seconds
-        ai_personality: The feedback style (supportive, direct, critical, humorous, mentor, professional)
+        ai_personality: The feedback style
+        audio_metrics: Acoustic metrics to include in the prompt
+        local_scores: Heuristic scores for the fallback, if already computed
+
+    Returns:
+        Feedback dictionary, or the fallback response if Gemini cannot answer in time
+    """
+    cache_key = FeedbackCache.make_key(transcript, user_goal, ai_personality, duration,
+                                       audio_path is not None, GEMINI_MODEL_NAME, audio_metrics=audio_metrics)
+    cached = feedback_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("LLM feedback served from cache")
+        return cached
+
+    feedback, shared = await llm_flights.do(cache_key, lambda: _fetch_llm_feedback(
+        cache_key, transcript, user_goal, audio_path, duration, ai_personality, audio_metrics, local_scores
+    ))
+    if shared:
+        COALESCED_REQUESTS.inc(scope="llm")
+        logger.debug("LLM feedback shared with an identical in-flight request")
+    return feedback
+
+
+async def _fetch_llm_feedback(cache_key: str, transcript: str, user_goal: str, audio_path: Optional[Path],
+                              duration: int, ai_personality: str, audio_metrics: Optional[Dict],
+                              local_scores: Optional[Dict]) -> Dict:
+    """The uncached part of request_llm_feedback: Gemini (or a fallback), then cache the answer"""
+    if GEMINI_API_KEY and estimate_tokens(transcript) > LLM_TRANSCRIPT_TOKEN_BUDGET:
+        feedback = await _map_reduce_llm_feedback(transcript, user_goal, ai_personality, duration, local_scores,
+                                                  audio_path, audio_metrics)
+        if not feedback.get("fallback"):
+            feedback_cache.set(cache_key, feedback)
+        return feedback
+
+    if not GEMINI_API_KEY:
+        logger.warning("Gemini API not configured, using placeholder response")
+        return _placeholder_feedback(user_goal, transcript, duration, local_scores)
+
+    try:
+        async with llm_slot():
+            feedback = await llm_client.call(generate_llm_feedback, transcript, user_goal, audio_path, duration,
+                                             ai_personality, audio_metrics=audio_metrics)
+    except AdmissionRejectedError:
+        raise
+    except Exception as e:
+        logger.warning("Gemini feedback failed", extra={"error": str(e), "error_type": type(e).__name__})
+        return _fallback_feedback(e, transcript, duration, local_scores)
+
+    # Only cache real Gemini answers, never placeholders or error fallbacks
+    if not feedback.get("fallback"):
+        feedback_cache.set(cache_key, feedback)
+    return feedback
+
+
+async def _map_reduce_llm_feedback(transcript: str, user_goal: str, ai_personality: str, duration: int = 0,
+                                   local_scores: Optional[Dict] = None, audio_path: Optional[Path] = None,
+                                   audio_metrics: Optional[Dict] = None) -> Dict:
+    """
+    Analyze a long transcript as parallel segments and reduce the results
+
+    A segment's prompt and cache key depend only on its own text (with its
+    own word and filler counts), so analyzing the same speech again, at any
+    duration or with an edited tail, reuses every unchanged segment. The whole
+    speech's pace and audio measurements are applied to the reduced feedback.
+
+    Returns:
+        Reduced feedback dictionary, or the fallback if every segment failed
+    """
+    segments = plan_segments(transcript, LLM_SEGMENT_TOKENS)
+    logger.info("Long transcript: analyzing segments in parallel", extra={
+        "estimated_tokens": estimate_tokens(transcript), "segments": len(segments)
+    })
+
+    async def analyze_segment(index: int, segment: str) -> Dict:
+        # The prompt depends on the position and on whether this is the final
+        # segment, but not on the segment count
+        is_last = index == len(segments) - 1
+        key = FeedbackCache.make_key(segment, user_goal, ai_personality, 0, False, GEMINI_MODEL_NAME,
+                                     scope=f"segment:{index}:{'last' if is_last else 'inner'}")
+        cached = feedback_cache.get(key)
+        if cached is not None:
+            return cached
+        feedback, shared = await llm_flights.do(key, lambda: _admitted_call(
+            get_segment_feedback, segment, user_goal, ai_personality, index, is_last
+        ))
+        if shared:
+            COALESCED_REQUESTS.inc(scope="segment")
+        feedback_cache.set(key, feedback)
+        return feedback
+
+    results = await asyncio.gather(
+        *(analyze_segment(index, segment) for index, segment in enumerate(segments)),
+        return_exceptions=True
+    )
+
+    succeeded = [(result, len(segment.split())) for result, segment in zip(results, segments)
+                 if not isinstance(result, BaseException)]
+    failures = [result for result in results if isinstance(result, BaseException)]
+    for failure in failures:
+        logger.warning("Segment analysis failed", extra={"error": str(failure)})
+    if not succeeded:
+        rejected = [failure for failure in failures if isinstance(failure, AdmissionRejectedError)]
+        if rejected:
+            raise rejected[0]
+        return _fallback_feedback(failures[0], transcript, duration, local_scores)
+
+    logger.info("Reduced segment analyses", extra={"succeeded": len(succeeded), "segments": len(segments)})
+    reduced = reduce_segment_feedback([feedback for feedback, _ in succeeded], [count for _, count in succeeded])
+    # The measured recording length beats the client-reported duration, as in build_metrics
+    if audio_metrics and audio_metrics.get("durationSeconds"):
+        duration = audio_metrics["durationSeconds"]
+    pace = int(len(transcript.split()) * 60 / duration) if duration > 0 else None
+    return apply_delivery_metrics(reduced, pace, audio_metrics)
+
+
+async def _admitted_call(fn, *args, **kwargs) -> Any:
+    """llm_client.call inside an admission slot"""
+    async with llm_slot():
+        return await llm_client.call(fn, *args, **kwargs)
+
+
+async def stream_llm_feedback(transcript: str, user_goal: str, audio_path: Optional[Path] = None, duration: int = 0, ai_personality: str = "supportive",
+                              audio_metrics: Optional[Dict] = None,
+                              local_scores: Optional[Dict] = None) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream LLM feedback field by field
+
+    Gemini's streamed output is fed through an incremental JSON parser, so
+    each top-level field is yielded as soon as it is complete. Transcripts over
+    LLM_TRANSCRIPT_TOKEN_BUDGET go through the same segment analysis as
+    request_llm_feedback, and their fields are yielded once it is reduced.
+
+    Yields:
+        ("field", (name, value)) for each field as it completes, then
+        ("feedback", dict) with the validated feedback (or the fallback)
+    """
+    cache_key = FeedbackCache.make_key(transcript, user_goal, ai_personality, duration,
+                                       audio_path is not None, GEMINI_MODEL_NAME, audio_metrics=audio_metrics)
+    cached = feedback_cache.get(cache_key)
+    if cached is None and not GEMINI_API_KEY:
+        cached = _placeholder_feedback(user_goal, transcript, duration, local_scores)
+    if cached is not None:
+        for name, value in cached.items():
+            if name != "fallback":
+                yield "field", (name, value)
+        yield "feedback", cached
+        return
+
+    if estimate_tokens(transcript) > LLM_TRANSCRIPT_TOKEN_BUDGET:
+        feedback, shared = await llm_flights.do(cache_key, lambda: _fetch_llm_feedback(
+            cache_key, transcript, user_goal, audio_path, duration, ai_personality, audio_metrics, local_scores
+        ))
+        if shared:
+            COALESCED_REQUESTS.inc(scope="llm")
+        for name, value in feedback.items():
+            if name != "fallback":
+                yield "field", (name, value)
+        yield "feedback", feedback
+        return
+
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def emit(text: str):
+        loop.call_soon_threadsafe(chunks.put_nowait, text)
+
+    # The admission slot is held until the stream ends
+    async with llm_slot():
+        if not llm_client.breaker.allow():
+            # Streamed output cannot be retried, but it can fail fast like the other paths
+            yield "feedback", _fallback_feedback(CircuitOpenError("Gemini circuit breaker is open"), transcript,
+                                                 duration, local_scores)
+            return
+
+        producer = asyncio.ensure_future(llm_executor.run(
+            _generate_feedback_stream, emit, stop, transcript, user_goal, audio_path, duration, ai_personality,
+            audio_metrics
+        ))
+        # Chunks are queued before the producer resolves, so None always arrives last
+        producer.add_done_callback(lambda _: chunks.put_nowait(None))
+
+        parser = IncrementalJSONObjectParser()
+        try:
+            while True:
+                text = await chunks.get()
+                if text is None:
+                    break
+                for name, value in parser.feed(text):
+                    yield "field", (name, value)
+
+            response_text = await producer
+            logger.debug("Received streamed response from Gemini", extra={"chars": len(response_text)})
+            with STAGE_SECONDS.time(stage="json_parse"):
+                feedback = parse_feedback_response(response_text.strip())
+            llm_client.record_outcome(None)
+            feedback_cache.set(cache_key, feedback)
+        except Exception as e:
+            logger.error("Error streaming Gemini feedback", extra={"error": str(e)})
+            llm_client.record_outcome(e)
+            feedback = _fallback_feedback(e, transcript, duration, local_scores)
+        except BaseException:
+            # Cancelled or the client went away mid-stream: free a half-open trial
+            llm_client.breaker.release_trial()
+            raise
+        finally:
+            stop.set()
+
+    yield "feedback", feedback
+
+
+def _generate_feedback_stream(emit, stop: threading.Event, *prompt_args) -> str:
+    """
+    Run a streamed Gemini generation in an executor thread, emitting text chunks as they arrive
+
+    Args:
+        emit: Called with each chunk of text
+        stop: Set by the caller to abandon the stream
+        prompt_args: Arguments for build_feedback_request
+    """
+    with STAGE_SECONDS.time(stage="prompt_build"):
+        system_instruction, message = build_feedback_request(*prompt_args)
+    model = get_gemini_model(system_instruction)
+    logger.debug("Calling Gemini API (streaming) for speech analysis")
+    parts = []
+    try:
+        with STAGE_SECONDS.time(stage="gemini_call"):
+            for chunk in model.generate_content(message, stream=True):
+                if stop.is_set():
+                    raise RuntimeError("Streaming cancelled")
+                text = chunk.text
+                parts.append(text)
+                emit(text)
+    except Exception:
+        LLM_CALLS.inc(kind="stream", outcome="error")
+        raise
+    LLM_CALLS.inc(kind="stream", outcome="ok")
+    return "".join(parts)
+
+
+def _fallback_feedback(error: Exception, transcript: str = "", duration: int = 0,
+                       local_scores: Optional[Dict] = None) -> Dict:
+    """
+    Fallback response with all required fields, used when the LLM call fails
+
+    Scores, tip, strengths and improvements come from the local heuristic
+    scorer, so the speech still gets feedback of its own.
+    """
+    if isinstance(error, CircuitOpenError):
+        reason = "circuit_open"
+    elif isinstance(error, LLMTimeoutError):
+        reason = "timeout"
+    else:
+        reason = "error"
+    LLM_FALLBACKS.inc(reason=reason)
+    if local_scores is None:
+        local_scores = local_scorer.score(transcript, duration)
+    return {
+        **local_scorer.feedback(local_scores),
+        "summary": f"Unable to generate AI feedback, showing a local estimate. Error: {str(error)[:100]}",
+        "fallback": True
+    }
+
+
+def calculate_metrics_batch(transcripts: List[str], durations: List[int]) -> List[Dict]:
+    """
+    Calculate metrics for a batch of transcripts in one pass
+    
+    Same results as calling calculate_metrics per transcript, but with the
+    compiled filler matcher bound once and no per-item logging.
+    
+    Args:
+        transcripts: Speech texts
+        durations: Recording durations in seconds, aligned with transcripts
         
     Returns:
-        Dictionary with summary, clarity score, and constructive tip
+        List of metrics dictionaries, aligned with the inputs
+    """
+    find_fillers = filler_matcher.find
+    summarize_fillers = filler_matcher.summarize
+    results = []
+    with STAGE_SECONDS.time(stage="metrics_batch"):
+        for transcript, duration in zip(transcripts, durations):
+            occurrences = find_fillers(transcript)
+            results.append({
+                "pace": _pace_from_word_count(len(transcript.split()), duration),
+                "fillerWords": summarize_fillers(occurrences),
+                "fillerOccurrences": [occurrence._asdict() for occurrence in occurrences]
+            })
+    logger.debug("Batch metrics calculated", extra={"transcripts": len(results)})
+    return results
+
+
+def _pace_from_word_count(word_count: int, duration: int) -> int:
+    """Words per minute, estimated from an average speaking pace when duration is unknown"""
+    if duration > 0:
+        minutes = duration / 60.0
+        return int(word_count / minutes) if minutes > 0 else 0
+    # Fallback: estimate based on average speaking pace
+    estimated_minutes = word_count / 150  # Rough estimate
+    return int(word_count / max(estimated_minutes, 0.5))  # Avoid division by zero
+
+
+def get_gemini_model(system_instruction: Optional[str] = None):
+    """Shared Gemini model for a system instruction (benchmarks swap this for a local stand-in)"""
+    return gemini_models.get(system_instruction)
+
+
+def generate_llm_feedback(transcript: str, user_goal: str, audio_path: Optional[Path] = None, duration: int = 0,
+                          ai_personality: str = "supportive", audio_metrics: Optional[Dict] = None) -> Dict:
     """
+    One Gemini feedback call: build the prompt, generate and parse
     
-    # Check if Gemini API is configured
-    if not GEMINI_API_KEY:
-        print("⚠ Gemini API not configured, using placeholder response")
-        return {
-            "summary": f"The speaker discussed their intended goal: {user_goal}",
-            "clarityScore": 75,
-            "confidenceScore": 70,
-            "engagementScore": 65,
-            "structureScore": 70,
-            "overall_score": 7.0,
-            "tip": "Configure GEMINI_API_KEY in .env file to get AI-powered feedback!",
-            "strengths": ["Speech recorded successfully", "Basic structure present", "Clear intention"],
-            "improvements": ["AI analysis unavailable", "Please configure GEMINI_API_KEY", "Enable full feedback system"]
-        }
+    Raises on failure (API errors, or ValueError for malformed JSON) so the
+    LLM client can decide whether to retry.
     
+    Returns:
+        Parsed feedback dictionary
+    """
+    with STAGE_SECONDS.time(stage="prompt_build"):
+        system_instruction, message = build_feedback_request(
+            transcript, user_goal, audio_path, duration, ai_personality, audio_metrics
+        )
+    model = get_gemini_model(system_instruction)
+
+    # Call Gemini API
+    logger.debug("Calling Gemini API for speech analysis")
     try:
-        # Initialize Gemini model (using gemini-2.0-flash - fast and efficient)
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # Word count and duration for context
-        word_count = len(transcript.split())
-        duration_minutes = duration / 60.0 if duration > 0 else 0
-        actual_wpm = int(word_count / duration_minutes) if duration_minutes > 0 else 0
+        with STAGE_SECONDS.time(stage="gemini_call"):
+            response = model.generate_content(message)
+            # Extract response text
+            response_text = response.text.strip()
+    except Exception:
+        LLM_CALLS.inc(kind="full", outcome="error")
+        raise
+    LLM_CALLS.inc(kind="full", outcome="ok")
+    logger.debug("Received response from Gemini", extra={"chars": len(response_text)})
+    
+    with STAGE_SECONDS.time(stage="json_parse"):
+        return parse_feedback_response(response_text)
+
+
+def _placeholder_feedback(user_goal: str, transcript: str = "", duration: int = 0,
+                          local_scores: Optional[Dict] = None) -> Dict:
+    """Placeholder response used when no Gemini API key is configured, scored locally"""
+    LLM_FALLBACKS.inc(reason="not_configured")
+    if local_scores is None:
+        local_scores = local_scorer.score(transcript, duration)
+    return {
+        **local_scorer.feedback(local_scores),
+        "summary": f"The speaker discussed their intended goal: {user_goal}",
+        "tip": "Configure GEMINI_API_KEY in .env file to get AI-powered feedback!",
+        "fallback": True
+    }
+
+
+def build_feedback_request(transcript: str, user_goal: str, audio_path: Optional[Path] = None, duration: int = 0,
+                           ai_personality: str = "supportive", audio_metrics: Optional[Dict] = None
+                           ) -> Tuple[Optional[str], str]:
+    """
+    What to send Gemini for a speech: the personality's static instructions
+    as the model's system instruction and the request fields as the message
+    where the SDK supports system instructions, else (None, whole prompt)
+    
+    Returns:
+        (system_instruction, message)
+    """
+    duration_context, audio_note = _prompt_context(transcript, audio_path, duration, audio_metrics)
+    return split_for_system_instruction(
+        prompt_templates.get(ai_personality), user_goal, transcript, duration_context, audio_note,
+        gemini_models.supports_system_instruction
+    )
+
+
+def _prompt_context(transcript: str, audio_path: Optional[Path], duration: int,
+                    audio_metrics: Optional[Dict]) -> Tuple[str, str]:
+    """The per-request prompt sections: (speech metrics, audio analysis notes)"""
+    # Word count and duration for context
+    word_count = len(transcript.split())
+    duration_minutes = duration / 60.0 if duration > 0 else 0
+    actual_wpm = int(word_count / duration_minutes) if duration_minutes > 0 else 0
+    
+    # Audio context note
+    if audio_metrics:
+        audio_note = build_audio_note(audio_metrics)
+    elif audio_path:
+        audio_note = "\n**AUDIO ANALYSIS NOTES:**\nAudio file provided but not in a format that can be analyzed (PCM WAV) - analysis based on transcript only."
+    else:
+        audio_note = "\n**AUDIO ANALYSIS NOTES:**\nNo audio file provided - analysis based on transcript only."
+    
+    # Duration context
+    duration_context = ""
+    if duration > 0:
+        duration_context = f"\n**SPEECH METRICS:**\n- Duration: {duration} seconds ({duration_minutes:.1f} minutes)\n- Word count: {word_count}\n- Speaking pace: {actual_wpm} WPM (ideal: 140-160 WPM)"
+    return duration_context, audio_note
+
+
+def build_audio_note(audio_metrics: Dict) -> str:
+    """
+    Describe the measured delivery for the prompt
+    
+    Args:
+        audio_metrics: Acoustic metrics including articulationRate
         
-        # Audio context note
-        audio_note = ""
-        if audio_path:
-            audio_note = f"\n**AUDIO ANALYSIS NOTES:**\nAudio file provided: {audio_path.name} - Enable future audio analysis for tone, pacing, and confidence detection."
-        else:
-            audio_note = "\n**AUDIO ANALYSIS NOTES:**\nNo audio file provided - analysis based on transcript only."
+    Returns:
+        Prompt section with speaking time, pauses and pitch variability
+    """
+    lines = [
+        f"- Speaking time: {audio_metrics['speakingSeconds']}s of {audio_metrics['durationSeconds']}s "
+        f"({audio_metrics['speakingRatio'] * 100:.0f}% speaking, {audio_metrics['silenceSeconds']}s silence)",
+        f"- Pauses: {audio_metrics['pauseCount']} (mean {audio_metrics['meanPauseSeconds']}s, "
+        f"longest {audio_metrics['longestPauseSeconds']}s, {audio_metrics['longPauseCount']} longer than {LONG_PAUSE_SECONDS:g}s)"
+    ]
+    if audio_metrics.get("articulationRate"):
+        lines.append(f"- Articulation rate: {audio_metrics['articulationRate']} words per minute of speaking time")
+    if audio_metrics.get("pitchVariabilitySemitones") is not None:
+        lines.append(
+            f"- Pitch: mean {audio_metrics['meanPitchHz']} Hz, variability {audio_metrics['pitchVariabilitySemitones']} "
+            f"semitones (below ~2 sounds monotone, 3-5 is expressive)"
+        )
+    return ("\n**AUDIO ANALYSIS (measured from the recording):**\n" + "\n".join(lines)
+            + "\nUse these measurements when judging confidence, pacing and engagement.")
+
+
+def get_segment_feedback(segment: str, user_goal: str, ai_personality: str, index: int, is_last: bool) -> Dict:
+    """
+    Get Gemini feedback for one segment of a long transcript
+    
+    Raises on failure, so the caller can reduce
+    over the segments that did succeed.
+    
+    Args:
+        segment: Segment text
+        user_goal: The user's intended message
+        ai_personality: The feedback style
+        index: Zero-based segment position
+        is_last: Whether this segment ends the speech
         
-        # Duration context
-        duration_context = ""
-        if duration > 0:
-            duration_context = f"\n**SPEECH METRICS:**\n- Duration: {duration} seconds ({duration_minutes:.1f} minutes)\n- Word count: {word_count}\n- Speaking pace: {actual_wpm} WPM (ideal: 140-160 WPM)"
+    Returns:
+        Parsed feedback dictionary for the segment
+    """
+    model = get_gemini_model()
+    with STAGE_SECONDS.time(stage="prompt_build"):
+        prompt = build_segment_prompt(segment, user_goal, ai_personality, index, is_last)
+    logger.debug("Calling Gemini API for segment", extra={"segment": index + 1})
+    try:
+        with STAGE_SECONDS.time(stage="gemini_call"):
+            response_text = model.generate_content(prompt).text.strip()
+    except Exception:
+        LLM_CALLS.inc(kind="segment", outcome="error")
+        raise
+    LLM_CALLS.inc(kind="segment", outcome="ok")
+    with STAGE_SECONDS.time(stage="json_parse"):
+        return parse_feedback_response(response_text)
+
+
+def build_segment_prompt(segment: str, user_goal: str, ai_personality: str, index: int, is_last: bool) -> str:
+    """
+    Build the Gemini prompt for one segment of a long transcript
+    
+    The prompt deliberately does not mention the total number of segments,
+    and its metrics are those of the segment text alone, so the prompt is
+    the same whatever the rest of the speech, its duration or its audio.
+    
+    Returns:
+        Prompt text asking for the feedback JSON object for this segment
+    """
+    return prompt_templates.get(ai_personality).segment_prompt(segment, user_goal, index, is_last,
+                                                                segment_metrics_note(segment))
+
+
+def segment_metrics_note(segment: str) -> str:
+    """Prompt section with the word and filler counts of one segment"""
+    fillers = filler_matcher.count(segment)
+    filler_text = ", ".join(f"'{filler}' x{count}" for filler, count in fillers.items()) or "none"
+    return f"\n**PART METRICS:**\n- Word count: {len(segment.split())}\n- Filler words: {filler_text}"
+
+
+def parse_feedback_response(response_text: str) -> Dict:
+    """
+    Parse and validate the JSON feedback object returned by Gemini
+    
+    Args:
+        response_text: Raw model output, optionally wrapped in a markdown code fence
         
-        # Personality customization
-        personality_styles = {
-            "supportive": {
-                "tone": "encouraging and nurturing",
-                "approach": "Focus on positive reinforcement and gentle guidance. Celebrate strengths enthusiastically and frame improvements as opportunities for growth.",
-                "example": "Be warm, use phrases like 'Great job on...', 'You're making wonderful progress...', 'Consider trying...'"
-            },
-            "direct": {
-                "tone": "straightforward and concise",
-                "approach": "Get straight to the point. Be clear and efficient with feedback. No fluff, just facts and actionable items.",
-                "example": "Use bullet points, be brief, focus on specific actions: 'Do this', 'Avoid that', 'Change X to Y'"
-            },
-            "critical": {
-                "tone": "analytical and detailed",
-                "approach": "Provide thorough, in-depth analysis. Point out subtle issues and areas for improvement with precise observations.",
-                "example": "Be specific about what could be better, analyze patterns, provide detailed reasoning for each score"
-            },
-            "humorous": {
-                "tone": "light-hearted and fun",
-                "approach": "Keep it fun and engaging. Use wit and gentle humor to make feedback memorable and enjoyable. Still be helpful!",
-                "example": "Use playful language, clever metaphors, keep it upbeat while still being useful"
-            },
-            "mentor": {
-                "tone": "wise and reflective",
-                "approach": "Share insights like a seasoned coach. Use wisdom from experience, ask thought-provoking questions, guide self-discovery.",
-                "example": "Use phrases like 'Consider...', 'Reflect on...', 'In my experience...', 'What if you tried...'"
-            },
-            "professional": {
-                "tone": "formal and structured",
-                "approach": "Maintain business formality. Use professional language, systematic analysis, and corporate communication style.",
-                "example": "Use formal language, structured feedback, professional terminology, organized sections"
-            }
-        }
+    Returns:
+        Feedback dictionary with typed, clamped scores
         
-        personality_config = personality_styles.get(ai_personality, personality_styles["supportive"])
-        personality_instruction = f"""
-**FEEDBACK PERSONALITY: {ai_personality.upper()}**
-- Tone: {personality_config['tone']}
-- Approach: {personality_config['approach']}
-- Style: {personality_config['example']}
-
-IMPORTANT: Maintain this personality consistently throughout ALL your feedback (summary, strengths, improvements, and constructive tip).
-"""
+    Raises:
+        ValueError: If the text is not valid JSON or misses required fields
+    """
+    # Parse JSON response
+    # Remove markdown code blocks if present
+    response_text = re.sub(r'^```json\s*', '', response_text)
+    response_text = re.sub(r'^```\s*', '', response_text)
+    response_text = re.sub(r'\s*```$', '', response_text)
+    response_text = response_text.strip()
+    
+    # Parse JSON
+    try:
+        feedback_data = json.loads(response_text)
+        if not isinstance(feedback_data, dict):
+            raise ValueError(f"LLM response is a JSON {type(feedback_data).__name__}, not an object")
         
-        # Construct comprehensive prompt
-        prompt = f"""You are an expert public speaking coach analyzing a speech recording. Your goal is to provide constructive, actionable feedback to help the speaker improve.
-
-{personality_instruction}
-
-**SPEAKER'S GOAL:** {user_goal}
-
-**TRANSCRIPT TO ANALYZE:**
-{transcript}
-{duration_context}
-{audio_note}
-
-**CRITICAL SCORING INSTRUCTIONS:**
-- Score HONESTLY based on the actual content quality
-- DO NOT give similar scores to different speeches
-- Each speech is unique and should have DISTINCT scores
-- Poor speeches should score 40-60, average 60-75, good 75-85, excellent 85-95+
-- Be CRITICAL but FAIR - look for actual issues
-- Consider speech length: very short speeches (<30 words) should generally score lower
-
-**YOUR TASK:**
-Analyze this SPECIFIC speech across multiple dimensions:
-
-1. **CLARITY SCORE** (0-100):
-   - How clearly did the speaker communicate their intended message?
-   - Consider: organization, word choice, directness, coherence
-
-2. **CONFIDENCE SCORE** (0-100):
-   - How confident and assertive does the speaker sound?
-   - Consider: use of hedging language, filler words, assertive statements
-
-3. **ENGAGEMENT SCORE** (0-100):
-   - How engaging and interesting is the content?
-   - Consider: storytelling, examples, energy, audience connection
-
-4. **STRUCTURE SCORE** (0-100):
-   - How well-organized is the speech?
-   - Consider: logical flow, clear beginning/middle/end, transitions
-
-5. **OVERALL SCORE** (0-10, can use decimals like 8.5):
-   - Holistic evaluation of the speech quality
-   - Consider all factors: clarity, confidence, engagement, structure
-
-6. **FILLER WORDS & VERBAL CRUTCHES**:
-   - Note excessive use of: um, uh, like, you know, so, basically, actually, literally, kind of, sort of
-
-7. **STRENGTHS** (3-4 specific points):
-   - What did the speaker do well?
-   - Be specific with examples
-
-8. **IMPROVEMENTS** (3-4 specific actionable points):
-   - What can be improved?
-   - Be specific and actionable
-
-9. **CONSTRUCTIVE FEEDBACK** (2-3 sentences):
-   - Main improvement opportunity with actionable advice
-
-**IMPORTANT GUIDELINES:**
-- Be constructive and encouraging, not harsh
-- Focus on actionable improvements
-- Acknowledge what they did well
-- Use specific examples from their speech
-- Keep feedback concise and prioritized
-
-**RESPONSE FORMAT:**
-Return your analysis as a valid JSON object with this exact structure:
-{{
-  "summary": "one or two sentence summary of what the speaker communicated",
-  "clarityScore": number_between_0_and_100,
-  "confidenceScore": number_between_0_and_100,
-  "engagementScore": number_between_0_and_100,
-  "structureScore": number_between_0_and_100,
-  "overall_score": number_between_0_and_10_with_decimals,
-  "tip": "detailed constructive feedback with specific actionable advice (2-3 sentences)",
-  "strengths": ["strength 1", "strength 2", "strength 3"],
-  "improvements": ["improvement 1", "improvement 2", "improvement 3"]
-}}
-
-CRITICAL: Return ONLY the JSON object, no other text before or after. Ensure the JSON is valid and properly formatted."""
-
-        # Call Gemini API
-        print(f"🤖 Calling Gemini API for speech analysis...")
-        response = model.generate_content(prompt)
+        # Validate required fields
+        required_fields = ['summary', 'clarityScore', 'confidenceScore', 'engagementScore', 
+                         'structureScore', 'overall_score', 'tip', 'strengths', 'improvements']
+        if not all(key in feedback_data for key in required_fields):
+            raise ValueError(f"Missing required fields in LLM response. Got: {list(feedback_data.keys())}")
         
-        # Extract response text
-        response_text = response.text.strip()
-        print(f"📥 Received response from Gemini ({len(response_text)} chars)")
+        # Ensure scores are properly typed
+        feedback_data['clarityScore'] = int(feedback_data['clarityScore'])
+        feedback_data['confidenceScore'] = int(feedback_data['confidenceScore'])
+        feedback_data['engagementScore'] = int(feedback_data['engagementScore'])
+        feedback_data['structureScore'] = int(feedback_data['structureScore'])
+        feedback_data['overall_score'] = float(feedback_data['overall_score'])
         
-        # Parse JSON response
-        # Remove markdown code blocks if present
-        response_text = re.sub(r'^```json\s*', '', response_text)
-        response_text = re.sub(r'^```\s*', '', response_text)
-        response_text = re.sub(r'\s*```$', '', response_text)
-        response_text = response_text.strip()
+        # Clamp scores to valid ranges
+        feedback_data['clarityScore'] = max(0, min(100, feedback_data['clarityScore']))
+        feedback_data['confidenceScore'] = max(0, min(100, feedback_data['confidenceScore']))
+        feedback_data['engagementScore'] = max(0, min(100, feedback_data['engagementScore']))
+        feedback_data['structureScore'] = max(0, min(100, feedback_data['structureScore']))
+        feedback_data['overall_score'] = max(0.0, min(10.0, feedback_data['overall_score']))
         
-        # Parse JSON
-        try:
-            feedback_data = json.loads(response_text)
-            
-            # Validate required fields
-            required_fields = ['summary', 'clarityScore', 'confidenceScore', 'engagementScore', 
-                             'structureScore', 'overall_score', 'tip', 'strengths', 'improvements']
-            if not all(key in feedback_data for key in required_fields):
-                raise ValueError(f"Missing required fields in LLM response. Got: {list(feedback_data.keys())}")
-            
-            # Ensure scores are properly typed
-            feedback_data['clarityScore'] = int(feedback_data['clarityScore'])
-            feedback_data['confidenceScore'] = int(feedback_data['confidenceScore'])
-            feedback_data['engagementScore'] = int(feedback_data['engagementScore'])
-            feedback_data['structureScore'] = int(feedback_data['structureScore'])
-            feedback_data['overall_score'] = float(feedback_data['overall_score'])
-            
-            # Clamp scores to valid ranges
-            feedback_data['clarityScore'] = max(0, min(100, feedback_data['clarityScore']))
-            feedback_data['confidenceScore'] = max(0, min(100, feedback_data['confidenceScore']))
-            feedback_data['engagementScore'] = max(0, min(100, feedback_data['engagementScore']))
-            feedback_data['structureScore'] = max(0, min(100, feedback_data['structureScore']))
-            feedback_data['overall_score'] = max(0.0, min(10.0, feedback_data['overall_score']))
-            
-            print(f"✓ LLM analysis complete:")
-            print(f"  - Clarity: {feedback_data['clarityScore']}/100")
-            print(f"  - Confidence: {feedback_data['confidenceScore']}/100")
-            print(f"  - Engagement: {feedback_data['engagementScore']}/100")
-            print(f"  - Structure: {feedback_data['structureScore']}/100")
-            print(f"  - Overall: {feedback_data['overall_score']}/10")
-            return feedback_data
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing error: {e}")
-            print(f"Response text: {response_text[:200]}...")
-            raise ValueError(f"Failed to parse LLM response as JSON: {e}")
-    
-    except Exception as e:
-        print(f"❌ Error calling Gemini API: {e}")
+        logger.debug("LLM analysis complete", extra={
+            "clarity": feedback_data['clarityScore'],
+            "confidence": feedback_data['confidenceScore'],
+            "engagement": feedback_data['engagementScore'],
+            "structure": feedback_data['structureScore'],
+            "overall": feedback_data['overall_score']
+        })
+        return feedback_data
         
-        # Fallback response with all required fields
-        return {
-            "summary": f"Unable to generate AI feedback. Error: {str(e)[:100]}",
-            "clarityScore": 70,
-            "confidenceScore": 65,
-            "engagementScore": 60,
-            "structureScore": 70,
-            "overall_score": 6.6,
-            "tip": "The AI analysis service encountered an error. Please try again or check your API configuration.",
-            "strengths": ["Speech recorded successfully", "Basic structure present"],
-            "improvements": ["AI analysis unavailable", "Please configure GEMINI_API_KEY"]
-        }
+    except json.JSONDecodeError as e:
+        LLM_PARSE_FAILURES.inc()
+        logger.warning("JSON parsing error", extra={"error": str(e), "response_preview": response_text[:200]})
+        raise ValueError(f"Failed to parse LLM response as JSON: {e}")
+    except (ValueError, TypeError) as e:
+        # Missing fields or non-numeric scores
+        LLM_PARSE_FAILURES.inc()
+        logger.warning("Invalid LLM feedback", extra={"error": str(e)})
+        raise ValueError(str(e)) from e
 
 
 # ========================================
@@ -609,4 +2152,14 @@ CRITICAL: Return ONLY the JSON object, no other text before or after. Ensure the
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8000"))
+    if WEB_CONCURRENCY > 1:
+        # Hand over to the uvicorn CLI: its supervisor spawns the workers without
+        # re-running this module's setup in itself and in every child
+        os.execv(sys.executable, [
+            sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(Path(__file__).resolve().parent),
+            "--host", host, "--port", str(port), "--workers", str(WEB_CONCURRENCY)
+        ])
+    else:
+        uvicorn.run(app, host=host, port=port)
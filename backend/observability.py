@@ -0,0 +1,296 @@
+"""
+Podium Pal Backend - Observability
+===================================
+Structured logging through a background queue, and in-process counters and
+histograms rendered in the Prometheus text exposition format for /metrics.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond local work to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+# ========================================
+# Logging
+# ========================================
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Format records as JSON lines, or as text with key=value fields
+
+    Fields come from the `extra` mapping of the logging call, e.g.
+    logger.info("Session saved", extra={"session_id": session_id}).
+    """
+
+    def __init__(self, json_lines: bool = False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+        timestamp = datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds")
+        # QueueHandler has already merged args and any traceback into the message
+        message = record.getMessage()
+
+        if self.json_lines:
+            return json.dumps({
+                "ts": timestamp,
+                "level": record.levelname.lower(),
+                "logger": record.name,
+                "msg": message,
+                **fields
+            }, default=str, ensure_ascii=False)
+
+        text = f"{timestamp} {record.levelname:<7} {record.name}: {message}"
+        if fields:
+            text += " " + " ".join(f"{key}={_format_field(value)}" for key, value in fields.items())
+        return text
+
+
+def _format_field(value) -> str:
+    text = str(value)
+    return json.dumps(text) if (" " in text or not text) else text
+
+
+def configure_logging(level: str = "INFO", json_lines: bool = False,
+                      stream=None) -> logging.handlers.QueueListener:
+    """
+    Route the root logger through a queue drained by a background thread
+
+    Logging calls on the request path only enqueue the record; formatting
+    and the blocking write to the stream happen on the listener thread.
+
+    Args:
+        level: Root log level name
+        json_lines: Emit JSON lines instead of text
+        stream: Output stream (default stderr)
+
+    Returns:
+        The started QueueListener (stopped, and so flushed, at interpreter exit)
+    """
+    log_queue: queue.Queue = queue.Queue()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(StructuredFormatter(json_lines=json_lines))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level.upper())
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+# ========================================
+# Metrics
+# ========================================
+
+def _label_key(labelnames: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {list(labelnames)}, got {sorted(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down, usually set right before a scrape"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time of the with-block, in seconds (also on error)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(self.labelnames, labels))
+            return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for a /metrics scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class RequestLatencyMiddleware:
+    """
+    ASGI middleware observing each HTTP request's duration, labelled by
+    method, route template and status code
+
+    Route templates (not raw paths) keep the label set bounded; requests that
+    match no route are recorded as "unmatched". Streaming responses are
+    timed until their last chunk is sent.
+    """
+
+    def __init__(self, app, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.histogram.observe(time.perf_counter() - started, method=scope["method"],
+                                   route=route, status=str(status["code"]))
@@ -0,0 +1,417 @@
+"""
+Podium Pal Backend - Progress Rollups
+======================================
+Per-user aggregates for /progress, maintained as sessions are saved: daily
+and weekly score averages, filler-rate and pace trends, a WPM histogram and
+the best and worst sessions. Reading a user's progress touches a bounded
+number of rows however many sessions they have. Rebuildable from the session
+files at any time:
+
+    python progress.py rebuild
+"""
+
+import argparse
+import json
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from session_store import session_store_from_env
+from worker_coordination import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+# (rollup column suffix, feedback field)
+SCORE_FIELDS = (
+    ("clarity", "clarityScore"),
+    ("confidence", "confidenceScore"),
+    ("engagement", "engagementScore"),
+    ("structure", "structureScore"),
+    ("overall", "overall_score"),
+)
+
+# WPM histogram bins; paces at or above WPM_BIN_CAP share the last, open-ended bin
+WPM_BIN_WIDTH = 20
+WPM_BIN_CAP = 300
+
+# Upper bounds on the trend windows a /progress query may ask for
+MAX_DAYS = 366
+MAX_WEEKS = 104
+
+_SUM_COLUMNS = [f"sum_{name}" for name, _ in SCORE_FIELDS] + ["sum_fillers", "sum_words", "sum_wpm"]
+
+
+def session_facts(session_data: Dict) -> Optional[Dict]:
+    """
+    Extract what a session contributes to the rollups
+
+    Args:
+        session_data: Full session record
+
+    Returns:
+        Dictionary of rollup inputs, or None if the session lacks a timestamp or scores
+    """
+    try:
+        timestamp = datetime.fromisoformat(session_data.get("timestamp") or "")
+    except ValueError:
+        return None
+    feedback = session_data.get("feedback") or {}
+    scores = [feedback.get(field) for _, field in SCORE_FIELDS]
+    if not all(isinstance(score, (int, float)) for score in scores):
+        return None
+    fillers = feedback.get("fillerWords") or {}
+    return {
+        "session_id": session_data["sessionId"],
+        "user_id": session_data.get("userId") or "",
+        "timestamp": timestamp.isoformat(),
+        "day": timestamp.date().isoformat(),
+        "week": iso_week(timestamp.date()),
+        "sums": [float(score) for score in scores] + [
+            sum(count for count in fillers.values() if isinstance(count, int)),
+            len((session_data.get("transcript") or "").split()),
+            int(feedback.get("pace") or 0),
+        ],
+    }
+
+
+def iso_week(day: date) -> str:
+    """ISO week label, e.g. 2024-W07 (sorts chronologically as text)"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def wpm_bin(wpm: int) -> int:
+    """Lower bound of the histogram bin a pace falls in"""
+    return min(max(wpm, 0), WPM_BIN_CAP) // WPM_BIN_WIDTH * WPM_BIN_WIDTH
+
+
+def _bucket_summary(sessions: int, sums: Sequence) -> Dict:
+    """Averages for a bucket row of (sessions, sum_* columns in _SUM_COLUMNS order)"""
+    summary = {"sessions": sessions}
+    for (name, _), total in zip(SCORE_FIELDS, sums):
+        summary[name] = round(total / sessions, 2) if sessions else None
+    fillers, words, wpm = sums[len(SCORE_FIELDS):]
+    summary["wpm"] = round(wpm / sessions) if sessions else None
+    summary["fillersPer100Words"] = round(fillers * 100.0 / words, 2) if words else 0.0
+    return summary
+
+
+class ProgressRollups:
+    """Running sums per user and day/week/all-time bucket, plus WPM bins and extremes"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.db_path)
+        sum_columns = ",\n".join(f"                {column} REAL NOT NULL DEFAULT 0" for column in _SUM_COLUMNS)
+        counted_columns = [row[1] for row in self._conn.execute("PRAGMA table_info(progress_counted)")]
+        if counted_columns and "sums" not in counted_columns:
+            # Rollups from before per-session contributions were kept cannot
+            # take replacements; drop them and let the startup sync rebuild
+            self._conn.executescript(
+                """
+                DROP TABLE progress_counted;
+                DROP TABLE IF EXISTS progress_buckets;
+                DROP TABLE IF EXISTS progress_wpm;
+                DROP TABLE IF EXISTS progress_extremes;
+                """
+            )
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS progress_counted (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT,
+                day TEXT,
+                week TEXT,
+                timestamp TEXT,
+                overall_score REAL,
+                sums TEXT
+            );
+            CREATE INDEX IF NOT EXISTS progress_counted_user_score
+                ON progress_counted (user_id, overall_score);
+            CREATE TABLE IF NOT EXISTS progress_buckets (
+                user_id TEXT NOT NULL,
+                period TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                sessions INTEGER NOT NULL DEFAULT 0,
+{sum_columns},
+                PRIMARY KEY (user_id, period, bucket)
+            );
+            CREATE TABLE IF NOT EXISTS progress_wpm (
+                user_id TEXT NOT NULL,
+                bin INTEGER NOT NULL,
+                sessions INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, bin)
+            );
+            CREATE TABLE IF NOT EXISTS progress_extremes (
+                user_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                overall_score REAL NOT NULL,
+                timestamp TEXT NOT NULL,
+                PRIMARY KEY (user_id, kind)
+            );
+            """
+        )
+        self._conn.commit()
+
+        placeholders = ", ".join("?" * len(_SUM_COLUMNS))
+        additions = ", ".join(f"{column} = {column} + excluded.{column}" for column in _SUM_COLUMNS)
+        self._bucket_sql = (
+            f"INSERT INTO progress_buckets (user_id, period, bucket, sessions, {', '.join(_SUM_COLUMNS)})"
+            f" VALUES (?, ?, ?, 1, {placeholders})"
+            f" ON CONFLICT (user_id, period, bucket) DO UPDATE SET sessions = sessions + 1, {additions}"
+        )
+
+    def add(self, session_data: Dict):
+        """Fold one new session into the rollups"""
+        self.add_many([session_data])
+
+    def add_many(self, sessions: Iterable[Dict], replace: bool = False) -> int:
+        """
+        Fold new sessions into the rollups in one transaction
+
+        Each session is counted once: saving the same session again is a no-op,
+        unless `replace` is set, in which case the earlier version's
+        contribution is taken out before the new one is added. Sessions
+        without a timestamp or scores are recorded as seen but add nothing to
+        the averages.
+
+        Args:
+            sessions: Session records
+            replace: Whether a session already counted should be replaced by this version
+
+        Returns:
+            Number of sessions added
+        """
+        facts = []
+        for session_data in sessions:
+            if not session_data.get("sessionId"):
+                continue
+            try:
+                fact = session_facts(session_data)
+            except (AttributeError, TypeError, ValueError) as e:
+                # Counted as seen, like a session without scores, so rebuilds stay in step with the store
+                logger.warning("Session left out of the progress averages", extra={
+                    "session_id": session_data["sessionId"], "error": str(e)
+                })
+                fact = None
+            facts.append((session_data["sessionId"], fact))
+        return self.add_facts(facts, replace)
+
+    def add_facts(self, facts: Iterable[Tuple[str, Optional[Dict]]], replace: bool = False) -> int:
+        """
+        add_many for sessions already reduced by session_facts
+
+        Args:
+            facts: (session id, facts or None) pairs
+            replace: Whether a session already counted should be replaced by this version
+
+        Returns:
+            Number of sessions added
+        """
+        added = 0
+        replaced_users = set()
+        with self._lock:
+            for session_id, fact in facts:
+                previous = self._conn.execute(
+                    "SELECT user_id, day, week, sums FROM progress_counted WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if previous is not None:
+                    if not replace:
+                        continue
+                    if previous[3] is not None:
+                        self._subtract(previous[0], previous[1], previous[2], json.loads(previous[3]))
+                        replaced_users.add(previous[0])
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO progress_counted"
+                    " (session_id, user_id, day, week, timestamp, overall_score, sums) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, *self._counted_row(fact))
+                )
+                if fact is not None:
+                    self._add(fact)
+                    added += 1
+            for user_id in replaced_users:
+                self._recompute_extremes(user_id)
+            self._conn.commit()
+        return added
+
+    @staticmethod
+    def _counted_row(fact: Optional[Dict]) -> tuple:
+        if fact is None:
+            return (None, None, None, None, None, None)
+        overall_score = fact["sums"][len(SCORE_FIELDS) - 1]
+        return (fact["user_id"], fact["day"], fact["week"], fact["timestamp"], overall_score,
+                json.dumps(fact["sums"]))
+
+    def _subtract(self, user_id: str, day: str, week: str, sums: Sequence[float]):
+        """Take one session's contribution back out of its buckets and WPM bin"""
+        subtractions = ", ".join(f"{column} = {column} - ?" for column in _SUM_COLUMNS)
+        for period, bucket in (("day", day), ("week", week), ("all", "")):
+            self._conn.execute(
+                f"UPDATE progress_buckets SET sessions = sessions - 1, {subtractions}"
+                " WHERE user_id = ? AND period = ? AND bucket = ?",
+                (*sums, user_id, period, bucket)
+            )
+        self._conn.execute(
+            "UPDATE progress_wpm SET sessions = sessions - 1 WHERE user_id = ? AND bin = ?",
+            (user_id, wpm_bin(int(sums[-1])))
+        )
+        self._conn.execute("DELETE FROM progress_buckets WHERE user_id = ? AND sessions <= 0", (user_id,))
+        self._conn.execute("DELETE FROM progress_wpm WHERE user_id = ? AND sessions <= 0", (user_id,))
+
+    def _recompute_extremes(self, user_id: str):
+        """Best and worst sessions of a user, from the per-session scores (after a replacement)"""
+        self._conn.execute("DELETE FROM progress_extremes WHERE user_id = ?", (user_id,))
+        for kind, order in (("best", "DESC"), ("worst", "ASC")):
+            row = self._conn.execute(
+                "SELECT session_id, overall_score, timestamp FROM progress_counted"
+                " WHERE user_id = ? AND overall_score IS NOT NULL"
+                f" ORDER BY overall_score {order}, timestamp LIMIT 1",
+                (user_id,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "INSERT INTO progress_extremes (user_id, kind, session_id, overall_score, timestamp)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (user_id, kind, *row)
+                )
+
+    def _add(self, fact: Dict):
+        user_id = fact["user_id"]
+        for period, bucket in (("day", fact["day"]), ("week", fact["week"]), ("all", "")):
+            self._conn.execute(self._bucket_sql, (user_id, period, bucket, *fact["sums"]))
+        self._conn.execute(
+            "INSERT INTO progress_wpm (user_id, bin, sessions) VALUES (?, ?, 1)"
+            " ON CONFLICT (user_id, bin) DO UPDATE SET sessions = sessions + 1",
+            (user_id, wpm_bin(int(fact["sums"][-1])))
+        )
+        overall_score = fact["sums"][len(SCORE_FIELDS) - 1]
+        for kind, beats in (("best", ">"), ("worst", "<")):
+            self._conn.execute(
+                "INSERT INTO progress_extremes (user_id, kind, session_id, overall_score, timestamp)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (user_id, kind) DO UPDATE SET session_id = excluded.session_id,"
+                " overall_score = excluded.overall_score, timestamp = excluded.timestamp"
+                f" WHERE excluded.overall_score {beats} progress_extremes.overall_score",
+                (user_id, kind, fact["session_id"], overall_score, fact["timestamp"])
+            )
+
+    def count(self) -> int:
+        """Number of sessions the rollups have seen"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM progress_counted").fetchone()[0]
+
+    def rebuild(self, sessions: Iterable[Dict], batch_size: int = 500) -> int:
+        """
+        Recompute every rollup from the session store
+
+        Args:
+            sessions: Every stored session, e.g. SessionStore.iter_sessions()
+            batch_size: Number of sessions folded in per transaction
+
+        Returns:
+            Number of sessions added to the averages
+        """
+        with self._lock:
+            for table in ("progress_counted", "progress_buckets", "progress_wpm", "progress_extremes"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.commit()
+
+        counted = 0
+        batch = []
+        for session_data in sessions:
+            batch.append(session_data)
+            if len(batch) >= batch_size:
+                counted += self.add_many(batch)
+                batch = []
+        if batch:
+            counted += self.add_many(batch)
+        return counted
+
+    def progress(self, user_id: str = "", days: int = 30, weeks: int = 12,
+                 today: Optional[date] = None) -> Dict:
+        """
+        Progress summary for one user
+
+        Args:
+            user_id: Whose sessions to summarize ("" for sessions saved without a user)
+            days: Number of days of daily trend, ending today
+            weeks: Number of weeks of weekly trend, ending this week
+            today: Reference date (defaults to the server's local date)
+
+        Returns:
+            Dictionary with all-time averages, daily and weekly trends, the WPM
+            distribution and the best and worst sessions
+        """
+        today = today or date.today()
+        days = min(max(days, 1), MAX_DAYS)
+        weeks = min(max(weeks, 1), MAX_WEEKS)
+        first_day = (today - timedelta(days=days - 1)).isoformat()
+        first_week = iso_week(today - timedelta(weeks=weeks - 1))
+        columns = f"bucket, sessions, {', '.join(_SUM_COLUMNS)}"
+
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT {columns} FROM progress_buckets WHERE user_id = ? AND period = 'all'", (user_id,)
+            ).fetchone()
+            daily = self._conn.execute(
+                f"SELECT {columns} FROM progress_buckets"
+                " WHERE user_id = ? AND period = 'day' AND bucket >= ? ORDER BY bucket",
+                (user_id, first_day)
+            ).fetchall()
+            weekly = self._conn.execute(
+                f"SELECT {columns} FROM progress_buckets"
+                " WHERE user_id = ? AND period = 'week' AND bucket >= ? ORDER BY bucket",
+                (user_id, first_week)
+            ).fetchall()
+            wpm_bins = self._conn.execute(
+                "SELECT bin, sessions FROM progress_wpm WHERE user_id = ? ORDER BY bin", (user_id,)
+            ).fetchall()
+            extremes = self._conn.execute(
+                "SELECT kind, session_id, overall_score, timestamp FROM progress_extremes WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+
+        overall = _bucket_summary(total[1], total[2:]) if total else _bucket_summary(0, [0] * len(_SUM_COLUMNS))
+        sessions = overall.pop("sessions")
+        extremes = {kind: {"sessionId": session_id, "overall_score": score, "timestamp": timestamp}
+                    for kind, session_id, score, timestamp in extremes}
+        return {
+            "userId": user_id or None,
+            "sessions": sessions,
+            "averages": overall,
+            "daily": [{"date": row[0], **_bucket_summary(row[1], row[2:])} for row in daily],
+            "weekly": [{"week": row[0], **_bucket_summary(row[1], row[2:])} for row in weekly],
+            "wpmDistribution": [
+                {"min": low, "max": low + WPM_BIN_WIDTH if low < WPM_BIN_CAP else None, "sessions": count}
+                for low, count in wpm_bins
+            ],
+            "best": extremes.get("best"),
+            "worst": extremes.get("worst"),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ========================================
+# Command Line Entry Point
+# ========================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the Podium Pal progress rollups")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: recompute rollups from every stored session")
+    parser.add_argument("--db", default="sessions.db", help="Path to the rollup database")
+    parser.add_argument("--sessions", help="Session store directory or database (default: SESSION_STORE_PATH)")
+    args = parser.parse_args()
+
+    rollups = ProgressRollups(Path(args.db))
+    store = session_store_from_env(Path(args.sessions) if args.sessions else None)
+    count = rollups.rebuild(store.iter_sessions())
+    store.close()
+    rollups.close()
+    print(f"✓ Rolled up {count} sessions into {args.db}")
@@ -0,0 +1,261 @@
+"""
+Podium Pal Backend - Prompt Templates
+======================================
+Gemini prompts, compiled once per feedback personality. A compiled template
+holds every static piece of the prompt (coaching instructions, the
+personality section, scoring rubric and response format) already joined, so
+building a prompt per request only concatenates the request's own fields.
+
+A template can also render its static text as a system instruction and the
+request fields as the message, for SDK versions that accept a system
+instruction on the model.
+"""
+
+from typing import Dict, Optional, Tuple
+
+DEFAULT_PERSONALITY = "supportive"
+
+PERSONALITY_STYLES: Dict[str, Dict[str, str]] = {
+    "supportive": {
+        "tone": "encouraging and nurturing",
+        "approach": "Focus on positive reinforcement and gentle guidance. Celebrate strengths enthusiastically and frame improvements as opportunities for growth.",
+        "example": "Be warm, use phrases like 'Great job on...', 'You're making wonderful progress...', 'Consider trying...'"
+    },
+    "direct": {
+        "tone": "straightforward and concise",
+        "approach": "Get straight to the point. Be clear and efficient with feedback. No fluff, just facts and actionable items.",
+        "example": "Use bullet points, be brief, focus on specific actions: 'Do this', 'Avoid that', 'Change X to Y'"
+    },
+    "critical": {
+        "tone": "analytical and detailed",
+        "approach": "Provide thorough, in-depth analysis. Point out subtle issues and areas for improvement with precise observations.",
+        "example": "Be specific about what could be better, analyze patterns, provide detailed reasoning for each score"
+    },
+    "humorous": {
+        "tone": "light-hearted and fun",
+        "approach": "Keep it fun and engaging. Use wit and gentle humor to make feedback memorable and enjoyable. Still be helpful!",
+        "example": "Use playful language, clever metaphors, keep it upbeat while still being useful"
+    },
+    "mentor": {
+        "tone": "wise and reflective",
+        "approach": "Share insights like a seasoned coach. Use wisdom from experience, ask thought-provoking questions, guide self-discovery.",
+        "example": "Use phrases like 'Consider...', 'Reflect on...', 'In my experience...', 'What if you tried...'"
+    },
+    "professional": {
+        "tone": "formal and structured",
+        "approach": "Maintain business formality. Use professional language, systematic analysis, and corporate communication style.",
+        "example": "Use formal language, structured feedback, professional terminology, organized sections"
+    }
+}
+
+FEEDBACK_INTRO = (
+    "You are an expert public speaking coach analyzing a speech recording. Your goal is to provide "
+    "constructive, actionable feedback to help the speaker improve."
+)
+
+FEEDBACK_TASK = """**CRITICAL SCORING INSTRUCTIONS:**
+- Score HONESTLY based on the actual content quality
+- DO NOT give similar scores to different speeches
+- Each speech is unique and should have DISTINCT scores
+- Poor speeches should score 40-60, average 60-75, good 75-85, excellent 85-95+
+- Be CRITICAL but FAIR - look for actual issues
+- Consider speech length: very short speeches (<30 words) should generally score lower
+
+**YOUR TASK:**
+Analyze this SPECIFIC speech across multiple dimensions:
+
+1. **CLARITY SCORE** (0-100):
+   - How clearly did the speaker communicate their intended message?
+   - Consider: organization, word choice, directness, coherence
+
+2. **CONFIDENCE SCORE** (0-100):
+   - How confident and assertive does the speaker sound?
+   - Consider: use of hedging language, filler words, assertive statements
+
+3. **ENGAGEMENT SCORE** (0-100):
+   - How engaging and interesting is the content?
+   - Consider: storytelling, examples, energy, audience connection
+
+4. **STRUCTURE SCORE** (0-100):
+   - How well-organized is the speech?
+   - Consider: logical flow, clear beginning/middle/end, transitions
+
+5. **OVERALL SCORE** (0-10, can use decimals like 8.5):
+   - Holistic evaluation of the speech quality
+   - Consider all factors: clarity, confidence, engagement, structure
+
+6. **FILLER WORDS & VERBAL CRUTCHES**:
+   - Note excessive use of: um, uh, like, you know, so, basically, actually, literally, kind of, sort of
+
+7. **STRENGTHS** (3-4 specific points):
+   - What did the speaker do well?
+   - Be specific with examples
+
+8. **IMPROVEMENTS** (3-4 specific actionable points):
+   - What can be improved?
+   - Be specific and actionable
+
+9. **CONSTRUCTIVE FEEDBACK** (2-3 sentences):
+   - Main improvement opportunity with actionable advice
+
+**IMPORTANT GUIDELINES:**
+- Be constructive and encouraging, not harsh
+- Focus on actionable improvements
+- Acknowledge what they did well
+- Use specific examples from their speech
+- Keep feedback concise and prioritized
+
+**RESPONSE FORMAT:**
+Return your analysis as a valid JSON object with this exact structure:
+{
+  "summary": "one or two sentence summary of what the speaker communicated",
+  "clarityScore": number_between_0_and_100,
+  "confidenceScore": number_between_0_and_100,
+  "engagementScore": number_between_0_and_100,
+  "structureScore": number_between_0_and_100,
+  "overall_score": number_between_0_and_10_with_decimals,
+  "tip": "detailed constructive feedback with specific actionable advice (2-3 sentences)",
+  "strengths": ["strength 1", "strength 2", "strength 3"],
+  "improvements": ["improvement 1", "improvement 2", "improvement 3"]
+}
+
+CRITICAL: Return ONLY the JSON object, no other text before or after. Ensure the JSON is valid and properly formatted."""
+
+SEGMENT_POSITIONS = ("the OPENING part", "a MIDDLE part", "the CLOSING part")
+
+SEGMENT_RESPONSE_FORMAT = """**RESPONSE FORMAT:**
+Return ONLY a valid JSON object with this exact structure:
+{
+  "summary": "one sentence summary of what this part communicated",
+  "clarityScore": number_between_0_and_100,
+  "confidenceScore": number_between_0_and_100,
+  "engagementScore": number_between_0_and_100,
+  "structureScore": number_between_0_and_100,
+  "overall_score": number_between_0_and_10_with_decimals,
+  "tip": "constructive feedback with specific actionable advice",
+  "strengths": ["strength 1", "strength 2"],
+  "improvements": ["improvement 1", "improvement 2"]
+}"""
+
+
+def build_personality_instruction(ai_personality: str) -> str:
+    """
+    Prompt section describing the feedback personality
+
+    Args:
+        ai_personality: The feedback style (unknown styles fall back to supportive)
+
+    Returns:
+        Personality instruction text for the prompt
+    """
+    personality_config = PERSONALITY_STYLES.get(ai_personality, PERSONALITY_STYLES[DEFAULT_PERSONALITY])
+    return f"""
+**FEEDBACK PERSONALITY: {ai_personality.upper()}**
+- Tone: {personality_config['tone']}
+- Approach: {personality_config['approach']}
+- Style: {personality_config['example']}
+
+IMPORTANT: Maintain this personality consistently throughout ALL your feedback (summary, strengths, improvements, and constructive tip).
+"""
+
+
+def _segment_task(first: bool, last: bool) -> str:
+    structure = "logical flow and transitions"
+    if first:
+        structure += " and a clear opening"
+    if last:
+        structure += " and a clear conclusion"
+    return f"""**YOUR TASK:**
+Score this part HONESTLY (poor 40-60, average 60-75, good 75-85, excellent 85-95+) on:
+1. **CLARITY SCORE** (0-100): organization, word choice, directness, coherence
+2. **CONFIDENCE SCORE** (0-100): hedging language, filler words, assertive statements
+3. **ENGAGEMENT SCORE** (0-100): storytelling, examples, energy, audience connection
+4. **STRUCTURE SCORE** (0-100): {structure}
+5. **OVERALL SCORE** (0-10, can use decimals like 8.5)
+Also give 2-3 specific strengths, 2-3 specific actionable improvements, and one constructive tip (1-2 sentences), using examples from this part.
+
+{SEGMENT_RESPONSE_FORMAT}"""
+
+
+class PromptTemplate:
+    """
+    Feedback and segment prompts for one personality, with the static text
+    joined once
+
+    Args:
+        ai_personality: Personality name as the client sent it (shown in the
+            prompt; unknown names use the supportive style)
+    """
+
+    def __init__(self, ai_personality: str):
+        self.ai_personality = ai_personality
+        personality = build_personality_instruction(ai_personality)
+        self._feedback_head = f"{FEEDBACK_INTRO}\n\n{personality}\n\n**SPEAKER'S GOAL:** "
+        self._feedback_tail = "\n\n" + FEEDBACK_TASK
+        self.feedback_system_instruction = f"{FEEDBACK_INTRO}\n\n{personality}\n{FEEDBACK_TASK}"
+        self._segment_personality = f"\n\n{personality}\n\n**SPEAKER'S GOAL:** "
+        self._segment_tasks = {
+            (first, last): "\n\n" + _segment_task(first, last)
+            for first in (False, True) for last in (False, True)
+        }
+
+    def feedback_prompt(self, user_goal: str, transcript: str, duration_context: str, audio_note: str) -> str:
+        """Whole prompt for a speech, static instructions included"""
+        return "".join((
+            self._feedback_head, user_goal, "\n\n**TRANSCRIPT TO ANALYZE:**\n", transcript, "\n",
+            duration_context, "\n", audio_note, self._feedback_tail
+        ))
+
+    def feedback_message(self, user_goal: str, transcript: str, duration_context: str, audio_note: str) -> str:
+        """Only the request's fields, for use with feedback_system_instruction"""
+        return "".join((
+            "**SPEAKER'S GOAL:** ", user_goal, "\n\n**TRANSCRIPT TO ANALYZE:**\n", transcript, "\n",
+            duration_context, "\n", audio_note
+        ))
+
+    def segment_prompt(self, segment: str, user_goal: str, index: int, is_last: bool, metrics_note: str = "") -> str:
+        """Whole prompt for one segment of a long transcript, with metrics of that segment alone"""
+        first = index == 0
+        position = SEGMENT_POSITIONS[0] if first else SEGMENT_POSITIONS[2] if is_last else SEGMENT_POSITIONS[1]
+        part = str(index + 1)
+        return "".join((
+            "You are an expert public speaking coach analyzing a long speech that has been split into parts. "
+            "You are analyzing part ", part, ", which is ", position,
+            " of the speech. Other parts are analyzed separately, so judge only this part.",
+            self._segment_personality, user_goal, "\n\n**TRANSCRIPT PART ", part, ":**\n", segment, "\n",
+            metrics_note,
+            self._segment_tasks[(first, is_last)]
+        ))
+
+
+class PromptTemplates:
+    """
+    Compiled templates for the known personalities
+
+    Unknown personality names get a template built for the request and not
+    kept, so arbitrary client input cannot grow the cache.
+    """
+
+    def __init__(self, personalities=tuple(PERSONALITY_STYLES)):
+        self._templates: Dict[str, PromptTemplate] = {name: PromptTemplate(name) for name in personalities}
+
+    def get(self, ai_personality: str) -> PromptTemplate:
+        template = self._templates.get(ai_personality)
+        return template if template is not None else PromptTemplate(ai_personality)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+
+def split_for_system_instruction(template: PromptTemplate, user_goal: str, transcript: str,
+                                 duration_context: str, audio_note: str,
+                                 use_system_instruction: bool) -> Tuple[Optional[str], str]:
+    """
+    The (system instruction, message) pair to send for a speech
+
+    Without system instruction support the whole prompt is the message.
+    """
+    if use_system_instruction:
+        return (template.feedback_system_instruction,
+                template.feedback_message(user_goal, transcript, duration_context, audio_note))
+    return None, template.feedback_prompt(user_goal, transcript, duration_context, audio_note)
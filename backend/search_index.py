@@ -0,0 +1,332 @@
+"""
+Podium Pal Backend - Search Index
+==================================
+SQLite FTS5 inverted index over session transcripts, goals and feedback text
+for /search: BM25-ranked results, phrase queries, score and personality
+filters and highlighted snippets, without opening any session file. Kept up
+to date as sessions are saved and rebuildable from the session store:
+
+    python search_index.py rebuild
+"""
+
+import argparse
+import html
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from session_store import session_store_from_env
+from worker_coordination import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+# (FTS column, BM25 weight); goals and summaries are short, so a hit there says more
+SEARCH_COLUMNS = (
+    ("transcript", 1.0),
+    ("goal", 3.0),
+    ("summary", 2.0),
+    ("strengths", 1.5),
+    ("improvements", 1.5),
+)
+_TEXT_COLUMNS = " ".join(name for name, _ in SEARCH_COLUMNS)
+
+# Default cap on the matches BM25 ranks per query: the most recent ones. A
+# query matching more documents is ranked over only those and reported as
+# truncated; 0 ranks every match (a word found in nearly every session then
+# makes each query score the whole corpus).
+MAX_RANKED_MATCHES = 1000
+
+SNIPPET_TOKENS = 16
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+# FTS5 brackets matches with these, which cannot occur in escaped text
+_MARK_OPEN = "\x02"
+_MARK_CLOSE = "\x03"
+_STRIP_MARKERS = {ord(_MARK_OPEN): None, ord(_MARK_CLOSE): None}
+
+_QUERY_PART = re.compile(r'"([^"]*)"?|(\S+)')
+_TERM = re.compile(r"\w+")
+
+
+def build_match_expression(query: str) -> str:
+    """
+    Turn a user query into an FTS5 MATCH expression
+
+    "Double-quoted" text is a phrase; every other word is a term. All phrases
+    and terms must match. A trailing * on a word makes it a prefix term.
+    User input never reaches FTS5 query syntax unquoted, so stray operators
+    or punctuation cannot cause syntax errors.
+
+    Raises:
+        ValueError: If the query contains no searchable words
+    """
+    parts = []
+    for match in _QUERY_PART.finditer(query):
+        phrase, word = match.groups()
+        if phrase is not None:
+            words = _TERM.findall(phrase)
+            if words:
+                parts.append('"' + " ".join(words) + '"')
+            continue
+        for term in _TERM.findall(word):
+            parts.append(f'"{term}"')
+        if word.endswith("*") and parts and _TERM.search(word):
+            parts[-1] += "*"
+    if not parts:
+        raise ValueError("Search query has no searchable words")
+    return " AND ".join(parts)
+
+
+def search_document(session_data: Dict) -> Dict:
+    """
+    Extract the searchable text and filter fields from a full session record
+
+    Returns:
+        Dictionary with session_id, timestamp, overall_score, ai_personality and the text columns
+    """
+    feedback = session_data.get("feedback") or {}
+    score = feedback.get("overall_score")
+    text = {
+        "transcript": session_data.get("transcript") or "",
+        "goal": session_data.get("userGoal") or "",
+        "summary": feedback.get("aiSummary") or "",
+        "strengths": "\n".join(feedback.get("strengths") or []),
+        "improvements": "\n".join(feedback.get("improvements") or []),
+    }
+    return {
+        "session_id": session_data.get("sessionId"),
+        "timestamp": session_data.get("timestamp", ""),
+        "overall_score": float(score) if isinstance(score, (int, float)) else None,
+        "ai_personality": session_data.get("aiPersonality") or "",
+        # Stored text must not contain the snippet match markers
+        **{name: value.translate(_STRIP_MARKERS) for name, value in text.items()},
+    }
+
+
+def _highlight(snippet: str) -> str:
+    """Escape a snippet for HTML, then turn the FTS5 match markers into <mark> tags"""
+    escaped = html.escape(snippet, quote=False)
+    return escaped.replace(_MARK_OPEN, HIGHLIGHT_OPEN).replace(_MARK_CLOSE, HIGHLIGHT_CLOSE)
+
+
+class SearchIndex:
+    """
+    Full-text index of sessions
+
+    Filter fields live in an ordinary table keyed by the FTS rowid, so a
+    session can be replaced by rowid and filters are a primary-key lookup per
+    matching document. The personality is also indexed as an FTS column (never
+    searched by query words, weight 0) so that filter is a doclist
+    intersection inside FTS5 rather than a lookup per match.
+    """
+
+    def __init__(self, db_path: Path, max_ranked_matches: int = MAX_RANKED_MATCHES):
+        self.db_path = Path(db_path)
+        self.max_ranked_matches = max(0, max_ranked_matches)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.db_path)
+        columns = ", ".join(name for name, _ in SEARCH_COLUMNS) + ", ai_personality"
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS search_docs (
+                doc_id INTEGER PRIMARY KEY,
+                session_id TEXT NOT NULL UNIQUE,
+                timestamp TEXT NOT NULL,
+                overall_score REAL,
+                ai_personality TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+                {columns}, tokenize = 'porter unicode61'
+            );
+            """
+        )
+        self._conn.commit()
+        self._weights = ", ".join(str(weight) for _, weight in SEARCH_COLUMNS) + ", 0.0"
+
+    def upsert(self, session_data: Dict):
+        """Add or replace one session"""
+        self.upsert_many([session_data])
+
+    def upsert_many(self, sessions: Iterable[Dict]) -> int:
+        """
+        Add or replace several sessions in one transaction
+
+        A session whose fields have the wrong types is logged and left out
+        rather than failing the batch (or a rebuild at startup).
+
+        Returns:
+            Number of sessions written
+        """
+        documents = []
+        for session_data in sessions:
+            try:
+                documents.append(search_document(session_data))
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.warning("Session left out of the search index", extra={
+                    "session_id": session_data.get("sessionId"), "error": str(e)
+                })
+        self.upsert_documents(documents)
+        return len(documents)
+
+    def upsert_documents(self, documents: Iterable[Dict]):
+        """Add or replace sessions already reduced by search_document, in one transaction"""
+        names = [name for name, _ in SEARCH_COLUMNS] + ["ai_personality"]
+        with self._lock:
+            for doc in documents:
+                if not doc["session_id"]:
+                    continue
+                row = self._conn.execute(
+                    "SELECT doc_id FROM search_docs WHERE session_id = ?", (doc["session_id"],)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("DELETE FROM search_fts WHERE rowid = ?", (row[0],))
+                    self._conn.execute("DELETE FROM search_docs WHERE doc_id = ?", (row[0],))
+                cursor = self._conn.execute(
+                    "INSERT INTO search_docs (session_id, timestamp, overall_score, ai_personality)"
+                    " VALUES (?, ?, ?, ?)",
+                    (doc["session_id"], doc["timestamp"], doc["overall_score"], doc["ai_personality"])
+                )
+                self._conn.execute(
+                    f"INSERT INTO search_fts (rowid, {', '.join(names)}) VALUES (?, {', '.join('?' * len(names))})",
+                    (cursor.lastrowid, *(doc[name] for name in names))
+                )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_docs").fetchone()[0]
+
+    def rebuild(self, sessions: Iterable[Dict], batch_size: int = 500) -> int:
+        """
+        Replace the index contents with text read from the session store
+
+        Args:
+            sessions: Every stored session, e.g. SessionStore.iter_sessions()
+            batch_size: Number of sessions written per transaction
+
+        Returns:
+            Number of sessions indexed
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM search_docs")
+            self._conn.execute("DELETE FROM search_fts")
+            self._conn.commit()
+
+        indexed = 0
+        batch = []
+        for session_data in sessions:
+            batch.append(session_data)
+            if len(batch) >= batch_size:
+                indexed += self.upsert_many(batch)
+                batch = []
+        if batch:
+            indexed += self.upsert_many(batch)
+        with self._lock:
+            # Merge the b-trees written batch by batch into one for faster queries
+            self._conn.execute("INSERT INTO search_fts (search_fts) VALUES ('optimize')")
+            self._conn.commit()
+        return indexed
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, min_score: Optional[float] = None,
+               max_score: Optional[float] = None,
+               personality: Optional[str] = None) -> Tuple[List[Dict], bool, bool]:
+        """
+        Ranked full-text search
+
+        Args:
+            query: Words and "quoted phrases", all of which must match
+            limit: Maximum number of results
+            offset: Number of results to skip
+            min_score: Inclusive lower bound on overall_score
+            max_score: Inclusive upper bound on overall_score
+            personality: Only sessions with this AI personality
+
+        Returns:
+            (results, has_more, truncated), best match first. Each result has
+            the session metadata, its relevance (higher is better) and an
+            HTML snippet: the text is escaped and the matched words are
+            wrapped in <mark> tags. `truncated` is True when the query matched
+            more than max_ranked_matches sessions, so only the most recently
+            indexed ones were ranked and older matches are not returned.
+
+        Raises:
+            ValueError: If the query has no searchable words
+        """
+        expression = f"{{{_TEXT_COLUMNS}}} : ({build_match_expression(query)})"
+        if personality:
+            expression += ' AND ai_personality : "' + personality.replace('"', '""') + '"'
+        clauses = ["search_fts MATCH ?"]
+        filter_params: List = [expression]
+        if min_score is not None:
+            clauses.append("d.overall_score >= ?")
+            filter_params.append(min_score)
+        if max_score is not None:
+            clauses.append("d.overall_score <= ?")
+            filter_params.append(max_score)
+        if personality:
+            # The FTS match narrows by token; this keeps the filter an exact match
+            clauses.append("d.ai_personality = ?")
+            filter_params.append(personality)
+        where = " AND ".join(clauses)
+        sql = (
+            "SELECT d.session_id, d.timestamp, d.overall_score, d.ai_personality,"
+            f" bm25(search_fts, {self._weights}) AS rank,"
+            f" snippet(search_fts, -1, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', {SNIPPET_TOKENS}),"
+            " search_fts.goal"
+            " FROM search_fts JOIN search_docs d ON d.doc_id = search_fts.rowid"
+            f" WHERE search_fts.rowid > ? AND {where}"
+            # Fetch one extra row to know whether another page exists
+            " ORDER BY rank LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            oldest_excluded = None
+            if self.max_ranked_matches:
+                # FTS5 walks matches in rowid order and stops at the OFFSET, so
+                # finding the newest match beyond the cap is cheap
+                oldest_excluded = self._conn.execute(
+                    "SELECT search_fts.rowid FROM search_fts JOIN search_docs d ON d.doc_id = search_fts.rowid"
+                    f" WHERE {where} ORDER BY search_fts.rowid DESC LIMIT 1 OFFSET ?",
+                    filter_params + [self.max_ranked_matches]
+                ).fetchone()
+            lower_bound = oldest_excluded[0] if oldest_excluded else 0
+            rows = self._conn.execute(sql, [lower_bound] + filter_params + [limit + 1, offset]).fetchall()
+
+        has_more = len(rows) > limit
+        results = [
+            {
+                "session_id": row[0],
+                "timestamp": row[1],
+                "overall_score": row[2],
+                "ai_personality": row[3],
+                "relevance": round(-row[4], 4),
+                "snippet": _highlight(row[5]),
+                "goal": row[6] or "General Speech",
+            }
+            for row in rows[:limit]
+        ]
+        return results, has_more, oldest_excluded is not None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ========================================
+# Command Line Entry Point
+# ========================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the Podium Pal search index")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: re-index every stored session")
+    parser.add_argument("--db", default="sessions.db", help="Path to the index database")
+    parser.add_argument("--sessions", help="Session store directory or database (default: SESSION_STORE_PATH)")
+    args = parser.parse_args()
+
+    index = SearchIndex(Path(args.db))
+    store = session_store_from_env(Path(args.sessions) if args.sessions else None)
+    count = index.rebuild(store.iter_sessions())
+    store.close()
+    index.close()
+    print(f"✓ Indexed {count} sessions for search into {args.db}")
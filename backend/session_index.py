@@ -0,0 +1,257 @@
+"""
+Podium Pal Backend - Session Index
+===================================
+SQLite index of session metadata so /recordings can page, sort and filter
+without opening every session file. Kept up to date as sessions are saved
+and rebuildable from the session store at any time:
+
+    python session_index.py rebuild
+"""
+
+import argparse
+import base64
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from session_store import session_store_from_env
+from worker_coordination import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+SORT_COLUMNS = {
+    "timestamp": "timestamp",
+    "score": "COALESCE(overall_score, -1)",
+}
+
+
+def summarize_session(session_data: Dict, session_id: Optional[str] = None) -> Dict:
+    """
+    Extract the recordings-list fields from a full session record
+
+    Args:
+        session_data: Parsed session file contents
+        session_id: Session id to use if the record does not carry one
+
+    Returns:
+        Dictionary with the fields stored in the index
+    """
+    feedback = session_data.get("feedback") or {}
+    transcript = session_data.get("transcript") or ""
+    score = feedback.get("overall_score")
+    return {
+        "session_id": session_data.get("sessionId") or session_id,
+        "timestamp": session_data.get("timestamp", ""),
+        "goal": session_data.get("userGoal") or "General Speech",
+        "overall_score": float(score) if isinstance(score, (int, float)) else None,
+        "ai_personality": session_data.get("aiPersonality"),
+        "transcript_preview": transcript[:100] + "..." if transcript else ""
+    }
+
+
+def _encode_cursor(sort_value, session_id: str) -> str:
+    raw = json.dumps([sort_value, session_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple:
+    try:
+        sort_value, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return sort_value, session_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class SessionIndex:
+    """Session metadata table with keyset pagination"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.db_path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                goal TEXT,
+                overall_score REAL,
+                ai_personality TEXT,
+                transcript_preview TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_timestamp ON sessions (timestamp, session_id);
+            CREATE INDEX IF NOT EXISTS idx_sessions_score ON sessions (COALESCE(overall_score, -1), session_id);
+            CREATE INDEX IF NOT EXISTS idx_sessions_personality ON sessions (ai_personality, timestamp);
+            """
+        )
+        self._conn.commit()
+
+    def upsert(self, session_data: Dict):
+        """Add or update one session"""
+        self.upsert_many([session_data])
+
+    def upsert_many(self, sessions: Iterable[Dict]) -> int:
+        """
+        Add or update several sessions in one transaction
+
+        A session whose fields have the wrong types is logged and left out
+        rather than failing the batch (or a rebuild at startup).
+
+        Returns:
+            Number of sessions written
+        """
+        summaries = []
+        for session_data in sessions:
+            try:
+                summaries.append(summarize_session(session_data))
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.warning("Session left out of the index", extra={
+                    "session_id": session_data.get("sessionId"), "error": str(e)
+                })
+        self.upsert_summaries(summaries)
+        return len(summaries)
+
+    def upsert_summaries(self, summaries: Iterable[Dict]):
+        """Add or update sessions already reduced by summarize_session, in one transaction"""
+        rows = [
+            (info["session_id"], info["timestamp"], info["goal"], info["overall_score"],
+             info["ai_personality"], info["transcript_preview"])
+            for info in summaries
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sessions"
+                " (session_id, timestamp, goal, overall_score, ai_personality, transcript_preview)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def rebuild(self, sessions: Iterable[Dict], batch_size: int = 500) -> int:
+        """
+        Replace the index contents with metadata read from the session store
+
+        Args:
+            sessions: Every stored session, e.g. SessionStore.iter_sessions()
+            batch_size: Number of sessions written per transaction
+
+        Returns:
+            Number of sessions indexed
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions")
+            self._conn.commit()
+
+        indexed = 0
+        batch = []
+        for session_data in sessions:
+            batch.append(session_data)
+            if len(batch) >= batch_size:
+                indexed += self.upsert_many(batch)
+                batch = []
+        if batch:
+            indexed += self.upsert_many(batch)
+        return indexed
+
+    def query(self, limit: Optional[int] = None, cursor: Optional[str] = None, sort: str = "timestamp",
+              order: str = "desc", personality: Optional[str] = None, date_from: Optional[str] = None,
+              date_to: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        List sessions from the index
+
+        Args:
+            limit: Maximum number of rows (None returns everything)
+            cursor: Opaque cursor from a previous page
+            sort: "timestamp" or "score"
+            order: "desc" or "asc"
+            personality: Only sessions with this AI personality
+            date_from: Inclusive lower bound on the ISO timestamp
+            date_to: Inclusive upper bound on the ISO timestamp
+
+        Returns:
+            (rows, next_cursor) where next_cursor is None on the last page
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unsupported order: {order}")
+
+        sort_expr = SORT_COLUMNS[sort]
+        clauses = []
+        params: List = []
+        if personality:
+            clauses.append("ai_personality = ?")
+            params.append(personality)
+        if date_from:
+            clauses.append("timestamp >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("timestamp <= ?")
+            params.append(date_to)
+        if cursor:
+            sort_value, last_id = _decode_cursor(cursor)
+            op = "<" if order == "desc" else ">"
+            clauses.append(f"({sort_expr} {op} ? OR ({sort_expr} = ? AND session_id {op} ?))")
+            params.extend([sort_value, sort_value, last_id])
+
+        sql = (
+            f"SELECT session_id, timestamp, goal, overall_score, ai_personality, transcript_preview,"
+            f" {sort_expr} FROM sessions"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {sort_expr} {order.upper()}, session_id {order.upper()}"
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][6], rows[-1][0])
+
+        recordings = [
+            {
+                "session_id": row[0],
+                "timestamp": row[1],
+                "goal": row[2],
+                "overall_score": row[3] if row[3] is not None else "N/A",
+                "ai_personality": row[4] or "N/A",
+                "transcript_preview": row[5]
+            }
+            for row in rows
+        ]
+        return recordings, next_cursor
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ========================================
+# Command Line Entry Point
+# ========================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the Podium Pal session index")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: re-index every stored session")
+    parser.add_argument("--db", default="sessions.db", help="Path to the index database")
+    parser.add_argument("--sessions", help="Session store directory or database (default: SESSION_STORE_PATH)")
+    args = parser.parse_args()
+
+    index = SessionIndex(Path(args.db))
+    store = session_store_from_env(Path(args.sessions) if args.sessions else None)
+    count = index.rebuild(store.iter_sessions())
+    store.close()
+    index.close()
+    print(f"✓ Indexed {count} sessions into {args.db}")
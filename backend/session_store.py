@@ -0,0 +1,511 @@
+"""
+Podium Pal Backend - Session Store
+===================================
+Where full session records live. Three interchangeable backends:
+
+- ShardedFileStore: one compact (optionally gzip or zstd compressed) file per
+  session under 256 hash-named shard directories, written to a temporary file
+  and renamed into place so a crash never leaves a truncated session
+- SQLiteSessionStore: one row per session in an embedded database
+- MemorySessionStore: a dictionary, for tests and benchmarks
+
+Sessions saved by earlier versions (pretty-printed <session_id>.json files in
+one flat directory) are still read by ShardedFileStore; move them into the
+configured store with:
+
+    python session_store.py migrate --from feedback_sessions
+"""
+
+import abc
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for the "zstd" codec
+    zstandard = None
+
+from worker_coordination import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+
+# ========================================
+# Encoding
+# ========================================
+
+class Codec:
+    """How a session is turned into bytes: compact JSON, optionally compressed"""
+
+    def __init__(self, name: str, suffix: str, compress=None, decompress=None):
+        self.name = name
+        self.suffix = suffix
+        self._compress = compress
+        self._decompress = decompress
+
+    def encode(self, session_data: Dict) -> bytes:
+        raw = json.dumps(session_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return self._compress(raw) if self._compress else raw
+
+    def decode(self, data: bytes) -> Dict:
+        return json.loads(self._decompress(data) if self._decompress else data)
+
+
+CODECS: Dict[str, Codec] = {
+    "json": Codec("json", ".json"),
+    # Level 5 is most of level 9's ratio on JSON text at about twice the speed
+    "gzip": Codec("gzip", ".json.gz", lambda raw: gzip.compress(raw, compresslevel=5), gzip.decompress),
+}
+if zstandard is not None:
+    CODECS["zstd"] = Codec(
+        "zstd", ".json.zst",
+        zstandard.ZstdCompressor(level=3).compress,
+        lambda data: zstandard.ZstdDecompressor().decompress(data)
+    )
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Look up a codec by name
+
+    Raises:
+        ValueError: For unknown codecs, or "zstd" without the zstandard package
+    """
+    if name == "zstd" and zstandard is None:
+        raise ValueError('The "zstd" session codec needs the zstandard package (pip install zstandard)')
+    if name not in CODECS:
+        raise ValueError(f"Unknown session codec {name!r} (expected one of: {', '.join(sorted(CODECS))})")
+    return CODECS[name]
+
+
+def is_valid_session_id(session_id: str) -> bool:
+    """Session ids become file names, so refuse anything that could leave the directory"""
+    return bool(session_id) and not session_id.startswith(".") and "/" not in session_id and "\\" not in session_id
+
+
+# ========================================
+# Backends
+# ========================================
+
+class SessionStore(abc.ABC):
+    """
+    Storage interface for full session records, keyed by sessionId
+
+    Sessions are written once by the analysis paths and never modified, so
+    saving an existing id simply replaces it.
+    """
+
+    backend = "base"
+
+    def save(self, session_data: Dict):
+        """Store one session"""
+        self.save_many([session_data])
+
+    @abc.abstractmethod
+    def save_many(self, sessions: Iterable[Dict]):
+        """Store several sessions"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load(self, session_id: str) -> Optional[Dict]:
+        """The stored session, or None if there is none with this id"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_sessions(self) -> Iterator[Dict]:
+        """Yield every readable session; unreadable ones are logged and skipped"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def count(self) -> int:
+        """Number of stored sessions"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {"backend": self.backend}
+
+    def close(self):
+        pass
+
+
+class ShardedFileStore(SessionStore):
+    """
+    One file per session at <root>/<shard>/<session_id><suffix>
+
+    The shard is the first byte of a hash of the id in hex, which spreads
+    sessions evenly over 256 directories whatever the id format. Files are
+    written to a hidden temporary name in the same directory and renamed over
+    the final name, which is atomic on POSIX and Windows. With `fsync` the data
+    is also flushed to disk before the rename, which protects against power
+    loss as well as crashes at the cost of a slower write.
+
+    Args:
+        root: Base directory
+        codec: Codec name for new files; files in any other codec are still read
+        fsync: Flush each file to disk before renaming it into place
+    """
+
+    backend = "fs"
+
+    def __init__(self, root: Path, codec: str = "json", fsync: bool = False):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.codec = get_codec(codec)
+        self.fsync = fsync
+        # Configured codec first, so lookups usually succeed on the first try
+        self._read_codecs = [self.codec] + [c for c in CODECS.values() if c is not self.codec]
+        self._shards_created = set()
+        self._lock = threading.Lock()
+        self._unreadable = 0
+
+    @staticmethod
+    def shard_for(session_id: str) -> str:
+        return hashlib.blake2b(session_id.encode("utf-8"), digest_size=1).hexdigest()
+
+    def _shard_dir(self, session_id: str) -> Path:
+        shard = self.shard_for(session_id)
+        shard_dir = self.root / shard
+        if shard not in self._shards_created:
+            shard_dir.mkdir(exist_ok=True)
+            self._shards_created.add(shard)
+        return shard_dir
+
+    def save_many(self, sessions: Iterable[Dict]):
+        for session_data in sessions:
+            session_id = session_data["sessionId"]
+            if not is_valid_session_id(session_id):
+                raise ValueError(f"Invalid session id {session_id!r}")
+            shard_dir = self._shard_dir(session_id)
+            final_path = shard_dir / f"{session_id}{self.codec.suffix}"
+            temp_path = shard_dir / f".{session_id}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(self.codec.encode(session_data))
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(temp_path, final_path)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+            # A copy written earlier in another codec would be listed (and loaded) alongside this one
+            for codec in self._read_codecs[1:]:
+                (shard_dir / f"{session_id}{codec.suffix}").unlink(missing_ok=True)
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        if not is_valid_session_id(session_id):
+            return None
+        shard_dir = self.root / self.shard_for(session_id)
+        for codec in self._read_codecs:
+            try:
+                with open(shard_dir / f"{session_id}{codec.suffix}", "rb") as f:
+                    return codec.decode(f.read())
+            except FileNotFoundError:
+                continue
+        # Flat layout from before the store existed
+        try:
+            with open(self.root / f"{session_id}.json", "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def _session_files(self) -> Iterator[os.DirEntry]:
+        with os.scandir(self.root) as entries:
+            shard_dirs = []
+            for entry in entries:
+                if entry.is_dir() and len(entry.name) == 2:
+                    shard_dirs.append(entry.path)
+                elif entry.name.endswith(".json") and not entry.name.startswith("."):
+                    # A flat file migrated without --remove is shadowed by its sharded copy
+                    if not self._is_sharded(entry.name[:-len(".json")]):
+                        yield entry
+        for shard_dir in sorted(shard_dirs):
+            with os.scandir(shard_dir) as entries:
+                for entry in entries:
+                    # Hidden names are temporary files of writes still in progress (or interrupted)
+                    if not entry.name.startswith("."):
+                        yield entry
+
+    def _is_sharded(self, session_id: str) -> bool:
+        shard_dir = self.root / self.shard_for(session_id)
+        return any((shard_dir / f"{session_id}{codec.suffix}").exists() for codec in self._read_codecs)
+
+    def _codec_for(self, name: str) -> Optional[Codec]:
+        for codec in sorted(CODECS.values(), key=lambda c: -len(c.suffix)):
+            if name.endswith(codec.suffix):
+                return codec
+        return None
+
+    def iter_sessions(self) -> Iterator[Dict]:
+        for entry in self._session_files():
+            codec = self._codec_for(entry.name)
+            if codec is None:
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    session_data = codec.decode(f.read())
+            except Exception as e:
+                with self._lock:
+                    self._unreadable += 1
+                logger.warning("Error reading session", extra={"file": entry.path, "error": str(e)})
+                continue
+            session_data.setdefault("sessionId", entry.name[:-len(codec.suffix)])
+            yield session_data
+
+    def count(self) -> int:
+        return sum(1 for entry in self._session_files() if self._codec_for(entry.name) is not None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"backend": self.backend, "codec": self.codec.name, "unreadable": self._unreadable}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions as rows of an embedded SQLite database (WAL mode)
+
+    Args:
+        db_path: Database file (may be shared with the session index)
+        codec: Codec for new rows; each row records its own codec
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, db_path: Path, codec: str = "json"):
+        self.db_path = Path(db_path)
+        self.codec = get_codec(codec)
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.db_path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS session_records (
+                session_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                body BLOB NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def save_many(self, sessions: Iterable[Dict]):
+        rows = [
+            (s["sessionId"], s.get("timestamp", ""), self.codec.name, self.codec.encode(s))
+            for s in sessions
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO session_records (session_id, timestamp, codec, body) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT codec, body FROM session_records WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return get_codec(row[0]).decode(row[1]) if row else None
+
+    def iter_sessions(self, batch_size: int = 500) -> Iterator[Dict]:
+        # Keyset pages keep memory flat and never hold the lock while the caller works
+        last_id = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT session_id, codec, body FROM session_records WHERE session_id > ?"
+                    " ORDER BY session_id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for session_id, codec, body in rows:
+                try:
+                    yield get_codec(codec).decode(body)
+                except Exception as e:
+                    logger.warning("Error reading session", extra={"session_id": session_id, "error": str(e)})
+            last_id = rows[-1][0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM session_records").fetchone()[0]
+
+    def stats(self) -> Dict:
+        return {"backend": self.backend, "codec": self.codec.name}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions kept in process memory as encoded bytes, so callers can never
+    mutate a stored session through a reference they still hold
+    """
+
+    backend = "memory"
+
+    def __init__(self, codec: str = "json"):
+        self.codec = get_codec(codec)
+        self._sessions: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def save_many(self, sessions: Iterable[Dict]):
+        encoded = [(s["sessionId"], self.codec.encode(s)) for s in sessions]
+        with self._lock:
+            self._sessions.update(encoded)
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        data = self._sessions.get(session_id)
+        return self.codec.decode(data) if data is not None else None
+
+    def iter_sessions(self) -> Iterator[Dict]:
+        with self._lock:
+            snapshot = list(self._sessions.values())
+        for data in snapshot:
+            yield self.codec.decode(data)
+
+    def count(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict:
+        return {"backend": self.backend, "codec": self.codec.name}
+
+
+BACKENDS = ("fs", "sqlite", "memory")
+
+
+def open_session_store(backend: str = "fs", path: Optional[Path] = None, codec: str = "json",
+                       fsync: bool = False) -> SessionStore:
+    """
+    Create a session store
+
+    Args:
+        backend: "fs", "sqlite" or "memory"
+        path: Directory (fs) or database file (sqlite); defaults to
+            feedback_sessions and feedback_sessions.db
+        codec: "json", "gzip" or "zstd"
+        fsync: Flush each file to disk before it becomes visible (fs only)
+
+    Raises:
+        ValueError: For an unknown backend or codec
+    """
+    if backend == "fs":
+        return ShardedFileStore(Path(path or "feedback_sessions"), codec=codec, fsync=fsync)
+    if backend == "sqlite":
+        return SQLiteSessionStore(Path(path or "feedback_sessions.db"), codec=codec)
+    if backend == "memory":
+        return MemorySessionStore(codec=codec)
+    raise ValueError(f"Unknown session store backend {backend!r} (expected one of: {', '.join(BACKENDS)})")
+
+
+def session_store_from_env(path: Optional[Path] = None) -> SessionStore:
+    """
+    The session store configured by SESSION_STORE, SESSION_STORE_PATH,
+    SESSION_CODEC and SESSION_FSYNC
+
+    Args:
+        path: Use this directory or database instead of SESSION_STORE_PATH
+    """
+    if path is None and os.getenv("SESSION_STORE_PATH"):
+        path = Path(os.getenv("SESSION_STORE_PATH"))
+    return open_session_store(
+        backend=os.getenv("SESSION_STORE", "fs"),
+        path=path,
+        codec=os.getenv("SESSION_CODEC", "json"),
+        fsync=os.getenv("SESSION_FSYNC", "false").strip().lower() in ("1", "true", "yes")
+    )
+
+
+# ========================================
+# Migration
+# ========================================
+
+def iter_flat_sessions(storage_dir: Path) -> Iterator[Dict]:
+    """
+    Yield every readable session from a flat directory of <session_id>.json
+    files (the layout used before the session store)
+
+    Unreadable files, such as ones truncated by a crash mid-write, are logged
+    and skipped; records without a sessionId get it from the file name.
+    """
+    for session_file in Path(storage_dir).glob("*.json"):
+        try:
+            with open(session_file, "rb") as f:
+                session_data = json.loads(f.read())
+        except Exception as e:
+            logger.warning("Error reading session", extra={"file": session_file.name, "error": str(e)})
+            continue
+        session_data.setdefault("sessionId", session_file.stem)
+        yield session_data
+
+
+def migrate_flat_directory(source_dir: Path, target: SessionStore, remove: bool = False,
+                           batch_size: int = 500) -> int:
+    """
+    Copy sessions from a flat directory of <session_id>.json files into a store
+
+    Args:
+        source_dir: Directory in the old layout
+        target: Store to copy into (may use source_dir as its root)
+        remove: Delete each old file once its session is stored
+        batch_size: Sessions saved per batch
+
+    Returns:
+        Number of sessions migrated
+    """
+    source_dir = Path(source_dir)
+    migrated = 0
+    batch: List[Dict] = []
+
+    def flush():
+        target.save_many(batch)
+        if remove:
+            for session_data in batch:
+                (source_dir / f"{session_data['sessionId']}.json").unlink(missing_ok=True)
+
+    for session_data in iter_flat_sessions(source_dir):
+        batch.append(session_data)
+        if len(batch) >= batch_size:
+            flush()
+            migrated += len(batch)
+            batch = []
+    if batch:
+        flush()
+        migrated += len(batch)
+    return migrated
+
+
+# ========================================
+# Command Line Entry Point
+# ========================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage Podium Pal session storage")
+    parser.add_argument("command", choices=["migrate", "count"],
+                        help="migrate: copy flat <session_id>.json files into the store; count: sessions stored")
+    parser.add_argument("--from", dest="source", default="feedback_sessions",
+                        help="Flat directory of session files to migrate")
+    parser.add_argument("--backend", choices=BACKENDS, default=os.getenv("SESSION_STORE", "fs"))
+    parser.add_argument("--path", default=os.getenv("SESSION_STORE_PATH"),
+                        help="Store directory (fs) or database file (sqlite)")
+    parser.add_argument("--codec", default=os.getenv("SESSION_CODEC", "json"), help="json, gzip or zstd")
+    parser.add_argument("--remove", action="store_true", help="Delete each old file once migrated")
+    args = parser.parse_args()
+
+    store = open_session_store(args.backend, Path(args.path) if args.path else None, args.codec)
+    if args.command == "migrate":
+        count = migrate_flat_directory(Path(args.source), store, remove=args.remove)
+        print(f"✓ Migrated {count} sessions from {args.source} into the {args.backend} store")
+    else:
+        print(store.count())
+    store.close()
@@ -0,0 +1,470 @@
+"""
+Podium Pal Backend - Session Export and Import
+===============================================
+Bulk copies of session history as NDJSON: one session record per line,
+optionally gzip-compressed. Both directions are generator pipelines that hold
+one batch of sessions at a time, so memory stays flat however long the
+history is, and a slow reader or writer holds back the other end instead of
+letting data pile up in between.
+
+Export: stored sessions -> time range -> field projection -> NDJSON lines ->
+chunks -> optional gzip. Import: byte chunks -> optional gunzip -> lines ->
+validated records -> batches saved to the store and indexes together.
+
+Served as /export and /import by the API, and usable offline:
+
+    python session_transfer.py export --out sessions.ndjson.gz --date-from 2025-01-01
+    python session_transfer.py import sessions.ndjson.gz
+
+Records only reference their audio files (audioPath); copy AUDIO_STORAGE_DIR
+separately.
+"""
+
+import argparse
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from progress import SCORE_FIELDS, ProgressRollups, session_facts
+from search_index import SearchIndex, search_document
+from session_index import SessionIndex, summarize_session
+from session_store import SessionStore, is_valid_session_id, session_store_from_env
+
+# Fields an imported record must have; projected exports lack some of them
+# and must not overwrite full sessions
+IMPORT_REQUIRED_FIELDS = ("sessionId", "timestamp", "transcript", "feedback")
+
+# Optional text fields the indexes read, at the top level and in feedback
+OPTIONAL_TEXT_FIELDS = ("userGoal", "aiPersonality", "userId")
+OPTIONAL_FEEDBACK_TEXT_FIELDS = ("aiSummary",)
+OPTIONAL_FEEDBACK_LIST_FIELDS = ("strengths", "improvements")
+
+# Export output is grouped into chunks of about this size before it is sent
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# A longer line is rejected rather than buffered without bound
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+# ========================================
+# Export
+# ========================================
+
+def iter_sessions_in_range(store: SessionStore, index, date_from: Optional[str] = None,
+                           date_to: Optional[str] = None, page_size: int = 500) -> Iterator[Dict]:
+    """
+    Sessions whose timestamp falls in a range, oldest first, found through the
+    session index so sessions outside the range are never read
+
+    Args:
+        store: Where the full records live
+        index: SessionIndex over the same sessions
+        date_from: Inclusive lower bound on the ISO timestamp
+        date_to: Inclusive upper bound on the ISO timestamp
+        page_size: Index rows fetched per query
+    """
+    cursor = None
+    while True:
+        rows, cursor = index.query(limit=page_size, cursor=cursor, sort="timestamp", order="asc",
+                                   date_from=date_from, date_to=date_to)
+        for row in rows:
+            session_data = store.load(row["session_id"])
+            if session_data is not None:
+                yield session_data
+        if cursor is None:
+            return
+
+
+def in_time_range(sessions: Iterable[Dict], date_from: Optional[str] = None,
+                  date_to: Optional[str] = None) -> Iterator[Dict]:
+    """Sessions with date_from <= timestamp <= date_to (ISO strings, either bound optional)"""
+    for session_data in sessions:
+        timestamp = session_data.get("timestamp") or ""
+        if date_from and timestamp < date_from:
+            continue
+        if date_to and timestamp > date_to:
+            continue
+        yield session_data
+
+
+def project(sessions: Iterable[Dict], fields: Optional[Sequence[str]] = None,
+            exclude: Sequence[str] = ()) -> Iterator[Dict]:
+    """
+    Keep only some top-level fields of each session
+
+    Args:
+        sessions: Full session records
+        fields: Fields to keep (None keeps every field); sessionId is always kept
+        exclude: Fields to drop, e.g. ["transcript"]
+    """
+    if fields is None and not exclude:
+        yield from sessions
+        return
+    keep = None if fields is None else {"sessionId", *fields}
+    drop = set(exclude) - {"sessionId"}
+    for session_data in sessions:
+        yield {
+            key: value for key, value in session_data.items()
+            if (keep is None or key in keep) and key not in drop
+        }
+
+
+def ndjson_lines(records: Iterable[Dict]) -> Iterator[bytes]:
+    """One compact JSON document per line"""
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def chunked(lines: Iterable[bytes], chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Join lines into chunks of about chunk_bytes, so each write carries many sessions"""
+    buffer: List[bytes] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 5) -> Iterator[bytes]:
+    """Compress a byte stream into one gzip member, chunk by chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(sessions: Iterable[Dict], date_from: Optional[str] = None, date_to: Optional[str] = None,
+                  fields: Optional[Sequence[str]] = None, exclude: Sequence[str] = (),
+                  compress: bool = False) -> Iterator[bytes]:
+    """
+    Encode sessions as an NDJSON byte stream
+
+    Args:
+        sessions: Sessions to export, e.g. SessionStore.iter_sessions()
+        date_from: Inclusive lower bound on the ISO timestamp
+        date_to: Inclusive upper bound on the ISO timestamp
+        fields: Top-level fields to keep (None keeps every field)
+        exclude: Top-level fields to drop
+        compress: gzip the stream
+
+    Returns:
+        Iterator of byte chunks
+    """
+    stream = chunked(ndjson_lines(project(in_time_range(sessions, date_from, date_to), fields, exclude)))
+    return gzip_chunks(stream) if compress else stream
+
+
+# ========================================
+# Import
+# ========================================
+
+class NDJSONDecoder:
+    """
+    Incremental NDJSON parser fed arbitrary byte chunks
+
+    Compressed input (gzip, including concatenated members) is detected from
+    the first bytes. Each complete line is parsed as it arrives; blank lines
+    are ignored.
+    """
+
+    def __init__(self):
+        self._decompressor = None
+        self._sniffed = False
+        self._pending = b""
+        self.line_number = 0
+
+    def feed(self, chunk: bytes) -> List[Tuple[int, Optional[Dict], Optional[str]]]:
+        """
+        Parse the complete lines in a chunk
+
+        Returns:
+            (line number, record or None, error or None) per complete line
+
+        Raises:
+            ValueError: If the data is not valid gzip or a line exceeds MAX_LINE_BYTES
+        """
+        if not self._sniffed:
+            self._pending += chunk
+            if len(self._pending) < 2:
+                return []
+            self._sniffed = True
+            chunk, self._pending = self._pending, b""
+            if chunk[:2] == b"\x1f\x8b":
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return self._split(self._decompress(chunk))
+
+    def close(self) -> List[Tuple[int, Optional[Dict], Optional[str]]]:
+        """Parse whatever is left after the last chunk (a final line without a newline)"""
+        parsed = []
+        if not self._sniffed:
+            self._sniffed = True
+        elif self._decompressor is not None:
+            parsed = self._split(self._decompressor.flush())
+            if not self._decompressor.eof:
+                raise ValueError("Truncated gzip stream")
+        rest, self._pending = self._pending, b""
+        return parsed + self._parse_lines([rest]) if rest.strip() else parsed
+
+    def _decompress(self, chunk: bytes) -> bytes:
+        if self._decompressor is None:
+            return chunk
+        out = []
+        try:
+            while chunk:
+                if self._decompressor.eof:
+                    # Concatenated gzip members (e.g. files joined with cat)
+                    self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                out.append(self._decompressor.decompress(chunk))
+                chunk = self._decompressor.unused_data if self._decompressor.eof else b""
+        except zlib.error as e:
+            raise ValueError(f"Invalid gzip data: {e}")
+        return b"".join(out)
+
+    def _split(self, data: bytes) -> List[Tuple[int, Optional[Dict], Optional[str]]]:
+        data = self._pending + data
+        lines = data.split(b"\n")
+        self._pending = lines.pop()
+        if len(self._pending) > MAX_LINE_BYTES:
+            raise ValueError(f"Line {self.line_number + 1} is longer than {MAX_LINE_BYTES} bytes")
+        return self._parse_lines(lines)
+
+    def _parse_lines(self, lines: List[bytes]) -> List[Tuple[int, Optional[Dict], Optional[str]]]:
+        parsed = []
+        for line in lines:
+            self.line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                parsed.append((self.line_number, None, f"Invalid JSON: {e}"))
+                continue
+            error = validate_record(record)
+            parsed.append((self.line_number, None, error) if error else (self.line_number, record, None))
+        return parsed
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_iso_timestamp(value) -> bool:
+    if not isinstance(value, str):
+        return False
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def validate_record(record) -> Optional[str]:
+    """
+    Why a parsed line cannot be imported as a session, or None if it can
+
+    Besides the required fields, every field the session, progress and
+    search indexes read must have the type they expect, so an accepted record
+    can always be indexed.
+    """
+    if not isinstance(record, dict):
+        return "Not a JSON object"
+    missing = [field for field in IMPORT_REQUIRED_FIELDS if field not in record]
+    if missing:
+        return f"Missing fields: {', '.join(missing)}"
+    if not isinstance(record["sessionId"], str) or not is_valid_session_id(record["sessionId"]):
+        return "Invalid sessionId"
+    if not _is_iso_timestamp(record["timestamp"]):
+        return "timestamp must be an ISO 8601 date and time"
+    if not isinstance(record["transcript"], str):
+        return "transcript must be a string"
+    for field in OPTIONAL_TEXT_FIELDS:
+        if record.get(field) is not None and not isinstance(record[field], str):
+            return f"{field} must be a string"
+
+    feedback = record["feedback"]
+    if not isinstance(feedback, dict):
+        return "feedback must be an object"
+    scores = [field for _, field in SCORE_FIELDS if not _is_number(feedback.get(field))]
+    if scores:
+        return f"feedback scores must be numbers: {', '.join(scores)}"
+    for field in OPTIONAL_FEEDBACK_TEXT_FIELDS:
+        if feedback.get(field) is not None and not isinstance(feedback[field], str):
+            return f"feedback.{field} must be a string"
+    for field in OPTIONAL_FEEDBACK_LIST_FIELDS:
+        value = feedback.get(field)
+        if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            return f"feedback.{field} must be a list of strings"
+    if feedback.get("fillerWords") is not None and not isinstance(feedback["fillerWords"], dict):
+        return "feedback.fillerWords must be an object"
+    if feedback.get("pace") is not None and not _is_number(feedback["pace"]):
+        return "feedback.pace must be a number"
+    return None
+
+
+def save_imported(sessions: List[Dict], store: SessionStore, index: SessionIndex, rollups: ProgressRollups,
+                  search: SearchIndex):
+    """
+    Save a batch of imported sessions to the store and the three indexes,
+    replacing earlier versions of the same sessions
+
+    Every index row is worked out before anything is written, so a record the
+    indexes cannot take fails the batch before the store holds it, and the
+    store and indexes never disagree.
+    """
+    summaries = [summarize_session(session_data) for session_data in sessions]
+    facts = [(session_data["sessionId"], session_facts(session_data)) for session_data in sessions]
+    documents = [search_document(session_data) for session_data in sessions]
+    store.save_many(sessions)
+    index.upsert_summaries(summaries)
+    rollups.add_facts(facts, replace=True)
+    search.upsert_documents(documents)
+
+
+class ImportSummary:
+    """Running totals of an import, plus the first few errors"""
+
+    MAX_ERRORS = 20
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+
+    def error(self, line_number: int, message: str):
+        self.failed += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append({"line": line_number, "error": message})
+
+    def to_dict(self) -> Dict:
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+
+def import_stream(chunks: Iterable[bytes], save_batch: Callable[[List[Dict]], None],
+                  batch_size: int = 500, summary: Optional[ImportSummary] = None) -> Dict:
+    """
+    Import an NDJSON (or gzip NDJSON) byte stream
+
+    Lines that are not valid session records are counted as failed and
+    skipped; the rest of their batch is still saved.
+
+    Args:
+        chunks: The stream, in chunks of any size
+        save_batch: Persists a list of sessions, e.g. with save_imported
+        batch_size: Sessions per save_batch call
+        summary: Totals to update, so a caller still has them if the stream fails part-way
+
+    Returns:
+        {"imported": n, "failed": n, "errors": [{"line": n, "error": "..."}]}
+
+    Raises:
+        ValueError: If the stream is not valid gzip or has an overlong line
+    """
+    decoder = NDJSONDecoder()
+    summary = summary if summary is not None else ImportSummary()
+    batch: List[Dict] = []
+
+    def take(parsed):
+        for line_number, record, error in parsed:
+            if error:
+                summary.error(line_number, error)
+            else:
+                batch.append(record)
+
+    def flush():
+        save_batch(batch)
+        summary.imported += len(batch)
+        batch.clear()
+
+    for chunk in chunks:
+        take(decoder.feed(chunk))
+        if len(batch) >= batch_size:
+            flush()
+    take(decoder.close())
+    if batch:
+        flush()
+    return summary.to_dict()
+
+
+def read_file_chunks(path: Path, chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """A file ("-" for stdin) in chunks"""
+    f = sys.stdin.buffer if str(path) == "-" else open(path, "rb")
+    try:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+
+def parse_field_list(text: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated field names (None or blank for no list)"""
+    if not text:
+        return None
+    return [field.strip() for field in text.split(",") if field.strip()]
+
+
+# ========================================
+# Command Line Entry Point
+# ========================================
+
+if __name__ == "__main__":
+    from worker_coordination import SharedGeneration
+
+    parser = argparse.ArgumentParser(description="Export or import Podium Pal sessions as NDJSON")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("file", nargs="?", default="-", help="import: NDJSON or gzip NDJSON file ('-' for stdin)")
+    parser.add_argument("--out", default="-", help="export: output file ('-' for stdout; .gz compresses)")
+    parser.add_argument("--gzip", action="store_true", help="export: gzip the output")
+    parser.add_argument("--date-from", help="export: inclusive lower bound on the ISO timestamp")
+    parser.add_argument("--date-to", help="export: inclusive upper bound on the ISO timestamp")
+    parser.add_argument("--fields", help="export: comma-separated top-level fields to keep")
+    parser.add_argument("--exclude", help="export: comma-separated top-level fields to drop, e.g. transcript")
+    parser.add_argument("--db", default="sessions.db", help="import: index database to update")
+    parser.add_argument("--sessions", help="Session store directory or database (default: SESSION_STORE_PATH)")
+    parser.add_argument("--batch-size", type=int, default=500, help="import: sessions saved per batch")
+    args = parser.parse_args()
+
+    store = session_store_from_env(Path(args.sessions) if args.sessions else None)
+    if args.command == "export":
+        stream = export_stream(
+            store.iter_sessions(), args.date_from, args.date_to, parse_field_list(args.fields),
+            parse_field_list(args.exclude) or (), compress=args.gzip or args.out.endswith(".gz")
+        )
+        out = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+        for chunk in stream:
+            out.write(chunk)
+        out.flush()
+        if out is not sys.stdout.buffer:
+            out.close()
+    else:
+        index = SessionIndex(Path(args.db))
+        rollups = ProgressRollups(Path(args.db))
+        search = SearchIndex(Path(args.db))
+
+        summary = import_stream(read_file_chunks(Path(args.file)),
+                                lambda sessions: save_imported(sessions, store, index, rollups, search),
+                                args.batch_size)
+        # A running server drops its cached copies of replaced sessions
+        SharedGeneration(Path(os.getenv("WORKER_LOCK_DIR", "worker_locks")) / "session_cache.generation").bump()
+        for closeable in (index, rollups, search):
+            closeable.close()
+        print(f"✓ Imported {summary['imported']} sessions ({summary['failed']} failed)", file=sys.stderr)
+        for error in summary["errors"]:
+            print(f"  line {error['line']}: {error['error']}", file=sys.stderr)
+    store.close()
@@ -0,0 +1,128 @@
+"""
+Podium Pal Backend - Incremental JSON Parsing
+==============================================
+Parser for a JSON object that arrives in chunks (e.g. streamed LLM output).
+Each top-level member is emitted as soon as its value is complete, without
+waiting for the rest of the object.
+"""
+
+import json
+from typing import Any, List, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONObjectParser:
+    """
+    Feed text chunks with `feed()` and collect completed (key, value) pairs
+
+    Anything before the opening brace (such as a ```json fence) is ignored.
+    Text is scanned exactly once; a member whose value is not valid JSON is
+    skipped rather than raising, since the full response is validated again
+    once the stream ends.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._token_start = 0
+        self._key = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Add a chunk of text
+
+        Returns:
+            (key, value) pairs completed by this chunk, in order
+        """
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        length = len(buffer)
+
+        while self._pos < length and not self.done:
+            char = buffer[self._pos]
+            state = self._state
+
+            if state == "start":
+                if char == "{":
+                    self._state = "key"
+            elif state == "key":
+                if char == '"':
+                    self._state = "key_string"
+                    self._token_start = self._pos
+                elif char == "}":
+                    self.done = True
+            elif state == "key_string":
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._key = json.loads(buffer[self._token_start:self._pos + 1])
+                    self._state = "colon"
+            elif state == "colon":
+                if char == ":":
+                    self._state = "value_start"
+            elif state == "value_start":
+                if char not in _WHITESPACE:
+                    self._token_start = self._pos
+                    self._depth = 0
+                    self._in_string = False
+                    self._state = "value"
+                    # Re-scan this character as the first character of the value
+                    continue
+            elif state == "value":
+                value_end = self._scan_value_char(char)
+                if value_end is not None:
+                    raw = buffer[self._token_start:value_end]
+                    try:
+                        completed.append((self._key, json.loads(raw)))
+                    except ValueError:
+                        pass
+                    self._state = "key"
+                    if value_end == self._pos:
+                        # Scalar terminated by a delimiter that still needs handling
+                        continue
+
+            self._pos += 1
+
+        return completed
+
+    def _scan_value_char(self, char: str):
+        """
+        Advance the value scanner by one character
+
+        Returns:
+            End offset of the value if it is now complete, otherwise None
+        """
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 0:
+                    return self._pos + 1
+            return None
+
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            if self._depth == 0:
+                # Closing brace of the enclosing object ends a scalar value
+                return self._pos
+            self._depth -= 1
+            if self._depth == 0:
+                return self._pos + 1
+        elif self._depth == 0 and (char == "," or char in _WHITESPACE):
+            return self._pos
+        return None
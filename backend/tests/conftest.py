@@ -0,0 +1,49 @@
+"""
+Backend tests: run from the backend directory with
+
+    python -m pytest -q
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Backend modules are imported flat ("from session_store import ..."), as main.py does
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """
+    The main module, imported inside a temporary working directory so its
+    storage directories and databases never touch real data, with Gemini
+    replaced by the benchmark suite's local fake
+    """
+    from benchmarks.fake_gemini import FakeGenerativeModel, install_fake_gemini
+
+    previous_cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app"))
+    os.environ.update({"LOG_LEVEL": "ERROR", "CLIENT_RATE_PER_MINUTE": "0", "TRANSFER_RATE_PER_MINUTE": "0"})
+    import main
+    install_fake_gemini(main, FakeGenerativeModel(latency=0, jitter=0))
+    yield main
+    os.chdir(previous_cwd)
+
+
+@pytest.fixture(scope="session")
+def client(app_module):
+    """TestClient with the app's startup and shutdown handlers run once for the whole session"""
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_module.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def fake_model(app_module):
+    """A fresh fake Gemini model for one test, with call counting from zero"""
+    from benchmarks.fake_gemini import FakeGenerativeModel, install_fake_gemini
+
+    return install_fake_gemini(app_module, FakeGenerativeModel(latency=0, jitter=0))
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import signal
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from acoustics import AcousticAnalyzer, analyze_wav, articulation_rate, segment_speech
+
+SAMPLE_RATE = 16000
+
+
+def write_wav(path, pattern, pitch_hz=180.0):
+    """Write a mono 16-bit WAV of (seconds, voiced) pieces: a tone when voiced, faint noise otherwise"""
+    rng = np.random.default_rng(0)
+    pieces = []
+    for seconds, voiced in pattern:
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        if voiced:
+            pieces.append(0.5 * np.sin(2 * np.pi * pitch_hz * t))
+        else:
+            pieces.append(0.001 * rng.standard_normal(t.size))
+    samples = (np.concatenate(pieces) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(samples.tobytes())
+    return path
+
+
+def test_segment_speech_bridges_short_gaps_and_drops_bursts():
+    quiet, loud = -60.0, -10.0
+    frame = 0.03
+    # 1 s speech, 0.15 s gap (bridged), 1 s speech, 2 s pause, 0.06 s click, 1 s pause, 1 s speech
+    energy = ([loud] * 33 + [quiet] * 5 + [loud] * 33 + [quiet] * 67 + [loud] * 2 + [quiet] * 33
+              + [loud] * 33)
+    speech = segment_speech(np.array(energy), frame)
+    starts = np.flatnonzero(np.diff(np.concatenate([[0], speech.astype(int)])) == 1)
+    assert starts.tolist() == [0, len(energy) - 33]
+    assert speech[33:38].all()
+    assert not speech[138:140].any()
+
+
+def test_segment_speech_empty():
+    assert segment_speech(np.zeros(0), 0.03).size == 0
+
+
+def test_analyze_wav_measures_pauses_and_pitch(tmp_path):
+    path = write_wav(tmp_path / "talk.wav", [(0.5, False), (2.0, True), (0.5, False), (1.0, True),
+                                            (2.0, False), (1.5, True), (0.5, False)])
+    metrics = analyze_wav(str(path), block_seconds=0.7)
+    assert metrics["durationSeconds"] == 8.0
+    assert metrics["speechSegments"] == 3
+    assert metrics["pauseCount"] == 2
+    assert metrics["longPauseCount"] == 1
+    assert metrics["longestPauseSeconds"] == pytest.approx(2.0, abs=0.1)
+    assert metrics["speakingSeconds"] == pytest.approx(4.5, abs=0.15)
+    assert metrics["meanPitchHz"] == pytest.approx(180, abs=5)
+    assert metrics["pitchVariabilitySemitones"] < 0.5
+    assert metrics["sampleRate"] == SAMPLE_RATE
+    # Reading in blocks gives the same answer as one block
+    assert analyze_wav(str(path), block_seconds=100) == metrics
+
+
+def test_analyze_wav_rejects_non_wav(tmp_path):
+    path = tmp_path / "speech.wav"
+    path.write_bytes(b"OggS not a wav file")
+    assert analyze_wav(str(path)) is None
+
+
+def test_articulation_rate_excludes_pauses():
+    assert articulation_rate(150, {"speakingSeconds": 45}) == 200
+    assert articulation_rate(150, {"speakingSeconds": 0}) is None
+
+
+def test_analyzer_skips_unsupported_formats(tmp_path):
+    analyzer = AcousticAnalyzer(workers=1)
+    assert asyncio.run(analyzer.analyze(tmp_path / "speech.webm")) is None
+    assert analyzer._pool is None
+
+
+def test_analyzer_replaces_a_broken_pool_and_retries(tmp_path):
+    path = write_wav(tmp_path / "talk.wav", [(1.0, True), (1.0, False), (1.0, True)])
+    analyzer = AcousticAnalyzer(workers=1, timeout=30)
+    try:
+        first = asyncio.run(analyzer.analyze(path))
+        assert first["speechSegments"] == 2
+        old_pool = analyzer._pool
+        for pid in list(old_pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        # Let the pool notice that its worker died
+        deadline = time.monotonic() + 10
+        while not old_pool._broken and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert old_pool._broken
+
+        assert asyncio.run(analyzer.analyze(path)) == first
+        assert analyzer._pool is not old_pool
+    finally:
+        analyzer.shutdown()
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from admission import (
+    PRIORITY_BACKGROUND, PRIORITY_BATCH, PRIORITY_INTERACTIVE, AdmissionController, AdmissionRejectedError,
+    ClientRateLimiter, TokenBucket
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=1.0, burst=2, now=0.0)
+    assert bucket.take(1, 0.0) == 0
+    assert bucket.take(1, 0.0) == 0
+    assert bucket.take(1, 0.0) == pytest.approx(1.0)
+    assert bucket.take(1, 1.0) == 0
+
+
+def test_token_bucket_admits_oversized_cost_when_full():
+    bucket = TokenBucket(rate=1.0, burst=2, now=0.0)
+    assert bucket.take(5, 0.0) == 0
+    # In debt: the next request waits for the bucket to climb back
+    assert bucket.take(1, 0.0) == pytest.approx(4.0)
+
+
+def test_rate_limiter_is_per_client():
+    clock = FakeClock()
+    limiter = ClientRateLimiter(rate_per_minute=60, burst=1, clock=clock)
+    limiter.check("a")
+    limiter.check("b")
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        limiter.check("a")
+    assert rejected.value.reason == "rate_limited"
+    assert rejected.value.retry_after_header == "1"
+    clock.now = 1.0
+    limiter.check("a")
+    assert limiter.stats() == {"clients": 2, "limited": 1}
+
+
+def test_rate_limiter_zero_rate_is_unlimited():
+    limiter = ClientRateLimiter(rate_per_minute=0, burst=1)
+    for _ in range(100):
+        limiter.check("a")
+
+
+def test_rate_limiter_forgets_least_recent_client():
+    limiter = ClientRateLimiter(rate_per_minute=1, burst=1, max_clients=2, clock=FakeClock())
+    limiter.check("a")
+    limiter.check("b")
+    limiter.check("c")
+    # "a" was evicted, so it starts over with a full bucket
+    limiter.check("a")
+    with pytest.raises(AdmissionRejectedError):
+        limiter.check("c")
+
+
+def test_waiters_are_admitted_in_priority_order():
+    controller = AdmissionController(max_concurrent=1, max_queue=10)
+    order = []
+
+    async def worker(priority, name):
+        async with controller.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def scenario():
+        async with controller.slot():
+            tasks = [asyncio.ensure_future(worker(PRIORITY_BACKGROUND, "background")),
+                     asyncio.ensure_future(worker(PRIORITY_BATCH, "batch")),
+                     asyncio.ensure_future(worker(PRIORITY_INTERACTIVE, "interactive"))]
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order == ["interactive", "batch", "background"]
+    assert controller.stats()["running"] == 0
+
+
+def hold(controller, priority=PRIORITY_INTERACTIVE):
+    async def run():
+        async with controller.slot(priority):
+            await asyncio.sleep(0)
+    return asyncio.ensure_future(run())
+
+
+def test_full_queue_sheds_less_urgent_waiter():
+    controller = AdmissionController(max_concurrent=1, max_queue=1)
+
+    async def scenario():
+        async with controller.slot():
+            batch = hold(controller, PRIORITY_BATCH)
+            await asyncio.sleep(0)
+            interactive = hold(controller)
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejectedError) as shed:
+                await batch
+            assert shed.value.reason == "shed"
+            with pytest.raises(AdmissionRejectedError) as full:
+                async with controller.slot():
+                    pass
+            assert full.value.reason == "queue_full"
+        await interactive
+
+    asyncio.run(scenario())
+    assert controller.stats()["rejected"] == {"queue_full": 1, "shed": 1}
+    assert controller.stats()["running"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    controller = AdmissionController(max_concurrent=1, max_queue=10)
+
+    async def scenario():
+        async with controller.slot():
+            waiter = hold(controller)
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        assert controller.stats()["running"] == 0
+        async with controller.slot() as waited:
+            assert waited == 0.0
+
+    asyncio.run(scenario())
@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+import struct
+
+import pytest
+
+from audio_ingest import (
+    InvalidUploadError, UploadTooLargeError, audio_extension, read_multipart_upload, wav_byte_rate
+)
+
+BOUNDARY = "test-boundary"
+
+
+class FakeRequest:
+    """Just enough of a Starlette request: headers and a chunked body stream"""
+
+    def __init__(self, body: bytes, chunk_size: int = 7, boundary: str = BOUNDARY):
+        self.headers = {"content-type": f"multipart/form-data; boundary={boundary}"}
+        self._body = body
+        self._chunk_size = chunk_size
+        self.chunks_read = 0
+
+    async def stream(self):
+        for start in range(0, len(self._body), self._chunk_size):
+            self.chunks_read += 1
+            yield self._body[start:start + self._chunk_size]
+
+
+def multipart_body(parts):
+    """Encode (name, value) form parts in order; a (filename, bytes) value is a file part"""
+    body = b""
+    for name, value in parts:
+        if isinstance(value, tuple):
+            filename, data = value
+            body += (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     "Content-Type: application/octet-stream\r\n\r\n").encode() + data + b"\r\n"
+        else:
+            body += f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def wav_bytes(seconds, sample_rate=8000):
+    data_size = sample_rate * 2 * seconds
+    header = b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE" + b"fmt " + struct.pack(
+        "<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16
+    ) + b"data" + struct.pack("<I", data_size)
+    return header + b"\x01\x00" * (sample_rate * seconds)
+
+
+def read(body, tmp_path, max_bytes=1 << 20, max_duration=None, chunk_size=7):
+    request = FakeRequest(body, chunk_size)
+    return asyncio.run(read_multipart_upload(request, tmp_path, max_bytes, max_duration)), request
+
+
+def test_fields_and_audio_are_streamed_to_content_addressed_storage(tmp_path):
+    audio = bytes(range(256)) * 40
+    body = multipart_body([("transcript", "Hello ✓"), ("duration", "12"), ("audio", ("speech.wav", audio))])
+    (fields, stored), request = read(body, tmp_path)
+    assert fields == {"transcript": "Hello ✓", "duration": "12"}
+    digest = hashlib.sha256(audio).hexdigest()
+    assert stored.sha256 == digest
+    assert stored.path == tmp_path / digest[:2] / f"{digest}.wav"
+    assert stored.path.read_bytes() == audio
+    assert stored.size == len(audio) and not stored.deduplicated
+    assert request.chunks_read > 100
+    assert not list(tmp_path.glob(".upload-*"))
+
+
+def test_identical_uploads_share_one_file(tmp_path):
+    body = multipart_body([("transcript", "x"), ("audio", ("speech.wav", b"same audio bytes"))])
+    (_, first), _ = read(body, tmp_path)
+    (_, second), _ = read(body, tmp_path)
+    assert second.path == first.path
+    assert second.deduplicated
+    assert len(list(tmp_path.rglob("*.wav"))) == 1
+
+
+def test_no_audio_part(tmp_path):
+    (fields, stored), _ = read(multipart_body([("transcript", "only text")]), tmp_path)
+    assert fields == {"transcript": "only text"}
+    assert stored is None
+
+
+def test_size_cap_aborts_and_removes_partial_file(tmp_path):
+    with pytest.raises(UploadTooLargeError):
+        read(multipart_body([("audio", ("speech.wav", b"a" * 5000))]), tmp_path, max_bytes=1000)
+    assert not list(tmp_path.rglob("*.*"))
+
+
+def test_wav_duration_cap_from_header(tmp_path):
+    body = multipart_body([("transcript", "x"), ("audio", ("speech.wav", wav_bytes(3)))])
+    with pytest.raises(UploadTooLargeError, match="longer than 2 seconds"):
+        read(body, tmp_path, max_duration=2, chunk_size=4096)
+    (_, stored), _ = read(body, tmp_path, max_duration=5, chunk_size=4096)
+    assert stored is not None
+
+
+def test_reported_duration_before_file_rejects_without_writing(tmp_path):
+    body = multipart_body([("duration", "600"), ("audio", ("speech.wav", b"a" * 5000))])
+    with pytest.raises(UploadTooLargeError):
+        read(body, tmp_path, max_duration=60)
+    assert not list(tmp_path.rglob("*.*"))
+
+
+def test_missing_boundary(tmp_path):
+    request = FakeRequest(b"", boundary="")
+    request.headers = {"content-type": "multipart/form-data"}
+    with pytest.raises(InvalidUploadError):
+        asyncio.run(read_multipart_upload(request, tmp_path, 1000))
+
+
+def test_audio_extension_and_wav_header():
+    assert audio_extension("talk.WAV") == "wav"
+    assert audio_extension("../../etc/passwd") == "webm"
+    assert audio_extension("noextension") == "webm"
+    assert wav_byte_rate(wav_bytes(1)[:44]) == 16000
+    assert wav_byte_rate(b"OggS" + b"\x00" * 40) is None
+
+
+def test_analyze_rejects_oversized_upload(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "AUDIO_MAX_BYTES", 1000)
+    response = client.post("/analyze", data={"transcript": "Too big", "duration": "5"},
+                           files={"audio": ("speech.webm", b"a" * 5000, "audio/webm")})
+    assert response.status_code == 413
+
+
+def test_analyze_rejects_duration_sent_after_the_file(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "AUDIO_MAX_DURATION_SECONDS", 60)
+    body = multipart_body([("transcript", "Too long"), ("audio", ("late.webm", b"a" * 500)),
+                           ("duration", "600")])
+    response = client.post("/analyze", content=body,
+                           headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+    assert response.status_code == 413
+    assert not list(app_module.AUDIO_STORAGE_DIR.rglob("*.webm"))
@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+
+from benchmarks.fake_gemini import FakeGenerativeModel, install_fake_gemini
+
+
+class ConcurrencyTrackingModel(FakeGenerativeModel):
+    """Fake model that records how many calls were in flight at once"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._in_flight = 0
+        self._count_lock = threading.Lock()
+        self.max_in_flight = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self._count_lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            return super().generate_content(prompt, stream=stream, **kwargs)
+        finally:
+            with self._count_lock:
+                self._in_flight -= 1
+
+
+def batch_items(count, tag):
+    return [{"id": f"{tag}-{i}", "transcript": f"Batch speech {tag} number {i}, um, about the quarterly plan.",
+             "userGoal": "Explain the plan", "duration": 30} for i in range(count)]
+
+
+def post_batch(client, items):
+    response = client.post("/analyze/batch", json={"items": items})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_fans_out_with_bounded_concurrency(client, app_module, monkeypatch):
+    model = install_fake_gemini(app_module, ConcurrencyTrackingModel(latency=0.05, jitter=0))
+    monkeypatch.setattr(app_module, "BATCH_MAX_CONCURRENCY", 2)
+    started = time.monotonic()
+    lines = post_batch(client, batch_items(6, "fan-out"))
+    elapsed = time.monotonic() - started
+
+    items, summary = lines[:-1], lines[-1]
+    assert summary == {"type": "summary", "total": 6, "succeeded": 6, "failed": 0}
+    assert sorted(line["index"] for line in items) == list(range(6))
+    assert all(line["status"] == "done" and not line["llmFallback"] for line in items)
+    assert {line["id"] for line in items} == {f"fan-out-{i}" for i in range(6)}
+    assert model.calls == 6
+    assert model.max_in_flight == 2
+    # Six 50 ms calls two at a time, not one after another
+    assert elapsed < 6 * 0.05 + 1.0
+    for line in items:
+        session_id = line["result"]["sessionId"]
+        assert client.get(f"/feedback/{session_id}").status_code == 200
+
+
+def test_batch_reports_failed_items_and_saves_the_rest(client, app_module, fake_model, monkeypatch):
+    request_llm_feedback = app_module.request_llm_feedback
+
+    async def fail_second(transcript, *args, **kwargs):
+        if "number 1," in transcript:
+            raise RuntimeError("item broke")
+        return await request_llm_feedback(transcript, *args, **kwargs)
+
+    monkeypatch.setattr(app_module, "request_llm_feedback", fail_second)
+    lines = post_batch(client, batch_items(3, "partial"))
+    by_index = {line["index"]: line for line in lines[:-1]}
+    assert by_index[1] == {"type": "item", "index": 1, "id": "partial-1", "status": "error", "error": "item broke"}
+    assert by_index[0]["status"] == by_index[2]["status"] == "done"
+    assert lines[-1] == {"type": "summary", "total": 3, "succeeded": 2, "failed": 1}
+
+
+def test_batch_too_large(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_MAX_ITEMS", 2)
+    response = client.post("/analyze/batch", json={"items": batch_items(3, "too-large")})
+    assert response.status_code == 413
+
+
+def test_batch_requires_items(client):
+    assert client.post("/analyze/batch", json={"items": []}).status_code == 422
+
+
+def test_batch_never_reports_an_unsaved_session(client, app_module, fake_model, monkeypatch):
+    def failing_save(sessions):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(app_module, "save_sessions", failing_save)
+    lines = post_batch(client, batch_items(2, "unsaved"))
+    for line in lines[:-1]:
+        assert line["status"] == "error"
+        assert line["error"] == "Could not save session: disk full"
+        assert "result" not in line
+    assert lines[-1] == {"type": "summary", "total": 2, "succeeded": 0, "failed": 2}
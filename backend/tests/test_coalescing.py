@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from coalescing import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flights = SingleFlight()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("key", compute) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(runs) == 1
+    assert [result for result, _ in results] == ["result"] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert flights.stats() == {"started": 1, "joined": 4, "inFlight": 0}
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+
+    async def scenario():
+        return await asyncio.gather(flights.do("a", lambda: asyncio.sleep(0, "a")),
+                                    flights.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(scenario()) == [("a", False), ("b", False)]
+
+
+def test_finished_calls_are_not_cached():
+    flights = SingleFlight()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        return len(runs)
+
+    async def scenario():
+        first, _ = await flights.do("key", compute)
+        second, shared = await flights.do("key", compute)
+        return first, second, shared
+
+    assert asyncio.run(scenario()) == (1, 2, False)
+
+
+def test_exception_reaches_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        return await asyncio.gather(flights.do("key", fail), flights.do("key", fail), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_computation():
+    flights = SingleFlight()
+    finished = []
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flights.do("key", compute))
+        second = asyncio.ensure_future(flights.do("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == ("done", True)
+    assert finished == [1]
@@ -0,0 +1,81 @@
+import json
+import uuid
+
+from caching import LRUCache
+
+
+def store_session(app_module, transcript="Cached feedback body ✓"):
+    session_id = str(uuid.uuid4())
+    app_module.save_session({"sessionId": session_id, "timestamp": "2025-03-01T09:00:00", "transcript": transcript,
+                             "userGoal": "Test ETags", "feedback": {"overall_score": 6.5}})
+    return session_id
+
+
+def test_byte_capped_cache_evicts_least_recent():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", 1, size=4)
+    cache.set("b", 2, size=4)
+    cache.get("a")
+    cache.set("c", 3, size=4)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.size_bytes == 8
+
+
+def test_byte_capped_cache_skips_oversized_entries():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", 1, size=4)
+    cache.set("big", 2, size=11)
+    assert cache.get("big") is None
+    assert cache.get("a") == 1
+
+
+def test_feedback_has_strong_etag_and_revalidates(client, app_module):
+    session_id = store_session(app_module)
+    response = client.get(f"/feedback/{session_id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.json()["transcript"] == "Cached feedback body ✓"
+
+    not_modified = client.get(f"/feedback/{session_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+
+def test_if_none_match_lists_and_weak_tags(client, app_module):
+    session_id = store_session(app_module)
+    etag = client.get(f"/feedback/{session_id}").headers["etag"]
+    for header in (f'"other", {etag}', f"W/{etag}", "*"):
+        assert client.get(f"/feedback/{session_id}", headers={"If-None-Match": header}).status_code == 304
+    assert client.get(f"/feedback/{session_id}", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_etag_changes_when_a_session_is_replaced(client, app_module):
+    session_id = store_session(app_module)
+    etag = client.get(f"/feedback/{session_id}").headers["etag"]
+    record = json.loads(client.get(f"/feedback/{session_id}").content)
+    record["transcript"] = "Replaced by an import"
+    app_module.import_sessions([record])
+
+    response = client.get(f"/feedback/{session_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["transcript"] == "Replaced by an import"
+
+
+def test_feedback_served_from_cache_without_reading_the_store(client, app_module, monkeypatch):
+    session_id = store_session(app_module)
+    first = client.get(f"/feedback/{session_id}")
+
+    def unexpected_load(session_id):
+        raise AssertionError("session store read for a cached session")
+
+    monkeypatch.setattr(app_module.session_store, "load", unexpected_load)
+    assert client.get(f"/feedback/{session_id}").content == first.content
+
+
+def test_feedback_not_found(client):
+    assert client.get(f"/feedback/{uuid.uuid4()}").status_code == 404
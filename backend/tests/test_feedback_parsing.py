@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+VALID = {"summary": "Clear talk", "clarityScore": "82", "confidenceScore": 140, "engagementScore": -3,
+         "structureScore": 70.6, "overall_score": 11, "tip": "Pause more", "strengths": ["a"], "improvements": ["b"]}
+
+
+def test_scores_are_typed_and_clamped(app_module):
+    feedback = app_module.parse_feedback_response("```json\n" + json.dumps(VALID) + "\n```")
+    assert (feedback["clarityScore"], feedback["confidenceScore"], feedback["engagementScore"],
+            feedback["structureScore"], feedback["overall_score"]) == (82, 100, 0, 70, 10.0)
+
+
+@pytest.mark.parametrize("text", [
+    "[]", '"just a string"', "42", "null", "true", '[{"summary": "x"}]',
+    "not json", json.dumps({**VALID, "clarityScore": "high"}), json.dumps({"summary": "x"}),
+])
+def test_anything_but_a_complete_feedback_object_is_a_value_error(app_module, text):
+    failures = app_module.LLM_PARSE_FAILURES.value()
+    with pytest.raises(ValueError):
+        app_module.parse_feedback_response(text)
+    assert app_module.LLM_PARSE_FAILURES.value() == failures + 1
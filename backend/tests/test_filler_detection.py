@@ -0,0 +1,58 @@
+from filler_detection import FillerMatcher, tokenize
+
+
+def fillers(text, lexicon=None):
+    matcher = FillerMatcher(lexicon) if lexicon else FillerMatcher()
+    return [occurrence.filler for occurrence in matcher.find(text)]
+
+
+def test_single_and_multi_word_fillers():
+    assert fillers("Um, you know, it was kind of great. Like, really.") == ["um", "you know", "kind of", "like"]
+
+
+def test_longest_phrase_wins():
+    assert fillers("you know", ["you", "you know"]) == ["you know"]
+
+
+def test_case_and_punctuation_between_phrase_words():
+    assert fillers("YOU, know") == ["you know"]
+
+
+def test_filler_inside_a_word_is_not_counted():
+    assert fillers("summary likely sober umbrella") == []
+
+
+def test_contractions_are_one_word():
+    assert fillers("so's he, 'so' she said") == ["so"]
+
+
+def test_hyphenated_words_are_one_word():
+    assert fillers("uh-huh") == []
+    assert fillers("so-so, well-known, right-handed") == []
+
+
+def test_hyphenated_filler_in_lexicon():
+    assert fillers("uh-huh, uh", ["uh-huh", "uh"]) == ["uh-huh", "uh"]
+
+
+def test_dash_after_filler_still_counts():
+    assert fillers("um-- so") == ["um", "so"]
+
+
+def test_offsets_point_into_original_text():
+    text = "Well, um... okay"
+    assert [text[o.start:o.end] for o in FillerMatcher().find(text)] == ["Well", "um", "okay"]
+
+
+def test_duplicate_lexicon_entries_are_merged():
+    matcher = FillerMatcher(["Um", "um", " um "])
+    assert matcher.lexicon == ["um"]
+    assert matcher.count("um um") == {"um": 2}
+
+
+def test_empty_lexicon_finds_nothing():
+    assert FillerMatcher([]).find("um uh") == []
+
+
+def test_tokenize():
+    assert tokenize("Don't stop, uh-huh!") == ["don't", "stop", "uh-huh"]
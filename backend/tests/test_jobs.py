@@ -0,0 +1,218 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from jobs import JOB_DONE, JOB_FAILED, JOB_QUEUED, JobManager, JobQueueFullError
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def echo_handler(job_id, payload):
+    return {"sessionId": job_id, **payload}
+
+
+def write_job(storage_dir, job_id, status, owner=None, **fields):
+    job = {"jobId": job_id, "status": status, "createdAt": "2025-01-01T10:00:00",
+           "updatedAt": "2025-01-01T10:00:00", "input": {"n": 1}, "result": None, "error": None,
+           "owner": owner, **fields}
+    (storage_dir / f"{job_id}.json").write_text(json.dumps(job))
+
+
+async def wait_for_status(manager, job_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while manager.get(job_id)["status"] != status:
+        assert time.monotonic() < deadline, f"job {job_id} never reached {status}"
+        await asyncio.sleep(0.01)
+    return manager.get(job_id)
+
+
+def test_job_runs_and_clears_pending_marker(tmp_path):
+    async def run():
+        manager = JobManager(tmp_path, echo_handler, workers=1)
+        await manager.start()
+        job = manager.submit("j1", {"n": 1})
+        assert job["status"] == JOB_QUEUED
+        done = await wait_for_status(manager, "j1", JOB_DONE)
+        await manager.stop()
+        return done
+
+    done = asyncio.run(run())
+    assert done["result"] == {"sessionId": "j1", "n": 1}
+    assert not (tmp_path / ".pending" / "j1").exists()
+    assert json.loads((tmp_path / "j1.json").read_text())["status"] == JOB_DONE
+
+
+def test_failed_job_records_error(tmp_path):
+    async def failing(job_id, payload):
+        raise RuntimeError("boom")
+
+    async def run():
+        manager = JobManager(tmp_path, failing, workers=1)
+        await manager.start()
+        manager.submit("j1", {})
+        failed = await wait_for_status(manager, "j1", JOB_FAILED)
+        await manager.stop()
+        return failed
+
+    assert asyncio.run(run())["error"] == "boom"
+    assert not (tmp_path / ".pending" / "j1").exists()
+
+
+def test_events_follow_status_changes(tmp_path):
+    async def run():
+        gate = asyncio.Event()
+
+        async def slow(job_id, payload):
+            await gate.wait()
+            return {"ok": True}
+
+        manager = JobManager(tmp_path, slow, workers=1)
+        await manager.start()
+        manager.submit("j1", {})
+        statuses = []
+        async for job in manager.events("j1"):
+            statuses.append(job["status"])
+            gate.set()
+        await manager.stop()
+        return statuses
+
+    statuses = asyncio.run(run())
+    assert statuses[0] in ("queued", "running")
+    assert statuses[-1] == JOB_DONE
+
+
+def test_queue_full(tmp_path):
+    async def run():
+        manager = JobManager(tmp_path, echo_handler, workers=0, max_queue=1)
+        await manager.start()
+        manager.submit("j1", {})
+        with pytest.raises(JobQueueFullError):
+            manager.submit("j2", {})
+        await manager.stop()
+
+    asyncio.run(run())
+
+
+def test_unfinished_jobs_are_recovered_on_start(tmp_path):
+    async def interrupted(job_id, payload):
+        await asyncio.sleep(60)
+
+    async def first_run():
+        manager = JobManager(tmp_path, interrupted, workers=1)
+        await manager.start()
+        manager.submit("j1", {"n": 1})
+        await wait_for_status(manager, "j1", "running")
+        # Simulate a restart: the job is still running on disk
+        await manager.stop()
+
+    async def second_run():
+        manager = JobManager(tmp_path, echo_handler, workers=1)
+        recovered = await manager.start()
+        done = await wait_for_status(manager, "j1", JOB_DONE)
+        await manager.stop()
+        return recovered, done
+
+    asyncio.run(first_run())
+    assert (tmp_path / ".pending" / "j1").exists()
+    recovered, done = asyncio.run(second_run())
+    assert recovered == 1
+    assert done["result"] == {"sessionId": "j1", "n": 1}
+
+
+def test_recovery_reads_only_pending_jobs(tmp_path):
+    (tmp_path / ".pending").mkdir()
+    write_job(tmp_path, "done", JOB_DONE)
+    # Not valid JSON: recovery must not open finished jobs at all
+    (tmp_path / "broken.json").write_text("{")
+    write_job(tmp_path, "queued", JOB_QUEUED)
+    (tmp_path / ".pending" / "queued").touch()
+    # Marker left behind by a crash after the job finished
+    write_job(tmp_path, "finished", JOB_DONE)
+    (tmp_path / ".pending" / "finished").touch()
+
+    async def run():
+        manager = JobManager(tmp_path, echo_handler, workers=0)
+        recovered = await manager.start()
+        await manager.stop()
+        return recovered
+
+    assert asyncio.run(run()) == 1
+    assert not (tmp_path / ".pending" / "finished").exists()
+
+
+def test_legacy_directory_gets_pending_markers(tmp_path):
+    write_job(tmp_path, "old-done", JOB_DONE)
+    write_job(tmp_path, "old-running", "running")
+
+    async def run():
+        manager = JobManager(tmp_path, echo_handler, workers=0)
+        recovered = await manager.start()
+        await manager.stop()
+        return recovered
+
+    assert asyncio.run(run()) == 1
+    assert sorted(os.listdir(tmp_path / ".pending")) == ["old-running"]
+
+
+def test_jobs_owned_by_a_live_process_are_left_alone(tmp_path):
+    async def run():
+        owner = JobManager(tmp_path, echo_handler, workers=0)
+        await owner.start()
+        owner.submit("j1", {})
+        other = JobManager(tmp_path, echo_handler, workers=0)
+        recovered = await other.start()
+        await other.stop()
+        await owner.stop()
+        return recovered
+
+    assert asyncio.run(run()) == 0
+
+
+def test_prune_deletes_only_expired_finished_jobs(tmp_path):
+    manager = JobManager(tmp_path, echo_handler, retention_seconds=60)
+    (tmp_path / ".pending").mkdir()
+    old = time.time() - 3600
+    for job_id, status in (("old-done", JOB_DONE), ("old-queued", JOB_QUEUED), ("new-done", JOB_DONE)):
+        write_job(tmp_path, job_id, status)
+    (tmp_path / ".pending" / "old-queued").touch()
+    for job_id in ("old-done", "old-queued"):
+        os.utime(tmp_path / f"{job_id}.json", (old, old))
+
+    assert manager.prune() == 1
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["new-done.json", "old-queued.json"]
+    assert manager.stats()["pruned"] == 1
+
+
+def test_prune_disabled_without_retention(tmp_path):
+    manager = JobManager(tmp_path, echo_handler)
+    write_job(tmp_path, "old-done", JOB_DONE)
+    old = time.time() - 3600
+    os.utime(tmp_path / "old-done.json", (old, old))
+    assert manager.prune() == 0
+    assert (tmp_path / "old-done.json").exists()
+
+
+def test_job_events_stream_until_done(client, fake_model):
+    response = client.post("/analyze?mode=async", json={
+        "transcript": "A job mode request whose status changes are streamed as server-sent events.",
+        "userGoal": "Explain jobs", "duration": 15
+    })
+    assert response.status_code == 202
+    job_id = response.json()["jobId"]
+    events = parse_sse(client.get(f"/jobs/{job_id}/events").text)
+    assert {name for name, _ in events} == {"status"}
+    assert events[-1][1]["status"] == "done"
+    assert events[-1][1]["result"]["sessionId"] == job_id
+
+
+def test_job_events_unknown_job(client):
+    assert client.get("/jobs/no-such-job/events").status_code == 404
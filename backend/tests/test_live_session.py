@@ -0,0 +1,148 @@
+import random
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from filler_detection import FillerMatcher
+from live_session import MAX_PENDING_CHARS, LiveAlertPolicy, LiveTranscript, TranscriptTooLargeError
+
+
+def feed(text, sizes, matcher=None):
+    matcher = matcher or FillerMatcher()
+    live = LiveTranscript(matcher, clock=lambda: 0.0)
+    start = 0
+    for size in sizes:
+        if start >= len(text):
+            break
+        live.append(text[start:start + size], at=0.0)
+        start += size
+    live.append(text[start:], at=0.0)
+    return live
+
+
+def test_live_transcript_matches_full_scan_across_deltas():
+    text = "So, uh-huh, you know I kind of think that, um, well-known facts are like facts"
+    matcher = FillerMatcher()
+    for size in (1, 2, 3, 7):
+        live = feed(text, [size] * len(text), matcher)
+        assert live.finish() == matcher.find(text)
+        assert live.filler_counts == matcher.count(text)
+
+
+def test_live_transcript_matches_full_scan_for_random_splits():
+    rng = random.Random(0)
+    vocabulary = ["um", "uh", "you", "know", "kind", "of", "so-so", "don't", "like", "Well,", "right?", "'so'",
+                  "--", "sort", "basically", "okay.", "actually"]
+    matcher = FillerMatcher()
+    for _ in range(50):
+        text = " ".join(rng.choice(vocabulary) for _ in range(60))
+        sizes = [rng.randint(1, 12) for _ in range(len(text))]
+        live = feed(text, sizes, matcher)
+        assert live.finish() == matcher.find(text)
+        assert live.word_count == len(text.split())
+        assert live.text == text
+
+
+def test_windowed_pace_and_alerts():
+    policy = LiveAlertPolicy(window_seconds=10, min_wpm=100, max_wpm=150, filler_alert_count=2,
+                             warmup_seconds=5, cooldown_seconds=5)
+    live = LiveTranscript(FillerMatcher(), policy, clock=lambda: 0.0)
+    assert live.append("one two three ", at=1.0) == []
+    alerts = live.append(" ".join(["word"] * 40) + " ", at=6.0)
+    assert [alert["kind"] for alert in alerts] == ["pace_fast"]
+    assert alerts[0]["wpm"] == live.windowed_wpm(6.0) == 430
+    # Cooldown: no repeat of the same alert within 5 seconds
+    assert live.append("more words ", at=7.0) == []
+    alerts = live.append("um uh and then ", at=8.0)
+    assert [alert["kind"] for alert in alerts] == ["fillers"]
+    # Words older than the window stop counting
+    assert live.windowed_wpm(30.0) == 0
+
+
+def test_snapshot_reports_counts_in_lexicon_order():
+    live = LiveTranscript(FillerMatcher(), clock=lambda: 0.0)
+    live.append("so um, like, um you know. Right then ", at=2.5)
+    # "Right" is still in the uncommitted tail
+    assert live.snapshot() == {"elapsed": 2.5, "words": 8, "wpm": 192,
+                               "fillerWords": {"um": 2, "like": 1, "you know": 1, "so": 1}}
+
+
+def test_oversized_delta_and_transcript_are_rejected_unchanged():
+    live = LiveTranscript(FillerMatcher(), clock=lambda: 0.0, max_delta_chars=10, max_chars=15)
+    live.append("um hello ", at=0.0)
+    with pytest.raises(TranscriptTooLargeError):
+        live.append("x" * 11, at=0.0)
+    with pytest.raises(TranscriptTooLargeError):
+        live.append("1234567", at=0.0)
+    assert live.text == "um hello "
+    assert live.word_count == 2
+    live.append("world", at=0.0)
+    assert live.finish()[0].filler == "um"
+
+
+@pytest.mark.parametrize("limit, messages", [
+    ("LIVE_MAX_DELTA_CHARS", ["x" * 30]),
+    ("LIVE_MAX_TRANSCRIPT_CHARS", ["x" * 15, "y" * 15]),
+])
+def test_websocket_closes_with_1009_over_the_limits(client, app_module, monkeypatch, limit, messages):
+    monkeypatch.setattr(app_module, limit, 20)
+    with client.websocket_connect("/ws/live") as websocket:
+        for text in messages[:-1]:
+            websocket.send_json({"type": "transcript", "text": text})
+            assert websocket.receive_json()["type"] == "metrics"
+        websocket.send_json({"type": "transcript", "text": messages[-1]})
+        error = websocket.receive_json()
+        assert error["type"] == "error" and "character limit" in error["detail"]
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+    assert closed.value.code == 1009
+
+
+def test_websocket_session_ends_with_a_saved_result(client, fake_model):
+    with client.websocket_connect("/ws/live") as websocket:
+        websocket.send_json({"type": "start", "userGoal": "Live test"})
+        websocket.send_json({"type": "transcript", "text": "So um this is a live ", "t": 1.0})
+        assert websocket.receive_json()["words"] == 6
+        websocket.send_json({"type": "transcript", "text": "session, you know.", "t": 3.0})
+        metrics = websocket.receive_json()
+        assert metrics["fillerWords"] == {"um": 1, "so": 1}
+        websocket.send_json({"type": "end", "duration": 4})
+        result = websocket.receive_json()
+    assert result["type"] == "result"
+    assert result["fillerWords"] == {"um": 1, "you know": 1, "so": 1}
+    assert client.get(f"/feedback/{result['sessionId']}").status_code == 200
+
+
+def test_pending_tail_stays_bounded_without_word_breaks():
+    live = LiveTranscript(FillerMatcher(), clock=lambda: 0.0)
+    for _ in range(5000):
+        live.append("a", at=0.0)
+        assert len(live._pending) <= MAX_PENDING_CHARS + 1
+    for _ in range(5000):
+        live.append("!", at=0.0)
+        assert len(live._pending) <= MAX_PENDING_CHARS + 1
+    live.append(" um, so", at=0.0)
+    text = live.text
+    assert live.finish() == FillerMatcher().find(text)
+    assert live.filler_counts == {"um": 1, "so": 1}
+
+
+def test_cut_inside_a_long_word_does_not_create_fillers():
+    # The tail is cut mid-word; the letters before the cut still count as part of the word
+    text = "x" * (MAX_PENDING_CHARS + 3) + "um-like so'um well"
+    matcher = FillerMatcher()
+    for size in (1, 5, MAX_PENDING_CHARS + 3):
+        live = feed(text, [size] * len(text), matcher)
+        assert live.finish() == matcher.find(text)
+        assert live.filler_counts == {"well": 1}
+
+
+def test_client_time_going_backwards_is_clamped():
+    policy = LiveAlertPolicy(window_seconds=10, filler_alert_count=100)
+    live = LiveTranscript(FillerMatcher(), policy, clock=lambda: 0.0)
+    live.append("one two three four ", at=20.0)
+    live.append("five six ", at=5.0)
+    assert list(live._window_words) == [(20.0, 4), (20.0, 2)]
+    assert live.snapshot()["elapsed"] == 20.0
+    # Both deltas leave the window together
+    assert live.windowed_wpm(30.5) == 0
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+
+import pytest
+
+from llm_executor import LLMExecutor
+from llm_resilience import (
+    CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, CircuitOpenError, ResilientLLMClient
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_breaker(clock, threshold=2, reset=10.0):
+    breaker = CircuitBreaker(failure_threshold=threshold, reset_seconds=reset, clock=clock)
+    for _ in range(threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_half_open_lets_one_trial_through():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 10.0
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert breaker.opened == 2
+
+
+def test_released_trial_can_be_retried():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.release_trial()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert breaker.allow()
+
+
+def test_cancelled_trial_call_does_not_wedge_the_breaker():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 10.0
+    # Two threads: the cancelled call keeps its thread until slow_call returns
+    executor = LLMExecutor(max_concurrency=2, timeout=None)
+    client = ResilientLLMClient(executor, breaker, deadline=None, attempt_timeout=None)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_call():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    async def scenario():
+        trial = asyncio.ensure_future(client.call(slow_call))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        # The next call becomes the new trial instead of failing fast forever
+        return await client.call(lambda: "ok")
+
+    try:
+        assert asyncio.run(scenario()) == "ok"
+        assert breaker.state == CIRCUIT_CLOSED
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_open_circuit_fails_fast():
+    clock = FakeClock()
+    executor = LLMExecutor(max_concurrency=1, timeout=None)
+    client = ResilientLLMClient(executor, open_breaker(clock), deadline=None, attempt_timeout=None)
+    try:
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(client.call(lambda: "never"))
+    finally:
+        executor.shutdown()
+
+
+def test_transient_errors_are_retried():
+    executor = LLMExecutor(max_concurrency=1, timeout=None)
+    client = ResilientLLMClient(executor, CircuitBreaker(), deadline=None, attempt_timeout=None,
+                                max_attempts=3, backoff_base=0.0)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TimeoutError("slow")
+        return "ok"
+
+    try:
+        assert asyncio.run(client.call(flaky)) == "ok"
+        assert len(calls) == 3
+        assert client.stats()["retries"] == 2
+    finally:
+        executor.shutdown()
@@ -0,0 +1,82 @@
+import pytest
+
+from filler_detection import FillerMatcher
+from local_scoring import SCORE_KEYS, LocalScorer, PhraseIndex, score_deviation
+
+GOOD = ("Good morning everyone. Today I want to talk about our results. Have you ever wondered why revenue grew? "
+        "For example, every region beat its plan. First, sales improved. Next, costs stayed flat. As a result, "
+        "our margin grew. In conclusion, we are in great shape, so thank you for listening.")
+HESITANT = ("um so I think maybe the results were kind of okay I guess um like probably fine um you know "
+            "I am not sure but perhaps it was sort of good um basically I think so")
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return LocalScorer(FillerMatcher())
+
+
+def test_scores_are_deterministic_and_in_range(scorer):
+    first = scorer.score(GOOD, 30)
+    assert scorer.score(GOOD, 30) == first
+    for key in SCORE_KEYS:
+        assert 0 <= first[key] <= 100
+    assert 0 <= first["overall_score"] <= 10
+
+
+def test_empty_transcript(scorer):
+    scores = scorer.score("  ", 10)
+    assert {key: scores[key] for key in SCORE_KEYS} == dict.fromkeys(SCORE_KEYS, 0)
+    assert scores["signals"]["words"] == 0 and scores["signals"]["pace"] is None
+    assert scorer.feedback(scores)["summary"].startswith("Local estimate from 0 words")
+
+
+def test_signals(scorer):
+    signals = scorer.score(GOOD, 30)["signals"]
+    assert signals["opening"] and signals["closing"]
+    assert signals["examples"] == 1
+    assert signals["questions"] == 2
+    assert signals["transitions"] >= 3
+    assert signals["sentences"] == 8
+    assert signals["pace"] == signals["words"] * 2
+
+
+def test_fillers_and_hedges_lower_clarity_and_confidence(scorer):
+    good, hesitant = scorer.score(GOOD, 30), scorer.score(HESITANT, 20)
+    assert hesitant["clarityScore"] < good["clarityScore"]
+    assert hesitant["confidenceScore"] < good["confidenceScore"]
+    assert hesitant["structureScore"] < good["structureScore"]
+    assert hesitant["signals"]["hedgesPer100Words"] > 10
+
+
+def test_metrics_are_reused_instead_of_rescanned(scorer):
+    metrics = {"fillerWords": {"um": 50}, "pace": 300}
+    scores = scorer.score(HESITANT, 20, metrics)
+    assert scores["signals"]["pace"] == 300
+    assert scores["signals"]["fillersPer100Words"] > scorer.score(HESITANT, 20)["signals"]["fillersPer100Words"]
+    # Without a duration the pace in the metrics is a placeholder and is not judged
+    assert scorer.score(HESITANT, 0, metrics)["signals"]["pace"] is None
+
+
+def test_self_counted_fillers_match_the_matcher(scorer, app_module):
+    metrics = app_module.calculate_metrics(HESITANT, 20)
+    assert scorer.score(HESITANT, 20)["signals"] == scorer.score(HESITANT, 20, metrics)["signals"]
+
+
+def test_feedback_has_llm_fields(scorer):
+    feedback = scorer.feedback(scorer.score(HESITANT, 20))
+    assert set(feedback) == {"summary", *SCORE_KEYS, "overall_score", "tip", "strengths", "improvements"}
+    assert feedback["tip"] == feedback["improvements"][0]
+    assert "filler" in " ".join(feedback["improvements"]).lower()
+
+
+def test_phrase_index_counts_words_and_phrases():
+    index = PhraseIndex({"a": ["you", "you know"], "b": ["for example"]})
+    words = "you know for example you for".split()
+    assert index.count(f" {' '.join(words)} ", set(words)) == {"a": 3, "b": 1}
+
+
+def test_score_deviation():
+    local = {"clarityScore": 80, "confidenceScore": 70, "engagementScore": 60, "structureScore": 50}
+    llm = {"clarityScore": 75, "confidenceScore": 20, "engagementScore": 90, "structureScore": 50}
+    assert score_deviation(llm, local) == ("confidenceScore", 50)
+    assert score_deviation(local, local) == ("clarityScore", 0)
@@ -0,0 +1,113 @@
+import pytest
+
+from long_transcripts import (
+    LONG_PAUSES_NOTED, apply_delivery_metrics, estimate_tokens, plan_segments, reduce_segment_feedback
+)
+
+SENTENCES = [f"Sentence number {number} says something about the quarterly plan." for number in range(60)]
+
+
+def segment_feedback(score, summary, strengths=("Clear",), improvements=("Slow down",)):
+    return {"clarityScore": score, "confidenceScore": score, "engagementScore": score, "structureScore": score,
+            "overall_score": score / 10, "summary": summary, "tip": f"Tip {summary}",
+            "strengths": list(strengths), "improvements": list(improvements)}
+
+
+def test_segments_respect_the_budget_and_keep_every_word():
+    transcript = " ".join(SENTENCES)
+    segments = plan_segments(transcript, max_tokens=50)
+    assert len(segments) > 1
+    assert all(estimate_tokens(segment) <= 50 for segment in segments)
+    assert " ".join(segments).split() == transcript.split()
+
+
+def test_unpunctuated_text_is_cut_at_words():
+    transcript = " ".join(["word"] * 500)
+    segments = plan_segments(transcript, max_tokens=20)
+    assert all(len(segment) <= 80 for segment in segments)
+    assert sum(len(segment.split()) for segment in segments) == 500
+
+
+def test_editing_the_tail_keeps_earlier_segments():
+    transcript = " ".join(SENTENCES)
+    segments = plan_segments(transcript, max_tokens=50)
+    edited = plan_segments(transcript + " One more closing sentence.", max_tokens=50)
+    assert edited[:len(segments) - 1] == segments[:-1]
+
+
+def test_reduce_weights_scores_by_length_and_takes_the_weakest_tip():
+    reduced = reduce_segment_feedback(
+        [segment_feedback(90, "First.", strengths=["Clear", "Vivid"]),
+         segment_feedback(60, "Second.", strengths=["clear", "Warm"], improvements=["Pause more"])],
+        [300, 100]
+    )
+    assert reduced["clarityScore"] == 82
+    assert reduced["overall_score"] == 8.2
+    assert reduced["summary"] == "First. Second."
+    assert reduced["tip"] == "Tip Second."
+    assert reduced["strengths"] == ["Clear", "Vivid", "Warm"]
+    assert reduced["improvements"] == ["Slow down", "Pause more"]
+
+
+def test_delivery_metrics_adjust_the_reduced_feedback():
+    feedback = segment_feedback(80, "All.", improvements=["Add an example"])
+    assert apply_delivery_metrics(feedback, 150) is feedback
+    assert apply_delivery_metrics(feedback, None) is feedback
+
+    fast = apply_delivery_metrics(feedback, 220)
+    assert fast["clarityScore"] == 60 and fast["confidenceScore"] == 70
+    assert fast["engagementScore"] == 80 and fast["structureScore"] == 80
+    assert fast["overall_score"] == 7.2
+    assert fast["improvements"][0].startswith("Slow down: at 220 WPM")
+    assert fast["improvements"][1] == "Add an example"
+    assert feedback["clarityScore"] == 80
+
+    audio = {"longPauseCount": LONG_PAUSES_NOTED, "longestPauseSeconds": 4.2, "pitchVariabilitySemitones": 1.1}
+    flat = apply_delivery_metrics(feedback, 150, audio)
+    assert flat["confidenceScore"] == 80 - 2 * LONG_PAUSES_NOTED
+    assert flat["engagementScore"] == 72
+    assert flat["improvements"][:2] == [f"Shorten your pauses: {LONG_PAUSES_NOTED} were long, the longest 4.2s",
+                                        "Vary your pitch to sound less monotone"]
+    assert apply_delivery_metrics(feedback, 150, {"longPauseCount": 1, "pitchVariabilitySemitones": 4}) is feedback
+
+
+@pytest.fixture
+def small_segments(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "LLM_TRANSCRIPT_TOKEN_BUDGET", 200)
+    monkeypatch.setattr(app_module, "LLM_SEGMENT_TOKENS", 100)
+
+
+def analyze(client, transcript, duration):
+    response = client.post("/analyze", json={"transcript": transcript, "userGoal": "Segment cache test",
+                                             "duration": duration})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_segment_prompts_only_see_their_own_text(app_module):
+    prompt = app_module.build_segment_prompt("So um, this part is short.", "goal", "direct", 1, False)
+    assert "- Word count: 6" in prompt
+    assert "'um' x1, 'so' x1" in prompt
+    assert "Duration" not in prompt and "AUDIO ANALYSIS" not in prompt
+
+
+def test_tail_edit_and_new_duration_reuse_cached_segments(client, app_module, fake_model, small_segments):
+    transcript = " ".join(f"Segment cache sentence {number} keeps the roadmap on track." for number in range(40))
+    segments = app_module.plan_segments(transcript, app_module.LLM_SEGMENT_TOKENS)
+    assert len(segments) >= 3
+
+    analyze(client, transcript, 120)
+    assert fake_model.calls == len(segments)
+
+    # Only the last segment changes; the earlier ones are cache hits
+    edited = transcript + " A closing line."
+    assert app_module.plan_segments(edited, app_module.LLM_SEGMENT_TOKENS)[:-1] == segments[:-1]
+    analyze(client, edited, 125)
+    assert fake_model.calls == len(segments) + 1
+
+    # The whole-speech pace changes the result, not the segment prompts
+    words = len(transcript.split())
+    steady, fast = analyze(client, transcript, words * 60 // 150), analyze(client, transcript, words * 60 // 300)
+    assert fake_model.calls == len(segments) + 1
+    assert fast["clarityScore"] < steady["clarityScore"]
+    assert fast["improvements"][0].startswith("Slow down: at 300 WPM")
@@ -0,0 +1,97 @@
+import atexit
+import io
+import json
+import logging
+import re
+
+import pytest
+
+from observability import MetricsRegistry, StructuredFormatter, configure_logging
+
+
+def sample(text, line_prefix):
+    """Value of the exposition line starting with `line_prefix`"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {line_prefix!r} in:\n{text}")
+
+
+def test_counter_and_gauge_render_with_labels():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ["kind"])
+    depth = registry.gauge("queue_depth", "Depth")
+    calls.inc(kind="full")
+    calls.inc(2, kind='we"ird\n')
+    depth.set(3)
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text
+    assert "# TYPE queue_depth gauge" in text
+    assert sample(text, 'calls_total{kind="full"}') == 1
+    assert sample(text, 'calls_total{kind="we\\"ird\\n"}') == 2
+    assert sample(text, "queue_depth") == 3
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=[0.1, 1])
+    for value in (0.05, 0.5, 0.5, 5):
+        latency.observe(value, stage="llm")
+    text = registry.render()
+    assert sample(text, 'latency_seconds_bucket{stage="llm",le="0.1"}') == 1
+    assert sample(text, 'latency_seconds_bucket{stage="llm",le="1"}') == 3
+    assert sample(text, 'latency_seconds_bucket{stage="llm",le="+Inf"}') == 4
+    assert sample(text, 'latency_seconds_count{stage="llm"}') == 4
+    assert sample(text, 'latency_seconds_sum{stage="llm"}') == pytest.approx(6.05)
+    assert latency.count(stage="llm") == 4
+
+
+def test_labels_must_match_and_names_are_unique():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ["kind"])
+    with pytest.raises(ValueError):
+        calls.inc(outcome="ok")
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Again")
+
+
+def test_structured_formatter_text_and_json():
+    record = logging.LogRecord("podium", logging.INFO, __file__, 1, "Session saved", None, None)
+    record.session_id = "abc"
+    record.note = "two words"
+    text = StructuredFormatter().format(record)
+    assert text.endswith('podium: Session saved session_id=abc note="two words"')
+    line = json.loads(StructuredFormatter(json_lines=True).format(record))
+    assert line["msg"] == "Session saved" and line["session_id"] == "abc" and line["level"] == "info"
+
+
+def test_queued_logging_writes_on_the_listener_thread():
+    stream = io.StringIO()
+    root = logging.getLogger()
+    level, handlers = root.level, list(root.handlers)
+    listener = configure_logging("INFO", json_lines=True, stream=stream)
+    try:
+        logging.getLogger("podium.test").info("Queued", extra={"n": 1})
+    finally:
+        listener.stop()
+        atexit.unregister(listener.stop)
+        root.handlers[:] = handlers
+        root.setLevel(level)
+    assert json.loads(stream.getvalue())["n"] == 1
+
+
+def test_metrics_endpoint_reports_requests_and_stages(client, fake_model):
+    response = client.post("/analyze", json={"transcript": "Metrics are recorded for this analysis, um, quickly.",
+                                             "userGoal": "Check metrics", "duration": 10})
+    assert response.status_code == 200
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = metrics.text
+    assert sample(text, 'podium_http_request_duration_seconds_count{method="POST",route="/analyze",status="200"}') >= 1
+    assert sample(text, 'podium_stage_duration_seconds_count{stage="request_parse"}') >= 1
+    assert sample(text, 'podium_llm_circuit_state{state="closed"}') == 1
+    assert re.search(r'^podium_analysis_jobs\{status="queued"\} \d+$', text, re.M)
+    # Unknown paths share one label value instead of one series per path
+    client.get("/no/such/path/123")
+    assert 'route="/no/such/path/123"' not in client.get("/metrics").text
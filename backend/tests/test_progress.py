@@ -0,0 +1,113 @@
+from datetime import date
+
+import pytest
+
+from progress import ProgressRollups, iso_week, session_facts, wpm_bin
+
+
+def make_session(session_id, timestamp, overall, user_id="u1", pace=120, fillers=None, words=100):
+    return {
+        "sessionId": session_id,
+        "timestamp": timestamp,
+        "userId": user_id,
+        "transcript": " ".join(["word"] * words),
+        "feedback": {"clarityScore": 80, "confidenceScore": 70, "engagementScore": 60, "structureScore": 50,
+                     "overall_score": overall, "pace": pace, "fillerWords": fillers or {}},
+    }
+
+
+@pytest.fixture
+def rollups(tmp_path):
+    rollups = ProgressRollups(tmp_path / "progress.db")
+    yield rollups
+    rollups.close()
+
+
+def test_iso_week_and_wpm_bins():
+    assert iso_week(date(2024, 2, 14)) == "2024-W07"
+    assert iso_week(date(2021, 1, 1)) == "2020-W53"
+    assert wpm_bin(139) == 120
+    assert wpm_bin(999) == 300
+    assert wpm_bin(-5) == 0
+
+
+def test_session_facts_needs_timestamp_and_scores():
+    assert session_facts(make_session("a", "not a date", 7.0)) is None
+    assert session_facts(make_session("a", "2025-01-01T10:00:00", None)) is None
+    fact = session_facts(make_session("a", "2025-01-01T10:00:00", 7.0, fillers={"um": 3, "bad": "x"}))
+    assert fact["day"] == "2025-01-01" and fact["week"] == "2025-W01"
+    assert fact["sums"] == [80.0, 70.0, 60.0, 50.0, 7.0, 3, 100, 120]
+
+
+def test_progress_averages_trends_and_extremes(rollups):
+    added = rollups.add_many([
+        make_session("a", "2025-03-03T09:00:00", 6.0, pace=110, fillers={"um": 2}),
+        make_session("b", "2025-03-03T18:00:00", 8.0, pace=150, fillers={"um": 1, "so": 1}),
+        make_session("c", "2025-03-12T09:00:00", 4.0, pace=155),
+        make_session("other", "2025-03-12T09:00:00", 9.9, user_id="u2"),
+    ])
+    assert added == 4
+    progress = rollups.progress("u1", days=30, weeks=4, today=date(2025, 3, 14))
+    assert progress["sessions"] == 3
+    assert progress["averages"]["overall"] == 6.0
+    assert progress["averages"]["wpm"] == 138
+    assert progress["averages"]["fillersPer100Words"] == 1.33
+    assert [(day["date"], day["sessions"], day["overall"]) for day in progress["daily"]] == [
+        ("2025-03-03", 2, 7.0), ("2025-03-12", 1, 4.0)
+    ]
+    assert [week["week"] for week in progress["weekly"]] == ["2025-W10", "2025-W11"]
+    assert progress["wpmDistribution"] == [{"min": 100, "max": 120, "sessions": 1},
+                                           {"min": 140, "max": 160, "sessions": 2}]
+    assert progress["best"]["sessionId"] == "b"
+    assert progress["worst"]["sessionId"] == "c"
+    # The trend windows end today
+    recent = rollups.progress("u1", days=3, weeks=1, today=date(2025, 3, 14))
+    assert [day["date"] for day in recent["daily"]] == ["2025-03-12"]
+
+
+def test_each_session_counts_once(rollups):
+    session = make_session("a", "2025-03-03T09:00:00", 6.0)
+    assert rollups.add_many([session]) == 1
+    assert rollups.add_many([session]) == 0
+    assert rollups.progress("u1", today=date(2025, 3, 4))["sessions"] == 1
+
+
+def test_replace_moves_the_contribution(rollups):
+    rollups.add_many([make_session("a", "2025-03-03T09:00:00", 9.0),
+                      make_session("b", "2025-03-04T09:00:00", 5.0)])
+    rollups.add_many([make_session("a", "2025-03-04T12:00:00", 3.0, pace=200)], replace=True)
+    progress = rollups.progress("u1", today=date(2025, 3, 5))
+    assert progress["sessions"] == 2
+    assert progress["averages"]["overall"] == 4.0
+    assert [(day["date"], day["sessions"]) for day in progress["daily"]] == [("2025-03-04", 2)]
+    assert {bucket["min"] for bucket in progress["wpmDistribution"]} == {120, 200}
+    assert progress["best"]["sessionId"] == "b"
+    assert progress["worst"]["sessionId"] == "a"
+
+
+def test_sessions_without_scores_are_seen_but_not_averaged(rollups):
+    assert rollups.add_many([make_session("a", "2025-03-03T09:00:00", None)]) == 0
+    assert rollups.count() == 1
+    assert rollups.progress("u1", today=date(2025, 3, 4))["sessions"] == 0
+
+
+def test_rebuild_matches_incremental_adds(rollups, tmp_path):
+    sessions = [make_session(f"s{i}", f"2025-03-{1 + i % 20:02d}T09:00:00", 3 + i % 7, pace=90 + 7 * i,
+                             fillers={"um": i % 4}) for i in range(40)]
+    rollups.add_many(sessions[:25])
+    rollups.add_many(sessions[25:])
+    rebuilt = ProgressRollups(tmp_path / "rebuilt.db")
+    assert rebuilt.rebuild(iter(sessions), batch_size=7) == 40
+    today = date(2025, 3, 25)
+    assert rebuilt.progress("u1", today=today) == rollups.progress("u1", today=today)
+    rebuilt.close()
+
+
+def test_progress_endpoint(client, app_module):
+    app_module.save_session(make_session("endpoint-1", date.today().isoformat() + "T08:00:00", 7.5,
+                                         user_id="progress-endpoint-user"))
+    response = client.get("/progress", params={"userId": "progress-endpoint-user", "days": 7})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sessions"] == 1 and body["best"]["sessionId"] == "endpoint-1"
+    assert client.get("/progress", params={"days": 0}).status_code == 422
@@ -0,0 +1,158 @@
+import inspect
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from gemini_models import GeminiModelPool
+from prompts import (
+    FEEDBACK_INTRO, FEEDBACK_TASK, PERSONALITY_STYLES, SEGMENT_POSITIONS, PromptTemplate, PromptTemplates,
+    build_personality_instruction, split_for_system_instruction
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+FIELDS = ("Persuade the board", "We should ship it. Um, soon.", "Duration: 30 seconds", "Audio: none")
+
+
+def legacy_prompt(ai_personality, user_goal, transcript, duration_context, audio_note):
+    """The prompt as it was formatted per request before templates were compiled"""
+    return f"""{FEEDBACK_INTRO}
+
+{build_personality_instruction(ai_personality)}
+
+**SPEAKER'S GOAL:** {user_goal}
+
+**TRANSCRIPT TO ANALYZE:**
+{transcript}
+{duration_context}
+{audio_note}
+
+{FEEDBACK_TASK}"""
+
+
+@pytest.mark.parametrize("ai_personality", [*PERSONALITY_STYLES, "pirate"])
+def test_compiled_prompt_matches_the_per_request_prompt(ai_personality):
+    template = PromptTemplate(ai_personality)
+    assert template.feedback_prompt(*FIELDS) == legacy_prompt(ai_personality, *FIELDS)
+
+
+def test_unknown_personality_uses_the_supportive_style_and_is_not_kept():
+    templates = PromptTemplates()
+    assert len(templates) == len(PERSONALITY_STYLES)
+    assert templates.get("direct") is templates.get("direct")
+    pirate = templates.get("pirate")
+    assert pirate is not templates.get("pirate")
+    assert len(templates) == len(PERSONALITY_STYLES)
+    prompt = pirate.feedback_prompt(*FIELDS)
+    assert "FEEDBACK PERSONALITY: PIRATE" in prompt
+    assert PERSONALITY_STYLES["supportive"]["tone"] in prompt
+
+
+def test_system_instruction_split():
+    template = PromptTemplate("mentor")
+    system_instruction, message = split_for_system_instruction(template, *FIELDS, use_system_instruction=True)
+    assert system_instruction == template.feedback_system_instruction
+    assert system_instruction.startswith(FEEDBACK_INTRO) and system_instruction.endswith(FEEDBACK_TASK)
+    assert message.startswith("**SPEAKER'S GOAL:** Persuade the board")
+    assert all(field in message for field in FIELDS)
+    assert FEEDBACK_INTRO not in message
+    assert split_for_system_instruction(template, *FIELDS, use_system_instruction=False) == (
+        None, template.feedback_prompt(*FIELDS)
+    )
+
+
+def test_segment_prompts_name_the_part_and_its_position():
+    template = PromptTemplate("direct")
+    first, middle, last = (template.segment_prompt("segment text", "goal", index, index == 2) for index in range(3))
+    assert "part 1, which is " + SEGMENT_POSITIONS[0] in first
+    assert "part 2, which is " + SEGMENT_POSITIONS[1] in middle
+    assert "part 3, which is " + SEGMENT_POSITIONS[2] in last
+    assert "and a clear opening" in first and "and a clear conclusion" not in first
+    assert "and a clear conclusion" in last
+    assert all("**TRANSCRIPT PART" in prompt and "segment text" in prompt for prompt in (first, middle, last))
+
+
+def fake_sdk(system_instructions: bool):
+    """A stand-in for google.generativeai recording configure calls and created models"""
+    sdk = types.SimpleNamespace(configured=[], created=[])
+
+    def generative_model(model_name, system_instruction=None):
+        sdk.created.append((model_name, system_instruction))
+        return object()
+
+    def older_generative_model(model_name):
+        return generative_model(model_name)
+
+    sdk.GenerativeModel = generative_model if system_instructions else older_generative_model
+    sdk.configure = lambda api_key: sdk.configured.append(api_key)
+    return sdk
+
+
+@pytest.fixture
+def install_sdk(monkeypatch):
+    import google
+
+    def install(system_instructions):
+        sdk = fake_sdk(system_instructions)
+        monkeypatch.setitem(sys.modules, "google.generativeai", sdk)
+        monkeypatch.setattr(google, "generativeai", sdk, raising=False)
+        return sdk
+
+    return install
+
+
+def test_model_pool_loads_the_sdk_once_and_reuses_models(install_sdk):
+    sdk = install_sdk(system_instructions=True)
+    pool = GeminiModelPool("gemini-test", api_key="key")
+    assert pool.stats() == {"sdkLoaded": False, "importSeconds": None, "systemInstructions": False, "models": 0}
+    assert pool.get() is pool.get()
+    assert pool.get("be brief") is pool.get("be brief")
+    assert pool.get("be brief") is not pool.get()
+    assert sdk.configured == ["key"]
+    assert sdk.created == [("gemini-test", None), ("gemini-test", "be brief")]
+    stats = pool.stats()
+    assert stats["sdkLoaded"] and stats["systemInstructions"] and stats["models"] == 2
+
+
+def test_model_pool_warm_up(install_sdk):
+    sdk = install_sdk(system_instructions=True)
+    pool = GeminiModelPool("gemini-test")
+    assert pool.warm_up(["a", "b", "a"]) >= 0
+    assert sdk.configured == []
+    assert sdk.created == [("gemini-test", None), ("gemini-test", "a"), ("gemini-test", "b")]
+
+
+def test_model_pool_without_system_instruction_support(install_sdk):
+    sdk = install_sdk(system_instructions=False)
+    assert "system_instruction" not in inspect.signature(sdk.GenerativeModel).parameters
+    pool = GeminiModelPool("gemini-test")
+    assert not pool.supports_system_instruction
+    with pytest.raises(ValueError):
+        pool.get("be brief")
+    pool.warm_up(["be brief"])
+    assert pool.stats()["models"] == 1
+
+
+def test_importing_main_does_not_load_the_gemini_sdk(tmp_path):
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR), "LOG_LEVEL": "ERROR"}
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('google.generativeai' in sys.modules)"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+def test_ready_endpoint_reports_warm_up(client, app_module):
+    response = client.get("/ready")
+    body = response.json()
+    assert response.status_code == (200 if body["ready"] else 503)
+    # Without an API key there is nothing to warm up
+    if app_module.gemini_models.api_key is None:
+        assert body["ready"]
+    assert body["promptTemplates"] == len(PERSONALITY_STYLES)
+    assert set(body["gemini"]) >= {"sdkLoaded", "warmUpSeconds", "warmUpError"}
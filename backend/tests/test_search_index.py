@@ -0,0 +1,99 @@
+import pytest
+
+from search_index import SearchIndex, build_match_expression
+
+
+@pytest.mark.parametrize("query, expression", [
+    ("eye contact", '"eye" AND "contact"'),
+    ('"eye contact" pacing', '"eye contact" AND "pacing"'),
+    ("pac*", '"pac"*'),
+    ('unterminated "phrase here', '"unterminated" AND "phrase here"'),
+    ("NOT OR AND", '"NOT" AND "OR" AND "AND"'),
+    ('quote"inside col:umn (x)', '"quote" AND "inside" AND "col" AND "umn" AND "x"'),
+])
+def test_match_expression_quotes_every_term(query, expression):
+    assert build_match_expression(query) == expression
+
+
+@pytest.mark.parametrize("query", ["", "   ", '""', "*", "-- ()"])
+def test_query_without_words(query):
+    with pytest.raises(ValueError):
+        build_match_expression(query)
+
+
+def make_session(number, transcript, score=7.0, personality="supportive"):
+    return {
+        "sessionId": f"s{number:03d}",
+        "timestamp": f"2025-01-01T10:{number // 60:02d}:{number % 60:02d}",
+        "transcript": transcript,
+        "userGoal": "Pitch the product",
+        "aiPersonality": personality,
+        "feedback": {"overall_score": score, "strengths": ["Clear opening"], "improvements": []},
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(tmp_path / "search.db")
+    yield index
+    index.close()
+
+
+def test_search_finds_and_filters(index):
+    index.upsert_many([
+        make_session(1, "We talked about the quarterly budget", score=8.0),
+        make_session(2, "The budget was too large", score=4.0, personality="direct"),
+        make_session(3, "Nothing relevant here"),
+    ])
+    results, has_more, truncated = index.search("budget")
+    assert sorted(result["session_id"] for result in results) == ["s001", "s002"]
+    assert not has_more and not truncated
+    assert [r["session_id"] for r in index.search("budget", min_score=5)[0]] == ["s001"]
+    assert [r["session_id"] for r in index.search("budget", personality="direct")[0]] == ["s002"]
+    assert index.search('"budget was"')[0][0]["session_id"] == "s002"
+
+
+def test_operator_words_do_not_break_queries(index):
+    index.upsert(make_session(1, "NOT a problem, OR is it"))
+    assert len(index.search("NOT OR")[0]) == 1
+
+
+def test_snippets_are_escaped(index):
+    index.upsert(make_session(1, "<script>alert('x')</script> budget & costs"))
+    snippet = index.search("budget")[0][0]["snippet"]
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "<mark>budget</mark> &amp; costs" in snippet
+
+
+def test_marker_characters_in_text_cannot_fake_highlights(index):
+    index.upsert(make_session(1, "budget \x02<b>x</b>\x03"))
+    snippet = index.search("budget")[0][0]["snippet"]
+    assert snippet.count("<mark>") == 1
+    assert "&lt;b&gt;" in snippet
+
+
+def test_replacing_a_session_reindexes_it(index):
+    index.upsert(make_session(1, "budget talk"))
+    index.upsert(make_session(1, "marketing talk"))
+    assert index.count() == 1
+    assert index.search("budget")[0] == []
+    assert len(index.search("marketing")[0]) == 1
+
+
+def test_ranking_cap_is_reported(tmp_path):
+    index = SearchIndex(tmp_path / "search.db", max_ranked_matches=10)
+    index.upsert_many(make_session(number, f"budget number{number}") for number in range(25))
+    results, has_more, truncated = index.search("budget", limit=50)
+    assert len(results) == 10 and not has_more and truncated
+    # The most recently indexed matches are the ones ranked
+    assert min(result["session_id"] for result in results) == "s015"
+    index.close()
+
+
+def test_ranking_cap_disabled(tmp_path):
+    index = SearchIndex(tmp_path / "search.db", max_ranked_matches=0)
+    index.upsert_many(make_session(number, "budget") for number in range(25))
+    results, has_more, truncated = index.search("budget", limit=10, offset=20)
+    assert len(results) == 5 and not has_more and not truncated
+    index.close()
@@ -0,0 +1,71 @@
+import pytest
+
+from session_index import SessionIndex
+
+
+def make_session(number, score, personality="supportive"):
+    return {
+        "sessionId": f"s{number:03d}",
+        # Pairs of sessions share a timestamp, so ties must be broken by id
+        "timestamp": f"2025-01-{1 + number // 2:02d}T10:00:00",
+        "userGoal": "Goal",
+        "aiPersonality": personality,
+        "transcript": "word " * 40,
+        "feedback": {"overall_score": score},
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SessionIndex(tmp_path / "sessions.db")
+    sessions = [make_session(number, score=float(number % 4) if number % 5 else None,
+                             personality="direct" if number % 3 == 0 else "supportive")
+                for number in range(23)]
+    index.upsert_many(sessions)
+    yield index
+    index.close()
+
+
+def collect(index, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = index.query(limit=limit, cursor=cursor, **filters)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort", ["timestamp", "score"])
+@pytest.mark.parametrize("order", ["desc", "asc"])
+@pytest.mark.parametrize("limit", [1, 4, 23, 50])
+def test_pages_cover_every_row_once_in_order(index, sort, order, limit):
+    everything, cursor = index.query(sort=sort, order=order)
+    assert cursor is None
+    pages = collect(index, limit, sort=sort, order=order)
+    assert [row for page in pages for row in page] == everything
+    assert all(0 < len(page) <= limit for page in pages)
+
+
+def test_filters_apply_across_pages(index):
+    pages = collect(index, 2, personality="direct", date_from="2025-01-03", date_to="2025-01-09T23:59:59")
+    ids = [row["session_id"] for page in pages for row in page]
+    assert ids == ["s015", "s012", "s009", "s006"]
+
+
+def test_missing_score_is_reported(index):
+    rows, _ = index.query(sort="score", order="asc", limit=1)
+    assert rows[0]["overall_score"] == "N/A"
+
+
+def test_invalid_arguments(index):
+    with pytest.raises(ValueError):
+        index.query(cursor="not a cursor")
+    with pytest.raises(ValueError):
+        index.query(sort="goal")
+    with pytest.raises(ValueError):
+        index.query(order="sideways")
+
+
+def test_rebuild_replaces_contents(index):
+    assert index.rebuild([make_session(1, 3.0)], batch_size=1) == 1
+    assert index.count() == 1
@@ -0,0 +1,132 @@
+import json
+import os
+
+import pytest
+
+import session_store
+from session_store import (
+    CODECS, ShardedFileStore, get_codec, migrate_flat_directory, open_session_store
+)
+from session_transfer import export_stream
+
+
+def make_session(session_id="s1", **fields):
+    return {"sessionId": session_id, "timestamp": "2025-01-01T10:00:00", "transcript": "Hello — world ✓",
+            "feedback": {"overall_score": 7.5}, **fields}
+
+
+@pytest.mark.parametrize("name", sorted(CODECS))
+def test_codec_round_trip(name):
+    codec = get_codec(name)
+    session = make_session()
+    data = codec.encode(session)
+    assert codec.decode(data) == session
+    if codec.name != "json":
+        assert data != CODECS["json"].encode(session)
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("brotli")
+
+
+def test_zstd_without_package(monkeypatch):
+    monkeypatch.setattr(session_store, "zstandard", None)
+    with pytest.raises(ValueError, match="zstandard"):
+        get_codec("zstd")
+
+
+@pytest.fixture(params=["fs", "sqlite", "memory"])
+def store(request, tmp_path):
+    path = tmp_path / ("sessions" if request.param == "fs" else "sessions.db")
+    store = open_session_store(request.param, path if request.param != "memory" else None, codec="gzip")
+    yield store
+    store.close()
+
+
+def test_save_load_and_iterate(store):
+    store.save_many([make_session("a"), make_session("b")])
+    store.save(make_session("a", transcript="replaced"))
+    assert store.load("a")["transcript"] == "replaced"
+    assert store.load("missing") is None
+    assert store.count() == 2
+    assert sorted(session["sessionId"] for session in store.iter_sessions()) == ["a", "b"]
+
+
+def test_fs_write_leaves_no_temporary_files(tmp_path):
+    store = ShardedFileStore(tmp_path, fsync=True)
+    store.save(make_session("a"))
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == ["a.json"]
+    assert (tmp_path / ShardedFileStore.shard_for("a") / "a.json").exists()
+
+
+def test_fs_failed_write_keeps_previous_version(tmp_path, monkeypatch):
+    store = ShardedFileStore(tmp_path)
+    store.save(make_session("a"))
+
+    def crash(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(session_store.os, "replace", crash)
+    with pytest.raises(OSError):
+        store.save(make_session("a", transcript="new"))
+    monkeypatch.undo()
+    assert store.load("a")["transcript"] == "Hello — world ✓"
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == ["a.json"]
+
+
+def test_fs_skips_temporary_and_unreadable_files(tmp_path):
+    store = ShardedFileStore(tmp_path)
+    store.save(make_session("a"))
+    shard_dir = tmp_path / ShardedFileStore.shard_for("a")
+    (shard_dir / ".b.1234.tmp").write_bytes(b'{"sessionId": "b"')
+    (shard_dir / "c.json").write_bytes(b'{"truncated')
+    assert [session["sessionId"] for session in store.iter_sessions()] == ["a"]
+    assert store.stats()["unreadable"] == 1
+
+
+def test_fs_reads_other_codecs_and_flat_files(tmp_path):
+    ShardedFileStore(tmp_path, codec="gzip").save(make_session("old-gzip"))
+    (tmp_path / "flat.json").write_text(json.dumps(make_session("flat")))
+    store = ShardedFileStore(tmp_path, codec="json")
+    assert store.load("old-gzip")["sessionId"] == "old-gzip"
+    assert store.load("flat")["sessionId"] == "flat"
+    assert sorted(session["sessionId"] for session in store.iter_sessions()) == ["flat", "old-gzip"]
+
+
+@pytest.mark.parametrize("first, second", [("gzip", "json"), ("json", "gzip")])
+def test_fs_resave_in_another_codec_replaces_the_old_copy(tmp_path, first, second):
+    ShardedFileStore(tmp_path, codec=first).save(make_session("a", transcript="old"))
+    store = ShardedFileStore(tmp_path, codec=second)
+    store.save_many([make_session("a", transcript="new"), make_session("b")])
+    assert store.count() == 2
+    assert sorted(session["sessionId"] for session in store.iter_sessions()) == ["a", "b"]
+    assert store.load("a")["transcript"] == "new"
+    exported = b"".join(export_stream(store.iter_sessions())).decode("utf-8").splitlines()
+    assert sorted(json.loads(line)["transcript"] for line in exported) == ["Hello — world ✓", "new"]
+    # The configured codec is tried first, so the same holds when reading with the old one
+    assert ShardedFileStore(tmp_path, codec=first).load("a")["transcript"] == "new"
+
+
+@pytest.mark.parametrize("session_id", ["", ".hidden", "../escape", "a/b", "a\\b"])
+def test_fs_rejects_unsafe_ids(tmp_path, session_id):
+    store = ShardedFileStore(tmp_path)
+    with pytest.raises(ValueError):
+        store.save(make_session(session_id))
+    assert store.load(session_id) is None
+
+
+def test_migrate_flat_directory(tmp_path):
+    for session_id in ("a", "b"):
+        (tmp_path / f"{session_id}.json").write_text(json.dumps(make_session(session_id), indent=2))
+    store = ShardedFileStore(tmp_path, codec="gzip")
+    assert migrate_flat_directory(tmp_path, store, remove=True) == 2
+    assert not list(tmp_path.glob("*.json"))
+    assert store.load("b") == make_session("b")
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        session_store.SessionStore()
@@ -0,0 +1,196 @@
+import gzip
+import json
+import logging
+
+import pytest
+
+from progress import ProgressRollups
+from search_index import SearchIndex
+from session_index import SessionIndex
+from session_store import MemorySessionStore
+from session_transfer import (
+    NDJSONDecoder, export_stream, import_stream, parse_field_list, read_file_chunks, save_imported,
+    validate_record
+)
+
+SCORES = {"clarityScore": 80, "confidenceScore": 70, "engagementScore": 60, "structureScore": 50}
+
+
+def make_record(session_id, **fields):
+    return {"sessionId": session_id, "timestamp": "2025-01-01T09:00:00", "transcript": "",
+            "feedback": {**SCORES, "overall_score": 6.5}, **fields}
+
+
+def make_sessions(count):
+    return [
+        make_record(f"s{number}", timestamp=f"2025-01-{number + 1:02d}T09:00:00",
+                    transcript=f"Speech {number} — ünïcode\nwith a newline",
+                    feedback={**SCORES, "overall_score": number})
+        for number in range(count)
+    ]
+
+
+def ndjson(*records):
+    return b"".join(json.dumps(record).encode("utf-8") + b"\n" for record in records)
+
+
+def rechunk(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def run_import(chunks, batch_size=3):
+    saved = []
+    summary = import_stream(chunks, lambda batch: saved.append(list(batch)), batch_size)
+    return summary, saved
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_round_trip(compress, chunk_size):
+    sessions = make_sessions(10)
+    data = b"".join(export_stream(iter(sessions), compress=compress))
+    summary, saved = run_import(rechunk(data, chunk_size))
+    assert summary == {"imported": 10, "failed": 0, "errors": []}
+    assert [session for batch in saved for session in batch] == sessions
+
+
+def test_sessions_are_saved_in_batches():
+    lines = b"".join(export_stream(iter(make_sessions(10)))).splitlines(keepends=True)
+    summary, saved = run_import(lines, batch_size=3)
+    assert [len(batch) for batch in saved] == [3, 3, 3, 1]
+
+
+def test_export_filters_and_projection():
+    sessions = make_sessions(5)
+    data = b"".join(export_stream(iter(sessions), date_from="2025-01-02", date_to="2025-01-03T23:59:59",
+                                  exclude=["transcript"]))
+    summary, saved = run_import([data])
+    # Without transcripts the records are no longer importable, and each one is reported
+    assert summary["imported"] == 0 and summary["failed"] == 2
+    assert summary["errors"][0] == {"line": 1, "error": "Missing fields: transcript"}
+
+    data = b"".join(export_stream(iter(sessions), fields=["timestamp"]))
+    assert data.splitlines()[0] == b'{"sessionId":"s0","timestamp":"2025-01-01T09:00:00"}'
+
+
+def test_concatenated_gzip_members():
+    sessions = make_sessions(4)
+    data = gzip.compress(b"".join(export_stream(iter(sessions[:2])))) + \
+        gzip.compress(b"".join(export_stream(iter(sessions[2:]))))
+    summary, saved = run_import(rechunk(data, 5))
+    assert summary["imported"] == 4
+
+
+def test_bad_lines_are_reported_and_skipped():
+    data = ndjson(make_record("ok")) + b"\nnot json\n[1]\n" + ndjson(make_record("../x")) + \
+        json.dumps(make_record("last")).encode("utf-8")
+    summary, saved = run_import([data])
+    assert summary["imported"] == 2
+    assert [error["line"] for error in summary["errors"]] == [3, 4, 5]
+    assert [session["sessionId"] for batch in saved for session in batch] == ["ok", "last"]
+
+
+def test_truncated_gzip_is_an_error():
+    data = gzip.compress(b"".join(export_stream(iter(make_sessions(3)))))
+    with pytest.raises(ValueError):
+        run_import([data[:-10]])
+
+
+def test_overlong_line_is_an_error(monkeypatch):
+    import session_transfer
+    monkeypatch.setattr(session_transfer, "MAX_LINE_BYTES", 16)
+    decoder = NDJSONDecoder()
+    with pytest.raises(ValueError, match="longer than"):
+        decoder.feed(b'{"sessionId": "a very long line without a newline')
+
+
+def test_validate_record():
+    assert validate_record(make_record("a")) is None
+    assert validate_record(make_record("a", userGoal=None, feedback={**SCORES, "overall_score": 7,
+                                                                     "strengths": ["Clear"], "pace": 130.5})) is None
+    assert validate_record("text") == "Not a JSON object"
+    assert validate_record(make_record(5)) == "Invalid sessionId"
+
+
+@pytest.mark.parametrize("fields, error", [
+    ({"timestamp": "yesterday"}, "timestamp must be an ISO 8601 date and time"),
+    ({"timestamp": 1735722000}, "timestamp must be an ISO 8601 date and time"),
+    ({"transcript": ["not", "text"]}, "transcript must be a string"),
+    ({"userGoal": 3}, "userGoal must be a string"),
+    ({"feedback": "great"}, "feedback must be an object"),
+    ({"feedback": {**SCORES}}, "feedback scores must be numbers: overall_score"),
+    ({"feedback": {**SCORES, "clarityScore": "80", "overall_score": True}},
+     "feedback scores must be numbers: clarityScore, overall_score"),
+    ({"feedback": {**SCORES, "overall_score": 7, "strengths": "Clear"}}, "feedback.strengths must be a list of strings"),
+    ({"feedback": {**SCORES, "overall_score": 7, "fillerWords": ["um"]}}, "feedback.fillerWords must be an object"),
+    ({"feedback": {**SCORES, "overall_score": 7, "pace": "fast"}}, "feedback.pace must be a number"),
+])
+def test_validate_record_rejects_wrong_types(fields, error):
+    assert validate_record(make_record("a", **fields)) == error
+
+
+def test_badly_typed_lines_are_skipped_and_the_rest_of_the_batch_is_imported():
+    data = ndjson(make_record("a"), make_record("b", transcript=42), make_record("c"),
+                  make_record("d", feedback={"overall_score": "high"}), make_record("e"))
+    summary, saved = run_import([data], batch_size=10)
+    assert summary["imported"] == 3 and summary["failed"] == 2
+    assert summary["errors"] == [{"line": 2, "error": "transcript must be a string"},
+                                 {"line": 4, "error": "feedback scores must be numbers: clarityScore, "
+                                                      "confidenceScore, engagementScore, structureScore, "
+                                                      "overall_score"}]
+    assert [[session["sessionId"] for session in batch] for batch in saved] == [["a", "c", "e"]]
+
+
+@pytest.fixture
+def indexes(tmp_path):
+    opened = (SessionIndex(tmp_path / "sessions.db"), ProgressRollups(tmp_path / "sessions.db"),
+              SearchIndex(tmp_path / "sessions.db"))
+    yield opened
+    for index in opened:
+        index.close()
+
+
+def test_save_imported_writes_the_store_and_every_index(indexes):
+    store = MemorySessionStore()
+    index, rollups, search = indexes
+    sessions = [make_record("a", transcript="quarterly revenue grew", userId="u1"), make_record("b")]
+    save_imported(sessions, store, index, rollups, search)
+    assert store.count() == index.count() == rollups.count() == search.count() == 2
+    assert [hit["session_id"] for hit in search.search("revenue")[0]] == ["a"]
+
+
+def test_rebuild_logs_and_skips_a_bad_stored_record(indexes, caplog):
+    index, rollups, search = indexes
+    # Written before imports were validated: a transcript that is not text
+    sessions = [make_record("good", transcript="plain speech"), make_record("bad", transcript={"text": "x"})]
+    with caplog.at_level(logging.WARNING):
+        assert index.rebuild(iter(sessions)) == 1
+        assert search.rebuild(iter(sessions)) == 1
+        rollups.rebuild(iter(sessions))
+    assert index.count() == search.count() == 1
+    assert rollups.count() == 2
+    skipped = [record for record in caplog.records if getattr(record, "session_id", None) == "bad"]
+    assert len(skipped) >= 2
+
+
+def test_import_endpoint_skips_badly_typed_lines(client):
+    data = ndjson(make_record("import-ok-1", transcript="endpoint import"),
+                  make_record("import-bad", feedback={**SCORES, "overall_score": 7, "pace": "fast"}),
+                  make_record("import-ok-2"))
+    response = client.post("/import", content=data, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.json() == {"imported": 2, "failed": 1,
+                               "errors": [{"line": 2, "error": "feedback.pace must be a number"}]}
+    assert client.get("/feedback/import-ok-1").status_code == 200
+    assert client.get("/feedback/import-bad").status_code == 404
+
+
+def test_read_file_chunks(tmp_path):
+    path = tmp_path / "export.ndjson"
+    path.write_bytes(b"x" * 10)
+    assert list(read_file_chunks(path, chunk_bytes=4)) == [b"xxxx", b"xxxx", b"xx"]
+
+
+def test_parse_field_list():
+    assert parse_field_list(None) is None
+    assert parse_field_list(" transcript, feedback ,,") == ["transcript", "feedback"]
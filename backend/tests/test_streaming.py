@@ -0,0 +1,66 @@
+import json
+
+from streaming_json import IncrementalJSONObjectParser
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def feed_all(chunks):
+    parser = IncrementalJSONObjectParser()
+    completed = []
+    for chunk in chunks:
+        completed.append(parser.feed(chunk))
+    return parser, completed
+
+
+def test_parser_emits_each_member_as_soon_as_it_completes():
+    parser, completed = feed_all(['```json\n{"summary": "Go', 'od", "score"', ': 7', ', "tips": ["a"', ', "b"]}\n```'])
+    assert completed == [[], [("summary", "Good")], [], [("score", 7)], [("tips", ["a", "b"])]]
+    assert parser.done
+
+
+def test_parser_matches_json_loads_one_character_at_a_time():
+    document = {"a": "x \"quoted\" \\ y", "b": {"c": [1, 2, {"d": None}]}, "e": -1.5e3, "f": True, "g": "}"}
+    text = json.dumps(document, indent=2)
+    _, completed = feed_all(text)
+    assert dict(pair for pairs in completed for pair in pairs) == document
+
+
+def test_parser_skips_invalid_values():
+    _, completed = feed_all(['{"a": tru, "b": 2}'])
+    assert completed == [[("b", 2)]]
+
+
+def test_parser_ignores_text_after_the_object():
+    parser, completed = feed_all(['{"a": 1}', ' {"b": 2}'])
+    assert completed == [[("a", 1)], []]
+    assert parser.done
+
+
+def test_analyze_stream_event_order(client, fake_model):
+    response = client.post("/analyze/stream", json={
+        "transcript": "So um today I will explain how the streaming endpoint sends its events in order.",
+        "userGoal": "Explain streaming", "duration": 20, "aiPersonality": "direct"
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names[:3] == ["session", "metrics", "provisional"]
+    assert names[-1] == "result"
+    assert set(names[3:-1]) == {"field"}
+    session_id = events[0][1]["sessionId"]
+    result = events[-1][1]
+    assert result["sessionId"] == session_id
+    assert events[1][1]["fillerWords"] == result["fillerWords"]
+    fields = {data["name"]: data["value"] for name, data in events if name == "field"}
+    assert fields["clarityScore"] == result["clarityScore"]
+    assert fake_model.calls == 1
+    # Persisted like /analyze
+    assert client.get(f"/feedback/{session_id}").json()["sessionId"] == session_id
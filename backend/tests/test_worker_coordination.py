@@ -0,0 +1,164 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from caching import FeedbackCache
+import worker_coordination
+from worker_coordination import CrossProcessSemaphore, FileLock, SharedGeneration, connect_sqlite
+
+BACKEND_DIR = Path(worker_coordination.__file__).resolve().parent
+
+needs_flock = pytest.mark.skipif(worker_coordination.fcntl is None, reason="file locks are process-local here")
+
+# Holds slot locks from a separate process until its stdin closes
+HOLDER = """
+import sys
+from worker_coordination import CrossProcessSemaphore
+semaphore = CrossProcessSemaphore(sys.argv[1], int(sys.argv[2]), name="gemini")
+held = [semaphore.try_acquire() for _ in range(int(sys.argv[3]))]
+print(sum(lock is not None for lock in held), flush=True)
+sys.stdin.read()
+"""
+
+
+@pytest.fixture
+def holder(tmp_path):
+    """Start a process holding `count` of `slots` permits in tmp_path; it exits when the test ends"""
+    processes = []
+
+    def start(slots, count):
+        process = subprocess.Popen([sys.executable, "-c", HOLDER, str(tmp_path), str(slots), str(count)],
+                                   cwd=BACKEND_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        processes.append(process)
+        assert int(process.stdout.readline()) == count
+        return process
+
+    yield start
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+def test_file_locks_on_one_path_conflict(tmp_path):
+    first, second = FileLock(tmp_path / "a.lock"), FileLock(tmp_path / "a.lock")
+    assert first.acquire(blocking=False)
+    assert first.held
+    assert not second.acquire(blocking=False)
+    assert not second.held
+    first.release()
+    with second:
+        assert second.held
+        assert not first.acquire(blocking=False)
+    assert not second.held
+
+
+def test_shared_generation_sees_bumps_from_other_instances(tmp_path):
+    reader = SharedGeneration(tmp_path / "cache.generation")
+    writer = SharedGeneration(tmp_path / "cache.generation")
+    assert not reader.changed()
+    writer.bump()
+    assert reader.changed()
+    assert not reader.changed()
+    # Two bumps within one mtime tick still look different
+    writer.bump()
+    writer.bump()
+    assert reader.changed()
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_semaphore_caps_concurrency_in_one_process(tmp_path):
+    semaphore = CrossProcessSemaphore(tmp_path, 2)
+    running, peak = 0, 0
+
+    async def task():
+        nonlocal running, peak
+        async with semaphore.slot(max_poll_seconds=0.01) as waited:
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+        return waited
+
+    async def scenario():
+        return await asyncio.gather(*(task() for _ in range(6)))
+
+    waits = asyncio.run(scenario())
+    assert peak == 2
+    assert sorted(waits)[:2] == [pytest.approx(0, abs=0.01)] * 2
+    assert max(waits) >= 0.02
+    stats = semaphore.stats()
+    assert (stats["slots"], stats["heldHere"], stats["acquired"]) == (2, 0, 6)
+    assert stats["contended"] >= 4
+
+
+def test_semaphore_with_no_slots_never_waits(tmp_path):
+    semaphore = CrossProcessSemaphore(tmp_path, 0)
+
+    async def scenario():
+        async with semaphore.slot() as waited:
+            return waited
+
+    assert asyncio.run(scenario()) == 0.0
+    assert semaphore.try_acquire() is None
+    assert not list(tmp_path.iterdir())
+
+
+@needs_flock
+def test_semaphore_permits_are_shared_across_processes(tmp_path, holder):
+    holder(3, 2)
+    semaphore = CrossProcessSemaphore(tmp_path, 3, name="gemini")
+    lock = semaphore.try_acquire()
+    assert lock is not None
+    assert semaphore.try_acquire() is None
+    lock.release()
+
+
+@needs_flock
+def test_waiter_gets_the_permit_when_the_holding_process_dies(tmp_path, holder):
+    process = holder(1, 1)
+    semaphore = CrossProcessSemaphore(tmp_path, 1, name="gemini")
+    assert semaphore.try_acquire() is None
+
+    async def scenario():
+        async with semaphore.slot(max_poll_seconds=0.02) as waited:
+            return waited
+
+    async def kill_then_wait():
+        waiter = asyncio.ensure_future(scenario())
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        # No cleanup runs on SIGKILL: the kernel drops the flock with the process
+        process.kill()
+        return await asyncio.wait_for(waiter, 10)
+
+    assert asyncio.run(kill_then_wait()) >= 0.1
+    assert semaphore.stats()["contended"] == 1
+
+
+def test_connect_sqlite_uses_wal_and_a_busy_timeout(tmp_path):
+    conn = connect_sqlite(tmp_path / "shared.db")
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+    finally:
+        conn.close()
+
+
+def test_workers_share_the_persistent_feedback_cache(tmp_path):
+    # Two caches on one database stand in for two worker processes
+    first, second = FeedbackCache(db_path=tmp_path / "cache.db"), FeedbackCache(db_path=tmp_path / "cache.db")
+    try:
+        key = FeedbackCache.make_key("Shared transcript", "goal", "supportive", 30, False, "model")
+        assert second.get(key) is None
+        first.set(key, {"overall_score": 7.0})
+        assert second.get(key) == {"overall_score": 7.0}
+        assert second.stats()["persistentHits"] == 1
+        # Now served from the second worker's memory tier
+        assert second.get(key) == {"overall_score": 7.0}
+        assert second.stats()["persistentHits"] == 1
+    finally:
+        first.close()
+        second.close()
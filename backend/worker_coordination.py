@@ -0,0 +1,202 @@
+"""
+Podium Pal Backend - Worker Coordination
+=========================================
+Primitives for running several server processes (uvicorn --workers or
+gunicorn) over the same storage: SQLite connections that tolerate concurrent
+writers, advisory file locks, and a semaphore shared by every process on the
+host that caps concurrent Gemini calls globally.
+
+File locks use flock(2), so the kernel releases them when a process dies and
+a crashed worker can never leave a slot or lock held. On platforms without
+fcntl the locks are process-local, which is correct for a single worker.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only single-process serving is coordinated
+    fcntl = None
+
+# SQLite waits this long for another process's write lock before failing
+SQLITE_BUSY_TIMEOUT_SECONDS = 30.0
+
+
+def connect_sqlite(db_path: Path) -> sqlite3.Connection:
+    """
+    Open a SQLite database that other threads and worker processes share
+
+    WAL mode lets readers proceed while one process writes, and the busy
+    timeout makes a writer wait for another process's transaction instead of
+    failing with "database is locked".
+    """
+    conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=SQLITE_BUSY_TIMEOUT_SECONDS)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Durable at every checkpoint; a power loss can only drop the last commits
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a file, held across processes
+
+    Two FileLock objects on the same path conflict even inside one process,
+    since each opens its own file description.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._local = threading.Lock()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock; with blocking=False, return False instead of waiting"""
+        if not self._local.acquire(blocking):
+            return False
+        if fcntl is None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            os.close(fd)
+            self._local.release()
+            return False
+        except BaseException:
+            os.close(fd)
+            self._local.release()
+            raise
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            # Closing the descriptor drops the flock
+            os.close(self._fd)
+            self._fd = None
+        self._local.release()
+
+    @property
+    def held(self) -> bool:
+        """Whether this object holds the lock"""
+        return self._local.locked()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class SharedGeneration:
+    """
+    A counter every process can bump and cheaply notice the change of
+
+    Used to invalidate per-process caches: a writer bumps the generation,
+    and each reader compares the file's identity (one stat call) with what
+    it saw last. The file is replaced rather than rewritten, so every bump
+    gives it a new inode even within one mtime tick.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._seen = self._identity()
+
+    def _identity(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def bump(self):
+        """Signal every process (this one included) that its cached data may be stale"""
+        temp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp_path.write_text(f"{time.time()}\n")
+        os.replace(temp_path, self.path)
+
+    def changed(self) -> bool:
+        """Whether the generation moved since the last call that returned True (or since creation)"""
+        identity = self._identity()
+        if identity == self._seen:
+            return False
+        self._seen = identity
+        return True
+
+
+class CrossProcessSemaphore:
+    """
+    Counting semaphore shared by every process using the same directory
+
+    Each of the `slots` permits is a lock file; a holder owns the flock on
+    one of them. Waiters poll with a short, growing backoff (flock has no
+    fair wakeup), so throughput under contention is slightly below a perfect
+    semaphore, but no process can exceed the global limit.
+
+    Args:
+        lock_dir: Directory holding the slot files (created if missing)
+        slots: Permits across all processes; 0 disables the semaphore
+        name: Prefix of the slot files
+    """
+
+    def __init__(self, lock_dir: Path, slots: int, name: str = "slot"):
+        self.slots = max(0, slots)
+        self._locks: List[FileLock] = [FileLock(Path(lock_dir) / f"{name}-{i}.lock") for i in range(self.slots)]
+        # Start probing at a different slot in each process to spread contention
+        self._offset = os.getpid() % self.slots if self.slots else 0
+        self._acquired = 0
+        self._contended = 0
+
+    def try_acquire(self) -> Optional[FileLock]:
+        """A held slot lock, or None if every slot is taken"""
+        for i in range(self.slots):
+            lock = self._locks[(self._offset + i) % self.slots]
+            if not lock.held and lock.acquire(blocking=False):
+                return lock
+        return None
+
+    @asynccontextmanager
+    async def slot(self, max_poll_seconds: float = 0.25) -> AsyncIterator[float]:
+        """
+        Hold one permit for the duration of the block
+
+        Yields:
+            Seconds spent waiting for the permit
+        """
+        if not self.slots:
+            yield 0.0
+            return
+        started = time.monotonic()
+        lock = self.try_acquire()
+        delay = 0.005
+        if lock is None:
+            self._contended += 1
+        while lock is None:
+            await asyncio.sleep(delay)
+            delay = min(max_poll_seconds, delay * 2)
+            lock = self.try_acquire()
+        self._acquired += 1
+        try:
+            yield time.monotonic() - started
+        finally:
+            lock.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Permits, those held by this process, and acquisitions since start"""
+        return {
+            "slots": self.slots,
+            "heldHere": sum(1 for lock in self._locks if lock.held),
+            "acquired": self._acquired,
+            "contended": self._contended,
+        }